@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import os
-import re
 from typing import List, Optional, Tuple
 
 from ..services.lexicon_analyzer import load_lexicon
+from ..services.lexicon_registry import get_lexicon_registry
 
 
 def weak_lexicon_enabled() -> bool:
@@ -28,10 +28,7 @@ def evaluate_weak_language(
     if not weak_lexicon_enabled() or original_verdict != "pass":
         return original_verdict, False, version
 
-    text_lc = window_text.lower()
-    weak_terms = lexicon.weak_terms()
-    if any(re.search(rf"\b{re.escape(t)}\b", text_lc) for t in weak_terms):
-        anchors = [*(counter_anchors or []), *lexicon.strengtheners]
-        if not any(re.search(rf"\b{re.escape(a)}\b", text_lc) for a in anchors):
-            return "weak", True, version
+    compiled = get_lexicon_registry().for_language(language, lexicon)
+    if compiled.is_weak(window_text.lower(), counter_anchors):
+        return "weak", True, version
     return original_verdict, False, version
@@ -4,8 +4,8 @@ This file sets up a minimal FastAPI application with structured logging,
 request metrics middleware, and simple health/readiness endpoints.
 """
 
+import asyncio
 import os
-import uuid
 import logging
 import time
 import json
@@ -16,7 +16,7 @@ from fastapi import (
     WebSocket,
     WebSocketDisconnect,
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List
 from sqlalchemy import text
@@ -24,6 +24,10 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from .database import engine, Base
 from .models import entities
+from .services import storage, tracing
+from .services.histograms import get_histograms, render_prometheus
+from .services.profiling import PROFILE_HEADER, PROFILE_QUERY, ProfileSession, verify_profile_token
+from .services.job_events import analysis_channel, iter_events
 # Guarded router imports to avoid hard failures on optional subsystems during tests
 try:
     from .routers import rules as rules
@@ -122,25 +126,63 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
     """Return errors in a consistent JSON envelope."""
 
     if isinstance(exc.detail, dict):
-        return JSONResponse(status_code=exc.status_code, content=exc.detail)
+        return JSONResponse(status_code=exc.status_code, content=exc.detail, headers=exc.headers)
     return JSONResponse(
         status_code=exc.status_code,
         content={"code": "error", "message": str(exc.detail)},
+        headers=exc.headers,
     )
 
 
+async def _flush_trace(trace) -> None:
+    # Only traces tagged with an analysis are written to disk; the rest are
+    # dropped in memory, so they skip the hop to the I/O pool.
+    if trace is not None and trace.analysis_id:
+        await storage.run_io(tracing.flush, trace)
+    else:
+        tracing.flush(trace)
+
+
 @app.middleware("http")
 async def add_process_time_header_and_logging(request: Request, call_next):
     """
     Middleware to add a correlation ID, log requests, and measure latency.
     This fulfills parts of E4 (Metrics & Observability) for Sprint 1.
+
+    The correlation ID is the trace id of the request's root span, so it
+    matches the spans of any Celery job the request enqueues.
     """
     start_time = time.time()
-    correlation_id = str(uuid.uuid4())
+    span, reset = tracing.begin_span(
+        "http.request",
+        traceparent=request.headers.get(tracing.TRACEPARENT_HEADER),
+        kind="server",
+        method=request.method,
+        path=request.url.path,
+    )
+    correlation_id = span.trace_id
 
-    response = await call_next(request)
+    try:
+        response = await call_next(request)
+    except Exception as exc:
+        await _flush_trace(tracing.end_span(span, reset, exc))
+        raise
 
     process_time = (time.time() - start_time) * 1000
+    # Label by route template, not raw path, to bound series cardinality
+    route = request.scope.get("route")
+    get_histograms().observe(
+        "http_request_duration_ms",
+        process_time,
+        route=getattr(route, "path", "unmatched"),
+        method=request.method,
+        status=response.status_code,
+    )
+    span.set_attribute("route", getattr(route, "path", "unmatched"))
+    span.set_attribute("status_code", response.status_code)
+    if response.status_code >= 500:
+        span.status = "error"
+    await _flush_trace(tracing.end_span(span, reset))
 
     logger.info(
         f'{{"correlation_id": "{correlation_id}", "method": "{request.method}", '
@@ -149,6 +191,29 @@ async def add_process_time_header_and_logging(request: Request, call_next):
     )
 
     response.headers["X-Correlation-ID"] = correlation_id
+    response.headers[tracing.TRACEPARENT_HEADER] = span.traceparent
+    return response
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """Sample-profile this request when it carries an admin-signed profile token."""
+    token = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY)
+    if token is None:
+        return await call_next(request)
+    if not verify_profile_token(token):
+        return JSONResponse(
+            status_code=403,
+            content={"code": "invalid_profile_token", "message": "Profile token is invalid or expired"},
+        )
+    session = ProfileSession(f"{request.method} {request.url.path}")
+    reset = session.start()
+    try:
+        response = await call_next(request)
+    finally:
+        session.stop(reset)
+        await storage.run_io(session.save)
+    response.headers["X-Profile-Id"] = session.id
     return response
 
 
@@ -174,14 +239,37 @@ async def get_readiness():
     return JSONResponse(content={"ok": True, "db": "ok", "migrations": "ok"})
 
 
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+def get_prometheus_metrics() -> PlainTextResponse:
+    """Latency and usage histograms merged across workers, in Prometheus text format."""
+    return PlainTextResponse(
+        render_prometheus(get_histograms().collect()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.get("/")
 def read_root() -> dict[str, bool | str]:
     return {"status": "ok"}
 
 
+async def _forward_analysis_events(websocket: WebSocket, analysis_id: str) -> None:
+    """Push job status events for ``analysis_id`` to a connected client."""
+    try:
+        async for event in iter_events(analysis_channel(analysis_id)):
+            if event is None:
+                continue
+            await manager.send_personal_message(json.dumps(event), websocket)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        logger.warning(f"Job event stream unavailable for analysis {analysis_id}: {exc}")
+
+
 @app.websocket("/ws/analysis/{analysis_id}")
 async def websocket_endpoint(websocket: WebSocket, analysis_id: str):
     await manager.connect(websocket)
+    forwarder = asyncio.create_task(_forward_analysis_events(websocket, analysis_id))
     try:
         # Send initial connection confirmation
         await manager.send_personal_message(
@@ -210,6 +298,8 @@ async def websocket_endpoint(websocket: WebSocket, analysis_id: str):
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         manager.disconnect(websocket)
+    finally:
+        forwarder.cancel()
 
 
 @app.get("/api/analysis/{analysis_id}/live")
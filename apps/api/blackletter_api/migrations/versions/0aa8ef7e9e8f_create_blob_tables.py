@@ -0,0 +1,42 @@
+"""create blobs and blob_refs tables"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0aa8ef7e9e8f"
+down_revision = "7c4ad2dcff7c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blobs",
+        sa.Column("sha256", sa.String(64), primary_key=True, nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("refcount", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("backend", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("released_at", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "blob_refs",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("analysis_id", sa.String(), nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("org_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(op.f("ix_blob_refs_sha256"), "blob_refs", ["sha256"])
+    op.create_index(op.f("ix_blob_refs_analysis_id"), "blob_refs", ["analysis_id"])
+    op.create_index(op.f("ix_blob_refs_org_id"), "blob_refs", ["org_id"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_blob_refs_org_id"), table_name="blob_refs")
+    op.drop_index(op.f("ix_blob_refs_analysis_id"), table_name="blob_refs")
+    op.drop_index(op.f("ix_blob_refs_sha256"), table_name="blob_refs")
+    op.drop_table("blob_refs")
+    op.drop_table("blobs")
@@ -0,0 +1,33 @@
+"""create analysis_results table"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "2545ac105c92"
+down_revision = "d3f1a9b27c10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analysis_results",
+        sa.Column("analysis_id", sa.String(), primary_key=True, nullable=False),
+        sa.Column("org_id", sa.String(), nullable=True),
+        sa.Column("encoding", sa.String(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("finding_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("pass_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("weak_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("missing_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("needs_review_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("coverage_percentage", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(op.f("ix_analysis_results_org_id"), "analysis_results", ["org_id"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_analysis_results_org_id"), table_name="analysis_results")
+    op.drop_table("analysis_results")
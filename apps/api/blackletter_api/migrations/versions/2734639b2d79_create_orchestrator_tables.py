@@ -0,0 +1,42 @@
+"""create orchestrator_records and orchestrator_findings tables
+
+Used by the database orchestrator backend (ORCHESTRATOR_BACKEND=db).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "2734639b2d79"
+down_revision = "b8cf8d30d20c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "orchestrator_records",
+        sa.Column("id", sa.String(), primary_key=True, nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(op.f("ix_orchestrator_records_created_at"), "orchestrator_records", ["created_at"])
+    op.create_index(op.f("ix_orchestrator_records_expires_at"), "orchestrator_records", ["expires_at"])
+    op.create_table(
+        "orchestrator_findings",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True, nullable=False),
+        sa.Column("analysis_id", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(op.f("ix_orchestrator_findings_analysis_id"), "orchestrator_findings", ["analysis_id"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_orchestrator_findings_analysis_id"), table_name="orchestrator_findings")
+    op.drop_table("orchestrator_findings")
+    op.drop_index(op.f("ix_orchestrator_records_expires_at"), table_name="orchestrator_records")
+    op.drop_index(op.f("ix_orchestrator_records_created_at"), table_name="orchestrator_records")
+    op.drop_table("orchestrator_records")
@@ -0,0 +1,51 @@
+"""create metric_daily_rollups and index metrics.created_at
+
+Existing metrics are rolled up here, so history is counted from the first
+read after the upgrade.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "2de9e5fb5494"
+down_revision = "bd43e96c966f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metric_daily_rollups",
+        sa.Column("day", sa.Date(), primary_key=True, nullable=False),
+        sa.Column("analyses", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("tokens_total", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("llm_invoked_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cap_exceeded_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("latency_sum_ms", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("latency_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(op.f("ix_metrics_created_at"), "metrics", ["created_at"])
+    # Same aggregation as metric_rollups.rebuild_daily_rollups
+    op.execute(
+        """
+        INSERT INTO metric_daily_rollups (
+            day, analyses, tokens_total, llm_invoked_count, cap_exceeded_count,
+            latency_sum_ms, latency_count
+        )
+        SELECT
+            DATE(created_at),
+            COUNT(id),
+            COALESCE(SUM(tokens_per_doc), 0),
+            SUM(CASE WHEN llm_invoked THEN 1 ELSE 0 END),
+            SUM(CASE WHEN error_reason = 'token_cap' THEN 1 ELSE 0 END),
+            COALESCE(SUM(processing_time_ms), 0),
+            SUM(CASE WHEN processing_time_ms > 0 THEN 1 ELSE 0 END)
+        FROM metrics
+        GROUP BY DATE(created_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_metrics_created_at"), table_name="metrics")
+    op.drop_table("metric_daily_rollups")
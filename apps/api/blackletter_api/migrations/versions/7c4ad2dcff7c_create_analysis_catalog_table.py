@@ -0,0 +1,41 @@
+"""create analysis_catalog table
+
+Rows for analyses already on disk are backfilled by
+``catalogue.ensure_backfilled`` on the first listing after deploy.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "7c4ad2dcff7c"
+down_revision = "2545ac105c92"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analysis_catalog",
+        sa.Column("analysis_id", sa.String(), primary_key=True, nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("org_id", sa.String(), nullable=True),
+        sa.Column("pass_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("weak_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("missing_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("needs_review_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(op.f("ix_analysis_catalog_filename"), "analysis_catalog", ["filename"])
+    op.create_index(op.f("ix_analysis_catalog_status"), "analysis_catalog", ["status"])
+    op.create_index(op.f("ix_analysis_catalog_org_id"), "analysis_catalog", ["org_id"])
+    op.create_index("ix_analysis_catalog_created_id", "analysis_catalog", ["created_at", "analysis_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analysis_catalog_created_id", table_name="analysis_catalog")
+    op.drop_index(op.f("ix_analysis_catalog_org_id"), table_name="analysis_catalog")
+    op.drop_index(op.f("ix_analysis_catalog_status"), table_name="analysis_catalog")
+    op.drop_index(op.f("ix_analysis_catalog_filename"), table_name="analysis_catalog")
+    op.drop_table("analysis_catalog")
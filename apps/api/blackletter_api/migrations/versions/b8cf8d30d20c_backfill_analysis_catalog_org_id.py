@@ -0,0 +1,38 @@
+"""backfill analysis_catalog.org_id from analyses and blob_refs"""
+
+from alembic import op
+
+revision = "b8cf8d30d20c"
+down_revision = "0aa8ef7e9e8f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Entries catalogued before the submitter's org was recorded would
+    # otherwise all fall under the default org's retention policy.
+    op.execute(
+        """
+        UPDATE analysis_catalog
+        SET org_id = (
+            SELECT analyses.org_id FROM analyses
+            WHERE CAST(analyses.id AS VARCHAR) = analysis_catalog.analysis_id
+        )
+        WHERE org_id IS NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE analysis_catalog
+        SET org_id = (
+            SELECT MAX(blob_refs.org_id) FROM blob_refs
+            WHERE blob_refs.analysis_id = analysis_catalog.analysis_id
+        )
+        WHERE org_id IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    # Data-only revision; the backfilled values are left in place.
+    pass
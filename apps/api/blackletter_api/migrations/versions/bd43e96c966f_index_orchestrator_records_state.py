@@ -0,0 +1,20 @@
+"""index orchestrator_records by (state, created_at, id) for keyset paging"""
+
+from alembic import op
+
+revision = "bd43e96c966f"
+down_revision = "2734639b2d79"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_orchestrator_records_state_created_id",
+        "orchestrator_records",
+        ["state", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orchestrator_records_state_created_id", table_name="orchestrator_records")
@@ -0,0 +1,16 @@
+"""index analyses.created_at for the retention GC"""
+
+from alembic import op
+
+revision = "d3f1a9b27c10"
+down_revision = "8b6e5f4c2a71"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_analyses_created_at"), "analyses", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_analyses_created_at"), table_name="analyses")
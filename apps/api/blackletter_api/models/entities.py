@@ -1,13 +1,17 @@
 import uuid
 from sqlalchemy import (
+    BigInteger,
     Column,
+    Date,
     DateTime,
     Integer,
     String,
     Boolean,
     Float,
     Enum,
+    Index,
     JSON,
+    LargeBinary,
     func,
 )
 from sqlalchemy.dialects.postgresql import UUID
@@ -44,7 +48,8 @@ class Analysis(Base):
     size_bytes = Column(Integer, nullable=False)
     mime_type = Column(String, nullable=False)
     status = Column(String, nullable=False, default="queued")
-    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    # Indexed so the retention GC can find expired analyses without a scan
+    created_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
     # org_id is not used in MVP, but good to have for future multi-tenancy
     org_id = Column(String, nullable=True)
 
@@ -86,7 +91,7 @@ class Metric(Base):
     analysis_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     tokens_per_doc = Column(Integer, nullable=False, default=0)
     llm_invoked = Column(Boolean, nullable=False, default=False)
-    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    created_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
     
     # Additional metrics fields for comprehensive tracking
     processing_time_ms = Column(Float, nullable=True)
@@ -97,6 +102,24 @@ class Metric(Base):
         return f"<Metric(id={self.id}, analysis_id={self.analysis_id}, tokens={self.tokens_per_doc}, llm={self.llm_invoked})>"
 
 
+class MetricDailyRollup(Base):
+    """Per-day sums over ``metrics``, kept current by services.metric_rollups."""
+
+    __tablename__ = "metric_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    analyses = Column(Integer, nullable=False, default=0)
+    tokens_total = Column(BigInteger, nullable=False, default=0)
+    llm_invoked_count = Column(Integer, nullable=False, default=0)
+    cap_exceeded_count = Column(Integer, nullable=False, default=0)
+    # Average latency is latency_sum_ms / latency_count
+    latency_sum_ms = Column(Float, nullable=False, default=0.0)
+    latency_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MetricDailyRollup(day={self.day}, analyses={self.analyses})>"
+
+
 # Report model matching ReportExport schema
 class Report(Base):
     __tablename__ = "reports"
@@ -111,6 +134,109 @@ class Report(Base):
         return f"<Report(id={self.id}, analysis_id='{self.analysis_id}', filename='{self.filename}')>"
 
 
+# Compact per-analysis result payload (findings, coverage, verdict counts)
+class AnalysisResult(Base):
+    __tablename__ = "analysis_results"
+
+    analysis_id = Column(String, primary_key=True)
+    org_id = Column(String, nullable=True, index=True)
+    encoding = Column(String, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    finding_count = Column(Integer, nullable=False, default=0)
+    pass_count = Column(Integer, nullable=False, default=0)
+    weak_count = Column(Integer, nullable=False, default=0)
+    missing_count = Column(Integer, nullable=False, default=0)
+    needs_review_count = Column(Integer, nullable=False, default=0)
+    coverage_percentage = Column(Float, nullable=False, default=0.0)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<AnalysisResult(analysis_id='{self.analysis_id}', findings={self.finding_count},"
+            f" size={self.size_bytes})>"
+        )
+
+
+# Catalogue of analyses on disk, maintained by storage.write_analysis_json
+class AnalysisCatalogEntry(Base):
+    __tablename__ = "analysis_catalog"
+    __table_args__ = (Index("ix_analysis_catalog_created_id", "created_at", "analysis_id"),)
+
+    analysis_id = Column(String, primary_key=True)
+    filename = Column(String, nullable=False, index=True)
+    size = Column(Integer, nullable=False, default=0)
+    status = Column(String, nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False)
+    org_id = Column(String, nullable=True, index=True)
+    pass_count = Column(Integer, nullable=False, default=0)
+    weak_count = Column(Integer, nullable=False, default=0)
+    missing_count = Column(Integer, nullable=False, default=0)
+    needs_review_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AnalysisCatalogEntry(analysis_id='{self.analysis_id}', status='{self.status}')>"
+
+
+# Content-addressable upload blobs, stored once per SHA-256 and ref-counted
+class Blob(Base):
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    refcount = Column(Integer, nullable=False, default=0)
+    backend = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    released_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Blob(sha256='{self.sha256[:12]}', refcount={self.refcount})>"
+
+
+class BlobRef(Base):
+    __tablename__ = "blob_refs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    sha256 = Column(String(64), nullable=False, index=True)
+    analysis_id = Column(String, nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    org_id = Column(String, nullable=True, index=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<BlobRef(analysis_id='{self.analysis_id}', sha256='{self.sha256[:12]}')>"
+
+
+class OrchestratorRecord(Base):
+    """Analysis state shared across API workers (ORCHESTRATOR_BACKEND=db)."""
+
+    __tablename__ = "orchestrator_records"
+    __table_args__ = (Index("ix_orchestrator_records_state_created_id", "state", "created_at", "id"),)
+
+    id = Column(String, primary_key=True)
+    filename = Column(String, nullable=False)
+    state = Column(String, nullable=False)
+    # Bumped on every transition
+    version = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<OrchestratorRecord(id={self.id}, state='{self.state}')>"
+
+
+class OrchestratorFinding(Base):
+    __tablename__ = "orchestrator_findings"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    analysis_id = Column(String, nullable=False, index=True)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<OrchestratorFinding(analysis_id={self.analysis_id})>"
+
+
 # Artifacts linking extracted text and evidence windows to processing jobs
 class ExtractionArtifact(Base):
     __tablename__ = "extraction_artifacts"
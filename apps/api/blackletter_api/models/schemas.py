@@ -48,6 +48,8 @@ class RulesSummary(BaseModel):
     detector_count: int
     detectors: List[DetectorSummary]
     lexicons: List[str]
+    compile_ms: Optional[float] = None
+    loaded_at: Optional[datetime] = None
 
 
 class Finding(BaseModel):
@@ -0,0 +1,568 @@
+"""Storage backends for :class:`~blackletter_api.orchestrator.state.Orchestrator`.
+
+``ORCHESTRATOR_BACKEND`` selects one of:
+
+- ``memory`` (default): a process-local store behind a reader/writer lock.
+  Only suitable for a single worker.
+- ``redis``: one hash per record (``orch:rec:<id>``), one list of findings
+  (``orch:findings:<id>``) and sorted-set indexes scored by intake sequence:
+  ``orch:index`` for every record and ``orch:index:<STATE>`` per state. State
+  transitions use WATCH/MULTI, so a compare-and-set racing another writer
+  either retries or fails with :class:`StateConflict`.
+- ``db``: the ``orchestrator_records`` and ``orchestrator_findings`` tables.
+  Transitions are conditional ``UPDATE``s, committed with the finding insert.
+
+Listing goes through :meth:`OrchestratorBackend.page`, which walks an
+intake-ordered index (optionally one state's index) from an opaque cursor,
+so a page costs O(limit) however many records are held. Records are frozen
+:class:`AnalysisRecord` snapshots.
+
+Every write pushes expiry ``ORCHESTRATOR_TTL_SECONDS`` (default one day)
+into the future. Expired records read as missing and are evicted: by Redis
+itself, or by a periodic sweep in the other backends.
+"""
+from __future__ import annotations
+
+import base64
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from .locks import ReadWriteLock
+from .records import AnalysisRecord, AnalysisState, StateConflict
+
+logger = logging.getLogger(__name__)
+
+Findings = Tuple[Dict[str, Any], ...]
+Page = Tuple[List[AnalysisRecord], Optional[str]]
+
+
+def ttl_seconds() -> int:
+    return max(1, int(os.getenv("ORCHESTRATOR_TTL_SECONDS", "86400")))
+
+
+def sweep_interval_seconds() -> float:
+    return float(os.getenv("ORCHESTRATOR_SWEEP_SECONDS", "60"))
+
+
+def _seq_cursor(cursor: Optional[str]) -> int:
+    if cursor is None:
+        return 0
+    try:
+        return int(cursor)
+    except ValueError as exc:
+        raise ValueError("invalid_cursor") from exc
+
+
+class OrchestratorBackend:
+    """Interface implemented by every orchestrator backend.
+
+    ``get``, ``findings`` and ``advance`` raise ``KeyError`` for unknown or
+    expired analyses; ``page`` raises ``ValueError("invalid_cursor")``.
+    """
+
+    def create(self, filename: str) -> AnalysisRecord:
+        raise NotImplementedError
+
+    def get(self, analysis_id: str) -> AnalysisRecord:
+        raise NotImplementedError
+
+    def findings(self, analysis_id: str) -> Findings:
+        return self.get(analysis_id).findings
+
+    def advance(
+        self,
+        analysis_id: str,
+        new_state: AnalysisState,
+        finding: Optional[Dict[str, Any]] = None,
+        expected_state: Optional[AnalysisState] = None,
+    ) -> AnalysisRecord:
+        raise NotImplementedError
+
+    def page(self, limit: int, cursor: Optional[str] = None, state: Optional[AnalysisState] = None) -> Page:
+        """Up to ``limit`` records in intake order after ``cursor``, plus the next cursor."""
+        raise NotImplementedError
+
+    def list(self, limit: int) -> List[AnalysisRecord]:
+        return self.page(limit)[0]
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryOrchestratorBackend(OrchestratorBackend):
+    """Process-local records behind a reader/writer lock.
+
+    Each record gets an increasing intake sequence number. ``_order`` holds
+    the live sequence numbers and ``_by_state`` one sorted list per state,
+    so a page is a bisect plus a slice. Stored records are frozen and
+    replaced on every transition, so readers hand them out without copying
+    and only wait for writers, never for each other.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._store: Dict[str, AnalysisRecord] = {}
+        self._expires: Dict[str, float] = {}
+        self._seq_of: Dict[str, int] = {}
+        self._id_at: Dict[int, str] = {}
+        self._order: List[int] = []
+        self._by_state: Dict[AnalysisState, List[int]] = {s: [] for s in AnalysisState}
+        self._next_seq = 1
+        self._lock = ReadWriteLock()
+        self._clock = clock
+        self._next_sweep = 0.0
+
+    def _is_live(self, analysis_id: str, now: float) -> bool:
+        return analysis_id in self._store and self._expires[analysis_id] >= now
+
+    def _live(self, analysis_id: str, now: float) -> AnalysisRecord:
+        if not self._is_live(analysis_id, now):
+            raise KeyError(analysis_id)
+        return self._store[analysis_id]
+
+    @staticmethod
+    def _discard(index: List[int], seq: int) -> None:
+        i = bisect_left(index, seq)
+        if i < len(index) and index[i] == seq:
+            del index[i]
+
+    def _evict(self, analysis_id: str) -> None:
+        record = self._store.pop(analysis_id)
+        del self._expires[analysis_id]
+        seq = self._seq_of.pop(analysis_id)
+        del self._id_at[seq]
+        self._discard(self._order, seq)
+        self._discard(self._by_state[record.state], seq)
+
+    def _sweep(self, now: float) -> None:
+        # Caller holds the write lock
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + sweep_interval_seconds()
+        for analysis_id in [a for a, exp in self._expires.items() if exp < now]:
+            self._evict(analysis_id)
+
+    def create(self, filename: str) -> AnalysisRecord:
+        with self._lock.write():
+            now = self._clock()
+            self._sweep(now)
+            record = AnalysisRecord(id=str(uuid4()), filename=filename)
+            seq = self._next_seq
+            self._next_seq += 1
+            self._store[record.id] = record
+            self._expires[record.id] = now + ttl_seconds()
+            self._seq_of[record.id] = seq
+            self._id_at[seq] = record.id
+            self._order.append(seq)
+            self._by_state[record.state].append(seq)
+            return record
+
+    def get(self, analysis_id: str) -> AnalysisRecord:
+        with self._lock.read():
+            return self._live(analysis_id, self._clock())
+
+    def advance(self, analysis_id, new_state, finding=None, expected_state=None) -> AnalysisRecord:
+        with self._lock.write():
+            now = self._clock()
+            record = self._live(analysis_id, now)
+            if expected_state is not None and record.state != expected_state:
+                raise StateConflict(analysis_id, expected_state, record.state)
+            findings = record.findings + (dict(finding),) if finding else record.findings
+            updated = dataclasses.replace(record, state=new_state, findings=findings)
+            if new_state != record.state:
+                seq = self._seq_of[analysis_id]
+                self._discard(self._by_state[record.state], seq)
+                insort(self._by_state[new_state], seq)
+            self._store[analysis_id] = updated
+            self._expires[analysis_id] = now + ttl_seconds()
+            return updated
+
+    def page(self, limit: int, cursor: Optional[str] = None, state: Optional[AnalysisState] = None) -> Page:
+        after = _seq_cursor(cursor)
+        with self._lock.read():
+            now = self._clock()
+            index = self._order if state is None else self._by_state[state]
+            i = bisect_right(index, after)
+            records: List[AnalysisRecord] = []
+            while i < len(index) and len(records) < limit:
+                analysis_id = self._id_at[index[i]]
+                if self._is_live(analysis_id, now):
+                    records.append(self._store[analysis_id])
+                i += 1
+            next_cursor = str(index[i - 1]) if records and i < len(index) else None
+            return records, next_cursor
+
+    def clear(self) -> None:
+        with self._lock.write():
+            self._store.clear()
+            self._expires.clear()
+            self._seq_of.clear()
+            self._id_at.clear()
+            self._order.clear()
+            for index in self._by_state.values():
+                index.clear()
+
+
+class RedisOrchestratorBackend(OrchestratorBackend):
+    """Records shared through Redis; keys expire natively."""
+
+    SEQ_KEY = "orch:seq"
+    INDEX_KEY = "orch:index"
+
+    def __init__(self, client: Any = None) -> None:
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is not None:
+            return self._client
+        # Resolve lazily so tests (and the worker) can swap the shared client
+        from ..services import tasks
+
+        return tasks.redis_client
+
+    @staticmethod
+    def _rec_key(analysis_id: str) -> str:
+        return f"orch:rec:{analysis_id}"
+
+    @staticmethod
+    def _findings_key(analysis_id: str) -> str:
+        return f"orch:findings:{analysis_id}"
+
+    @classmethod
+    def _index_key(cls, state: Optional[AnalysisState]) -> str:
+        return cls.INDEX_KEY if state is None else f"{cls.INDEX_KEY}:{state.value}"
+
+    @staticmethod
+    def _decode(value: Any) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    def _record(self, data: Dict[Any, Any], findings: List[Any]) -> AnalysisRecord:
+        data = {self._decode(k): self._decode(v) for k, v in data.items()}
+        return AnalysisRecord(
+            id=data["id"],
+            filename=data["filename"],
+            state=AnalysisState(data["state"]),
+            findings=tuple(json.loads(self._decode(f)) for f in findings),
+            created_at=data["created_at"],
+        )
+
+    def create(self, filename: str) -> AnalysisRecord:
+        record = AnalysisRecord(id=str(uuid4()), filename=filename)
+        seq = int(self.client.incr(self.SEQ_KEY))
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(
+            self._rec_key(record.id),
+            mapping={
+                "id": record.id,
+                "filename": filename,
+                "state": record.state.value,
+                "created_at": record.created_at,
+                "seq": seq,
+            },
+        )
+        pipe.expire(self._rec_key(record.id), ttl_seconds())
+        pipe.zadd(self.INDEX_KEY, {record.id: seq})
+        pipe.zadd(self._index_key(record.state), {record.id: seq})
+        pipe.execute()
+        return record
+
+    def get(self, analysis_id: str) -> AnalysisRecord:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._rec_key(analysis_id))
+        pipe.lrange(self._findings_key(analysis_id), 0, -1)
+        data, findings = pipe.execute()
+        if not data:
+            raise KeyError(analysis_id)
+        return self._record(data, findings)
+
+    def advance(self, analysis_id, new_state, finding=None, expected_state=None) -> AnalysisRecord:
+        rec_key = self._rec_key(analysis_id)
+        findings_key = self._findings_key(analysis_id)
+        ttl = ttl_seconds()
+
+        def transition(pipe) -> None:
+            current, seq = pipe.hmget(rec_key, ["state", "seq"])
+            if current is None:
+                raise KeyError(analysis_id)
+            current_state = AnalysisState(self._decode(current))
+            if expected_state is not None and current_state != expected_state:
+                raise StateConflict(analysis_id, expected_state, current_state)
+            pipe.multi()
+            pipe.hset(rec_key, mapping={"state": new_state.value})
+            if finding:
+                pipe.rpush(findings_key, json.dumps(finding))
+            pipe.expire(rec_key, ttl)
+            pipe.expire(findings_key, ttl)
+            if new_state != current_state and seq is not None:
+                pipe.zrem(self._index_key(current_state), analysis_id)
+                pipe.zadd(self._index_key(new_state), {analysis_id: int(self._decode(seq))})
+
+        # WATCH the record: a concurrent transition aborts EXEC and we retry
+        # against the new state.
+        self.client.transaction(transition, rec_key)
+        return self.get(analysis_id)
+
+    def page(self, limit: int, cursor: Optional[str] = None, state: Optional[AnalysisState] = None) -> Page:
+        last = _seq_cursor(cursor)
+        index_key = self._index_key(state)
+        records: List[AnalysisRecord] = []
+        more = True
+        # Members whose record has expired are dropped from the indexes as
+        # they are met, and the page is topped up from further along.
+        while more and len(records) < limit:
+            want = limit - len(records)
+            batch = self.client.zrangebyscore(index_key, f"({last}", "+inf", start=0, num=want + 1, withscores=True)
+            more = len(batch) > want
+            batch = batch[:want]
+            if not batch:
+                break
+            pipe = self.client.pipeline(transaction=False)
+            for member, _ in batch:
+                pipe.hgetall(self._rec_key(self._decode(member)))
+                pipe.lrange(self._findings_key(self._decode(member)), 0, -1)
+            results = pipe.execute()
+            stale: List[str] = []
+            for i, (member, score) in enumerate(batch):
+                data, findings = results[2 * i], results[2 * i + 1]
+                if data:
+                    records.append(self._record(data, findings))
+                else:
+                    stale.append(self._decode(member))
+                last = int(score)
+            if stale:
+                pipe = self.client.pipeline(transaction=False)
+                for key in [self._index_key(s) for s in (None, *AnalysisState)]:
+                    pipe.zrem(key, *stale)
+                pipe.execute()
+        return records, (str(last) if more and records else None)
+
+    def clear(self) -> None:
+        ids = [self._decode(a) for a in self.client.zrange(self.INDEX_KEY, 0, -1)]
+        keys = [self.SEQ_KEY] + [self._index_key(s) for s in (None, *AnalysisState)]
+        for analysis_id in ids:
+            keys.extend([self._rec_key(analysis_id), self._findings_key(analysis_id)])
+        self.client.delete(*keys)
+
+
+class DatabaseOrchestratorBackend(OrchestratorBackend):
+    """Records shared through the application database.
+
+    Pages are a ``(created_at, id)`` keyset served by the
+    ``(state, created_at, id)`` index; cursors are opaque base64 tokens.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None, clock: Callable[[], datetime] = datetime.utcnow) -> None:
+        if session_factory is None:
+            from ..database import SessionLocal
+
+            session_factory = SessionLocal
+        self._session_factory = session_factory
+        self._clock = clock
+        self._next_sweep: Optional[datetime] = None
+        self._sweep_lock = threading.Lock()
+
+    def _expiry(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=ttl_seconds())
+
+    def _to_record(self, row: Any, findings: Findings) -> AnalysisRecord:
+        return AnalysisRecord(
+            id=row.id,
+            filename=row.filename,
+            state=AnalysisState(row.state),
+            findings=findings,
+            created_at=row.created_at.isoformat() + "+00:00",
+        )
+
+    @staticmethod
+    def _encode_cursor(row: Any) -> str:
+        raw = json.dumps({"created_at": row.created_at.isoformat(), "id": row.id})
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return datetime.fromisoformat(data["created_at"]), str(data["id"])
+        except (ValueError, KeyError, TypeError) as exc:
+            raise ValueError("invalid_cursor") from exc
+
+    def _findings_for(self, db: Any, analysis_ids: List[str]) -> Dict[str, Findings]:
+        from ..models.entities import OrchestratorFinding
+
+        grouped: Dict[str, List[Dict[str, Any]]] = {a: [] for a in analysis_ids}
+        if analysis_ids:
+            rows = (
+                db.query(OrchestratorFinding.analysis_id, OrchestratorFinding.payload)
+                .filter(OrchestratorFinding.analysis_id.in_(analysis_ids))
+                .order_by(OrchestratorFinding.id)
+                .all()
+            )
+            for r in rows:
+                grouped[r.analysis_id].append(r.payload)
+        return {a: tuple(f) for a, f in grouped.items()}
+
+    def _findings(self, db: Any, analysis_id: str) -> Findings:
+        return self._findings_for(db, [analysis_id])[analysis_id]
+
+    def _live_row(self, db: Any, analysis_id: str, now: datetime) -> Any:
+        from ..models.entities import OrchestratorRecord
+
+        row = db.get(OrchestratorRecord, analysis_id)
+        if row is None or row.expires_at <= now:
+            raise KeyError(analysis_id)
+        return row
+
+    def purge_expired(self, now: Optional[datetime] = None, batch_size: int = 500) -> int:
+        """Delete expired records and their findings in bounded batches."""
+        from ..models.entities import OrchestratorFinding, OrchestratorRecord
+
+        now = now or self._clock()
+        purged = 0
+        db = self._session_factory()
+        try:
+            while True:
+                ids = [
+                    r.id
+                    for r in db.query(OrchestratorRecord.id)
+                    .filter(OrchestratorRecord.expires_at <= now)
+                    .limit(batch_size)
+                    .all()
+                ]
+                if not ids:
+                    return purged
+                db.query(OrchestratorFinding).filter(OrchestratorFinding.analysis_id.in_(ids)).delete(
+                    synchronize_session=False
+                )
+                db.query(OrchestratorRecord).filter(OrchestratorRecord.id.in_(ids)).delete(synchronize_session=False)
+                db.commit()
+                purged += len(ids)
+        finally:
+            db.close()
+
+    def _maybe_sweep(self, now: datetime) -> None:
+        with self._sweep_lock:
+            if self._next_sweep is not None and now < self._next_sweep:
+                return
+            self._next_sweep = now + timedelta(seconds=sweep_interval_seconds())
+        try:
+            self.purge_expired(now)
+        except Exception as exc:
+            logger.warning(f"Orchestrator purge failed: {exc}")
+
+    def create(self, filename: str) -> AnalysisRecord:
+        from ..models.entities import OrchestratorRecord
+
+        now = self._clock()
+        self._maybe_sweep(now)
+        db = self._session_factory()
+        try:
+            row = OrchestratorRecord(
+                id=str(uuid4()),
+                filename=filename,
+                state=AnalysisState.RECEIVED.value,
+                created_at=now,
+                expires_at=self._expiry(now),
+            )
+            db.add(row)
+            db.commit()
+            return self._to_record(row, ())
+        finally:
+            db.close()
+
+    def get(self, analysis_id: str) -> AnalysisRecord:
+        db = self._session_factory()
+        try:
+            row = self._live_row(db, analysis_id, self._clock())
+            return self._to_record(row, self._findings(db, analysis_id))
+        finally:
+            db.close()
+
+    def advance(self, analysis_id, new_state, finding=None, expected_state=None) -> AnalysisRecord:
+        from ..models.entities import OrchestratorFinding, OrchestratorRecord
+
+        now = self._clock()
+        db = self._session_factory()
+        try:
+            query = db.query(OrchestratorRecord).filter(
+                OrchestratorRecord.id == analysis_id, OrchestratorRecord.expires_at > now
+            )
+            if expected_state is not None:
+                query = query.filter(OrchestratorRecord.state == expected_state.value)
+            updated = query.update(
+                {
+                    OrchestratorRecord.state: new_state.value,
+                    OrchestratorRecord.version: OrchestratorRecord.version + 1,
+                    OrchestratorRecord.expires_at: self._expiry(now),
+                },
+                synchronize_session=False,
+            )
+            if not updated:
+                db.rollback()
+                row = self._live_row(db, analysis_id, now)
+                raise StateConflict(analysis_id, expected_state, AnalysisState(row.state))
+            if finding:
+                db.add(OrchestratorFinding(analysis_id=analysis_id, payload=finding, created_at=now))
+            db.commit()
+            row = self._live_row(db, analysis_id, now)
+            return self._to_record(row, self._findings(db, analysis_id))
+        finally:
+            db.close()
+
+    def page(self, limit: int, cursor: Optional[str] = None, state: Optional[AnalysisState] = None) -> Page:
+        from sqlalchemy import and_, or_
+
+        from ..models.entities import OrchestratorRecord
+
+        after = self._decode_cursor(cursor) if cursor is not None else None
+        now = self._clock()
+        db = self._session_factory()
+        try:
+            query = db.query(OrchestratorRecord).filter(OrchestratorRecord.expires_at > now)
+            if state is not None:
+                query = query.filter(OrchestratorRecord.state == state.value)
+            if after is not None:
+                created_at, last_id = after
+                query = query.filter(
+                    or_(
+                        OrchestratorRecord.created_at > created_at,
+                        and_(OrchestratorRecord.created_at == created_at, OrchestratorRecord.id > last_id),
+                    )
+                )
+            rows = query.order_by(OrchestratorRecord.created_at, OrchestratorRecord.id).limit(limit + 1).all()
+            more = len(rows) > limit
+            rows = rows[:limit]
+            findings = self._findings_for(db, [row.id for row in rows])
+            records = [self._to_record(row, findings[row.id]) for row in rows]
+            return records, (self._encode_cursor(rows[-1]) if more else None)
+        finally:
+            db.close()
+
+    def clear(self) -> None:
+        from ..models.entities import OrchestratorFinding, OrchestratorRecord
+
+        db = self._session_factory()
+        try:
+            db.query(OrchestratorFinding).delete()
+            db.query(OrchestratorRecord).delete()
+            db.commit()
+        finally:
+            db.close()
+
+
+def backend_from_env() -> OrchestratorBackend:
+    kind = os.getenv("ORCHESTRATOR_BACKEND", "memory")
+    if kind == "memory":
+        return MemoryOrchestratorBackend()
+    if kind == "redis":
+        return RedisOrchestratorBackend()
+    if kind == "db":
+        return DatabaseOrchestratorBackend()
+    raise ValueError(f"Unknown orchestrator backend '{kind}'")
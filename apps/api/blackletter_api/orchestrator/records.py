@@ -0,0 +1,42 @@
+"""Record types shared by the orchestrator and its backends."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, Tuple
+
+
+class AnalysisState(str, Enum):
+    RECEIVED = "RECEIVED"
+    EXTRACTED = "EXTRACTED"
+    SEGMENTED = "SEGMENTED"
+    GDPR_DONE = "GDPR_DONE"
+    LEGAL_DONE = "LEGAL_DONE"
+    GC_DONE = "GC_DONE"
+    REPORTED = "REPORTED"
+
+
+class StateConflict(RuntimeError):
+    """Raised when a compare-and-set transition finds an unexpected state."""
+
+    def __init__(self, analysis_id: str, expected: AnalysisState, actual: AnalysisState) -> None:
+        super().__init__(f"analysis {analysis_id} is {actual.value}, expected {expected.value}")
+        self.analysis_id = analysis_id
+        self.expected = expected
+        self.actual = actual
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass(frozen=True)
+class AnalysisRecord:
+    """Immutable snapshot of an analysis; backends hand these out directly."""
+
+    id: str
+    filename: str
+    state: AnalysisState = AnalysisState.RECEIVED
+    findings: Tuple[Dict[str, Any], ...] = ()
+    created_at: str = field(default_factory=_now_iso)
@@ -1,61 +1,39 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from enum import Enum
-import threading
-from typing import Dict, List, Any
-from uuid import uuid4
+from typing import Dict, List, Any, Optional, Tuple
 
-
-class AnalysisState(str, Enum):
-    RECEIVED = "RECEIVED"
-    EXTRACTED = "EXTRACTED"
-    SEGMENTED = "SEGMENTED"
-    GDPR_DONE = "GDPR_DONE"
-    LEGAL_DONE = "LEGAL_DONE"
-    GC_DONE = "GC_DONE"
-    REPORTED = "REPORTED"
-
-
-@dataclass
-class AnalysisRecord:
-    id: str
-    filename: str
-    state: AnalysisState = AnalysisState.RECEIVED
-    findings: List[Dict[str, Any]] = field(default_factory=list)
+from .backends import MemoryOrchestratorBackend, OrchestratorBackend, backend_from_env
+from .records import AnalysisRecord, AnalysisState, StateConflict
 
 
 class Orchestrator:
-    """In-memory orchestrator for analysis state transitions.
+    """Analysis state transitions over a pluggable storage backend.
 
-    This orchestrator maintains state in-process and guards access with a
-    :class:`threading.Lock` for thread safety. It is not suitable for
-    multi-process deployments.
+    The default in-memory backend keeps records in-process behind a lock,
+    which only works for a single worker. Set ``ORCHESTRATOR_BACKEND`` to
+    ``redis`` or ``db`` to share records across uvicorn workers and nodes.
+    All backends evict records ``ORCHESTRATOR_TTL_SECONDS`` after their last
+    write. See :mod:`blackletter_api.orchestrator.backends`.
     """
 
-    def __init__(self) -> None:
-        self._store: Dict[str, AnalysisRecord] = {}
-        self._lock = threading.Lock()
+    def __init__(self, backend: Optional[OrchestratorBackend] = None) -> None:
+        self.backend = backend or MemoryOrchestratorBackend()
 
     def intake(self, filename: str) -> str:
-        with self._lock:
-            analysis_id = str(uuid4())
-            self._store[analysis_id] = AnalysisRecord(id=analysis_id, filename=filename)
-            return analysis_id
+        return self.backend.create(filename).id
 
     def summary(self, analysis_id: str) -> AnalysisRecord:
-        with self._lock:
-            return self._store[analysis_id]
+        return self.backend.get(analysis_id)
 
-    def findings(self, analysis_id: str) -> List[Dict[str, Any]]:
-        with self._lock:
-            return self._store[analysis_id].findings
+    def findings(self, analysis_id: str) -> Tuple[Dict[str, Any], ...]:
+        return self.backend.findings(analysis_id)
 
     def advance(
         self,
         analysis_id: str,
         new_state: AnalysisState,
         finding: Dict[str, Any] | None = None,
+        expected_state: AnalysisState | None = None,
     ) -> AnalysisRecord:
         """Update the state of an analysis and optionally append a finding.
 
@@ -63,22 +41,52 @@ class Orchestrator:
             analysis_id: Identifier returned by :meth:`intake`.
             new_state: The next :class:`AnalysisState` to assign.
             finding: Optional detail to add to the record's findings list.
+            expected_state: If given, the transition is a compare-and-set and
+                raises :class:`StateConflict` when the current state differs.
 
         Returns:
             The updated :class:`AnalysisRecord` instance.
         """
 
-        with self._lock:
-            record = self._store[analysis_id]
-            record.state = new_state
-            if finding:
-                record.findings.append(finding)
-            return record
+        return self.backend.advance(analysis_id, new_state, finding, expected_state)
+
+    def compare_and_set(self, analysis_id: str, expected: AnalysisState, new_state: AnalysisState) -> bool:
+        """Atomically move ``expected`` -> ``new_state``; False if the state differed."""
+        try:
+            self.backend.advance(analysis_id, new_state, None, expected)
+            return True
+        except StateConflict:
+            return False
+
+    def page_records(
+        self, limit: int, cursor: Optional[str] = None, state: AnalysisState | None = None
+    ) -> Tuple[List[AnalysisRecord], Optional[str]]:
+        """Return a page of records in intake order and the cursor for the next one.
+
+        Args:
+            limit: Maximum number of records to return.
+            cursor: Opaque cursor from a previous page; ``None`` starts at the
+                oldest record.
+            state: Only return records currently in this state.
+
+        Returns:
+            The records and the next cursor, or ``None`` on the last page.
+
+        Raises:
+            ValueError: If ``cursor`` is malformed.
+        """
+
+        return self.backend.page(limit, cursor, state)
+
+    def list_records(
+        self, limit: int, cursor: Optional[str] = None, state: AnalysisState | None = None
+    ) -> List[AnalysisRecord]:
+        return self.page_records(limit, cursor, state)[0]
 
-    def list_records(self, limit: int) -> List[AnalysisRecord]:
-        with self._lock:
-            return list(self._store.values())[:limit]
+    def reset(self) -> None:
+        """Drop every record (tests and local tooling)."""
+        self.backend.clear()
 
 
 # module-level orchestrator instance
-orchestrator = Orchestrator()
+orchestrator = Orchestrator(backend_from_env())
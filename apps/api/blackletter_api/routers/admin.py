@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
+from ..services import admission, profiling, storage, tracing
 from ..services.lexicon_analyzer import list_lexicons, reload_lexicons
+from ..services.lexicon_registry import get_lexicon_registry
 from ..services.metrics import get_metrics_service
 from ..services.llm_gate import get_llm_gate
 from apps.api.dependencies.auth import require_role
@@ -27,6 +30,12 @@ class MetricsSummary(BaseModel):
     total_analyses: int
     hard_cap_limit: int
     cap_exceeded_count: int
+    dedup_hits: int = 0
+    dedup_misses: int = 0
+    dedup_hit_rate: float = 0.0
+    first_job_latency_ms: float = 0.0
+    first_job_samples: int = 0
+    warm_start_ms: float = 0.0
 
 
 class AdminMetricsResponse(BaseModel):
@@ -66,6 +75,16 @@ class LexiconInfo(BaseModel):
     version: str
 
 
+class CompiledLexiconInfo(BaseModel):
+    name: str
+    language: str
+    version: str
+    file: Optional[str] = None
+    terms: int
+    compile_ms: float
+    memory_bytes: int
+
+
 class AggregateMetrics(BaseModel):
     avg_tokens_per_doc: float
     percent_docs_invoking_llm: float
@@ -134,6 +153,12 @@ async def get_admin_metrics() -> AdminMetricsResponse:
             total_analyses=metrics["total_analyses"],
             hard_cap_limit=metrics["hard_cap_limit"],
             cap_exceeded_count=metrics["cap_exceeded_count"],
+            dedup_hits=metrics.get("dedup_hits", 0),
+            dedup_misses=metrics.get("dedup_misses", 0),
+            dedup_hit_rate=metrics.get("dedup_hit_rate", 0.0),
+            first_job_latency_ms=metrics.get("first_job_latency_ms", 0.0),
+            first_job_samples=metrics.get("first_job_samples", 0),
+            warm_start_ms=metrics.get("warm_start_ms", 0.0),
         )
 
         return AdminMetricsResponse(tiles=tiles, summary=summary)
@@ -210,6 +235,14 @@ async def get_lexicons() -> List[LexiconInfo]:
         raise HTTPException(status_code=500, detail=f"Failed to list lexicons: {str(e)}")
 
 
+@router.get("/lexicons/compiled", response_model=List[CompiledLexiconInfo])
+async def get_compiled_lexicons() -> List[CompiledLexiconInfo]:
+    """Compiled lexicon matchers with their compile time and approximate memory."""
+    registry = get_lexicon_registry()
+    stats = registry.stats() or await storage.run_io(registry.compile_all)
+    return [CompiledLexiconInfo(**s) for s in stats]
+
+
 @router.post("/lexicons/reload")
 async def reload_lexicon_cache() -> Dict[str, str]:
     try:
@@ -219,6 +252,81 @@ async def reload_lexicon_cache() -> Dict[str, str]:
         raise HTTPException(status_code=500, detail=f"Failed to reload lexicons: {str(e)}")
 
 
+class ProfileToken(BaseModel):
+    token: str
+    header: str
+    query_param: str
+
+
+class ProfileInfo(BaseModel):
+    id: str
+    size: int
+    created_at: float
+
+
+@router.post("/profiles/token", response_model=ProfileToken)
+async def create_profile_token(ttl_seconds: int = Query(default=300, ge=1, le=3600)) -> ProfileToken:
+    """Mint a signed token that profiles any request carrying it until it expires."""
+    try:
+        token = profiling.sign_profile_token(ttl_seconds)
+    except RuntimeError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail={"code": "profiling_disabled", "message": str(exc)},
+        ) from exc
+    return ProfileToken(token=token, header=profiling.PROFILE_HEADER, query_param=profiling.PROFILE_QUERY)
+
+
+@router.get("/profiles", response_model=List[ProfileInfo])
+async def get_profiles() -> List[ProfileInfo]:
+    """List saved request profiles, newest first."""
+    return [ProfileInfo(**p) for p in await storage.run_io(profiling.list_profiles)]
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str) -> PlainTextResponse:
+    """Folded stacks of one profile, ready for flamegraph.pl or speedscope."""
+    text = await storage.run_io(profiling.load_profile, profile_id)
+    if text is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "not_found", "message": "Profile not found"},
+        )
+    return PlainTextResponse(text, headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'})
+
+
+class TraceSpan(BaseModel):
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    name: str
+    kind: str
+    start_ns: int
+    end_ns: int
+    duration_ms: float
+    status: str
+    attributes: Dict[str, Any] = {}
+
+
+class AnalysisTrace(BaseModel):
+    analysis_id: str
+    trace_ids: List[str]
+    spans: List[TraceSpan]
+
+
+@router.get("/traces/{analysis_id}", response_model=AnalysisTrace)
+async def get_analysis_trace(analysis_id: str) -> AnalysisTrace:
+    """Spans recorded for an analysis, from upload request through the worker run."""
+    spans = await storage.run_io(tracing.load_trace, analysis_id)
+    if not spans:
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "not_found", "message": "No trace recorded for this analysis"},
+        )
+    trace_ids = list(dict.fromkeys(s["trace_id"] for s in spans))
+    return AnalysisTrace(analysis_id=analysis_id, trace_ids=trace_ids, spans=[TraceSpan(**s) for s in spans])
+
+
 @router.get("/health")
 async def get_system_health() -> dict:
     """Get basic system health information."""
@@ -228,14 +336,16 @@ async def get_system_health() -> dict:
 
         # Get basic health metrics
         admin_metrics = metrics_service.get_admin_metrics()
+        queue = admission.snapshot()
 
         return {
-            "status": "healthy",
+            "status": "degraded" if queue.estimated_wait_seconds > queue.wait_slo_seconds else "healthy",
             "metrics_service": {
                 "total_analyses_tracked": admin_metrics["total_analyses"],
                 "token_cap": admin_metrics["hard_cap_limit"],
                 "functioning": True,
             },
+            "queue": queue.to_dict(),
             "system": {
                 "version": "1.0.0",
                 "environment": "development",
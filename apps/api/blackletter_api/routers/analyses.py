@@ -1,20 +1,27 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 
 import os
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import BaseModel
 
 from ..models.schemas import AnalysisSummary, Finding, VerdictCounts
-from ..services import storage
-from ..orchestrator.state import orchestrator
+from ..services import result_store, storage
+from ..orchestrator.state import AnalysisState, orchestrator
 
 
 router = APIRouter(tags=["analyses"])
 
 
+def _stored_results(analysis_id: str) -> dict | None:
+    """Results persisted by the analysis pipeline, if any."""
+    try:
+        return result_store.load_results(analysis_id)
+    except Exception:
+        return None
+
+
 class IntakeRequest(BaseModel):
     filename: str
 
@@ -26,11 +33,30 @@ def intake(req: IntakeRequest) -> dict:
 
 
 @router.get("/analyses", response_model=List[AnalysisSummary])
-def list_analyses(limit: int = Query(default=50, ge=1, le=200)) -> List[AnalysisSummary]:
-    # If FS-backed listing is enabled, read summaries from disk;
-    # otherwise, surface in-memory orchestrator records.
+def list_analyses(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from X-Next-Cursor"),
+    status: Optional[str] = Query(default=None),
+    filename_prefix: Optional[str] = Query(default=None),
+) -> List[AnalysisSummary]:
+    # If FS-backed listing is enabled, read summaries from the catalogue
+    # index; otherwise, surface in-memory orchestrator records.
     if os.getenv("ANALYSES_FS_ENABLED", "0") == "1":
-        fs_items = storage.list_analyses_summaries(limit=limit)
+        try:
+            fs_items, next_cursor = storage.list_analyses_page(
+                limit=limit, cursor=cursor, status=status, filename_prefix=filename_prefix
+            )
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=400,
+                detail={"code": "invalid_cursor", "message": "Cursor is malformed"},
+            ) from exc
+        except Exception:
+            # Catalogue unavailable: first page from a directory scan
+            fs_items, next_cursor = storage.list_analyses_summaries(limit=limit), None
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         # Ensure required 'state' is present on each item.
         enriched: List[AnalysisSummary] = []
         for it in fs_items:
@@ -46,13 +72,29 @@ def list_analyses(limit: int = Query(default=50, ge=1, le=200)) -> List[Analysis
             )
         return enriched
 
+    try:
+        state = AnalysisState(status) if status else None
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "invalid_status", "message": f"Unknown status '{status}'"},
+        ) from exc
+    try:
+        records, next_cursor = orchestrator.page_records(limit, cursor=cursor, state=state)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "invalid_cursor", "message": "Cursor is malformed"},
+        ) from exc
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     summaries: List[AnalysisSummary] = []
-    for rec in orchestrator.list_records(limit):
+    for rec in records:
         summaries.append(
             AnalysisSummary(
                 id=rec.id,
                 filename=rec.filename,
-                created_at=datetime.now(timezone.utc).isoformat(),
+                created_at=rec.created_at,
                 size=0,
                 state=rec.state.value,
                 verdicts=VerdictCounts(),
@@ -84,19 +126,24 @@ def get_analysis_summary(analysis_id: str) -> AnalysisSummary:
             detail={"code": "not_found", "message": "Analysis not found"},
         ) from exc
     
+    stored = _stored_results(analysis_id)
     return AnalysisSummary(
         id=rec.id,
         filename=rec.filename,
-        created_at=datetime.now(timezone.utc).isoformat(),
+        created_at=rec.created_at,
         size=0,
         state=rec.state.value,
-        verdicts=VerdictCounts(),
+        verdicts=stored["verdicts"] if stored else VerdictCounts(),
         coverage=coverage  # Story 4.2 - Include coverage
     )
 
 
 @router.get("/analyses/{analysis_id}/findings", response_model=List[Finding])
-def get_analysis_findings(analysis_id: str) -> List[Finding]:
+def get_analysis_findings(analysis_id: str, response: Response) -> List[Finding]:
+    stored = _stored_results(analysis_id)
+    if stored is not None:
+        response.headers["X-Result-Size-Bytes"] = str(stored["size_bytes"])
+        return stored["findings"]
     try:
         rec_findings = orchestrator.findings(analysis_id)
     except KeyError as exc:
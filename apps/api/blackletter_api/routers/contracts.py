@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import hashlib
+import shutil
 from datetime import datetime
+from typing import Optional
+from uuid import uuid4
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from sqlalchemy.orm import Session
 
 from ..database import get_db
@@ -13,8 +17,10 @@ from ..models.schemas import (
     JobState,
     ValidationResults,
 )
-from ..services import storage
-from ..services.tasks import enqueue_job, new_job
+from ..services import blob_store, dedup, storage
+from ..services.admission import admit_upload
+from ..services.session import request_org_id
+from ..services.tasks import enqueue_job, get_job, new_job
 
 
 router = APIRouter(tags=["contracts"])
@@ -29,8 +35,12 @@ MAX_BYTES = 10 * 1024 * 1024
 
 @router.post("/contracts", status_code=201, response_model=JobStatus)
 async def upload_contract(
+    response: Response,
     file: UploadFile = File(...),
+    force: bool = Query(default=False, description="Bypass submission dedup"),
     db: Session = Depends(get_db),
+    org_id: Optional[str] = Depends(request_org_id),
+    _admitted: None = Depends(admit_upload),
 ) -> JobStatus:
     # Validate type/extension
     ext = None
@@ -57,21 +67,23 @@ async def upload_contract(
         filename=file.filename or "untitled",
         size_bytes=0,  # We don't know the size until after saving
         mime_type=file.content_type or "application/octet-stream",
+        org_id=org_id,
     )
     db.add(analysis)
     db.commit()
     db.refresh(analysis)
     analysis_id = str(analysis.id)
 
-    target_dir = storage.analysis_dir(analysis_id)
+    target_dir = await storage.run_io(storage.analysis_dir, analysis_id)
     safe_name = storage.sanitize_filename(file.filename or f"upload{ext}")
     # Ensure extension matches allowed type inferred
     if not safe_name.lower().endswith(ext):
         safe_name = f"{safe_name}{ext}"
     target_path = target_dir / safe_name
 
+    hasher = hashlib.sha256()
     try:
-        size = storage.save_upload(file, target_path, max_bytes=MAX_BYTES)
+        size = await storage.save_upload_async(file, target_path, max_bytes=MAX_BYTES, hasher=hasher)
         analysis.size_bytes = size
         db.commit()
     except ValueError as e:
@@ -93,8 +105,40 @@ async def upload_contract(
             },
         ) from e
 
-    job_id = new_job(analysis_id=analysis_id)
-    enqueue_job(job_id, analysis_id, safe_name, size)
+    fingerprint = await storage.run_io(dedup.submission_fingerprint, hasher.hexdigest(), org_id=org_id)
+    job_id = str(uuid4())
+    if not force:
+        # Claim the fingerprint before enqueueing so a concurrent identical
+        # upload waits on this job instead of starting its own
+        existing = dedup.claim_submission(fingerprint, job_id, analysis_id)
+        if existing is not None:
+            # Identical submission already analysed: drop the new record and
+            # hand back the existing job instead of re-running the pipeline.
+            dedup.record_outcome(hit=True)
+            db.delete(analysis)
+            db.commit()
+            await storage.run_io(shutil.rmtree, target_dir, ignore_errors=True)
+            job = get_job(existing["job_id"])
+            response.status_code = 200
+            return JobStatus(
+                id=existing["job_id"],
+                job_id=existing["job_id"],
+                status=job.status if job else JobState.queued,
+                analysis_id=existing["analysis_id"],
+                created_at=job.created_at if job else None,
+            )
+        dedup.record_outcome(hit=False)
+
+    try:
+        await storage.run_io(
+            blob_store.ingest_upload, analysis_id, target_path, hasher.hexdigest(), org_id=analysis.org_id
+        )
+        new_job(analysis_id=analysis_id, job_id=job_id)
+        enqueue_job(job_id, analysis_id, safe_name, size, org_id=analysis.org_id)
+    except Exception:
+        dedup.release_submission(fingerprint, job_id)
+        raise
+    dedup.remember_submission(fingerprint, job_id, analysis_id)
 
     return JobStatus(
         id=job_id,
@@ -5,12 +5,19 @@ Context Engineering Framework v2.0.0 Compliant
 """
 from __future__ import annotations
 
+import hashlib
 import logging
+import shutil
 from typing import Optional
-from fastapi import APIRouter, HTTPException, UploadFile, File, Request, BackgroundTasks
-from fastapi.responses import JSONResponse
+from uuid import uuid4
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, BackgroundTasks
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from ..models.schemas import JobStatus, JobCreateResponse, JobState
+from ..services import blob_store, dedup, storage
+from ..services.admission import admit_upload
+from ..services.session import request_org_id
+from ..services.job_events import build_job_event, format_sse, is_terminal, iter_events, job_channel
 from ..services.tasks import get_job, create_contract_analysis_job
 
 logger = logging.getLogger(__name__)
@@ -22,7 +29,10 @@ router = APIRouter(tags=["jobs"])
 async def create_job(
     request: Request,
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    force: bool = Query(default=False, description="Bypass submission dedup"),
+    org_id: Optional[str] = Depends(request_org_id),
+    _admitted: None = Depends(admit_upload),
 ) -> JSONResponse:
     """
     Create new GDPR analysis job with 202 Accepted pattern.
@@ -53,15 +63,70 @@ async def create_job(
                     detail=f"Unsupported file type. Allowed: {', '.join(allowed_types)}"
                 )
         
-        # Create job and queue analysis
-        job_id = await create_contract_analysis_job(
-            filename=file.filename,
-            content_type=file.content_type or "application/octet-stream",
-            file_content=await file.read()
-        )
+        # Stream the upload straight into its analysis directory, enforcing
+        # the size limit and hashing chunks as they arrive.
+        analysis_id = str(uuid4())
+        target_dir = await storage.run_io(storage.analysis_dir, analysis_id)
+        safe_name = storage.sanitize_filename(file.filename)
+        hasher = hashlib.sha256()
+        try:
+            await storage.save_upload_async(file, target_dir / safe_name, max_bytes=max_size, hasher=hasher)
+        except ValueError as e:
+            await storage.run_io(shutil.rmtree, target_dir, ignore_errors=True)
+            if str(e) == "file_too_large":
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large. Maximum size: {max_size} bytes"
+                )
+            raise
+        base_url = str(request.base_url).rstrip('/')
+
+        # Identical submissions reuse the existing job unless force=true
+        fingerprint = await storage.run_io(dedup.submission_fingerprint, hasher.hexdigest(), org_id=org_id)
+        job_id = str(uuid4())
+        if not force:
+            # Claim the fingerprint before enqueueing so a concurrent identical
+            # upload is handed this job instead of starting its own
+            existing = dedup.claim_submission(fingerprint, job_id, analysis_id)
+            if existing is not None:
+                dedup.record_outcome(hit=True)
+                await storage.run_io(shutil.rmtree, target_dir, ignore_errors=True)
+                job = get_job(existing["job_id"])
+                location = f"{base_url}/api/jobs/{existing['job_id']}"
+                response_data = JobCreateResponse(
+                    job_id=existing["job_id"],
+                    status=job.status if job else JobState.queued,
+                    message="Duplicate submission; returning existing analysis job",
+                    location=location,
+                    analysis_id=existing["analysis_id"] or None,
+                )
+                logger.info(f"Dedup hit for {file.filename}: reusing job {existing['job_id']}")
+                return JSONResponse(
+                    status_code=200,
+                    content=response_data.model_dump(),
+                    headers={"Location": location},
+                )
+            dedup.record_outcome(hit=False)
+
+        try:
+            # Keep one copy per content hash; the analysis dir holds a reference
+            await storage.run_io(
+                blob_store.ingest_upload, analysis_id, target_dir / safe_name, hasher.hexdigest(), org_id=org_id
+            )
+
+            # Create job and queue analysis
+            job_id = await create_contract_analysis_job(
+                analysis_id=analysis_id,
+                filename=safe_name,
+                content_type=file.content_type or "application/octet-stream",
+                job_id=job_id,
+            )
+        except Exception:
+            dedup.release_submission(fingerprint, job_id)
+            raise
+        dedup.remember_submission(fingerprint, job_id, analysis_id)
         
         # Build location URL for status checking
-        base_url = str(request.base_url).rstrip('/')
         location = f"{base_url}/api/jobs/{job_id}"
         
         # Create response following 202 Accepted pattern
@@ -69,7 +134,8 @@ async def create_job(
             job_id=job_id,
             status=JobState.queued,
             message="Analysis job created successfully",
-            location=location
+            location=location,
+            analysis_id=analysis_id,
         )
         
         logger.info(f"Created analysis job {job_id} for file: {file.filename}")
@@ -115,3 +181,64 @@ def get_job_status_legacy(job_id: str) -> JobStatus:
     """Legacy endpoint for backward compatibility."""
     return get_job_status(job_id)
 
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request) -> StreamingResponse:
+    """Stream job status transitions as Server-Sent Events.
+
+    The first frame is the current status; the stream closes after the job
+    reaches ``done`` or ``error``.
+    """
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "not_found", "message": "Job not found"},
+        )
+
+    def _snapshot() -> dict:
+        current = get_job(job_id) or job
+        return build_job_event(
+            current.id,
+            current.status.value,
+            message=current.error_reason or "",
+            analysis_id=current.analysis_id,
+        )
+
+    async def event_stream():
+        snapshot = _snapshot()
+        if is_terminal(snapshot):
+            yield format_sse(snapshot)
+            return
+
+        sent_snapshot = False
+        try:
+            async for event in iter_events(job_channel(job_id)):
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    if not sent_snapshot:
+                        # Subscribed: re-read so no transition is missed
+                        snapshot = _snapshot()
+                        sent_snapshot = True
+                        yield format_sse(snapshot)
+                        if is_terminal(snapshot):
+                            break
+                    else:
+                        yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+                if is_terminal(event):
+                    break
+        except Exception as exc:
+            logger.warning(f"Job event stream unavailable for {job_id}: {exc}")
+            if not sent_snapshot:
+                yield format_sse(snapshot)
+            yield format_sse({"type": "stream_error", "job_id": job_id, "message": "Live updates unavailable"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -23,7 +23,13 @@ from ..services.ai_risk_scorer import (
     RiskCategory,
     ai_risk_scorer
 )
-from ..services.storage import get_analysis_text, get_analysis_findings
+from ..services.storage import (
+    analysis_path,
+    artifact_version,
+    get_analysis_text_async,
+    get_analysis_findings_async,
+    run_io,
+)
 
 router = APIRouter(tags=["risk-analysis"])
 
@@ -40,6 +46,12 @@ class RiskAnalysisResponse(BaseModel):
     metadata: Dict[str, Any]
 
 
+def _source_token(analysis_id: str) -> tuple:
+    """Stat markers of the artifacts a risk profile is derived from."""
+    base = analysis_path(analysis_id)
+    return artifact_version(base / "text.txt"), artifact_version(base / "findings.json")
+
+
 class RiskFactorResponse(BaseModel):
     category: str
     level: str
@@ -70,13 +82,22 @@ async def analyze_contract_risk(request: RiskAnalysisRequest) -> RiskAnalysisRes
     - Operational risk (SLAs, dependencies, resource commitments)
     - Reputational risk (breaches, disclosures, regulatory exposure)
     - Legal risk (jurisdiction, dispute resolution, liability)
+
+    Results are cached per analysis and scorer version until the stored
+    text or findings change.
     """
     try:
+        variant = (request.include_text_analysis, request.include_findings_analysis)
+        token = await run_io(_source_token, request.analysis_id)
+        cached = ai_risk_scorer.cached_result(request.analysis_id, variant, token)
+        if cached is not None:
+            return cached.model_copy(update={"metadata": {**cached.metadata, "cached": True}})
+
         # Get contract text if requested
         contract_text = ""
         if request.include_text_analysis:
             try:
-                contract_text = get_analysis_text(request.analysis_id)
+                contract_text = await get_analysis_text_async(request.analysis_id)
             except Exception as e:
                 # Fallback to empty text if extraction fails
                 contract_text = ""
@@ -85,7 +106,7 @@ async def analyze_contract_risk(request: RiskAnalysisRequest) -> RiskAnalysisRes
         findings = []
         if request.include_findings_analysis:
             try:
-                findings = get_analysis_findings(request.analysis_id)
+                findings = await get_analysis_findings_async(request.analysis_id)
             except Exception as e:
                 # Fallback to empty findings if retrieval fails
                 findings = []
@@ -100,13 +121,17 @@ async def analyze_contract_risk(request: RiskAnalysisRequest) -> RiskAnalysisRes
             "findings_analyzed": len(findings) > 0,
             "risk_categories_analyzed": len(risk_profile.risk_factors),
             "analysis_timestamp": datetime.utcnow().isoformat(),
+            "scorer_version": ai_risk_scorer.version,
+            "cached": False,
         }
         
-        return RiskAnalysisResponse(
+        response = RiskAnalysisResponse(
             analysis_id=request.analysis_id,
             risk_profile=risk_profile,
             metadata=metadata
         )
+        ai_risk_scorer.cache_result(request.analysis_id, variant, token, response)
+        return response
         
     except Exception as e:
         raise HTTPException(
@@ -127,7 +152,7 @@ async def get_contract_risk_analysis(
     If no analysis exists, performs a new one automatically.
     """
     try:
-        # For now, always perform analysis (could be cached in future)
+        # Served from the scorer's result cache while the artifacts are unchanged
         request = RiskAnalysisRequest(
             analysis_id=analysis_id,
             include_text_analysis=include_text,
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+
 from fastapi import APIRouter, HTTPException
 
 from ..services.rulepack_loader import load_rulepack, RulepackError
@@ -17,6 +19,7 @@ def rules_summary() -> dict:
     except RulepackError as e:
         raise HTTPException(status_code=500, detail=f"Rulepack error: {e}")
 
+    loaded_at = getattr(rp, "loaded_at", None)
     detectors = [
         DetectorSummary(
             id=getattr(d, "id", ""),
@@ -32,5 +35,7 @@ def rules_summary() -> dict:
         detector_count=len(detectors),
         detectors=detectors,
         lexicons=sorted(list((rp.lexicons or {}).keys())),
+        compile_ms=getattr(rp, "compile_ms", None),
+        loaded_at=datetime.fromtimestamp(loaded_at, tz=timezone.utc) if loaded_at else None,
     )
     return summary.model_dump()
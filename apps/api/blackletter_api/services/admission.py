@@ -0,0 +1,236 @@
+"""Admission control for the upload endpoints.
+
+Before accepting new work, ``POST /api/jobs`` and ``POST /api/contracts``
+estimate how long a new job would wait in the queue. The estimate is the
+live depth of the Celery queues (the Redis lists on ``CELERY_BROKER_URL``)
+divided by recent worker throughput. Throughput comes from jobs reaching a
+terminal state over the last ``ADMISSION_THROUGHPUT_WINDOW_SECONDS``; failed
+attempts that are retried do not count.
+
+- If the projected wait exceeds ``ADMISSION_WAIT_SLO_SECONDS``, the request
+  is rejected with ``503`` and a ``Retry-After`` header.
+- If an org exceeds ``ADMISSION_ORG_QUOTA_PER_MINUTE`` submissions in the
+  current minute, the request is rejected with ``429``.
+
+Admission fails open. If the broker cannot be read, requests are accepted.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+
+from .session import org_id_for_token, request_org_id
+
+logger = logging.getLogger(__name__)
+
+COMPLETIONS_KEY = "admission:completions"
+ORG_USAGE_PREFIX = "admission:org:"
+ANALYSIS_QUEUES = ("default", "gdpr_analysis")
+
+_depth_cache: Tuple[float, int] = (0.0, 0)
+_depth_lock = threading.Lock()
+
+# Client for the Celery broker, which need not be the job-status Redis
+broker_client = None
+_broker_lock = threading.Lock()
+
+
+def admission_enabled() -> bool:
+    """Check environment flag for upload admission control."""
+    return os.getenv("ADMISSION_ENABLED", "1") == "1"
+
+
+def wait_slo_seconds() -> float:
+    return float(os.getenv("ADMISSION_WAIT_SLO_SECONDS", "120"))
+
+
+def org_quota_per_minute() -> int:
+    """Max submissions per org per minute; 0 disables the quota."""
+    return int(os.getenv("ADMISSION_ORG_QUOTA_PER_MINUTE", "0"))
+
+
+def throughput_window_seconds() -> int:
+    return int(os.getenv("ADMISSION_THROUGHPUT_WINDOW_SECONDS", "300"))
+
+
+def default_throughput() -> float:
+    """Jobs per second assumed until completions have been observed."""
+    return float(os.getenv("ADMISSION_DEFAULT_THROUGHPUT", "0.2"))
+
+
+def _depth_cache_seconds() -> float:
+    return float(os.getenv("ADMISSION_DEPTH_CACHE_SECONDS", "2"))
+
+
+def _redis():
+    # Resolve lazily so test stubs assigned to ``tasks.redis_client`` apply.
+    from . import tasks
+
+    return tasks.redis_client
+
+
+def _broker():
+    global broker_client
+    if broker_client is None:
+        with _broker_lock:
+            if broker_client is None:
+                from redis import Redis
+
+                from .celery_app import celery_app
+
+                broker_client = Redis.from_url(celery_app.conf.broker_url)
+    return broker_client
+
+
+@dataclass
+class QueueSnapshot:
+    queue_depth: int
+    throughput_per_second: float
+    estimated_wait_seconds: float
+    wait_slo_seconds: float
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "queue_depth": self.queue_depth,
+            "throughput_per_second": round(self.throughput_per_second, 4),
+            "estimated_wait_seconds": (
+                None if math.isinf(self.estimated_wait_seconds) else round(self.estimated_wait_seconds, 1)
+            ),
+            "wait_slo_seconds": self.wait_slo_seconds,
+        }
+
+
+def queue_depth() -> int:
+    """Number of tasks waiting in the analysis queues on the broker.
+
+    Cached for a couple of seconds so bursts of uploads do not turn into a
+    burst of broker round trips.
+    """
+    global _depth_cache
+    now = time.monotonic()
+    with _depth_lock:
+        cached_at, depth = _depth_cache
+        if cached_at and now - cached_at < _depth_cache_seconds():
+            return depth
+    client = _broker()
+    depth = sum(int(client.llen(queue) or 0) for queue in ANALYSIS_QUEUES)
+    with _depth_lock:
+        _depth_cache = (now, depth)
+    return depth
+
+
+def record_completion(now: Optional[float] = None) -> None:
+    """Count a job that reached a terminal state towards worker throughput."""
+    bucket = int((now or time.time()) // 60)
+    try:
+        _redis().hincrby(COMPLETIONS_KEY, str(bucket), 1)
+    except Exception:
+        pass
+
+
+def throughput_per_second(now: Optional[float] = None) -> float:
+    """Jobs completed per second over the throughput window."""
+    now = now or time.time()
+    window = throughput_window_seconds()
+    oldest = int((now - window) // 60)
+    client = _redis()
+    buckets = client.hgetall(COMPLETIONS_KEY) or {}
+    completed = 0
+    stale = []
+    for bucket, count in buckets.items():
+        if int(bucket) > oldest:
+            completed += int(count)
+        else:
+            stale.append(bucket)
+    if stale:
+        try:
+            client.hdel(COMPLETIONS_KEY, *stale)
+        except Exception:
+            pass
+    if completed == 0:
+        return default_throughput()
+    return completed / window
+
+
+def snapshot(now: Optional[float] = None) -> QueueSnapshot:
+    """Current queue depth, throughput and projected wait for a new job."""
+    slo = wait_slo_seconds()
+    try:
+        depth = queue_depth()
+        rate = throughput_per_second(now)
+    except Exception as exc:
+        logger.warning(f"Admission control could not read broker state: {exc}")
+        return QueueSnapshot(0, 0.0, 0.0, slo)
+    wait = depth / rate if rate > 0 else (0.0 if depth == 0 else math.inf)
+    return QueueSnapshot(depth, rate, wait, slo)
+
+
+def _charge_org(org_id: str, now: float) -> Optional[int]:
+    """Count a submission for ``org_id``; return seconds to wait if over quota."""
+    quota = org_quota_per_minute()
+    if quota <= 0:
+        return None
+    minute = int(now // 60)
+    key = f"{ORG_USAGE_PREFIX}{minute}"
+    try:
+        client = _redis()
+        used = int(client.hincrby(key, org_id, 1))
+        client.expire(key, 120)
+    except Exception:
+        return None
+    if used > quota:
+        return max(1, int((minute + 1) * 60 - now))
+    return None
+
+
+def resolve_org_id(session_token: Optional[str]) -> str:
+    """Org of the caller's session, or ``"anonymous"`` for unauthenticated uploads."""
+    return org_id_for_token(session_token) or "anonymous"
+
+
+def check_admission(org_id: str = "anonymous", now: Optional[float] = None) -> None:
+    """Raise ``HTTPException`` when a new job should not be accepted."""
+    if not admission_enabled():
+        return
+    now = now or time.time()
+    snap = snapshot(now)
+    if snap.estimated_wait_seconds > snap.wait_slo_seconds:
+        excess = snap.estimated_wait_seconds - snap.wait_slo_seconds
+        retry_after = 300 if math.isinf(excess) else max(1, min(300, math.ceil(excess)))
+        logger.warning(
+            f"Rejecting upload: queue depth {snap.queue_depth}, "
+            f"projected wait {snap.estimated_wait_seconds:.0f}s > SLO {snap.wait_slo_seconds:.0f}s"
+        )
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "code": "queue_saturated",
+                "message": "Analysis queue is saturated, retry later.",
+                "queue_depth": snap.queue_depth,
+            },
+            headers={"Retry-After": str(retry_after)},
+        )
+    retry_after = _charge_org(org_id, now)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "code": "org_quota_exceeded",
+                "message": "Submission quota for this organization exceeded.",
+            },
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def admit_upload(org_id: Optional[str] = Depends(request_org_id)) -> None:
+    """FastAPI dependency applying admission control to upload endpoints."""
+    if not admission_enabled():
+        return
+    check_admission(org_id or "anonymous")
@@ -3,19 +3,31 @@ AI-Powered Contract Risk Scoring Service
 
 This service provides advanced risk analysis for contracts beyond basic GDPR compliance,
 including financial risk, operational risk, and compliance risk scoring.
+
+All category patterns are compiled into one case-insensitive scanner that
+makes a single pass over the original text. The alternation is a
+zero-width lookahead, so categories stay independent signals: a phrase
+that overlaps another category's match is still counted. Scored results
+can be cached per analysis and ``SCORER_VERSION``; bump the version
+whenever patterns or weights change.
 """
 
 from __future__ import annotations
 
 import json
 import logging
-from typing import Dict, List, Optional, Tuple
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Pattern, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import re
 
 logger = logging.getLogger(__name__)
 
+SCORER_VERSION = "3"
+
 
 class RiskLevel(Enum):
     LOW = "low"
@@ -56,8 +68,13 @@ class ContractRiskProfile:
 class AIRiskScorer:
     """Advanced AI-powered contract risk scoring system"""
     
+    version = SCORER_VERSION
+
     def __init__(self):
         self.risk_patterns = self._load_risk_patterns()
+        self._scanner, self._scanner_groups = self._compile_scanner()
+        self._results: "OrderedDict[Tuple[Hashable, ...], Tuple[Hashable, Any]]" = OrderedDict()
+        self._results_lock = threading.Lock()
         self.compliance_weights = {
             RiskCategory.COMPLIANCE: 0.35,
             RiskCategory.FINANCIAL: 0.25,
@@ -70,7 +87,8 @@ class AIRiskScorer:
         """Load risk detection patterns and rules"""
         return {
             "financial_risk": {
-                "high_value_contracts": r"\b(?:million|billion|£\d+[,\d]*[km]?|€\d+[,\d]*[km]?|\$\d+[,\d]*[km]?)\b",
+                # No \b before a currency symbol: it is not a word character
+                "high_value_contracts": r"(?:\b(?:million|billion)\b|[£€$]\d+[,\d]*[km]?\b)",
                 "penalty_clauses": r"\b(?:penalty|liquidated damages|forfeiture|fine)\b",
                 "payment_terms": r"\b(?:net\s+\d+|payment\s+within\s+\d+|advance\s+payment)\b",
                 "termination_fees": r"\b(?:termination\s+fee|early\s+termination\s+cost|exit\s+charge)\b"
@@ -94,31 +112,74 @@ class AIRiskScorer:
                 "force_majeure": r"\b(?:force\s+majeure|act\s+of\s+god|unforeseen\s+circumstances)\b"
             }
         }
-    
+
+    def _compile_scanner(self) -> Tuple[Pattern[str], List[Tuple[str, str]]]:
+        """Combine every category pattern into one alternation of named groups
+
+        The alternation sits in a zero-width lookahead, so a match consumes no
+        text: "regulatory penalty" still counts as both a regulatory fine and
+        a penalty clause, as it did when each pattern was searched separately.
+        """
+        groups: List[Tuple[str, str]] = []
+        parts: List[str] = []
+        for category, patterns in self.risk_patterns.items():
+            for name, pattern in patterns.items():
+                parts.append(f"(?P<g{len(groups)}>{pattern})")
+                groups.append((category, name))
+        return re.compile("(?=(?:" + "|".join(parts) + "))", re.IGNORECASE), groups
+
+    def scan(self, contract_text: str) -> Dict[str, Dict[str, int]]:
+        """Count matches per category and pattern in one pass over the text, one per start position"""
+        counts = {category: dict.fromkeys(patterns, 0) for category, patterns in self.risk_patterns.items()}
+        for match in self._scanner.finditer(contract_text):
+            category, name = self._scanner_groups[int(match.lastgroup[1:])]
+            counts[category][name] += 1
+        return counts
+
+    def cached_result(self, analysis_id: str, variant: Hashable, source_token: Hashable) -> Optional[Any]:
+        """Result cached for this analysis, variant and scorer version, if its sources are unchanged"""
+        key = (analysis_id, self.version, variant)
+        with self._results_lock:
+            entry = self._results.get(key)
+            if entry is None or entry[0] != source_token:
+                return None
+            self._results.move_to_end(key)
+            return entry[1]
+
+    def cache_result(self, analysis_id: str, variant: Hashable, source_token: Hashable, result: Any) -> None:
+        size = int(os.getenv("RISK_RESULT_CACHE_SIZE", "256"))
+        key = (analysis_id, self.version, variant)
+        with self._results_lock:
+            self._results[key] = (source_token, result)
+            self._results.move_to_end(key)
+            while len(self._results) > size:
+                self._results.popitem(last=False)
+
     def analyze_contract_risk(self, contract_text: str, findings: List[Dict]) -> ContractRiskProfile:
         """Analyze contract risk based on text content and existing findings"""
         
         # Extract risk factors from different categories
         risk_factors = []
+        counts = self.scan(contract_text)
         
         # Compliance risk (based on existing findings)
         compliance_risk = self._assess_compliance_risk(findings)
         risk_factors.append(compliance_risk)
         
         # Financial risk
-        financial_risk = self._assess_financial_risk(contract_text)
+        financial_risk = self._assess_financial_risk(counts["financial_risk"])
         risk_factors.append(financial_risk)
         
         # Operational risk
-        operational_risk = self._assess_operational_risk(contract_text)
+        operational_risk = self._assess_operational_risk(counts["operational_risk"])
         risk_factors.append(operational_risk)
         
         # Reputational risk
-        reputational_risk = self._assess_reputational_risk(contract_text)
+        reputational_risk = self._assess_reputational_risk(counts["reputational_risk"])
         risk_factors.append(reputational_risk)
         
         # Legal risk
-        legal_risk = self._assess_legal_risk(contract_text)
+        legal_risk = self._assess_legal_risk(counts["legal_risk"])
         risk_factors.append(legal_risk)
         
         # Calculate overall risk score
@@ -194,14 +255,10 @@ class AIRiskScorer:
             impact="High" if level in [RiskLevel.HIGH, RiskLevel.CRITICAL] else "Medium"
         )
     
-    def _assess_financial_risk(self, contract_text: str) -> RiskFactor:
-        """Assess financial risk from contract terms"""
-        text_lower = contract_text.lower()
-        
-        # Check for high-value indicators
-        high_value_matches = re.findall(self.risk_patterns["financial_risk"]["high_value_contracts"], contract_text, re.IGNORECASE)
-        penalty_matches = re.findall(self.risk_patterns["financial_risk"]["penalty_clauses"], text_lower)
-        payment_matches = re.findall(self.risk_patterns["financial_risk"]["payment_terms"], text_lower)
+    def _assess_financial_risk(self, counts: Dict[str, int]) -> RiskFactor:
+        """Assess financial risk from contract term counts"""
+        high_value_matches = counts["high_value_contracts"]
+        penalty_matches = counts["penalty_clauses"]
         
         # Calculate financial risk score
         risk_score = 0.1  # Base score
@@ -210,8 +267,10 @@ class AIRiskScorer:
             risk_score += 0.3
         if penalty_matches:
             risk_score += 0.2
-        if payment_matches:
+        if counts["payment_terms"]:
             risk_score += 0.1
+        if counts["termination_fees"]:
+            risk_score += 0.2
         
         # Determine risk level
         if risk_score >= 0.7:
@@ -239,19 +298,16 @@ class AIRiskScorer:
             level=level,
             score=risk_score,
             description=description,
-            evidence=f"Found {len(high_value_matches)} high-value indicators, {len(penalty_matches)} penalty clauses",
+            evidence=f"Found {high_value_matches} high-value indicators, {penalty_matches} penalty clauses",
             recommendations=recommendations,
             impact="High" if level == RiskLevel.HIGH else "Medium"
         )
     
-    def _assess_operational_risk(self, contract_text: str) -> RiskFactor:
-        """Assess operational risk from contract terms"""
-        text_lower = contract_text.lower()
-        
-        # Check operational risk indicators
-        sla_matches = re.findall(self.risk_patterns["operational_risk"]["service_levels"], text_lower)
-        resource_matches = re.findall(self.risk_patterns["operational_risk"]["resource_commitments"], text_lower)
-        dependency_matches = re.findall(self.risk_patterns["operational_risk"]["dependency_risks"], text_lower)
+    def _assess_operational_risk(self, counts: Dict[str, int]) -> RiskFactor:
+        """Assess operational risk from contract term counts"""
+        sla_matches = counts["service_levels"]
+        resource_matches = counts["resource_commitments"]
+        dependency_matches = counts["dependency_risks"]
         
         risk_score = 0.1
         
@@ -287,18 +343,16 @@ class AIRiskScorer:
             level=level,
             score=risk_score,
             description=description,
-            evidence=f"Found {len(sla_matches)} SLA references, {len(resource_matches)} resource commitments",
+            evidence=f"Found {sla_matches} SLA references, {resource_matches} resource commitments",
             recommendations=recommendations,
             impact="High" if level == RiskLevel.HIGH else "Medium"
         )
     
-    def _assess_reputational_risk(self, contract_text: str) -> RiskFactor:
-        """Assess reputational risk from contract terms"""
-        text_lower = contract_text.lower()
-        
-        breach_matches = re.findall(self.risk_patterns["reputational_risk"]["confidentiality_breaches"], text_lower)
-        disclosure_matches = re.findall(self.risk_patterns["reputational_risk"]["public_disclosure"], text_lower)
-        regulatory_matches = re.findall(self.risk_patterns["reputational_risk"]["regulatory_fines"], text_lower)
+    def _assess_reputational_risk(self, counts: Dict[str, int]) -> RiskFactor:
+        """Assess reputational risk from contract term counts"""
+        breach_matches = counts["confidentiality_breaches"]
+        disclosure_matches = counts["public_disclosure"]
+        regulatory_matches = counts["regulatory_fines"]
         
         risk_score = 0.1
         
@@ -334,18 +388,16 @@ class AIRiskScorer:
             level=level,
             score=risk_score,
             description=description,
-            evidence=f"Found {len(breach_matches)} breach references, {len(disclosure_matches)} disclosure obligations",
+            evidence=f"Found {breach_matches} breach references, {disclosure_matches} disclosure obligations",
             recommendations=recommendations,
             impact="High" if level == RiskLevel.HIGH else "Medium"
         )
     
-    def _assess_legal_risk(self, contract_text: str) -> RiskFactor:
-        """Assess legal risk from contract terms"""
-        text_lower = contract_text.lower()
-        
-        jurisdiction_matches = re.findall(self.risk_patterns["legal_risk"]["jurisdiction_issues"], text_lower)
-        arbitration_matches = re.findall(self.risk_patterns["legal_risk"]["arbitration_clauses"], text_lower)
-        liability_matches = re.findall(self.risk_patterns["legal_risk"]["limitation_liability"], text_lower)
+    def _assess_legal_risk(self, counts: Dict[str, int]) -> RiskFactor:
+        """Assess legal risk from contract term counts"""
+        jurisdiction_matches = counts["jurisdiction_issues"]
+        arbitration_matches = counts["arbitration_clauses"]
+        liability_matches = counts["limitation_liability"]
         
         risk_score = 0.1
         
@@ -381,7 +433,7 @@ class AIRiskScorer:
             level=level,
             score=risk_score,
             description=description,
-            evidence=f"Found {len(jurisdiction_matches)} jurisdiction references, {len(arbitration_matches)} dispute resolution clauses",
+            evidence=f"Found {jurisdiction_matches} jurisdiction references, {arbitration_matches} dispute resolution clauses",
             recommendations=recommendations,
             impact="High" if level == RiskLevel.HIGH else "Medium"
         )
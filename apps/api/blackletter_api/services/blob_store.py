@@ -0,0 +1,390 @@
+"""Content-addressable blob store for uploaded contracts.
+
+Each upload is stored once under its SHA-256. The ``blobs`` table counts
+references, and ``blob_refs`` records which analysis (and org) holds each
+reference. The analysis directory keeps a small ``<filename>.blob`` pointer
+instead of its own copy of the bytes, and :func:`resolve_upload` turns that
+pointer back into a readable local path with the original filename.
+
+Two backends are available, selected by ``BLOB_STORE_BACKEND``:
+
+- ``local`` (default) stores blobs under ``DATA_ROOT/blobs``.
+- ``s3`` uses any S3-compatible endpoint (AWS, MinIO), configured with the
+  same ``S3_*`` variables as the rulepack loader. ``BLOB_S3_BUCKET`` and
+  ``BLOB_S3_PREFIX`` can override the bucket and key prefix.
+
+Blobs are garbage collected once their refcount reaches zero and a grace
+period has passed. :func:`apply_retention` releases references older than
+the owning org's ``RetentionPolicy`` first.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.entities import Blob, BlobRef, OrgSetting, RetentionPolicy
+from . import storage
+from .s3_client import get_s3_client
+
+logger = logging.getLogger(__name__)
+
+REF_SUFFIX = ".blob"
+RETENTION_DAYS: Dict[RetentionPolicy, Optional[int]] = {
+    RetentionPolicy.none: None,
+    RetentionPolicy.thirty_days: 30,
+    RetentionPolicy.ninety_days: 90,
+}
+
+
+def blob_store_enabled() -> bool:
+    """Check environment flag for content-addressable upload storage."""
+    return os.getenv("BLOB_STORE_ENABLED", "1") == "1"
+
+
+def gc_grace_seconds() -> int:
+    return int(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
+
+
+class BlobBackend:
+    """Where blob bytes live. Keys are lowercase hex SHA-256 digests."""
+
+    name = "base"
+
+    def put_file(self, digest: str, src: Path) -> None:  # pragma: no cover - abstract
+        """Store a copy of ``src`` under ``digest``; ``src`` is left in place."""
+        raise NotImplementedError
+
+    def exists(self, digest: str) -> bool:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def fetch(self, digest: str) -> Path:  # pragma: no cover - abstract
+        """Return a local path holding the blob's bytes."""
+        raise NotImplementedError
+
+    def delete(self, digest: str) -> None:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+
+class LocalBlobBackend(BlobBackend):
+    name = "local"
+
+    def __init__(self, root: Optional[Path] = None):
+        self._root = root
+
+    @property
+    def root(self) -> Path:
+        # Resolved lazily so DATA_ROOT overrides (tests, CLI) apply.
+        return self._root or storage.DATA_ROOT / "blobs"
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def put_file(self, digest: str, src: Path) -> None:
+        dest = self._path(digest)
+        if dest.exists():
+            return
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f"{digest}.{os.getpid()}.tmp")
+        try:
+            # A hard link is free on the same filesystem; the caller drops
+            # the original once the reference is committed.
+            os.link(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+
+    def exists(self, digest: str) -> bool:
+        return self._path(digest).exists()
+
+    def fetch(self, digest: str) -> Path:
+        path = self._path(digest)
+        if not path.exists():
+            raise FileNotFoundError(f"blob {digest} missing")
+        return path
+
+    def delete(self, digest: str) -> None:
+        self._path(digest).unlink(missing_ok=True)
+
+
+class S3BlobBackend(BlobBackend):
+    """S3-compatible backend; fetched blobs are cached under DATA_ROOT.
+
+    Transfers go through the shared pooled client, so large contracts are
+    uploaded in multipart chunks and downloaded with concurrent ranged GETs.
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: Optional[str] = None,
+        prefix: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+    ):
+        self.bucket = bucket or os.getenv("BLOB_S3_BUCKET") or os.getenv("S3_BUCKET")
+        self.prefix = prefix if prefix is not None else os.getenv("BLOB_S3_PREFIX", "blobs/")
+        if not self.bucket:
+            raise ValueError("S3 blob backend requires BLOB_S3_BUCKET or S3_BUCKET")
+        self.s3 = get_s3_client(
+            bucket=self.bucket, endpoint_url=endpoint_url, access_key=access_key, secret_key=secret_key
+        )
+
+    def _key(self, digest: str) -> str:
+        return f"{self.prefix}{digest}"
+
+    def _cache_path(self, digest: str) -> Path:
+        return storage.DATA_ROOT / "blobs" / ".cache" / digest
+
+    def put_file(self, digest: str, src: Path) -> None:
+        if not self.exists(digest):
+            self.s3.upload_file(src, self._key(digest))
+
+    def exists(self, digest: str) -> bool:
+        return self.s3.exists(self._key(digest))
+
+    def fetch(self, digest: str) -> Path:
+        path = self._cache_path(digest)
+        if not path.exists():
+            self.s3.download_file(self._key(digest), path)
+        return path
+
+    def delete(self, digest: str) -> None:
+        self.s3.delete(self._key(digest))
+        self._cache_path(digest).unlink(missing_ok=True)
+
+
+_backend: Optional[BlobBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_blob_backend() -> BlobBackend:
+    """Get the process-wide blob backend selected by ``BLOB_STORE_BACKEND``."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                kind = os.getenv("BLOB_STORE_BACKEND", "local")
+                if kind == "local":
+                    _backend = LocalBlobBackend()
+                elif kind == "s3":
+                    _backend = S3BlobBackend()
+                else:
+                    raise ValueError(f"Unknown blob store backend '{kind}'")
+    return _backend
+
+
+def set_blob_backend(backend: Optional[BlobBackend]) -> None:
+    """Override (or with ``None``, reset) the process-wide backend."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def _session(db: Optional[Session]) -> Tuple[Session, bool]:
+    if db is None:
+        return SessionLocal(), True
+    return db, False
+
+
+def _ref_path(analysis_id: str, filename: str) -> Path:
+    return storage.analysis_dir(analysis_id) / f"{filename}{REF_SUFFIX}"
+
+
+def _add_reference(db: Session, digest: str, size: int, backend: BlobBackend) -> bool:
+    """Increment the refcount; returns True if the blob bytes still need storing."""
+    for _ in range(2):
+        updated = (
+            db.query(Blob)
+            .filter(Blob.sha256 == digest)
+            .update({Blob.refcount: Blob.refcount + 1, Blob.released_at: None}, synchronize_session=False)
+        )
+        if updated:
+            return False
+        try:
+            db.add(Blob(sha256=digest, size_bytes=size, refcount=1, backend=backend.name))
+            db.flush()
+            return True
+        except IntegrityError:
+            # Another writer created the row first; retry the increment.
+            db.rollback()
+    raise RuntimeError(f"could not reference blob {digest}")
+
+
+def _discard_unreferenced(db: Session, digest: str, backend: BlobBackend) -> None:
+    """Remove bytes stored by a failed ingest unless another writer owns them."""
+    try:
+        if db.get(Blob, digest) is None:
+            backend.delete(digest)
+    except Exception as exc:
+        logger.warning(f"Could not discard orphaned blob {digest}: {exc}")
+
+
+def ingest_upload(
+    analysis_id: str,
+    path: Path,
+    digest: str,
+    org_id: Optional[str] = None,
+    db: Optional[Session] = None,
+) -> Path:
+    """Move a freshly saved upload into the blob store.
+
+    The bytes are copied into the store first, and the reference rows are
+    committed next. Only then is the file at ``path`` replaced by a
+    ``<name>.blob`` pointer. If any step fails, the upload is left where it
+    is, and readers still find it through :func:`resolve_upload`.
+    """
+    if not blob_store_enabled():
+        return path
+    backend = get_blob_backend()
+    size = path.stat().st_size
+    db, owns = _session(db)
+    stored = False
+    try:
+        _add_reference(db, digest, size, backend)
+        db.add(BlobRef(sha256=digest, analysis_id=analysis_id, filename=path.name, org_id=org_id))
+        # A blob with a zero refcount may be mid-GC, so always (re)store bytes
+        # unless the backend already has them.
+        if not backend.exists(digest):
+            backend.put_file(digest, path)
+            stored = True
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        if stored:
+            _discard_unreferenced(db, digest, backend)
+        logger.warning(f"Blob store unavailable, keeping upload in place for {analysis_id}: {exc}")
+        return path
+    finally:
+        if owns:
+            db.close()
+    path.unlink(missing_ok=True)
+    ref = _ref_path(analysis_id, path.name)
+    ref.write_text(json.dumps({"sha256": digest, "size": size, "backend": backend.name}), encoding="utf-8")
+    return ref
+
+
+def resolve_upload(analysis_id: str, filename: str) -> Path:
+    """Return a readable local path for an analysis's upload.
+
+    Blob-backed uploads are exposed as a symlink named after the original
+    file, because extractors dispatch on the file suffix.
+    """
+    direct = storage.analysis_dir(analysis_id) / filename
+    ref = _ref_path(analysis_id, filename)
+    if not ref.exists():
+        return direct
+    digest = json.loads(ref.read_text(encoding="utf-8"))["sha256"]
+    blob_path = get_blob_backend().fetch(digest)
+    view = storage.DATA_ROOT / "blobs" / ".views" / digest / filename
+    if not view.exists():
+        view.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            view.symlink_to(blob_path)
+        except FileExistsError:
+            pass
+        except OSError:
+            shutil.copyfile(blob_path, view)
+    return view
+
+
+def release_analysis(analysis_id: str, db: Optional[Session] = None) -> int:
+    """Drop an analysis's blob references; returns the number released."""
+    db, owns = _session(db)
+    try:
+        refs = db.query(BlobRef).filter(BlobRef.analysis_id == analysis_id).all()
+        now = datetime.utcnow()
+        for ref in refs:
+            db.query(Blob).filter(Blob.sha256 == ref.sha256).update(
+                {Blob.refcount: Blob.refcount - 1, Blob.released_at: now}, synchronize_session=False
+            )
+            db.delete(ref)
+            _ref_path(analysis_id, ref.filename).unlink(missing_ok=True)
+        db.commit()
+        return len(refs)
+    finally:
+        if owns:
+            db.close()
+
+
+def collect_garbage(now: Optional[datetime] = None, db: Optional[Session] = None) -> Dict[str, int]:
+    """Delete blobs with no references whose grace period has passed."""
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(seconds=gc_grace_seconds())
+    backend = get_blob_backend()
+    db, owns = _session(db)
+    deleted = freed = 0
+    try:
+        candidates = (
+            db.query(Blob.sha256, Blob.size_bytes)
+            .filter(Blob.refcount <= 0, Blob.released_at.isnot(None), Blob.released_at <= cutoff)
+            .all()
+        )
+        for digest, size in candidates:
+            # Conditional delete: a concurrent ingest may have re-referenced it.
+            gone = (
+                db.query(Blob)
+                .filter(Blob.sha256 == digest, Blob.refcount <= 0)
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            if not gone:
+                continue
+            try:
+                backend.delete(digest)
+            except Exception as exc:
+                logger.warning(f"Could not delete blob {digest}: {exc}")
+                continue
+            shutil.rmtree(storage.DATA_ROOT / "blobs" / ".views" / digest, ignore_errors=True)
+            deleted += 1
+            freed += size or 0
+        return {"blobs_deleted": deleted, "bytes_freed": freed}
+    finally:
+        if owns:
+            db.close()
+
+
+def retention_cutoffs(db: Session, now: datetime) -> Tuple[Dict[str, datetime], Optional[datetime]]:
+    """Per-org cutoffs, plus the default (first org) cutoff for unowned refs."""
+    cutoffs: Dict[str, datetime] = {}
+    default: Optional[datetime] = None
+    for i, setting in enumerate(db.query(OrgSetting).order_by(OrgSetting.created_at).all()):
+        days = RETENTION_DAYS.get(setting.retention_policy)
+        cutoff = now - timedelta(days=days) if days else None
+        if cutoff is not None:
+            cutoffs[str(setting.org_id)] = cutoff
+        if i == 0:
+            default = cutoff
+    return cutoffs, default
+
+
+def apply_retention(now: Optional[datetime] = None, db: Optional[Session] = None) -> Dict[str, int]:
+    """Release references older than each org's retention policy, then GC."""
+    now = now or datetime.utcnow()
+    db, owns = _session(db)
+    try:
+        cutoffs, default = retention_cutoffs(db, now)
+        expired = set()
+        for org_id, cutoff in cutoffs.items():
+            rows = db.query(BlobRef.analysis_id).filter(BlobRef.org_id == org_id, BlobRef.created_at <= cutoff)
+            expired.update(r.analysis_id for r in rows)
+        if default is not None:
+            rows = db.query(BlobRef.analysis_id).filter(BlobRef.org_id.is_(None), BlobRef.created_at <= default)
+            expired.update(r.analysis_id for r in rows)
+        released = sum(release_analysis(analysis_id, db=db) for analysis_id in expired)
+        result = collect_garbage(now=now, db=db)
+        return {"refs_released": released, **result}
+    finally:
+        if owns:
+            db.close()
@@ -0,0 +1,239 @@
+"""Catalogue index of analyses stored under ``DATA_ROOT/analyses``.
+
+``storage.write_analysis_json`` upserts one ``analysis_catalog`` row per
+analysis, and the result writers keep its verdict counts current.
+``GET /api/analyses`` reads this index instead of scanning and parsing every
+``analysis.json``, so listing cost depends on the page size rather than on
+the number of analyses on disk.
+
+Pages are ordered by ``created_at`` (newest first) and walked with an opaque
+keyset cursor, which avoids deep ``OFFSET`` scans.
+
+Analyses written before the catalogue existed are indexed by
+:func:`ensure_backfilled` on the first listing. Completion is recorded in a
+marker file under ``DATA_ROOT/analyses``, so the backfill still runs when
+new uploads were catalogued first.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.entities import AnalysisCatalogEntry
+from ..models.schemas import AnalysisSummary, VerdictCounts
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_MARKER = ".catalogue_backfilled"
+
+_backfill_lock = threading.Lock()
+_backfilled_roots: Set[Path] = set()
+
+
+def _session(db: Optional[Session]) -> Tuple[Session, bool]:
+    if db is None:
+        return SessionLocal(), True
+    return db, False
+
+
+def _to_utc_naive(value: str) -> datetime:
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except Exception:
+        dt = datetime.now(timezone.utc)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def encode_cursor(entry: AnalysisCatalogEntry) -> str:
+    raw = json.dumps({"c": entry.created_at.isoformat(), "id": entry.analysis_id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Return ``(created_at, analysis_id)``; raises ``ValueError`` if malformed."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(data["c"]), str(data["id"])
+    except Exception as exc:
+        raise ValueError("invalid_cursor") from exc
+
+
+def upsert_entry(
+    analysis_id: str,
+    filename: str,
+    size: int,
+    created_at: str,
+    status: str,
+    org_id: Optional[str] = None,
+    db: Optional[Session] = None,
+) -> None:
+    """Insert or refresh the catalogue row for an analysis."""
+    db, owns = _session(db)
+    try:
+        entry = db.get(AnalysisCatalogEntry, analysis_id) or AnalysisCatalogEntry(analysis_id=analysis_id)
+        entry.filename = filename
+        entry.size = size
+        entry.status = status
+        entry.created_at = _to_utc_naive(created_at)
+        entry.org_id = org_id or entry.org_id
+        db.add(entry)
+        db.commit()
+    finally:
+        if owns:
+            db.close()
+
+
+def update_status(analysis_id: str, status: str, db: Optional[Session] = None) -> None:
+    """Store the current job state of an already catalogued analysis."""
+    db, owns = _session(db)
+    try:
+        entry = db.get(AnalysisCatalogEntry, analysis_id)
+        if entry is None:
+            return
+        entry.status = status
+        db.commit()
+    finally:
+        if owns:
+            db.close()
+
+
+def update_verdicts(analysis_id: str, verdicts: VerdictCounts, db: Optional[Session] = None) -> None:
+    """Store precomputed verdict counts for an already catalogued analysis."""
+    db, owns = _session(db)
+    try:
+        entry = db.get(AnalysisCatalogEntry, analysis_id)
+        if entry is None:
+            return
+        entry.pass_count = verdicts.pass_count
+        entry.weak_count = verdicts.weak_count
+        entry.missing_count = verdicts.missing_count
+        entry.needs_review_count = verdicts.needs_review_count
+        db.commit()
+    finally:
+        if owns:
+            db.close()
+
+
+def _to_summary(entry: AnalysisCatalogEntry) -> AnalysisSummary:
+    return AnalysisSummary(
+        id=entry.analysis_id,
+        filename=entry.filename,
+        created_at=entry.created_at.replace(tzinfo=timezone.utc).isoformat(),
+        size=entry.size,
+        state=entry.status,
+        verdicts=VerdictCounts(
+            pass_count=entry.pass_count,
+            weak_count=entry.weak_count,
+            missing_count=entry.missing_count,
+            needs_review_count=entry.needs_review_count,
+        ),
+    )
+
+
+def list_entries(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    filename_prefix: Optional[str] = None,
+    db: Optional[Session] = None,
+) -> Tuple[List[AnalysisSummary], Optional[str]]:
+    """Return one page of summaries (newest first) and the next cursor."""
+    limit = max(0, int(limit))
+    db, owns = _session(db)
+    try:
+        query = db.query(AnalysisCatalogEntry)
+        if status:
+            query = query.filter(AnalysisCatalogEntry.status == status)
+        if filename_prefix:
+            escaped = filename_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            query = query.filter(AnalysisCatalogEntry.filename.like(f"{escaped}%", escape="\\"))
+        if cursor:
+            created_at, analysis_id = decode_cursor(cursor)
+            query = query.filter(
+                or_(
+                    AnalysisCatalogEntry.created_at < created_at,
+                    and_(
+                        AnalysisCatalogEntry.created_at == created_at,
+                        AnalysisCatalogEntry.analysis_id < analysis_id,
+                    ),
+                )
+            )
+        rows = (
+            query.order_by(AnalysisCatalogEntry.created_at.desc(), AnalysisCatalogEntry.analysis_id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit and limit > 0 else None
+        return [_to_summary(r) for r in rows[:limit]], next_cursor
+    finally:
+        if owns:
+            db.close()
+
+
+def rebuild_catalogue(db: Optional[Session] = None) -> int:
+    """Index every ``analysis.json`` on disk; returns the number indexed.
+
+    Used once to backfill analyses written before the catalogue existed.
+    """
+    from . import storage
+
+    root = storage.DATA_ROOT / "analyses"
+    if not root.exists():
+        return 0
+    db, owns = _session(db)
+    count = 0
+    try:
+        for d in root.iterdir():
+            p = d / "analysis.json"
+            if not p.is_file():
+                continue
+            try:
+                data = json.loads(p.read_text(encoding="utf-8"))
+                upsert_entry(
+                    str(data.get("id") or d.name),
+                    str(data.get("filename") or "unknown"),
+                    int(data.get("size") or 0),
+                    str(data.get("created_at") or ""),
+                    str(data.get("status") or "REPORTED"),
+                    org_id=data.get("org_id"),
+                    db=db,
+                )
+                count += 1
+            except Exception:
+                db.rollback()
+                continue
+        return count
+    finally:
+        if owns:
+            db.close()
+
+
+def ensure_backfilled() -> None:
+    """Backfill from disk unless the marker says it already ran for this DATA_ROOT."""
+    from . import storage
+
+    root = storage.DATA_ROOT / "analyses"
+    if root in _backfilled_roots:
+        return
+    with _backfill_lock:
+        if root in _backfilled_roots:
+            return
+        marker = root / BACKFILL_MARKER
+        if not marker.exists():
+            with SessionLocal() as db:
+                indexed = rebuild_catalogue(db=db)
+            root.mkdir(parents=True, exist_ok=True)
+            marker.write_text(datetime.now(timezone.utc).isoformat(), encoding="utf-8")
+            logger.info(f"Backfilled analysis catalogue with {indexed} entries")
+        _backfilled_roots.add(root)
@@ -7,9 +7,18 @@ Integrated from v4mpire77/blackletter for async job processing
 from __future__ import annotations
 
 import os
+import time
 import logging
 from celery import Celery
-from celery.signals import worker_ready, worker_shutdown
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_ready,
+    worker_shutdown,
+)
 from kombu import Queue
 
 # Configure logging
@@ -36,7 +45,20 @@ celery_app.conf.update(
     # Task routing
     task_routes={
         "blackletter_api.services.tasks.process_contract_analysis": {"queue": "gdpr_analysis"},
-        "blackletter_api.services.tasks.cleanup_task": {"queue": "maintenance"}
+        "blackletter_api.services.tasks.cleanup_task": {"queue": "maintenance"},
+        "blackletter_api.services.tasks.train_artifact_dictionary_task": {"queue": "maintenance"},
+    },
+
+    # Periodic maintenance (run with `celery beat`)
+    beat_schedule={
+        "retention-gc": {
+            "task": "blackletter_api.services.tasks.cleanup_task",
+            "schedule": float(os.getenv("RETENTION_GC_INTERVAL_SECONDS", "3600")),
+        },
+        "artifact-dictionary": {
+            "task": "blackletter_api.services.tasks.train_artifact_dictionary_task",
+            "schedule": float(os.getenv("ARTIFACT_DICT_TRAIN_INTERVAL_SECONDS", "86400")),
+        },
     },
     
     # Queue configuration
@@ -64,10 +86,89 @@ celery_app.conf.update(
 )
 
 
+@worker_init.connect
+def worker_init_handler(sender=None, **kwargs):
+    """Warm extraction libraries, rules and lexicons in the parent before fork."""
+    from .warmup import preload_before_fork, warm_start
+
+    if preload_before_fork():
+        warm_start(freeze=True)
+
+
+@worker_process_init.connect
+def worker_process_init_handler(sender=None, **kwargs):
+    """Warm each pool process when the parent did not preload."""
+    from .warmup import reset_first_job, warm_start
+
+    reset_first_job()
+    warm_start()
+
+
 @worker_ready.connect
 def worker_ready_handler(sender=None, **kwargs):
     """Log when worker is ready."""
-    logger.info("Celery worker ready for GDPR analysis tasks")
+    from .warmup import warm_report
+
+    logger.info(f"Celery worker ready for GDPR analysis tasks (warm start: {warm_report()})")
+
+
+@before_task_publish.connect
+def stamp_enqueue_time(headers=None, **kwargs):
+    """Record publish time and the publishing span for the worker."""
+    if headers is not None:
+        headers.setdefault("enqueued_at", time.time())
+        from .tracing import TRACEPARENT_HEADER, current_traceparent
+
+        traceparent = current_traceparent()
+        if traceparent:
+            headers.setdefault(TRACEPARENT_HEADER, traceparent)
+
+
+@task_prerun.connect
+def observe_queue_wait(task=None, **kwargs):
+    """Feed publish-to-start latency into the ``queue_wait_ms`` histogram."""
+    request = getattr(task, "request", None)
+    enqueued_at = getattr(request, "enqueued_at", None)
+    if enqueued_at is None:
+        return
+    from .histograms import observe
+
+    queue = (getattr(request, "delivery_info", None) or {}).get("routing_key") or "default"
+    observe("queue_wait_ms", max(0.0, (time.time() - float(enqueued_at)) * 1000), queue=queue)
+
+
+# Open task spans by task id, closed again in task_postrun
+_task_spans: dict = {}
+
+
+@task_prerun.connect
+def start_task_span(task_id=None, task=None, **kwargs):
+    """Open the task's root span under the publisher's ``traceparent``."""
+    from .tracing import TRACEPARENT_HEADER, begin_span
+
+    request = getattr(task, "request", None)
+    _task_spans[task_id] = begin_span(
+        f"celery.task {getattr(task, 'name', 'unknown')}",
+        traceparent=getattr(request, TRACEPARENT_HEADER, None),
+        kind="consumer",
+        task_id=task_id,
+        retries=getattr(request, "retries", 0) or 0,
+    )
+
+
+@task_postrun.connect
+def end_task_span(task_id=None, state=None, **kwargs):
+    """Close the task span and export the trace it belongs to."""
+    from .tracing import end_span, flush
+
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+    span, token = entry
+    span.set_attribute("state", state)
+    if state not in (None, "SUCCESS"):
+        span.status = "error"
+    flush(end_span(span, token))
 
 
 @worker_shutdown.connect  
@@ -0,0 +1,81 @@
+"""Per-stage checkpoints for analysis tasks.
+
+``process_contract_analysis`` runs with ``task_acks_late`` and
+``task_reject_on_worker_lost``, so a retried or redelivered task re-enters
+from the top. Each completed stage writes its output to
+``<analysis_dir>/checkpoints/<stage>.json`` so the retry can skip work that
+already finished instead of re-running extraction and analysis.
+
+Checkpoints are tagged with the job id. A checkpoint from a different job is
+ignored, and so is one that cannot be read; in both cases the stage runs
+again.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .storage import analysis_dir
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIRNAME = "checkpoints"
+
+
+def checkpoints_enabled() -> bool:
+    """Check environment flag for stage checkpointing."""
+    return os.getenv("TASK_CHECKPOINTS_ENABLED", "1") == "1"
+
+
+def _checkpoint_path(analysis_id: str, stage: str) -> Path:
+    return analysis_dir(analysis_id) / CHECKPOINT_DIRNAME / f"{stage}.json"
+
+
+def save_checkpoint(analysis_id: str, job_id: str, stage: str, data: Dict[str, Any]) -> None:
+    """Persist the output of a completed stage.
+
+    The file is written to a temp path and renamed into place, so a worker
+    killed mid-write never leaves a half-written checkpoint behind.
+    """
+    if not checkpoints_enabled():
+        return
+    path = _checkpoint_path(analysis_id, stage)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "job_id": job_id,
+        "stage": stage,
+        "completed_at": datetime.now(timezone.utc).isoformat(),
+        "data": data,
+    }
+    tmp = path.with_suffix(".json.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(analysis_id: str, job_id: str, stage: str) -> Optional[Dict[str, Any]]:
+    """Return the saved output of ``stage`` for ``job_id``, if any."""
+    if not checkpoints_enabled():
+        return None
+    path = _checkpoint_path(analysis_id, stage)
+    if not path.exists():
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except Exception as exc:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {exc}")
+        return None
+    if payload.get("job_id") != job_id:
+        return None
+    return payload.get("data")
+
+
+def clear_checkpoints(analysis_id: str) -> None:
+    """Remove all checkpoints once the task has succeeded or failed for good."""
+    shutil.rmtree(analysis_dir(analysis_id) / CHECKPOINT_DIRNAME, ignore_errors=True)
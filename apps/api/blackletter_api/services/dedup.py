@@ -0,0 +1,227 @@
+"""Submission-level deduplication for contract uploads.
+
+A submission is identified by the SHA-256 of the uploaded bytes, the active
+rulepack version and the submitting org's settings that influence analysis
+output, so submissions never match across orgs. When an
+identical submission was analysed recently, the upload endpoints hand back the
+existing job/analysis instead of enqueueing the full pipeline again.
+
+The index lives in Redis next to the job hashes (``dedup:<fingerprint>``), so
+it is shared by every API worker. A submission claims its fingerprint with
+``SET NX`` before it is enqueued, so of two concurrent identical uploads only
+one runs the pipeline and the other gets the claim holder's job. Dedup is
+strictly best effort: any error while computing or reading the index is
+treated as a miss.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from typing import Any, Dict, Optional
+
+from ..models.schemas import JobState
+
+logger = logging.getLogger(__name__)
+
+DEDUP_PREFIX = "dedup:"
+DEDUP_STATS_KEY = "dedup:stats"
+
+
+def dedup_enabled() -> bool:
+    """Check environment flag for submission deduplication."""
+    return os.getenv("DEDUP_ENABLED", "1") == "1"
+
+
+def dedup_ttl_seconds() -> int:
+    return int(os.getenv("DEDUP_TTL_SECONDS", str(24 * 3600)))
+
+
+def claim_ttl_seconds() -> int:
+    """Lifetime of a claim whose submission has not been enqueued yet."""
+    return int(os.getenv("DEDUP_CLAIM_SECONDS", "300"))
+
+
+def _redis():
+    # Resolve lazily so test stubs assigned to ``tasks.redis_client`` apply.
+    from . import tasks
+
+    return tasks.redis_client
+
+
+def _dedup_key(fingerprint: str) -> str:
+    return f"{DEDUP_PREFIX}{fingerprint}"
+
+
+def current_rulepack_version() -> str:
+    try:
+        from .rulepack_loader import load_rulepack
+
+        rp = load_rulepack()
+    except Exception:
+        rp = None
+    return str(getattr(rp, "version", None) or "none")
+
+
+def current_org_settings(org_id: Optional[str] = None) -> Dict[str, Any]:
+    """Return the settings of ``org_id`` that change analysis output.
+
+    Without an org (unauthenticated uploads) the single-tenant default
+    settings row applies, as in the settings router.
+    """
+    try:
+        from ..database import SessionLocal
+        from ..models.entities import OrgSetting
+
+        with SessionLocal() as session:
+            query = session.query(OrgSetting)
+            if org_id is not None:
+                query = query.filter(OrgSetting.org_id == uuid.UUID(str(org_id)))
+            settings = query.first()
+    except Exception:
+        settings = None
+    if settings is None:
+        return {"org_id": org_id} if org_id is not None else {}
+
+    def _value(v: Any) -> Any:
+        return getattr(v, "value", v)
+
+    return {
+        "org_id": str(settings.org_id) if settings.org_id else None,
+        "llm_provider": _value(settings.llm_provider),
+        "llm_enabled": bool(settings.llm_enabled),
+        "ocr_enabled": bool(settings.ocr_enabled),
+        "compliance_mode": _value(settings.compliance_mode),
+        "evidence_window_sentences": settings.evidence_window_sentences,
+    }
+
+
+def submission_fingerprint(
+    file_sha256: str,
+    rulepack_version: Optional[str] = None,
+    org_settings: Optional[Dict[str, Any]] = None,
+    org_id: Optional[str] = None,
+) -> str:
+    """Build the dedup key for a submission.
+
+    ``rulepack_version`` and ``org_settings`` default to the live values,
+    the latter for ``org_id``. Both read storage, so async callers should
+    go through ``storage.run_io``.
+    """
+    payload = {
+        "sha256": file_sha256,
+        "rulepack_version": rulepack_version or current_rulepack_version(),
+        "settings": org_settings if org_settings is not None else current_org_settings(org_id),
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _entry(fingerprint: str) -> Optional[Dict[str, str]]:
+    raw = _redis().get(_dedup_key(fingerprint))
+    if not raw:
+        return None
+    entry = json.loads(raw)
+    return entry if entry.get("job_id") else None
+
+
+def _reusable(entry: Optional[Dict[str, str]], pending_ok: bool) -> Optional[Dict[str, str]]:
+    from .tasks import get_job
+
+    if entry is None:
+        return None
+    job = get_job(entry["job_id"])
+    if job is None:
+        # A claim whose job record is still being created
+        return dict(entry) if pending_ok else None
+    if job.status == JobState.error:
+        return None
+    return {"job_id": job.id, "analysis_id": entry.get("analysis_id") or job.analysis_id or ""}
+
+
+def find_duplicate(fingerprint: str) -> Optional[Dict[str, str]]:
+    """Return ``{"job_id", "analysis_id"}`` of a reusable prior submission.
+
+    Entries whose job no longer exists or ended in error are ignored.
+    """
+    if not dedup_enabled():
+        return None
+    try:
+        return _reusable(_entry(fingerprint), pending_ok=False)
+    except Exception as exc:
+        logger.warning(f"Dedup lookup failed, treating as miss: {exc}")
+        return None
+
+
+def claim_submission(fingerprint: str, job_id: str, analysis_id: str) -> Optional[Dict[str, str]]:
+    """Atomically claim ``fingerprint`` for a submission about to be enqueued.
+
+    Returns None when the caller holds the claim and must run the pipeline,
+    then :func:`remember_submission` or :func:`release_submission`. Otherwise
+    returns the ``{"job_id", "analysis_id"}`` of the submission holding it.
+    A claim whose job ended in error is taken over.
+    """
+    if not dedup_enabled():
+        return None
+    key = _dedup_key(fingerprint)
+    value = json.dumps({"job_id": job_id, "analysis_id": analysis_id})
+    try:
+        client = _redis()
+        if client.set(key, value, nx=True, ex=claim_ttl_seconds()):
+            return None
+        holder = _reusable(_entry(fingerprint), pending_ok=True)
+        if holder is not None:
+            return holder
+        client.set(key, value, ex=claim_ttl_seconds())
+    except Exception as exc:
+        logger.warning(f"Dedup claim failed, treating as miss: {exc}")
+    return None
+
+
+def remember_submission(fingerprint: str, job_id: str, analysis_id: str) -> None:
+    """Index a freshly enqueued submission under its fingerprint."""
+    if not dedup_enabled():
+        return
+    value = json.dumps({"job_id": job_id, "analysis_id": analysis_id})
+    try:
+        _redis().set(_dedup_key(fingerprint), value, ex=dedup_ttl_seconds())
+    except Exception as exc:
+        logger.warning(f"Could not record dedup entry for job {job_id}: {exc}")
+
+
+def release_submission(fingerprint: str, job_id: str) -> None:
+    """Drop ``job_id``'s claim on ``fingerprint`` after its enqueue failed."""
+    if not dedup_enabled():
+        return
+    try:
+        entry = _entry(fingerprint)
+        if entry is not None and entry["job_id"] == job_id:
+            _redis().delete(_dedup_key(fingerprint))
+    except Exception as exc:
+        logger.warning(f"Could not release dedup claim for job {job_id}: {exc}")
+
+
+def record_outcome(hit: bool) -> None:
+    """Count a dedup hit or miss for the admin metrics."""
+    try:
+        _redis().hincrby(DEDUP_STATS_KEY, "hits" if hit else "misses", 1)
+    except Exception:
+        pass
+
+
+def get_dedup_stats() -> Dict[str, float]:
+    """Return dedup hit/miss counters and the resulting hit rate (percent)."""
+    try:
+        data = _redis().hgetall(DEDUP_STATS_KEY) or {}
+    except Exception:
+        data = {}
+    hits = int(data.get("hits") or 0)
+    misses = int(data.get("misses") or 0)
+    total = hits + misses
+    return {
+        "dedup_hits": hits,
+        "dedup_misses": misses,
+        "dedup_hit_rate": round((hits / total) * 100, 2) if total else 0.0,
+    }
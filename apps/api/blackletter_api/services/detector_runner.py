@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
 import re
-from typing import Any, Dict, Iterable, List, Optional, Pattern
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern
 
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -13,8 +13,9 @@ from ..database import SessionLocal
 from ..models.entities import OrgSetting
 from ..models.schemas import Finding
 from .evidence import build_window
+from .lexicon_registry import CompiledLexicon, compile_domain_lexicon, get_lexicon_registry
 from .rulepack_loader import load_rulepack
-from .storage import analysis_dir
+from .storage import analysis_dir, read_artifact_json, write_json_artifact
 from .token_ledger import (
     get_token_ledger,
     should_apply_token_capping,
@@ -23,14 +24,19 @@ from .token_ledger import (
 logger = logging.getLogger(__name__)
 
 
-def _has_any(text_lc: str, terms: Iterable[str]) -> bool:
-    for t in terms:
-        if not t:
-            continue
-        # whole-word match, case-insensitive handled by pre-lowering text
-        if re.search(rf"\b{re.escape(t)}\b", text_lc):
-            return True
-    return False
+def _term_matcher(name: str, terms: List[Any]) -> CompiledLexicon:
+    """One compiled alternation for a lexicon detector's terms.
+
+    Reuses the registry's domain matcher when it was built from the same
+    terms; rulepacks served from S3 or inline lists are compiled here.
+    """
+    compiled = get_lexicon_registry().domain(name)
+    wanted = {
+        str(item.get("term", "") if isinstance(item, dict) else item).strip().lower() for item in terms
+    } - {""}
+    if compiled is not None and set(compiled.metadata) == wanted:
+        return compiled
+    return compile_domain_lexicon(name, {"terms": terms})
 
 
 def run_detectors(analysis_id: str, extraction_json_path: str) -> List[Finding]:
@@ -44,8 +50,7 @@ def run_detectors(analysis_id: str, extraction_json_path: str) -> List[Finding]:
     cap_reason = None
 
     # Load extraction data
-    with open(extraction_json_path, 'r', encoding="utf-8") as f:
-        extraction_data = json.load(f)
+    extraction_data = read_artifact_json(Path(extraction_json_path))
 
     sentences = extraction_data.get("sentences", [])
 
@@ -77,24 +82,32 @@ def run_detectors(analysis_id: str, extraction_json_path: str) -> List[Finding]:
 
             # Persist findings early and return
             a_dir = analysis_dir(analysis_id)
-            findings_path = a_dir / "findings.json"
-            with findings_path.open("w", encoding="utf-8") as f:
-                json.dump([f.model_dump() for f in findings], f, indent=2)
+            write_json_artifact(a_dir / "findings.json", [f.model_dump() for f in findings])
 
             return findings
 
-    # Load rulepack dynamically
+    # Take the active rulepack once; a hot reload mid-run does not affect
+    # this analysis
     rulepack = load_rulepack()
 
-    # Precompile regex detectors once to avoid repeated compilation
-    compiled_regexes: Dict[str, Pattern[str]] = {}
-    for det in rulepack.detectors:
-        if det.type == "regex" and det.pattern:
-            try:
-                compiled_regexes[det.id] = re.compile(det.pattern, re.IGNORECASE)
-            except re.error:
-                # Skip malformed patterns
-                continue
+    # The loader precompiles regex detectors; compile here only for
+    # rulepacks that did not come from it
+    compiled_regexes: Dict[str, Pattern[str]] = getattr(rulepack, "patterns", None) or {}
+    if not compiled_regexes:
+        for det in rulepack.detectors:
+            if det.type == "regex" and det.pattern:
+                try:
+                    compiled_regexes[det.id] = re.compile(det.pattern, re.IGNORECASE)
+                except re.error:
+                    # Skip malformed patterns
+                    continue
+
+    # Pick the compiled weak-language lexicon once for the whole document
+    language = get_lexicon_registry().language_for(sentences)
+    logger.debug("analysis %s: lexicon language %s", analysis_id, language)
+
+    # Lexicon detector id -> compiled term matcher, built on first use
+    term_matchers: Dict[str, CompiledLexicon] = {}
 
     n_sentences = 2
     try:
@@ -148,6 +161,7 @@ def run_detectors(analysis_id: str, extraction_json_path: str) -> List[Finding]:
                         new_verdict, detected, version = evaluate_weak_language(
                             original_verdict=finding.verdict,
                             window_text=finding.snippet,
+                            language=language,
                         )
                         if new_verdict != finding.verdict:
                             logger.debug(
@@ -162,12 +176,11 @@ def run_detectors(analysis_id: str, extraction_json_path: str) -> List[Finding]:
                     continue
 
                 # Fallback to direct term matching if no metadata provided
-                if lx.terms and isinstance(lx.terms[0], dict):
-                    anchors_any = [item.get("term", "") for item in lx.terms if isinstance(item, dict)]
-                else:
-                    anchors_any = [str(term) for term in lx.terms]
-
-                if _has_any(sentence_text.lower(), anchors_any):
+                matcher = term_matchers.get(detector_id)
+                if matcher is None:
+                    matcher = term_matchers[detector_id] = _term_matcher(name, lx.terms)
+                term_hits = matcher.find_terms(sentence_text)
+                if term_hits:
                     window = build_window(analysis_id, start, end, n_sentences=n_sentences)
                     snippet = window["snippet"] or sentence_text
                     page_val = window["page"] or page
@@ -182,10 +195,13 @@ def run_detectors(analysis_id: str, extraction_json_path: str) -> List[Finding]:
                         start=start_val,
                         end=end_val,
                         rationale="Lexicon term found.",
+                        category=term_hits[0]["category"],
+                        confidence=term_hits[0]["confidence"],
                     )
                     new_verdict, detected, version = evaluate_weak_language(
                         original_verdict=finding.verdict,
                         window_text=finding.snippet,
+                        language=language,
                     )
                     if new_verdict != finding.verdict:
                         logger.debug(
@@ -218,6 +234,7 @@ def run_detectors(analysis_id: str, extraction_json_path: str) -> List[Finding]:
                     new_verdict, detected, version = evaluate_weak_language(
                         original_verdict=finding.verdict,
                         window_text=finding.snippet,
+                        language=language,
                     )
                     if new_verdict != finding.verdict:
                         logger.debug(
@@ -232,8 +249,6 @@ def run_detectors(analysis_id: str, extraction_json_path: str) -> List[Finding]:
 
     # Persist findings
     a_dir = analysis_dir(analysis_id)
-    findings_path = a_dir / "findings.json"
-    with findings_path.open("w", encoding="utf-8") as f:
-        json.dump([f.model_dump() for f in findings], f, indent=2)
+    write_json_artifact(a_dir / "findings.json", [f.model_dump() for f in findings])
 
     return findings
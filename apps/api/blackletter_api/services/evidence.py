@@ -1,14 +1,50 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Optional
 from sqlalchemy.orm import Session
-import json
 import logging
+import os
+import threading
 
-from .storage import analysis_dir
+from .storage import analysis_dir, artifact_exists, artifact_version, read_artifact_json
 
 logger = logging.getLogger(__name__)
 
+# Sentences and page map per analysis, keyed on the artifact's change marker.
+# build_window runs once per finding; in compact artifact mode each miss
+# decompresses the whole extraction.json.
+_SentenceData = Tuple[List[Dict], List[Dict]]
+_windows_cache: "OrderedDict[str, Tuple[Path, Any, _SentenceData]]" = OrderedDict()
+_windows_lock = threading.Lock()
+
+
+def _cache_capacity() -> int:
+    return int(os.getenv("EVIDENCE_CACHE_ENTRIES", "32"))
+
+
+def _load_sentences(analysis_id: str) -> _SentenceData:
+    a_dir = analysis_dir(analysis_id)
+    data_path = a_dir / "sentences.json"
+    if not artifact_exists(data_path):
+        # Compact artifact mode stores sentences only in extraction.json
+        data_path = a_dir / "extraction.json"
+    version = artifact_version(data_path)
+    with _windows_lock:
+        cached = _windows_cache.get(analysis_id)
+        if cached is not None and cached[:2] == (data_path, version):
+            _windows_cache.move_to_end(analysis_id)
+            return cached[2]
+    data = read_artifact_json(data_path)
+    loaded = (data.get("sentences", []), data.get("page_map", []))
+    with _windows_lock:
+        _windows_cache[analysis_id] = (data_path, version, loaded)
+        _windows_cache.move_to_end(analysis_id)
+        while len(_windows_cache) > _cache_capacity():
+            _windows_cache.popitem(last=False)
+    return loaded
+
 
 def build_window(
     analysis_id: str,
@@ -20,7 +56,9 @@ def build_window(
     """Build an evidence window around a finding span.
 
     This implementation loads sentence and page metadata from
-    ``analysis_dir/<analysis_id>/sentences.json`` produced in Story 1.2.
+    ``analysis_dir/<analysis_id>/sentences.json`` produced in Story 1.2
+    (``extraction.json`` in compact artifact mode), read once per analysis
+    while the artifact is unchanged.
 
     Args:
         analysis_id: The analysis ID of the document being inspected.
@@ -53,16 +91,12 @@ def build_window(
     if n_sentences is None:
         n_sentences = 2
 
-    data_path = analysis_dir(analysis_id) / "sentences.json"
     try:
-        data = json.loads(data_path.read_text(encoding="utf-8"))
+        sentences, page_map = _load_sentences(analysis_id)
     except Exception:
         logger.warning("sentences.json missing for analysis %s", analysis_id)
         return {"snippet": "", "page": 0, "start": start, "end": end}
 
-    sentences: List[Dict] = data.get("sentences", [])
-    page_map: List[Dict] = data.get("page_map", [])
-
     # Find the page containing the start offset
     page_info: Optional[Dict] = next(
         (p for p in page_map if p.get("start") <= start < p.get("end")), None
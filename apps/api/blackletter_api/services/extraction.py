@@ -2,14 +2,21 @@ from __future__ import annotations
 
 import json
 import hashlib
+import logging
+import os
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 import fitz  # PyMuPDF
 from docx2python import docx2python
 from blingfire import text_to_sentences
 
+from .storage import artifact_compression_enabled, artifact_exists, write_artifact, write_json_artifact
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class PageText:
@@ -101,6 +108,195 @@ def extract_docx(path: Path) -> Dict[str, Any]:
     }
 
 
+class BaseExtractor:
+    """A warm, reusable extractor for one document format.
+
+    Instances live for the lifetime of the worker process. ``warm()`` pays
+    the one-off library/model loading cost up front and a bounded semaphore
+    caps how many documents of this format are extracted concurrently.
+    """
+
+    engine: str = "unknown"
+    suffixes: Tuple[str, ...] = ()
+    default_concurrency: int = 2
+
+    def __init__(self, max_concurrency: Optional[int] = None) -> None:
+        if max_concurrency is None:
+            max_concurrency = int(
+                os.getenv(f"EXTRACT_CONCURRENCY_{self.engine.upper()}", self.default_concurrency)
+            )
+        self.max_concurrency = max(1, max_concurrency)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._warm = False
+
+    def warm(self) -> None:
+        if not self._warm:
+            self._load()
+            self._warm = True
+
+    def extract(self, path: Path) -> Dict[str, Any]:
+        """Return ``{"pages": [...], "sentences": [...], "engine": str}``."""
+        self.warm()
+        with self._slots:
+            return self._extract(path)
+
+    def _load(self) -> None:
+        pass
+
+    def _extract(self, path: Path) -> Dict[str, Any]:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+
+def _warm_sentence_splitter() -> None:
+    # blingfire loads its sentence model on first use
+    text_to_sentences("Warm up. Done.")
+
+
+def ocr_enabled() -> bool:
+    """Check environment flag for OCR fallback on image-only PDFs."""
+    return os.getenv("OCR_ENABLED", "0") == "1"
+
+
+class OcrPdfExtractor(BaseExtractor):
+    """Tesseract OCR through PyMuPDF, for scanned PDFs without a text layer."""
+
+    engine = "ocr"
+    suffixes = (".pdf",)
+    default_concurrency = 1
+
+    def _load(self) -> None:
+        _warm_sentence_splitter()
+
+    def _extract(self, path: Path) -> Dict[str, Any]:
+        language = os.getenv("OCR_LANGUAGE", "eng")
+        pages: List[PageText] = []
+        combined_len = 0
+        with fitz.open(path) as doc:
+            for i, page in enumerate(doc):
+                textpage = page.get_textpage_ocr(language=language, dpi=300, full=True)
+                text = page.get_text("text", textpage=textpage) or ""
+                pages.append(
+                    PageText(page=i + 1, text=text, char_start=combined_len, char_end=combined_len + len(text))
+                )
+                combined_len += len(text)
+        sentences = [
+            {"page": p.page, **s} for p in pages for s in _split_sentences_with_offsets(p.text)
+        ]
+        return {"pages": [p.__dict__ for p in pages], "sentences": sentences, "engine": "pymupdf-ocr"}
+
+
+class PdfExtractor(BaseExtractor):
+    engine = "pdf"
+    suffixes = (".pdf",)
+    default_concurrency = 2
+    # Below this many characters per page the PDF is treated as image-only
+    min_chars_per_page = 16
+
+    def __init__(self, max_concurrency: Optional[int] = None, ocr: Optional[BaseExtractor] = None) -> None:
+        super().__init__(max_concurrency)
+        self.ocr = ocr
+
+    def _load(self) -> None:
+        fitz.open().close()
+        _warm_sentence_splitter()
+
+    def _extract(self, path: Path) -> Dict[str, Any]:
+        result = extract_pdf(path)
+        payload = {
+            "pages": [p.__dict__ for p in result.pages],
+            "sentences": result.sentences,
+            "engine": "pymupdf",
+        }
+        chars = sum(len(p.text.strip()) for p in result.pages)
+        if self.ocr is not None and ocr_enabled() and chars < self.min_chars_per_page * max(1, len(result.pages)):
+            try:
+                return self.ocr.extract(path)
+            except Exception as exc:
+                logger.warning(f"OCR fallback failed for {path.name}: {exc}")
+        return payload
+
+
+class DocxExtractor(BaseExtractor):
+    engine = "docx"
+    suffixes = (".docx",)
+    default_concurrency = 4
+
+    def _load(self) -> None:
+        _warm_sentence_splitter()
+
+    def _extract(self, path: Path) -> Dict[str, Any]:
+        data = extract_docx(path)
+        return {**data, "engine": "docx2python"}
+
+
+class TextExtractor(BaseExtractor):
+    engine = "text"
+    suffixes = (".txt",)
+    default_concurrency = 8
+
+    def _load(self) -> None:
+        _warm_sentence_splitter()
+
+    def _extract(self, path: Path) -> Dict[str, Any]:
+        text = path.read_text(encoding="utf-8", errors="ignore")
+        pages = [PageText(page=1, text=text, char_start=0, char_end=len(text))]
+        sentences = [{"page": 1, **s} for s in _split_sentences_with_offsets(text)]
+        return {"pages": [p.__dict__ for p in pages], "sentences": sentences, "engine": "text"}
+
+
+class ExtractorRegistry:
+    """Maps file suffixes to warm extractor instances for this process."""
+
+    def __init__(self) -> None:
+        self._by_suffix: Dict[str, BaseExtractor] = {}
+        self._lock = threading.Lock()
+
+    def register(self, extractor: BaseExtractor, replace: bool = False) -> None:
+        with self._lock:
+            for suffix in extractor.suffixes:
+                if suffix in self._by_suffix and not replace:
+                    raise ValueError(f"extractor already registered for {suffix}")
+                self._by_suffix[suffix] = extractor
+
+    def for_path(self, path: Path) -> BaseExtractor:
+        suffix = path.suffix.lower()
+        extractor = self._by_suffix.get(suffix)
+        if extractor is None:
+            raise ValueError(f"unsupported_file_type: {suffix}")
+        return extractor
+
+    def extractors(self) -> List[BaseExtractor]:
+        return list({id(e): e for e in self._by_suffix.values()}.values())
+
+    def warm_all(self) -> None:
+        for extractor in self.extractors():
+            extractor.warm()
+
+    def extract(self, path: Path) -> Dict[str, Any]:
+        return self.for_path(path).extract(path)
+
+    def extract_text(self, path: Path) -> str:
+        return "".join(p["text"] for p in self.extract(path).get("pages", []))
+
+
+_registry: Optional[ExtractorRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_extractor_registry() -> ExtractorRegistry:
+    """Get the process-wide extractor registry with the default extractors."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = ExtractorRegistry()
+                registry.register(PdfExtractor(ocr=OcrPdfExtractor()))
+                registry.register(DocxExtractor())
+                registry.register(TextExtractor())
+                _registry = registry
+    return _registry
+
+
 def run_extraction(analysis_id: str, source_file: Path, out_dir: Path) -> Path:
     """Extract text and write a normalized extraction.json artifact.
 
@@ -111,41 +307,27 @@ def run_extraction(analysis_id: str, source_file: Path, out_dir: Path) -> Path:
     - meta: {engine: str}
     """
     out_dir.mkdir(parents=True, exist_ok=True)
-    suffix = source_file.suffix.lower()
 
     text_path = out_dir / "extracted.txt"
     payload: Dict[str, Any] = {"text_path": text_path.name, "page_map": [], "sentences": [], "meta": {}}
 
     try:
-        if suffix == ".pdf":
-            pdf_result = extract_pdf(source_file)
-            # Write concatenated text from pages
-            combined_text = "".join(p.text for p in pdf_result.pages)
-            text_path.write_text(combined_text, encoding="utf-8")
-            # Build page_map as list of per-page spans
-            payload["page_map"] = [
-                {"page": p.page, "start": p.char_start, "end": p.char_end}
-                for p in pdf_result.pages
-            ]
-            payload["sentences"] = pdf_result.sentences
-            payload["meta"] = {"engine": "pymupdf"}
-        elif suffix == ".docx":
-            docx_data = extract_docx(source_file)
-            combined_text = "".join(p["text"] for p in docx_data.get("pages", []))
-            text_path.write_text(combined_text, encoding="utf-8")
-            payload["page_map"] = [
-                {"page": p["page"], "start": p["char_start"], "end": p["char_end"]}
-                for p in docx_data.get("pages", [])
-            ]
-            payload["sentences"] = docx_data.get("sentences", [])
-            payload["meta"] = {"engine": "docx2python"}
-        else:
-            raise ValueError(f"unsupported_file_type: {suffix}")
+        result = get_extractor_registry().extract(source_file)
+        pages = result.get("pages", [])
+        combined_text = "".join(p["text"] for p in pages)
+        write_artifact(text_path, combined_text)
+        # Build page_map as list of per-page spans
+        payload["page_map"] = [
+            {"page": p["page"], "start": p["char_start"], "end": p["char_end"]}
+            for p in pages
+        ]
+        payload["sentences"] = result.get("sentences", [])
+        payload["meta"] = {"engine": result.get("engine", "unknown")}
     except Exception:
         # Graceful fallback for unreadable/corrupt files to satisfy pipeline wiring
         try:
-            if not text_path.exists():
-                text_path.write_text("", encoding="utf-8")
+            if not artifact_exists(text_path):
+                write_artifact(text_path, "")
         except Exception:
             pass
         payload.setdefault("page_map", [])
@@ -159,9 +341,13 @@ def run_extraction(analysis_id: str, source_file: Path, out_dir: Path) -> Path:
             h.update(chunk)
     payload["checksum_sha256"] = h.hexdigest()
 
-    out_path = out_dir / "extraction.json"
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f)
+    out_path = write_json_artifact(out_dir / "extraction.json", payload)
+
+    # Compact artifact mode drops sentences.json: it duplicates the sentences
+    # and page map already in extraction.json, which the evidence window
+    # builder falls back to.
+    if artifact_compression_enabled():
+        return out_path
 
     # Also emit a compact sentences.json used by evidence window builder
     try:
@@ -0,0 +1,354 @@
+"""Streaming histograms for latency and usage, exposed in Prometheus format.
+
+Each process keeps one :class:`DDSketch` per metric name and label set.
+A sketch stores logarithmically spaced bucket counts, so every quantile it
+reports is within ``HISTOGRAM_RELATIVE_ACCURACY`` (default 1%) of the true
+value. Memory is bounded by the value range, not the number of samples.
+Sketches with the same accuracy merge exactly, by adding bucket counts.
+
+Tracked series:
+
+- ``http_request_duration_ms{route,method,status}``: API middleware
+- ``pipeline_stage_duration_ms{stage}``: extraction, analysis, detection, ...
+- ``job_duration_ms{task}``: whole Celery jobs; feeds the admin p95 tile
+- ``queue_wait_ms{queue}``: publish to task start
+- ``llm_tokens``: tokens per recorded LLM usage
+
+Every ``TELEMETRY_PUBLISH_SECONDS`` (default 10, ``0`` disables) a daemon
+thread writes this process's sketches to the ``telemetry:sketches`` Redis
+hash, keyed by worker. :meth:`HistogramRegistry.collect` merges the local
+sketches with every peer entry newer than ``TELEMETRY_WORKER_TTL_SECONDS``.
+So ``/metrics`` and the admin tiles show the whole fleet (API workers and
+Celery processes), whichever worker serves the request.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_KEY = "telemetry:sketches"
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+# Values at or below this are counted in the zero bucket
+MIN_INDEXABLE = 1e-9
+
+HELP = {
+    "http_request_duration_ms": "HTTP request latency in milliseconds by route, method and status.",
+    "pipeline_stage_duration_ms": "Analysis pipeline stage duration in milliseconds.",
+    "job_duration_ms": "End-to-end Celery job duration in milliseconds.",
+    "queue_wait_ms": "Time between task publish and task start in milliseconds.",
+    "llm_tokens": "Tokens consumed per recorded LLM usage.",
+}
+
+LabelSet = Tuple[Tuple[str, str], ...]
+SeriesKey = Tuple[str, LabelSet]
+
+
+def relative_accuracy() -> float:
+    return float(os.getenv("HISTOGRAM_RELATIVE_ACCURACY", "0.01"))
+
+
+class DDSketch:
+    """Quantile sketch with relative-error guarantees (DDSketch, unbounded store).
+
+    Bins past ``HISTOGRAM_MAX_BINS`` are folded into the lowest kept bin, so
+    the accuracy guarantee holds for the upper quantiles, which are the
+    ones latency tiles read.
+    """
+
+    def __init__(self, alpha: Optional[float] = None) -> None:
+        self.alpha = alpha if alpha is not None else relative_accuracy()
+        self.gamma = (1 + self.alpha) / (1 - self.alpha)
+        self._log_gamma = math.log(self.gamma)
+        self._max_bins = int(os.getenv("HISTOGRAM_MAX_BINS", "2048"))
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= MIN_INDEXABLE:
+            self.zero_count += count
+        else:
+            index = self._index(value)
+            self.bins[index] = self.bins.get(index, 0) + count
+            if len(self.bins) > self._max_bins:
+                self._collapse()
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        excess = keys[: len(keys) - self._max_bins + 1]
+        folded = sum(self.bins.pop(k) for k in excess)
+        target = keys[len(excess)]
+        self.bins[target] = self.bins.get(target, 0) + folded
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        if not math.isclose(self.alpha, other.alpha):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        while len(self.bins) > self._max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile ``q`` (0..1); 0.0 for an empty sketch."""
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return max(self.min, 0.0)
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def copy(self) -> "DDSketch":
+        return DDSketch(self.alpha).merge(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "alpha": self.alpha,
+            "bins": {str(k): v for k, v in self.bins.items()},
+            "zero": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DDSketch":
+        sketch = cls(float(data["alpha"]))
+        sketch.bins = {int(k): int(v) for k, v in data["bins"].items()}
+        sketch.zero_count = int(data["zero"])
+        sketch.count = int(data["count"])
+        sketch.sum = float(data["sum"])
+        if sketch.count:
+            sketch.min = float(data["min"])
+            sketch.max = float(data["max"])
+        return sketch
+
+
+def _series_id(key: SeriesKey) -> str:
+    name, labels = key
+    return json.dumps([name, list(labels)], separators=(",", ":"))
+
+
+def _parse_series_id(raw: str) -> SeriesKey:
+    name, labels = json.loads(raw)
+    return name, tuple((str(k), str(v)) for k, v in labels)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class HistogramRegistry:
+    """Process-local sketches keyed by metric name and labels."""
+
+    def __init__(self) -> None:
+        self._sketches: Dict[SeriesKey, DDSketch] = {}
+        self._lock = threading.Lock()
+        self._publisher: Optional[threading.Thread] = None
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                sketch = self._sketches[key] = DDSketch()
+            sketch.add(float(value))
+        if self._publisher is None:
+            self._start_publisher()
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the ``with`` block in milliseconds."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - t0) * 1000, **labels)
+
+    def snapshot(self) -> Dict[SeriesKey, DDSketch]:
+        with self._lock:
+            return {key: sketch.copy() for key, sketch in self._sketches.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sketches.clear()
+
+    # -- cross-worker merge ------------------------------------------------
+
+    @staticmethod
+    def _redis() -> Any:
+        from . import tasks
+
+        return tasks.redis_client
+
+    def publish(self, client: Any = None) -> None:
+        """Write this process's sketches to Redis for peers to merge."""
+        payload = {
+            "ts": time.time(),
+            "series": {_series_id(k): s.to_dict() for k, s in self.snapshot().items()},
+        }
+        (client or self._redis()).hset(TELEMETRY_KEY, worker_id(), json.dumps(payload))
+
+    def collect(self, client: Any = None) -> Dict[SeriesKey, DDSketch]:
+        """Local sketches merged with every live peer's published sketches."""
+        merged = self.snapshot()
+        try:
+            client = client or self._redis()
+            entries = client.hgetall(TELEMETRY_KEY) or {}
+        except Exception as exc:
+            logger.debug(f"Peer histograms unavailable: {exc}")
+            return merged
+        me = worker_id()
+        cutoff = time.time() - float(os.getenv("TELEMETRY_WORKER_TTL_SECONDS", "600"))
+        stale: List[str] = []
+        for worker, raw in entries.items():
+            worker = worker.decode("utf-8") if isinstance(worker, bytes) else worker
+            if worker == me:
+                continue
+            try:
+                payload = json.loads(raw)
+                if payload["ts"] < cutoff:
+                    stale.append(worker)
+                    continue
+                for series, data in payload["series"].items():
+                    key = _parse_series_id(series)
+                    sketch = DDSketch.from_dict(data)
+                    if key in merged:
+                        merged[key].merge(sketch)
+                    else:
+                        merged[key] = sketch
+            except (ValueError, KeyError, TypeError) as exc:
+                logger.warning(f"Skipping malformed histograms from {worker}: {exc}")
+        if stale:
+            try:
+                client.hdel(TELEMETRY_KEY, *stale)
+            except Exception:
+                pass
+        return merged
+
+    def merged(self, name: str, client: Any = None) -> DDSketch:
+        """One sketch for ``name`` across all label sets and workers."""
+        total = DDSketch()
+        for (series, _), sketch in self.collect(client).items():
+            if series == name:
+                total.merge(sketch)
+        return total
+
+    def _start_publisher(self) -> None:
+        interval = float(os.getenv("TELEMETRY_PUBLISH_SECONDS", "10"))
+        with self._lock:
+            if self._publisher is not None:
+                return
+            self._publisher = threading.Thread(
+                target=self._publish_loop, args=(interval,), name="histogram-publisher", daemon=True
+            )
+            if interval <= 0:
+                return
+        self._publisher.start()
+
+    def _publish_loop(self, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                self.publish()
+            except Exception as exc:
+                logger.debug(f"Histogram publish failed: {exc}")
+
+    def _after_fork(self) -> None:
+        # A forked child must not re-report the parent's samples, and the
+        # parent's publisher thread does not exist in the child.
+        self._lock = threading.Lock()
+        self._sketches = {}
+        self._publisher = None
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: LabelSet, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render_prometheus(sketches: Dict[SeriesKey, DDSketch]) -> str:
+    """Prometheus text exposition (0.0.4): each series as a ``summary``."""
+    by_name: Dict[str, List[Tuple[LabelSet, DDSketch]]] = {}
+    for (name, labels), sketch in sketches.items():
+        by_name.setdefault(name, []).append((labels, sketch))
+    lines: List[str] = []
+    for name in sorted(by_name):
+        lines.append(f"# HELP {name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} summary")
+        for labels, sketch in sorted(by_name[name]):
+            for q in QUANTILES:
+                lines.append(f"{name}{_labels(labels, (('quantile', str(q)),))} {sketch.quantile(q):.6g}")
+            lines.append(f"{name}_sum{_labels(labels)} {sketch.sum:.6g}")
+            lines.append(f"{name}_count{_labels(labels)} {sketch.count}")
+    return "\n".join(lines) + "\n"
+
+
+_registry: Optional[HistogramRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_histograms() -> HistogramRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = HistogramRegistry()
+    return _registry
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    get_histograms().observe(name, value, **labels)
+
+
+def timer(name: str, **labels: Any):
+    return get_histograms().timer(name, **labels)
+
+
+def _reset_after_fork() -> None:
+    if _registry is not None:
+        _registry._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
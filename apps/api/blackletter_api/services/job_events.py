@@ -0,0 +1,90 @@
+"""Job status events over Redis pub/sub.
+
+Workers publish every job transition on two channels:
+
+- ``job_events:<job_id>`` for clients following a single job (SSE endpoint)
+- ``analysis_events:<analysis_id>`` for the ``/ws/analysis/{analysis_id}``
+  WebSocket
+
+so UIs can be pushed updates instead of polling ``GET /api/jobs/{job_id}``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+JOB_CHANNEL_PREFIX = "job_events:"
+ANALYSIS_CHANNEL_PREFIX = "analysis_events:"
+TERMINAL_STATUSES = {"done", "error"}
+
+
+def job_channel(job_id: str) -> str:
+    return f"{JOB_CHANNEL_PREFIX}{job_id}"
+
+
+def analysis_channel(analysis_id: str) -> str:
+    return f"{ANALYSIS_CHANNEL_PREFIX}{analysis_id}"
+
+
+def build_job_event(
+    job_id: str,
+    status: str,
+    message: str = "",
+    analysis_id: Optional[str] = None,
+    updated_at: Optional[str] = None,
+) -> Dict[str, Any]:
+    return {
+        "type": "job_status",
+        "job_id": job_id,
+        "analysis_id": analysis_id,
+        "status": status,
+        "message": message,
+        "updated_at": updated_at or datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def is_terminal(event: Dict[str, Any]) -> bool:
+    return event.get("status") in TERMINAL_STATUSES
+
+
+async def iter_events(*channels: str, idle_timeout: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """Yield decoded events published on ``channels``.
+
+    ``None`` is yielded once the subscription is live (so callers can read a
+    snapshot without racing the first event) and again after every
+    ``idle_timeout`` seconds without a message, for keep-alives and client
+    disconnect checks.
+    """
+    from redis import asyncio as aioredis
+
+    client = aioredis.from_url(REDIS_URL, decode_responses=True)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(*channels)
+        yield None
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=idle_timeout)
+            if message is None:
+                yield None
+                continue
+            try:
+                yield json.loads(message["data"])
+            except (TypeError, ValueError):
+                logger.warning(f"Dropping malformed job event on {message.get('channel')}")
+    finally:
+        try:
+            await pubsub.unsubscribe(*channels)
+            await pubsub.aclose()
+        finally:
+            await client.aclose()
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Serialize an event as a Server-Sent Events frame."""
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
@@ -1,11 +1,27 @@
+"""Weak-language lexicons with a two-tier cache.
+
+``load_lexicon`` serves from an in-process LRU keyed by ``(language,
+version)``. On a miss it reads Redis, under keys namespaced by a global
+version counter (``lexicon_cache:<N>:<language>``), and falls back to the
+YAML on disk. ``reload_lexicons`` bumps the counter instead of deleting keys,
+so the old namespace simply stops being read. The new version is broadcast
+on the ``lexicon_cache:invalidate`` channel. Every process subscribes
+lazily, adopts the new version and evicts its local copies, so the hot path
+never calls Redis. Stale namespaces expire after
+``LEXICON_CACHE_TTL_SECONDS``, and reload removes them in batches with
+``SCAN``, never ``KEYS``.
+"""
 from __future__ import annotations
 
 import json
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 import yaml
 from redis import Redis
@@ -21,6 +37,10 @@ except Exception:  # pragma: no cover - gracefully handle missing redis
     redis_client = None
 
 CACHE_PREFIX = "lexicon_cache:"
+VERSION_KEY = f"{CACHE_PREFIX}version"
+INVALIDATE_CHANNEL = f"{CACHE_PREFIX}invalidate"
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -36,7 +56,6 @@ class Lexicon:
         return [*self.hedging, *self.discretionary, *self.vague]
 
 
-@lru_cache(maxsize=16)
 def _load_from_disk(language: str) -> Lexicon:
     """Load lexicon YAML for a given language from disk."""
     candidates = [
@@ -74,18 +93,113 @@ def _load_from_disk(language: str) -> Lexicon:
     return Lexicon(language=language)
 
 
+_local: "OrderedDict[Tuple[str, int], Lexicon]" = OrderedDict()
+_local_lock = threading.Lock()
+_version: Optional[int] = None
+_subscriber: Optional[threading.Thread] = None
+
+
+def _cache_key(language: str, version: int) -> str:
+    return f"{CACHE_PREFIX}{version}:{language}"
+
+
+def _adopt_version(version: int) -> None:
+    """Switch to ``version`` and evict local entries of any other version."""
+    global _version
+    with _local_lock:
+        # Not ``<=``: a flushed Redis restarts the counter from zero
+        if version == _version:
+            return
+        _version = version
+        for key in [k for k in _local if k[1] != version]:
+            del _local[key]
+
+
+def _remote_version() -> int:
+    try:
+        return int(redis_client.get(VERSION_KEY) or 0) if redis_client else 0
+    except Exception:
+        return 0
+
+
+def _listen_for_invalidations() -> None:
+    """Follow version bumps from other processes; resync after reconnects."""
+    while True:
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATE_CHANNEL)
+            # Bumps published while we were not subscribed are not replayed
+            _adopt_version(_remote_version())
+            for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _adopt_version(int(message["data"]))
+        except Exception as exc:
+            logger.debug(f"Lexicon invalidation listener restarting: {exc}")
+            time.sleep(1.0)
+
+
+def _current_version() -> int:
+    global _subscriber
+    if _version is None:
+        with _local_lock:
+            start = redis_client is not None and _subscriber is None
+            if start:
+                _subscriber = threading.Thread(
+                    target=_listen_for_invalidations, name="lexicon-invalidations", daemon=True
+                )
+        if start:
+            _subscriber.start()
+        _adopt_version(_remote_version())
+    return _version or 0
+
+
+def cache_version() -> int:
+    """Current lexicon cache version; changes whenever lexicons are reloaded."""
+    return _current_version()
+
+
+def _ttl_seconds() -> int:
+    return int(os.getenv("LEXICON_CACHE_TTL_SECONDS", "86400"))
+
+
+def _remember(language: str, version: int, lex: Lexicon) -> None:
+    size = int(os.getenv("LEXICON_LOCAL_CACHE_SIZE", "32"))
+    with _local_lock:
+        if version != _version:
+            return  # invalidated while loading
+        _local[(language, version)] = lex
+        _local.move_to_end((language, version))
+        while len(_local) > size:
+            _local.popitem(last=False)
+
+
 def load_lexicon(language: str = "en", force_reload: bool = False) -> Lexicon:
-    """Load lexicon, using Redis cache when available."""
-    cache_key = f"{CACHE_PREFIX}{language}"
-    if not force_reload and redis_client:
-        cached = redis_client.get(cache_key)
-        if cached:
-            data = json.loads(cached)
-            return Lexicon(**data)
+    """Load a lexicon from the local LRU, then Redis, then disk."""
+    version = _current_version()
+    key = (language, version)
+    if not force_reload:
+        with _local_lock:
+            lex = _local.get(key)
+            if lex is not None:
+                _local.move_to_end(key)
+                return lex
+        if redis_client:
+            try:
+                cached = redis_client.get(_cache_key(language, version))
+            except Exception:
+                cached = None
+            if cached:
+                lex = Lexicon(**json.loads(cached))
+                _remember(language, version, lex)
+                return lex
 
     lex = _load_from_disk(language)
     if redis_client:
-        redis_client.set(cache_key, json.dumps(lex.__dict__))
+        try:
+            redis_client.set(_cache_key(language, version), json.dumps(lex.__dict__), ex=_ttl_seconds())
+        except Exception as exc:
+            logger.debug(f"Could not cache lexicon {language}: {exc}")
+    _remember(language, version, lex)
     return lex
 
 
@@ -100,10 +214,39 @@ def list_lexicons() -> List[Dict[str, str]]:
     return lexicons
 
 
-def reload_lexicons() -> None:
-    """Clear caches to force lexicon reload."""
-    _load_from_disk.cache_clear()
-    if redis_client:
-        keys = redis_client.keys(f"{CACHE_PREFIX}*")
-        if keys:
-            redis_client.delete(*keys)
+def _purge_stale(version: int, batch: int = 500) -> int:
+    """Drop cached lexicons of older versions with incremental ``SCAN``."""
+    current = _cache_key("", version)
+    stale = [
+        key
+        for key in redis_client.scan_iter(match=f"{CACHE_PREFIX}[0-9]*", count=batch)
+        if not key.startswith(current)
+    ]
+    for i in range(0, len(stale), batch):
+        redis_client.unlink(*stale[i : i + batch])
+    return len(stale)
+
+
+def reload_lexicons() -> int:
+    """Invalidate every process's lexicon cache; returns the new version."""
+    if not redis_client:
+        version = _current_version() + 1
+    else:
+        version = int(redis_client.incr(VERSION_KEY))
+        redis_client.publish(INVALIDATE_CHANNEL, version)
+        _purge_stale(version)
+    _adopt_version(version)
+    return version
+
+
+def _reset_after_fork() -> None:
+    # The listener thread does not survive fork; the child restarts it and
+    # re-reads the version on its next load
+    global _local_lock, _subscriber, _version
+    _local_lock = threading.Lock()
+    _subscriber = None
+    _version = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,312 @@
+"""Compiled lexicon matchers and per-document language detection.
+
+Every YAML file under ``rules/lexicons`` is compiled once into a single
+alternation regex per term list. These are the per-language weak-language
+lexicons (``weak_language.yaml``, ``weak_language_<lang>.yaml``,
+``<lang>/weak_language.yaml``) and the domain term lists (legal, business,
+technical). One compiled regex replaces a ``re.search`` per term per
+evidence window; ``run_detectors`` matches lexicon detectors through
+:meth:`LexiconRegistry.domain`.
+
+Weak-language matchers are built from the :class:`Lexicon` returned by
+``load_lexicon``. When a lexicon reload hands out a new object, its matcher
+is recompiled on the next use. Domain matchers are recompiled once the
+lexicon cache version moves.
+
+:func:`detect_language` scores a sample of the extracted sentences against
+stopword lists. ``run_detectors`` calls it once per analysis to choose which
+compiled lexicon evaluates that document.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+import yaml
+
+from . import lexicon_analyzer
+from .lexicon_analyzer import Lexicon, load_lexicon
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGE = "en"
+_WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+_LANGUAGE_FILE = re.compile(r"^weak_language_([a-z]{2})$")
+# Distinct counter-anchor lists cached per compiled lexicon
+MAX_COUNTER_MATCHERS = 256
+
+# Short, high-frequency function words; enough to separate the languages
+# contracts arrive in without a model dependency
+STOPWORDS: Dict[str, frozenset] = {
+    "en": frozenset("the and of to in that is for be by with as this shall or any are on not".split()),
+    "de": frozenset("der die das und zu den von mit ist im für auf nicht des dem ein eine oder sich".split()),
+    "fr": frozenset("le la les et des du de un une est pour dans que qui par sur au aux ne pas".split()),
+    "es": frozenset("el la los las y de del que en por con para una un es se al lo como".split()),
+    "it": frozenset("il la le gli di che e per un una con del della sono non al dei nel".split()),
+    "nl": frozenset("de het een en van in is op te dat die voor met niet zijn aan door".split()),
+    "pt": frozenset("o a os as e de do da que em para com um uma por não no na se".split()),
+}
+
+
+def _alternation(terms: Iterable[str]) -> Optional[Pattern[str]]:
+    # Longest first so overlapping phrases report the most specific term
+    unique = sorted({t.strip().lower() for t in terms if t and t.strip()}, key=lambda t: (-len(t), t))
+    if not unique:
+        return None
+    return re.compile(r"\b(?:" + "|".join(re.escape(t) for t in unique) + r")\b")
+
+
+def _deep_size(obj: Any) -> int:
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k) + _deep_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(item) for item in obj)
+    return size
+
+
+@dataclass
+class CompiledLexicon:
+    """One lexicon file compiled into regex matchers."""
+
+    name: str
+    language: str
+    version: str
+    file: Optional[str]
+    terms: int
+    weak: Optional[Pattern[str]]
+    anchors: Optional[Pattern[str]] = None
+    metadata: Dict[str, Tuple[Optional[str], Optional[float]]] = field(default_factory=dict)
+    compile_ms: float = 0.0
+    memory_bytes: int = 0
+    source: Any = field(default=None, repr=False, compare=False)
+    # Rule-level counter-anchor lists compiled on first use, keyed by the list
+    _counter: Dict[Tuple[str, ...], Optional[Pattern[str]]] = field(default_factory=dict, repr=False, compare=False)
+
+    def counter_matcher(self, counter_anchors: Sequence[str]) -> Optional[Pattern[str]]:
+        """Compiled alternation for ``counter_anchors``, built once per distinct list."""
+        key = tuple(counter_anchors)
+        try:
+            return self._counter[key]
+        except KeyError:
+            pass
+        if len(self._counter) >= MAX_COUNTER_MATCHERS:
+            self._counter.clear()
+        matcher = self._counter[key] = _alternation(key)
+        return matcher
+
+    def is_weak(self, text_lc: str, counter_anchors: Optional[Sequence[str]] = None) -> bool:
+        """Weak-term hit in ``text_lc`` with no strengthening anchor present."""
+        if self.weak is None or not self.weak.search(text_lc):
+            return False
+        if self.anchors is not None and self.anchors.search(text_lc):
+            return False
+        extra = self.counter_matcher(counter_anchors) if counter_anchors else None
+        return not (extra is not None and extra.search(text_lc))
+
+    def find_terms(self, text: str) -> List[Dict[str, Any]]:
+        """Domain-term hits in ``text`` with their category and confidence."""
+        if self.weak is None:
+            return []
+        hits = []
+        for match in self.weak.finditer(text.lower()):
+            category, confidence = self.metadata.get(match.group(0), (None, None))
+            hits.append({"term": match.group(0), "category": category, "confidence": confidence, "start": match.start()})
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "language": self.language,
+            "version": self.version,
+            "file": self.file,
+            "terms": self.terms,
+            "compile_ms": round(self.compile_ms, 3),
+            "memory_bytes": self.memory_bytes,
+        }
+
+
+def compile_weak_lexicon(name: str, lexicon: Lexicon, file: Optional[str] = None) -> CompiledLexicon:
+    t0 = time.perf_counter()
+    terms = lexicon.weak_terms()
+    weak = _alternation(terms)
+    anchors = _alternation(lexicon.strengtheners)
+    compile_ms = (time.perf_counter() - t0) * 1000
+    return CompiledLexicon(
+        name=name,
+        language=lexicon.language,
+        version=lexicon.version,
+        file=file,
+        terms=len(terms) + len(lexicon.strengtheners),
+        weak=weak,
+        anchors=anchors,
+        compile_ms=compile_ms,
+        memory_bytes=sum(_deep_size(p) for p in (weak, anchors) if p is not None),
+        source=lexicon,
+    )
+
+
+def compile_domain_lexicon(name: str, data: Dict[str, Any], file: Optional[str] = None) -> CompiledLexicon:
+    t0 = time.perf_counter()
+    metadata: Dict[str, Tuple[Optional[str], Optional[float]]] = {}
+    for item in data.get("terms") or []:
+        term = item.get("term") if isinstance(item, dict) else item
+        if term:
+            meta = item if isinstance(item, dict) else {}
+            metadata.setdefault(str(term).strip().lower(), (meta.get("category"), meta.get("confidence")))
+    weak = _alternation(metadata)
+    compile_ms = (time.perf_counter() - t0) * 1000
+    return CompiledLexicon(
+        name=name,
+        language=str(data.get("language") or DEFAULT_LANGUAGE),
+        version=str(data.get("version") or data.get("lexicon_id") or "0"),
+        file=file,
+        terms=len(metadata),
+        weak=weak,
+        metadata=metadata,
+        compile_ms=compile_ms,
+        memory_bytes=_deep_size(metadata) + (_deep_size(weak) if weak is not None else 0),
+    )
+
+
+def detect_language(
+    texts: Iterable[str],
+    candidates: Optional[Iterable[str]] = None,
+    max_words: int = 2000,
+    min_hits: int = 5,
+) -> str:
+    """Most likely language of ``texts`` by stopword frequency.
+
+    Only the first ``max_words`` words are scored. Returns
+    :data:`DEFAULT_LANGUAGE` when fewer than ``min_hits`` stopwords match or
+    the winner is not among ``candidates``.
+    """
+    languages = [lang for lang in (candidates or STOPWORDS) if lang in STOPWORDS]
+    scores = dict.fromkeys(languages, 0)
+    seen = 0
+    for text in texts:
+        for word in _WORD.findall(text.lower()):
+            for lang in languages:
+                if word in STOPWORDS[lang]:
+                    scores[lang] += 1
+            seen += 1
+            if seen >= max_words:
+                break
+        if seen >= max_words:
+            break
+    if not scores:
+        return DEFAULT_LANGUAGE
+    best = max(scores, key=lambda lang: (scores[lang], lang == DEFAULT_LANGUAGE))
+    return best if scores[best] >= min_hits else DEFAULT_LANGUAGE
+
+
+class LexiconRegistry:
+    """Process-wide compiled lexicons keyed by language and by name."""
+
+    def __init__(self, lexicon_dir: Optional[Path] = None) -> None:
+        self._dir = lexicon_dir
+        self._lock = threading.Lock()
+        self._languages: Dict[str, CompiledLexicon] = {}
+        self._files: Dict[str, str] = {}
+        self._domains: Dict[str, CompiledLexicon] = {}
+        self._cache_version: Optional[int] = None
+
+    @property
+    def lexicon_dir(self) -> Path:
+        return self._dir or lexicon_analyzer.LEXICON_DIR
+
+    def _language_of(self, path: Path, data: Dict[str, Any]) -> Optional[str]:
+        if data.get("language"):
+            return str(data["language"])
+        match = _LANGUAGE_FILE.match(path.stem)
+        if match:
+            return match.group(1)
+        if path.stem == "weak_language":
+            return path.parent.name if path.parent != self.lexicon_dir else DEFAULT_LANGUAGE
+        return None
+
+    def compile_all(self) -> List[Dict[str, Any]]:
+        """(Re)compile every lexicon file; returns per-lexicon stats."""
+        version = lexicon_analyzer.cache_version()
+        languages: Dict[str, str] = {}
+        domains: Dict[str, CompiledLexicon] = {}
+        for path in sorted(self.lexicon_dir.rglob("*.yaml")):
+            try:
+                data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+            except (OSError, yaml.YAMLError) as exc:
+                logger.warning(f"Skipping lexicon {path.name}: {exc}")
+                continue
+            rel = str(path.relative_to(self.lexicon_dir))
+            if data.get("terms"):
+                name = str(data.get("name") or path.stem)
+                domains[name] = compile_domain_lexicon(name, data, rel)
+                continue
+            language = self._language_of(path, data)
+            if language:
+                languages.setdefault(language, rel)
+        compiled = {lang: compile_weak_lexicon(f"weak_language:{lang}", load_lexicon(lang), rel) for lang, rel in languages.items()}
+        with self._lock:
+            self._files = languages
+            self._languages = compiled
+            self._domains = domains
+            self._cache_version = version
+        stats = self.stats()
+        logger.info(f"Compiled {len(stats)} lexicons in {sum(s['compile_ms'] for s in stats):.1f}ms")
+        return stats
+
+    def _ensure_current(self) -> None:
+        if self._cache_version != lexicon_analyzer.cache_version():
+            self.compile_all()
+
+    def languages(self) -> List[str]:
+        """Languages with a weak-language lexicon on disk."""
+        self._ensure_current()
+        return sorted(self._files) or [DEFAULT_LANGUAGE]
+
+    def for_language(self, language: str, lexicon: Optional[Lexicon] = None) -> CompiledLexicon:
+        """Compiled weak-language matcher for ``language``.
+
+        Recompiles when ``lexicon`` (by default ``load_lexicon(language)``)
+        is not the object the cached matcher was built from.
+        """
+        lexicon = lexicon if lexicon is not None else load_lexicon(language)
+        entry = self._languages.get(language)
+        if entry is not None and entry.source is lexicon:
+            return entry
+        entry = compile_weak_lexicon(f"weak_language:{language}", lexicon, self._files.get(language))
+        with self._lock:
+            self._languages[language] = entry
+        return entry
+
+    def domain(self, name: str) -> Optional[CompiledLexicon]:
+        self._ensure_current()
+        return self._domains.get(name)
+
+    def language_for(self, sentences: Iterable[Dict[str, Any]]) -> str:
+        """Lexicon language for a document's extracted sentences."""
+        return detect_language((s.get("text", "") for s in sentences), candidates=self.languages())
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = [*self._languages.values(), *self._domains.values()]
+        return [e.stats() for e in sorted(entries, key=lambda e: e.name)]
+
+
+_registry: Optional[LexiconRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_lexicon_registry() -> LexiconRegistry:
+    """Get the process-wide lexicon registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LexiconRegistry()
+    return _registry
@@ -2,10 +2,14 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime
 from typing import Dict, Optional, Tuple
 from ..core_config_loader import load_core_config
-from ..models.entities import Metric
+from ..models.entities import Metric, MetricDailyRollup
 from ..database import engine
+from .histograms import observe
+from .metric_rollups import MetricSnapshot, apply_metric_change, ensure_daily_rollups
+from sqlalchemy import func
 from sqlalchemy.orm import sessionmaker
 
 logger = logging.getLogger(__name__)
@@ -66,6 +70,7 @@ class LLMGate:
             existing_metric = session.query(Metric).filter(
                 Metric.analysis_id == analysis_id
             ).first()
+            before = MetricSnapshot.of(existing_metric)
             
             if existing_metric:
                 # Update existing metric
@@ -80,11 +85,15 @@ class LLMGate:
                     analysis_id=analysis_id,
                     tokens_per_doc=tokens_used,
                     llm_invoked=llm_invoked,
-                    error_reason=error_reason
+                    error_reason=error_reason,
+                    created_at=datetime.utcnow(),
                 )
                 session.add(metric)
             
+            apply_metric_change(session, before, metric)
             session.commit()
+            if tokens_used:
+                observe("llm_tokens", tokens_used)
             logger.info(f"Recorded {tokens_used} tokens for analysis {analysis_id}, LLM invoked: {llm_invoked}")
             
         except Exception as e:
@@ -143,9 +152,16 @@ class LLMGate:
         """
         session = SessionLocal()
         try:
-            metrics = session.query(Metric).all()
+            # Summed over the daily rollup: one row per day, not per analysis
+            ensure_daily_rollups(session)
+            total_analyses, total_tokens, llm_invoked_count, cap_exceeded_count = session.query(
+                func.coalesce(func.sum(MetricDailyRollup.analyses), 0),
+                func.coalesce(func.sum(MetricDailyRollup.tokens_total), 0),
+                func.coalesce(func.sum(MetricDailyRollup.llm_invoked_count), 0),
+                func.coalesce(func.sum(MetricDailyRollup.cap_exceeded_count), 0),
+            ).one()
             
-            if not metrics:
+            if not total_analyses:
                 return {
                     "avg_tokens_per_doc": 0,
                     "percent_docs_invoking_llm": 0,
@@ -154,17 +170,12 @@ class LLMGate:
                     "cap_exceeded_count": 0
                 }
             
-            total_tokens = sum(m.tokens_per_doc for m in metrics)
-            total_analyses = len(metrics)
-            llm_invoked_count = sum(1 for m in metrics if m.llm_invoked)
-            cap_exceeded_count = sum(1 for m in metrics if m.error_reason == 'token_cap')
-            
             return {
                 "avg_tokens_per_doc": round(total_tokens / total_analyses, 2),
                 "percent_docs_invoking_llm": round((llm_invoked_count / total_analyses) * 100, 2),
-                "total_analyses": total_analyses,
-                "total_tokens": total_tokens,
-                "cap_exceeded_count": cap_exceeded_count,
+                "total_analyses": int(total_analyses),
+                "total_tokens": int(total_tokens),
+                "cap_exceeded_count": int(cap_exceeded_count),
                 "hard_cap_limit": self.hard_cap
             }
             
@@ -0,0 +1,158 @@
+"""Incrementally maintained daily rollup of the ``metrics`` table.
+
+Every write to a :class:`~blackletter_api.models.entities.Metric` row goes
+through :func:`apply_metric_change` in the same transaction. It adds the
+difference between the row before and after the write to that day's
+:class:`~blackletter_api.models.entities.MetricDailyRollup`. Dashboard time
+series and all-time totals then read one row per day instead of scanning
+every metric.
+
+Counters are bumped with ``UPDATE ... SET col = col + delta``, so
+concurrent workers never lose an increment. :func:`rebuild_daily_rollups`
+recomputes the table from ``metrics`` with a single ``GROUP BY``. The
+migration that creates the table backfills it the same way;
+:func:`ensure_daily_rollups` covers databases created without migrations.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+
+from ..models.entities import Metric, MetricDailyRollup
+
+logger = logging.getLogger(__name__)
+
+CAP_EXCEEDED = "token_cap"
+
+# Engines whose rollups have been reconciled with ``metrics`` in this process
+_reconciled: "weakref.WeakSet[Any]" = weakref.WeakSet()
+_reconcile_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class MetricSnapshot:
+    """The rollup-relevant fields of a metric row at one point in time."""
+
+    tokens: int = 0
+    llm_invoked: bool = False
+    cap_exceeded: bool = False
+    processing_time_ms: Optional[float] = None
+
+    @classmethod
+    def of(cls, metric: Optional[Metric]) -> Optional["MetricSnapshot"]:
+        if metric is None:
+            return None
+        return cls(
+            tokens=metric.tokens_per_doc or 0,
+            llm_invoked=bool(metric.llm_invoked),
+            cap_exceeded=metric.error_reason == CAP_EXCEEDED,
+            processing_time_ms=metric.processing_time_ms,
+        )
+
+
+def _deltas(before: Optional[MetricSnapshot], after: MetricSnapshot) -> Dict[str, Any]:
+    prev = before or MetricSnapshot()
+    # Falsy timings are not samples, matching the dashboard percentile
+    return {
+        "analyses": 0 if before is not None else 1,
+        "tokens_total": after.tokens - prev.tokens,
+        "llm_invoked_count": int(after.llm_invoked) - int(prev.llm_invoked),
+        "cap_exceeded_count": int(after.cap_exceeded) - int(prev.cap_exceeded),
+        "latency_sum_ms": (after.processing_time_ms or 0.0) - (prev.processing_time_ms or 0.0),
+        "latency_count": int(bool(after.processing_time_ms)) - int(bool(prev.processing_time_ms)),
+    }
+
+
+def apply_metric_change(session: Any, before: Optional[MetricSnapshot], metric: Metric) -> None:
+    """Fold a metric insert (``before is None``) or update into its day's rollup.
+
+    Call before ``session.commit()`` so the rollup commits with the metric.
+    """
+    deltas = {k: v for k, v in _deltas(before, MetricSnapshot.of(metric)).items() if v}
+    if not deltas:
+        return
+    day = (metric.created_at or datetime.utcnow()).date()
+    values = {getattr(MetricDailyRollup, k): getattr(MetricDailyRollup, k) + v for k, v in deltas.items()}
+    query = session.query(MetricDailyRollup).filter(MetricDailyRollup.day == day)
+    if query.update(values, synchronize_session=False):
+        return
+    try:
+        # First write of the day; a concurrent first write loses the race on
+        # the primary key and falls back to the increment.
+        with session.begin_nested():
+            session.add(MetricDailyRollup(day=day, **{**_zero_rollup(), **deltas}))
+    except IntegrityError:
+        query.update(values, synchronize_session=False)
+
+
+def _zero_rollup() -> Dict[str, Any]:
+    return {
+        "analyses": 0,
+        "tokens_total": 0,
+        "llm_invoked_count": 0,
+        "cap_exceeded_count": 0,
+        "latency_sum_ms": 0.0,
+        "latency_count": 0,
+    }
+
+
+def rebuild_daily_rollups(session: Any, since: Optional[date] = None) -> int:
+    """Recompute rollups from ``metrics`` (all days, or from ``since``); returns days written."""
+    day = func.date(Metric.created_at)
+    query = session.query(
+        day.label("day"),
+        func.count(Metric.id),
+        func.coalesce(func.sum(Metric.tokens_per_doc), 0),
+        func.sum(case((Metric.llm_invoked.is_(True), 1), else_=0)),
+        func.sum(case((Metric.error_reason == CAP_EXCEEDED, 1), else_=0)),
+        func.coalesce(func.sum(Metric.processing_time_ms), 0.0),
+        func.sum(case((Metric.processing_time_ms > 0, 1), else_=0)),
+    )
+    deleted = session.query(MetricDailyRollup)
+    if since is not None:
+        query = query.filter(Metric.created_at >= datetime.combine(since, datetime.min.time()))
+        deleted = deleted.filter(MetricDailyRollup.day >= since)
+    deleted.delete(synchronize_session=False)
+    written = 0
+    for row_day, analyses, tokens, llm, capped, latency_sum, latency_count in query.group_by(day).all():
+        session.add(
+            MetricDailyRollup(
+                day=row_day if isinstance(row_day, date) else date.fromisoformat(str(row_day)),
+                analyses=analyses,
+                tokens_total=int(tokens),
+                llm_invoked_count=int(llm or 0),
+                cap_exceeded_count=int(capped or 0),
+                latency_sum_ms=float(latency_sum),
+                latency_count=int(latency_count or 0),
+            )
+        )
+        written += 1
+    session.commit()
+    logger.info(f"Rebuilt {written} daily metric rollups")
+    return written
+
+
+def ensure_daily_rollups(session: Any) -> None:
+    """Rebuild the rollups once per process if they do not cover every metric.
+
+    Compares the rolled-up analysis count with the metric count rather than
+    checking for an empty table: the first write after deploy creates
+    today's row, which would otherwise hide older metrics for good.
+    """
+    engine = session.get_bind()
+    if engine in _reconciled:
+        return
+    with _reconcile_lock:
+        if engine in _reconciled:
+            return
+        rolled_up = session.query(func.coalesce(func.sum(MetricDailyRollup.analyses), 0)).scalar()
+        if int(rolled_up) != session.query(func.count(Metric.id)).scalar():
+            rebuild_daily_rollups(session)
+        _reconciled.add(engine)
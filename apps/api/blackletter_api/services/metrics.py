@@ -4,12 +4,16 @@ from __future__ import annotations
 import logging
 from typing import Dict, Any, List
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import func, and_
+from sqlalchemy import case, func
 from datetime import datetime, timedelta
 
-from ..models.entities import Metric, Analysis
+from ..models.entities import Metric, MetricDailyRollup
 from ..database import engine
+from ..services.histograms import get_histograms
 from ..services.llm_gate import get_llm_gate
+from ..services.metric_rollups import CAP_EXCEEDED, MetricSnapshot, apply_metric_change, ensure_daily_rollups
+from ..services.dedup import get_dedup_stats
+from ..services.warmup import get_warm_start_stats
 
 logger = logging.getLogger(__name__)
 
@@ -35,28 +39,33 @@ class MetricsService:
         """
         session = SessionLocal()
         try:
-            # Get metrics for last 30 runs
-            recent_metrics = session.query(Metric).order_by(
-                Metric.created_at.desc()
-            ).limit(30).all()
-            
-            if not recent_metrics:
-                return self._empty_metrics()
-            
-            # Basic aggregations
-            total_analyses = len(recent_metrics)
-            total_tokens = sum(m.tokens_per_doc for m in recent_metrics)
-            llm_invoked_count = sum(1 for m in recent_metrics if m.llm_invoked)
-            
-            # P95 latency (mock implementation - would need actual timing data)
-            processing_times = [m.processing_time_ms for m in recent_metrics if m.processing_time_ms]
-            p95_latency = self._calculate_percentile(processing_times, 95) if processing_times else 0
+            # Last 30 runs, aggregated in SQL
+            recent = session.query(
+                Metric.tokens_per_doc, Metric.llm_invoked, Metric.processing_time_ms, Metric.error_reason
+            ).order_by(Metric.created_at.desc()).limit(30).subquery()
+            total_analyses, total_tokens, llm_invoked_count, cap_exceeded_count = session.query(
+                func.count(),
+                func.coalesce(func.sum(recent.c.tokens_per_doc), 0),
+                func.coalesce(func.sum(case((recent.c.llm_invoked.is_(True), 1), else_=0)), 0),
+                func.coalesce(func.sum(case((recent.c.error_reason == CAP_EXCEEDED, 1), else_=0)), 0),
+            ).select_from(recent).one()
+            
+            if not total_analyses:
+                return {**self._empty_metrics(), **get_dedup_stats(), **get_warm_start_stats()}
+            
+            # Streaming job-duration sketch merged across workers; the SQL
+            # percentile only covers deployments without samples yet.
+            job_latency = get_histograms().merged("job_duration_ms")
+            if job_latency.count:
+                p95_latency = job_latency.quantile(0.95)
+            else:
+                p95_latency = self._percentile(session, recent.c.processing_time_ms, 95)
             
             # Tokens per doc
-            avg_tokens_per_doc = round(total_tokens / total_analyses, 2) if total_analyses > 0 else 0
+            avg_tokens_per_doc = round(total_tokens / total_analyses, 2)
             
             # LLM usage percentage
-            llm_usage_percent = round((llm_invoked_count / total_analyses) * 100, 2) if total_analyses > 0 else 0
+            llm_usage_percent = round((llm_invoked_count / total_analyses) * 100, 2)
             
             # Explainability rate (mock - would depend on actual implementation)
             explainability_rate = 85.5  # Placeholder
@@ -68,7 +77,9 @@ class MetricsService:
                 "explainability_rate": explainability_rate,
                 "total_analyses": total_analyses,
                 "hard_cap_limit": self.llm_gate.hard_cap,
-                "cap_exceeded_count": sum(1 for m in recent_metrics if m.error_reason == 'token_cap')
+                "cap_exceeded_count": int(cap_exceeded_count),
+                **get_dedup_stats(),
+                **get_warm_start_stats(),
             }
             
         except Exception as e:
@@ -89,52 +100,23 @@ class MetricsService:
         """
         session = SessionLocal()
         try:
-            # Get metrics from last N days
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
-            
-            metrics = session.query(Metric).filter(
-                Metric.created_at >= cutoff_date
-            ).order_by(Metric.created_at).all()
-            
-            if not metrics:
-                return {"dates": [], "tokens": [], "llm_usage": [], "latency": []}
-            
-            # Group by day
-            daily_data = {}
-            for metric in metrics:
-                day_key = metric.created_at.date().isoformat()
-                if day_key not in daily_data:
-                    daily_data[day_key] = {
-                        "tokens": [],
-                        "llm_invoked": [],
-                        "processing_times": []
-                    }
-                
-                daily_data[day_key]["tokens"].append(metric.tokens_per_doc)
-                daily_data[day_key]["llm_invoked"].append(metric.llm_invoked)
-                if metric.processing_time_ms:
-                    daily_data[day_key]["processing_times"].append(metric.processing_time_ms)
-            
-            # Aggregate daily metrics
-            dates = sorted(daily_data.keys())
-            daily_tokens = []
-            daily_llm_usage = []
-            daily_latency = []
-            
-            for date in dates:
-                data = daily_data[date]
-                
-                # Average tokens per day
-                avg_tokens = sum(data["tokens"]) / len(data["tokens"]) if data["tokens"] else 0
-                daily_tokens.append(round(avg_tokens, 2))
-                
-                # LLM usage percentage per day
-                llm_percent = (sum(data["llm_invoked"]) / len(data["llm_invoked"]) * 100) if data["llm_invoked"] else 0
-                daily_llm_usage.append(round(llm_percent, 2))
-                
-                # Average latency per day
-                avg_latency = sum(data["processing_times"]) / len(data["processing_times"]) if data["processing_times"] else 0
-                daily_latency.append(round(avg_latency, 2))
+            # One rollup row per day, maintained as metrics are written
+            ensure_daily_rollups(session)
+            cutoff_day = (datetime.utcnow() - timedelta(days=days)).date()
+            rollups = session.query(MetricDailyRollup).filter(
+                MetricDailyRollup.day >= cutoff_day
+            ).order_by(MetricDailyRollup.day).all()
+            
+            dates, daily_tokens, daily_llm_usage, daily_latency = [], [], [], []
+            for rollup in rollups:
+                if not rollup.analyses:
+                    continue
+                dates.append(rollup.day.isoformat())
+                daily_tokens.append(round(rollup.tokens_total / rollup.analyses, 2))
+                daily_llm_usage.append(round(rollup.llm_invoked_count / rollup.analyses * 100, 2))
+                daily_latency.append(
+                    round(rollup.latency_sum_ms / rollup.latency_count, 2) if rollup.latency_count else 0
+                )
             
             return {
                 "dates": dates,
@@ -169,6 +151,7 @@ class MetricsService:
             metric = session.query(Metric).filter(
                 Metric.analysis_id == analysis_id
             ).first()
+            before = MetricSnapshot.of(metric)
             
             if metric:
                 # Update existing
@@ -187,10 +170,12 @@ class MetricsService:
                     llm_invoked=llm_invoked,
                     processing_time_ms=processing_time_ms,
                     detection_count=detection_count,
-                    error_reason=error_reason
+                    error_reason=error_reason,
+                    created_at=datetime.utcnow(),
                 )
                 session.add(metric)
             
+            apply_metric_change(session, before, metric)
             session.commit()
             logger.info(f"Recorded completion metrics for analysis {analysis_id}")
             
@@ -200,21 +185,28 @@ class MetricsService:
         finally:
             session.close()
     
-    def _calculate_percentile(self, values: List[float], percentile: int) -> float:
-        """Calculate the specified percentile of a list of values."""
-        if not values:
-            return 0.0
-            
-        sorted_values = sorted(values)
-        index = (percentile / 100.0) * (len(sorted_values) - 1)
+    def _percentile(self, session, column, percentile: int) -> float:
+        """Linear-interpolated percentile of the non-zero values of ``column``.
         
-        if index.is_integer():
-            return sorted_values[int(index)]
-        else:
-            lower_index = int(index)
-            upper_index = lower_index + 1
-            weight = index - lower_index
-            return sorted_values[lower_index] * (1 - weight) + sorted_values[upper_index] * weight
+        A window query ranks the values in SQL and returns only the (at most
+        two) rows around the percentile position.
+        """
+        ranked = session.query(
+            column.label("value"),
+            func.row_number().over(order_by=column).label("rank"),
+            func.count().over().label("n"),
+        ).filter(column != 0).subquery()
+        lower_rank = (percentile * (ranked.c.n - 1)) // 100 + 1
+        rows = session.query(ranked.c.value, ranked.c.rank, ranked.c.n).filter(
+            ranked.c.rank >= lower_rank, ranked.c.rank <= lower_rank + 1
+        ).order_by(ranked.c.rank).all()
+        if not rows:
+            return 0.0
+        index = (percentile / 100.0) * (rows[0].n - 1)
+        weight = index - int(index)
+        if len(rows) == 1 or not weight:
+            return float(rows[0].value)
+        return rows[0].value * (1 - weight) + rows[1].value * weight
     
     def _empty_metrics(self) -> Dict[str, Any]:
         """Return empty metrics structure."""
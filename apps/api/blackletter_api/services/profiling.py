@@ -0,0 +1,189 @@
+"""On-demand sampling profiles of single API requests.
+
+A request is profiled when it carries a valid token in the
+``X-Profile-Token`` header or the ``__profile`` query parameter. Tokens
+are ``<expiry>.<hmac>``, signed with ``PROFILING_SECRET`` (falling back to
+``SECRET_KEY``) and minted by admins through ``POST /api/admin/profiles/token``.
+With no secret configured, profiling is disabled. Requests without a token
+pay for one header lookup and one query lookup.
+
+While a profiled request runs, a sampler thread reads every thread's stack
+every ``PROFILE_SAMPLE_INTERVAL_MS`` (default 5). Only stacks running inside
+the request's ``contextvars`` context are kept: its event-loop callbacks, the
+threadpool running sync handlers, and ``storage.run_io`` calls. Concurrent
+requests on the same worker do not pollute the profile.
+
+Profiles are written in folded-stack format (``frame;frame;frame count``),
+which flamegraph.pl, speedscope and inferno read directly. They go to
+``DATA_ROOT/profiles/<id>.folded``, and only the newest
+``PROFILE_MAX_FILES`` are kept.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import Context, ContextVar
+from pathlib import Path
+from types import FrameType
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from . import storage
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_QUERY = "__profile"
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+# Frames whose locals carry the context they run in: asyncio Handle._run,
+# the anyio worker loop and storage._run_in_context.
+_CONTEXT_FRAMES = {"_run", "run", "_run_in_context"}
+
+_active: ContextVar[Optional["ProfileSession"]] = ContextVar("active_profile", default=None)
+
+
+def _secret() -> Optional[bytes]:
+    secret = os.getenv("PROFILING_SECRET") or os.getenv("SECRET_KEY")
+    return secret.encode("utf-8") if secret else None
+
+
+def _signature(secret: bytes, expires: int) -> str:
+    return hmac.new(secret, f"profile:{expires}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def sign_profile_token(ttl_seconds: int = 300, now: Optional[float] = None) -> str:
+    """Mint a token that enables profiling until ``now + ttl_seconds``."""
+    secret = _secret()
+    if secret is None:
+        raise RuntimeError("Profiling requires PROFILING_SECRET or SECRET_KEY")
+    expires = int((now or time.time()) + ttl_seconds)
+    return f"{expires}.{_signature(secret, expires)}"
+
+
+def verify_profile_token(token: Optional[str], now: Optional[float] = None) -> bool:
+    secret = _secret()
+    if not token or secret is None:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < (now or time.time()):
+        return False
+    return hmac.compare_digest(signature, _signature(secret, int(expires)))
+
+
+def profiles_dir() -> Path:
+    return storage.DATA_ROOT / "profiles"
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class ProfileSession:
+    """Samples the stacks that run in one request's context."""
+
+    def __init__(self, label: str, interval_ms: Optional[float] = None) -> None:
+        self.id = uuid4().hex
+        self.label = label
+        self.interval = (interval_ms or float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))) / 1000
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, name=f"profiler-{self.id[:8]}", daemon=True)
+        self._started = 0.0
+        self.duration_ms = 0.0
+
+    def _owns(self, frame: Optional[FrameType]) -> bool:
+        while frame is not None:
+            if frame.f_code.co_name in _CONTEXT_FRAMES:
+                local_vars = frame.f_locals
+                context = local_vars.get("context")
+                if context is None:
+                    context = getattr(local_vars.get("self"), "_context", None)
+                if isinstance(context, Context) and context.get(_active) is self:
+                    return True
+            frame = frame.f_back
+        return False
+
+    def sample(self) -> None:
+        me = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me or not self._owns(frame):
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.debug(f"Profile sample failed: {exc}")
+
+    def start(self) -> object:
+        """Activate the session in the current context; returns a reset token."""
+        token = _active.set(self)
+        self._started = time.perf_counter()
+        self._thread.start()
+        return token
+
+    def stop(self, token: object) -> None:
+        """Stop sampling and deactivate; call from the context that started it."""
+        self._stop.set()
+        self._thread.join()
+        _active.reset(token)
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
+
+    def save(self) -> Path:
+        out_dir = profiles_dir()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"{self.id}.folded"
+        header = (
+            f"# request: {self.label}\n"
+            f"# duration_ms: {self.duration_ms:.1f}\n"
+            f"# interval_ms: {self.interval * 1000:g}\n"
+            f"# samples: {sum(self.samples.values())}\n"
+        )
+        storage.write_artifact(path, header + self.folded())
+        _prune(out_dir)
+        logger.info(f"Saved profile {self.id} for {self.label} ({self.duration_ms:.0f}ms)")
+        return path
+
+
+def _prune(out_dir: Path) -> None:
+    keep = int(os.getenv("PROFILE_MAX_FILES", "50"))
+    files = sorted(out_dir.glob("*.folded*"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in files[keep:]:
+        stale.unlink(missing_ok=True)
+
+
+def load_profile(profile_id: str) -> Optional[str]:
+    """Folded-stack text of a saved profile, or None if unknown."""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = profiles_dir() / f"{profile_id}.folded"
+    if not storage.artifact_exists(path):
+        return None
+    return storage.read_artifact(path).decode("utf-8")
+
+
+def list_profiles() -> List[Dict[str, object]]:
+    out_dir = profiles_dir()
+    if not out_dir.exists():
+        return []
+    entries = []
+    for path in sorted(out_dir.glob("*.folded*"), key=lambda p: p.stat().st_mtime, reverse=True):
+        entries.append({"id": path.name.split(".", 1)[0], "size": path.stat().st_size, "created_at": path.stat().st_mtime})
+    return entries
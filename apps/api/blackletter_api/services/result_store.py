@@ -0,0 +1,198 @@
+"""Persistent, compact store for analysis results.
+
+Findings, coverage and verdict counts produced by the analysis pipeline are
+kept in one ``analysis_results`` row per analysis, keyed by ``analysis_id``
+and indexed by ``org_id``. Reading one analysis's findings is a primary key
+lookup plus a single decode.
+
+Findings are stored column-wise rather than as a list of dicts, so each field
+name appears once per analysis instead of once per finding. String columns
+with repeated values (verdicts, rule ids, categories) are dictionary encoded.
+The payload is msgpack. If msgpack is not installed, it falls back to
+zlib-compressed JSON.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.entities import Analysis, AnalysisResult
+from ..models.schemas import Coverage, Finding, VerdictCounts
+from .catalogue import update_verdicts
+
+try:  # pragma: no cover - optional dependency
+    import msgpack
+except ImportError:  # pragma: no cover - handled at runtime
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+FINDING_FIELDS = list(Finding.model_fields)
+
+
+def _encode_column(values: List[Any]) -> Any:
+    if values and all(isinstance(v, str) for v in values):
+        vocab = list(dict.fromkeys(values))
+        if len(vocab) * 2 <= len(values):
+            index = {v: i for i, v in enumerate(vocab)}
+            return {"dict": vocab, "codes": [index[v] for v in values]}
+    return values
+
+
+def _decode_column(column: Any) -> List[Any]:
+    if isinstance(column, dict):
+        vocab = column["dict"]
+        return [vocab[c] for c in column["codes"]]
+    return column
+
+
+def encode_findings(findings: Iterable[Finding]) -> Dict[str, Any]:
+    """Turn findings into a column-per-field mapping."""
+    rows = [f.model_dump() for f in findings]
+    return {
+        "n": len(rows),
+        "columns": {name: _encode_column([r[name] for r in rows]) for name in FINDING_FIELDS},
+    }
+
+
+def decode_findings(block: Dict[str, Any]) -> List[Finding]:
+    n = block.get("n", 0)
+    columns = {name: _decode_column(col) for name, col in block.get("columns", {}).items()}
+    return [Finding(**{name: col[i] for name, col in columns.items()}) for i in range(n)]
+
+
+def _pack(obj: Dict[str, Any]) -> tuple[bytes, str]:
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True), "msgpack"
+    return zlib.compress(json.dumps(obj, separators=(",", ":")).encode("utf-8")), "json+zlib"
+
+
+def _unpack(payload: bytes, encoding: str) -> Dict[str, Any]:
+    if encoding == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("msgpack is required to read this analysis result")
+        return msgpack.unpackb(payload, raw=False)
+    if encoding == "json+zlib":
+        return json.loads(zlib.decompress(payload).decode("utf-8"))
+    raise ValueError(f"Unknown result encoding '{encoding}'")
+
+
+def count_verdicts(findings: Iterable[Finding]) -> VerdictCounts:
+    counts = VerdictCounts()
+    for f in findings:
+        attr = f"{f.verdict}_count"
+        setattr(counts, attr, getattr(counts, attr) + 1)
+    return counts
+
+
+def _session(db: Optional[Session]) -> tuple[Session, bool]:
+    if db is None:
+        return SessionLocal(), True
+    return db, False
+
+
+def _analysis_org_id(db: Session, analysis_id: str) -> Optional[str]:
+    try:
+        row = db.get(Analysis, uuid.UUID(analysis_id))
+    except Exception:
+        return None
+    return row.org_id if row is not None else None
+
+
+def save_results(
+    analysis_id: str,
+    findings: List[Finding],
+    coverage: Coverage,
+    org_id: Optional[str] = None,
+    db: Optional[Session] = None,
+) -> AnalysisResult:
+    """Persist (or replace) the results of an analysis."""
+    verdicts = count_verdicts(findings)
+    payload, encoding = _pack(
+        {
+            "v": FORMAT_VERSION,
+            "findings": encode_findings(findings),
+            "coverage": coverage.model_dump(),
+            "verdicts": verdicts.model_dump(),
+        }
+    )
+    db, owns = _session(db)
+    try:
+        row = db.get(AnalysisResult, analysis_id) or AnalysisResult(analysis_id=analysis_id)
+        row.org_id = org_id or row.org_id or _analysis_org_id(db, analysis_id)
+        row.encoding = encoding
+        row.payload = payload
+        row.size_bytes = len(payload)
+        row.finding_count = len(findings)
+        row.pass_count = verdicts.pass_count
+        row.weak_count = verdicts.weak_count
+        row.missing_count = verdicts.missing_count
+        row.needs_review_count = verdicts.needs_review_count
+        row.coverage_percentage = coverage.percentage
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+        update_verdicts(analysis_id, verdicts, db=db)
+        return row
+    finally:
+        if owns:
+            db.close()
+
+
+def load_results(analysis_id: str, db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
+    """Return ``findings``, ``coverage``, ``verdicts`` and ``size_bytes`` for an analysis."""
+    db, owns = _session(db)
+    try:
+        row = db.get(AnalysisResult, analysis_id)
+        if row is None:
+            return None
+        data = _unpack(row.payload, row.encoding)
+        return {
+            "analysis_id": row.analysis_id,
+            "org_id": row.org_id,
+            "findings": decode_findings(data["findings"]),
+            "coverage": Coverage(**data["coverage"]),
+            "verdicts": VerdictCounts(**data["verdicts"]),
+            "size_bytes": row.size_bytes,
+        }
+    finally:
+        if owns:
+            db.close()
+
+
+def list_results_for_org(org_id: str, limit: int = 50, db: Optional[Session] = None) -> List[Dict[str, Any]]:
+    """Summaries (no payload decode) of the most recent results for an org."""
+    db, owns = _session(db)
+    try:
+        rows = (
+            db.query(AnalysisResult)
+            .filter(AnalysisResult.org_id == org_id)
+            .order_by(AnalysisResult.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+        return [
+            {
+                "analysis_id": r.analysis_id,
+                "finding_count": r.finding_count,
+                "size_bytes": r.size_bytes,
+                "coverage_percentage": r.coverage_percentage,
+                "verdicts": VerdictCounts(
+                    pass_count=r.pass_count,
+                    weak_count=r.weak_count,
+                    missing_count=r.missing_count,
+                    needs_review_count=r.needs_review_count,
+                ),
+            }
+            for r in rows
+        ]
+    finally:
+        if owns:
+            db.close()
@@ -0,0 +1,184 @@
+"""Retention-policy garbage collector for analyses.
+
+``OrgSetting.retention_policy`` sets how long an org's analyses are kept. The
+``cleanup_task`` maintenance job calls :func:`run_retention_gc`, which deletes
+analyses older than their org's cutoff. For each expired analysis it removes:
+
+- the ``DATA_ROOT/analyses/<id>`` directory
+- its blob references
+- its rows in the artifact, result, catalogue and report tables
+
+Expired analyses are found through the ``created_at`` indexes on
+``analysis_catalog`` and ``analyses`` and walked with a keyset, so a run never
+scans the data directory. Work is done in batches of
+``RETENTION_GC_BATCH_SIZE``, committed one at a time. A run stops after
+``RETENTION_GC_MAX_BATCHES`` and reports ``complete=False`` so the next run
+picks up the rest.
+
+Analyses without an org follow the first org's policy, as in
+:func:`blob_store.apply_retention`.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.entities import (
+    Analysis,
+    AnalysisCatalogEntry,
+    AnalysisResult,
+    EvidenceArtifact,
+    ExtractionArtifact,
+    Finding,
+    Report,
+)
+from . import blob_store, storage
+from .token_ledger import get_token_ledger
+
+logger = logging.getLogger(__name__)
+
+
+def _session(db: Optional[Session]) -> Tuple[Session, bool]:
+    if db is None:
+        return SessionLocal(), True
+    return db, False
+
+
+def batch_size() -> int:
+    return max(1, int(os.getenv("RETENTION_GC_BATCH_SIZE", "200")))
+
+
+def max_batches() -> int:
+    return max(1, int(os.getenv("RETENTION_GC_MAX_BATCHES", "50")))
+
+
+def _dir_size(path: Path) -> int:
+    if not path.is_dir():
+        return 0
+    total = 0
+    for p in path.rglob("*"):
+        try:
+            if p.is_file() and not p.is_symlink():
+                total += p.stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+def _as_uuid(value: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _expired_batches(
+    db: Session,
+    model: Any,
+    id_col: Any,
+    org_filter: Any,
+    cutoff: datetime,
+    limit: int,
+) -> Iterator[List[str]]:
+    """Yield batches of expired analysis ids in ``(created_at, id)`` order."""
+    created_col = model.created_at
+    after: Optional[Tuple[datetime, Any]] = None
+    while True:
+        query = db.query(created_col, id_col).filter(org_filter, created_col <= cutoff)
+        if after is not None:
+            query = query.filter(
+                or_(created_col > after[0], and_(created_col == after[0], id_col > after[1]))
+            )
+        rows = query.order_by(created_col, id_col).limit(limit).all()
+        if not rows:
+            return
+        after = (rows[-1][0], rows[-1][1])
+        yield [str(r[1]) for r in rows]
+        if len(rows) < limit:
+            return
+
+
+def purge_analyses(analysis_ids: List[str], db: Session) -> Dict[str, int]:
+    """Delete the given analyses' blob references, table rows and directories."""
+    bytes_reclaimed = sum(_dir_size(storage.analysis_path(a)) for a in analysis_ids)
+    for analysis_id in analysis_ids:
+        blob_store.release_analysis(analysis_id, db=db)
+
+    uuids = [u for u in (_as_uuid(a) for a in analysis_ids) if u is not None]
+    rows = 0
+    for model in (ExtractionArtifact, EvidenceArtifact, Finding):
+        if uuids:
+            rows += db.query(model).filter(model.analysis_id.in_(uuids)).delete(synchronize_session=False)
+    for model in (AnalysisResult, AnalysisCatalogEntry, Report):
+        rows += db.query(model).filter(model.analysis_id.in_(analysis_ids)).delete(synchronize_session=False)
+    if uuids:
+        rows += db.query(Analysis).filter(Analysis.id.in_(uuids)).delete(synchronize_session=False)
+    db.commit()
+
+    ledger = get_token_ledger()
+    for analysis_id in analysis_ids:
+        # Keeps the ledger's running totals in step with what is on disk
+        ledger.reset_usage(analysis_id)
+        shutil.rmtree(storage.analysis_path(analysis_id), ignore_errors=True)
+    return {"rows_deleted": rows, "bytes_reclaimed": bytes_reclaimed}
+
+
+def run_retention_gc(
+    now: Optional[datetime] = None,
+    db: Optional[Session] = None,
+    limit: Optional[int] = None,
+    batches: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Delete analyses past their org's retention policy and report the work done."""
+    t0 = time.perf_counter()
+    now = now or datetime.utcnow()
+    limit = limit or batch_size()
+    batches = batches or max_batches()
+    report: Dict[str, Any] = {
+        "analyses_deleted": 0,
+        "rows_deleted": 0,
+        "bytes_reclaimed": 0,
+        "blobs_deleted": 0,
+        "batches": 0,
+        "complete": True,
+    }
+    db, owns = _session(db)
+    try:
+        cutoffs, default = blob_store.retention_cutoffs(db, now)
+        scopes = [(org_id, cutoff) for org_id, cutoff in cutoffs.items()]
+        if default is not None:
+            scopes.append((None, default))
+        sources = ((AnalysisCatalogEntry, AnalysisCatalogEntry.analysis_id), (Analysis, Analysis.id))
+
+        for model, id_col in sources:
+            for org_id, cutoff in scopes:
+                org_filter = model.org_id.is_(None) if org_id is None else model.org_id == org_id
+                for ids in _expired_batches(db, model, id_col, org_filter, cutoff, limit):
+                    if report["batches"] >= batches:
+                        report["complete"] = False
+                        break
+                    result = purge_analyses(ids, db)
+                    report["batches"] += 1
+                    report["analyses_deleted"] += len(ids)
+                    report["rows_deleted"] += result["rows_deleted"]
+                    report["bytes_reclaimed"] += result["bytes_reclaimed"]
+
+        gc = blob_store.collect_garbage(now=now, db=db)
+        report["blobs_deleted"] = gc["blobs_deleted"]
+        report["bytes_reclaimed"] += gc["bytes_freed"]
+    finally:
+        if owns:
+            db.close()
+    report["runtime_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    logger.info(f"Retention GC: {report}")
+    return report
@@ -1,11 +1,32 @@
+"""Rulepack loading with background hot reload.
+
+The process-wide :class:`RulepackLoader` (see :func:`get_rulepack_loader`)
+holds one compiled :class:`Rulepack`. A daemon thread checks a fingerprint
+every ``RULEPACK_POLL_SECONDS`` (default 5; 0 disables). The fingerprint is
+the S3 ETags when S3 is configured, otherwise file mtimes and sizes under
+the rules directory. When it changes, the new rulepack is parsed and its
+regex detectors compiled off the request path. The result is swapped in with
+a single reference assignment. Callers keep the object they got from
+:func:`load_rulepack`, so an analysis already running finishes on the
+version it started with. A rulepack that fails to load leaves the previous
+one active.
+"""
 from __future__ import annotations
 
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Pattern
 import yaml
 import os
 
+logger = logging.getLogger(__name__)
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 RULES_DIR = BASE_DIR / "rules"
 
@@ -20,6 +41,7 @@ class DetectorSpec:
     type: str
     description: Optional[str] = None
     lexicon: Optional[str] = None
+    pattern: Optional[str] = None
 
 
 @dataclass
@@ -34,6 +56,11 @@ class Rulepack:
     version: str
     detectors: List[DetectorSpec] = field(default_factory=list)
     lexicons: Dict[str, Lexicon] = field(default_factory=dict)
+    # Set by RulepackLoader.compile(); never mutated once published
+    patterns: Dict[str, Pattern[str]] = field(default_factory=dict)
+    compile_ms: float = 0.0
+    fingerprint: str = ""
+    loaded_at: Optional[float] = None
 
 
 def _load_yaml_file(p: Path) -> Dict[str, Any]:
@@ -42,7 +69,11 @@ def _load_yaml_file(p: Path) -> Dict[str, Any]:
 
 
 class S3CompatibleStorage:
-    """S3-compatible storage handler for rulepacks."""
+    """S3-compatible storage handler for rulepacks.
+
+    Uses the shared pooled client from ``s3_client``. Rulepack reads are
+    conditional GETs, so an unchanged object costs a 304 and no re-parse.
+    """
 
     def __init__(self, endpoint_url: str = None, access_key: str = None, secret_key: str = None, bucket: str = None):
         self.endpoint_url = endpoint_url or os.getenv("S3_ENDPOINT_URL")
@@ -50,6 +81,20 @@ class S3CompatibleStorage:
         self.secret_key = secret_key or os.getenv("S3_SECRET_KEY")
         self.bucket = bucket or os.getenv("S3_BUCKET")
         self.enabled = bool(self.endpoint_url and self.access_key and self.secret_key and self.bucket)
+        # Parsed YAML for the current ETag of each key, least recently used first
+        self._parsed: "OrderedDict[str, tuple]" = OrderedDict()
+        self._parsed_capacity = int(os.getenv("RULEPACK_PARSED_CACHE_ENTRIES", "32"))
+
+    @property
+    def client(self):
+        from .s3_client import get_s3_client
+
+        return get_s3_client(
+            bucket=self.bucket,
+            endpoint_url=self.endpoint_url,
+            access_key=self.access_key,
+            secret_key=self.secret_key,
+        )
 
     def get_rulepack(self, rulepack_file: str) -> Optional[Dict[str, Any]]:
         """Get rulepack from S3-compatible storage."""
@@ -57,23 +102,36 @@ class S3CompatibleStorage:
             return None
 
         try:
-            # Import boto3 only when needed to avoid dependency issues
-            import boto3
-
-            s3 = boto3.client(
-                's3',
-                endpoint_url=self.endpoint_url,
-                aws_access_key_id=self.access_key,
-                aws_secret_access_key=self.secret_key,
-            )
-
-            # Download the file content
-            response = s3.get_object(Bucket=self.bucket, Key=rulepack_file)
-            content = response['Body'].read().decode('utf-8')
-            return yaml.safe_load(content) or {}
+            obj = self.client.get_cached(rulepack_file)
+            cached = self._parsed.get(rulepack_file)
+            if cached is not None and cached[0] == obj.etag:
+                self._parsed.move_to_end(rulepack_file)
+                return cached[1]
+            data = yaml.safe_load(obj.body.decode('utf-8')) or {}
+            self._parsed[rulepack_file] = (obj.etag, data)
+            self._parsed.move_to_end(rulepack_file)
+            while len(self._parsed) > self._parsed_capacity:
+                self._parsed.popitem(last=False)
+            return data
         except Exception as e:
             # Log error but don't fail - fallback to filesystem
-            print(f"Warning: Failed to load rulepack from S3: {e}")
+            logger.warning(f"Failed to load rulepack from S3: {e}")
+            return None
+
+    def list_keys(self, prefix: str) -> List[str]:
+        """List object keys under ``prefix`` (all pages)."""
+        if not self.enabled:
+            return []
+        return self.client.list_keys(prefix)
+
+    def get_etag(self, key: str) -> Optional[str]:
+        """ETag of ``key`` without downloading it; None if unavailable."""
+        if not self.enabled:
+            return None
+        try:
+            return self.client.etag(key)
+        except Exception as e:
+            logger.warning(f"Failed to HEAD {key} on S3: {e}")
             return None
 
 
@@ -89,6 +147,7 @@ def api_rules_summary() -> Dict[str, Any]:
             {
                 "id": rp.name,
                 "version": rp.version,
+                "compile_ms": rp.compile_ms,
                 "hedging": total_terms,
                 "discretionary": 0,
                 "vague": 0,
@@ -107,11 +166,18 @@ class RulepackLoader:
         self.s3_storage = s3_storage or S3CompatibleStorage()
         self._cache: Optional[Rulepack] = None
         self._version_cache: Dict[str, List[Rulepack]] = {}
+        self._refresh_lock = threading.Lock()
+        self._failed_fingerprint: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._watcher: Optional[threading.Thread] = None
 
     def load(self) -> Rulepack:
         if self._cache:
             return self._cache
+        self._cache = self._parse()
+        return self._cache
 
+    def _parse(self) -> Rulepack:
         # Try to load from S3 first if enabled
         data = None
         if self.s3_storage.enabled:
@@ -172,6 +238,7 @@ class RulepackLoader:
                     type=d.get("type", "lexicon"),
                     description=d.get("description"),
                     lexicon=(d.get("lexicon") or "").rsplit(".", 1)[0] or None,
+                    pattern=d.get("pattern"),
                 )
                 for d in data.get("detectors", [])
             ]
@@ -215,9 +282,100 @@ class RulepackLoader:
                 detectors=detectors,
                 lexicons=lexicons,
             )
-        self._cache = rp
         return rp
 
+    # -- hot reload --------------------------------------------------------
+
+    def fingerprint(self) -> str:
+        """Cheap marker that changes whenever the rulepack sources change."""
+        parts: List[str] = []
+        if self.s3_storage.enabled:
+            parts.append(f"s3:{self.s3_storage.get_etag(self.rulepack_file)}")
+            for key in sorted(self.s3_storage.list_keys("lexicons/")):
+                parts.append(f"{key}:{self.s3_storage.get_etag(key)}")
+        for path in [self.rules_dir / self.rulepack_file, *sorted((self.rules_dir / "lexicons").glob("*.yaml"))]:
+            try:
+                st = path.stat()
+                parts.append(f"{path.name}:{st.st_mtime_ns}:{st.st_size}")
+            except OSError:
+                parts.append(f"{path.name}:missing")
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+    def compile(self) -> Rulepack:
+        """Parse the current sources into a new, fully compiled rulepack."""
+        t0 = time.perf_counter()
+        # Taken first: an edit during parsing triggers one more reload
+        fingerprint = self.fingerprint()
+        rp = self._parse()
+        for det in rp.detectors:
+            if det.type == "regex" and det.pattern:
+                try:
+                    rp.patterns[det.id] = re.compile(det.pattern, re.IGNORECASE)
+                except re.error as e:
+                    logger.warning(f"Skipping malformed pattern for detector {det.id}: {e}")
+        rp.compile_ms = round((time.perf_counter() - t0) * 1000, 2)
+        rp.fingerprint = fingerprint
+        rp.loaded_at = time.time()
+        return rp
+
+    def refresh(self, force: bool = False) -> bool:
+        """Recompile and swap in the rulepack if its sources changed."""
+        with self._refresh_lock:
+            fingerprint = self.fingerprint()
+            active = self._cache
+            if not force and active is not None and active.fingerprint == fingerprint:
+                return False
+            if not force and fingerprint == self._failed_fingerprint:
+                return False
+            try:
+                rp = self.compile()
+            except (RulepackError, OSError, yaml.YAMLError) as e:
+                self._failed_fingerprint = fingerprint
+                self.last_error = str(e)
+                logger.warning(f"Rulepack reload failed, keeping {getattr(active, 'version', 'none')}: {e}")
+                return False
+            self._failed_fingerprint = None
+            self.last_error = None
+            self._cache = rp  # atomic swap; holders of the old object keep it
+            logger.info(f"Activated rulepack {rp.name} {rp.version} (compiled in {rp.compile_ms}ms)")
+            return True
+
+    def current(self) -> Rulepack:
+        """The active compiled rulepack, loading it on first use."""
+        self.start_watcher()
+        rp = self._cache
+        if rp is None:
+            self.refresh()
+            rp = self._cache
+            if rp is None:
+                raise RulepackError(self.last_error or "rulepack not loaded")
+        return rp
+
+    def start_watcher(self) -> None:
+        interval = float(os.getenv("RULEPACK_POLL_SECONDS", "5"))
+        if self._watcher is not None or interval <= 0:
+            return
+        with self._refresh_lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(
+                target=self._watch, args=(interval,), name="rulepack-watcher", daemon=True
+            )
+        self._watcher.start()
+
+    def _watch(self, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Rulepack watch failed: {e}")
+
+    def _after_fork(self) -> None:
+        # The watcher thread does not survive fork; restart it on next use
+        self._refresh_lock = threading.Lock()
+        self._watcher = None
+
     def list_available_versions(self, pack_id: str) -> List[str]:
         """
         List all available versions of a rulepack.
@@ -242,32 +400,16 @@ class RulepackLoader:
         # If S3 is enabled, also check there
         if self.s3_storage.enabled:
             try:
-                import boto3
-                s3 = boto3.client(
-                    's3',
-                    endpoint_url=self.s3_storage.endpoint_url,
-                    aws_access_key_id=self.s3_storage.access_key,
-                    aws_secret_access_key=self.s3_storage.secret_key,
-                )
-
-                # List objects with prefix
-                response = s3.list_objects_v2(
-                    Bucket=self.s3_storage.bucket,
-                    Prefix=f"{pack_id}_v"
-                )
-
-                if 'Contents' in response:
-                    for obj in response['Contents']:
-                        filename = obj['Key']
-                        if filename.endswith('.yaml'):
-                            # Extract version from filename
-                            stem = Path(filename).stem
-                            if f"{pack_id}_v" in stem:
-                                version_str = stem.replace(f"{pack_id}_v", "")
-                                if version_str not in versions:
-                                    versions.append(version_str)
+                for filename in self.s3_storage.list_keys(f"{pack_id}_v"):
+                    if filename.endswith('.yaml'):
+                        # Extract version from filename
+                        stem = Path(filename).stem
+                        if f"{pack_id}_v" in stem:
+                            version_str = stem.replace(f"{pack_id}_v", "")
+                            if version_str not in versions:
+                                versions.append(version_str)
             except Exception as e:
-                print(f"Warning: Failed to list versions from S3: {e}")
+                logger.warning(f"Failed to list versions from S3: {e}")
 
         # Sort versions in descending order (newest first)
         versions.sort(key=lambda v: [int(x) for x in v.split('.')], reverse=True)
@@ -307,13 +449,37 @@ class RulepackLoader:
         return versions[0] if versions else None
 
 
+_loader: Optional[RulepackLoader] = None
+_loader_lock = threading.Lock()
+
+
+def get_rulepack_loader() -> RulepackLoader:
+    """Get the process-wide hot-reloading rulepack loader."""
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = RulepackLoader()
+    return _loader
+
+
 def load_rulepack() -> Rulepack | None:
+    """The active rulepack; keep the returned object for a whole analysis."""
     try:
-        return RulepackLoader().load()
+        return get_rulepack_loader().current()
     except RulepackError:
         return None
 
 
+def _reset_after_fork() -> None:
+    if _loader is not None:
+        _loader._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 __all__ = [
     "RulepackError",
     "RulepackLoader",
@@ -321,6 +487,7 @@ __all__ = [
     "Lexicon",
     "DetectorSpec",
     "api_rules_summary",
+    "get_rulepack_loader",
     "load_rulepack",
     "S3CompatibleStorage",
 ]
@@ -0,0 +1,255 @@
+"""Shared S3-compatible access layer.
+
+Every S3 user in the API (rulepack loading, the S3 blob backend) goes through
+an :class:`S3Client` obtained from :func:`get_s3_client`. Clients are cached
+per endpoint, credentials and bucket, so the botocore connection pool
+(``S3_MAX_POOL_CONNECTIONS``) is reused across calls instead of a new client
+and TLS handshake per request.
+
+Transfers:
+
+- :meth:`S3Client.upload_file` and :meth:`S3Client.upload_fileobj` switch to
+  multipart uploads above ``S3_MULTIPART_THRESHOLD_MB`` and send
+  ``S3_MULTIPART_CHUNK_MB`` parts on up to ``S3_TRANSFER_CONCURRENCY``
+  threads. File objects are streamed, never read fully into memory.
+- :meth:`S3Client.download_file` uses the same managed transfer (concurrent
+  ranged GETs for large objects). :meth:`S3Client.stream` and
+  :meth:`S3Client.get_range` read in chunks or byte ranges.
+- :meth:`S3Client.get_cached` is a conditional GET: it sends ``If-None-Match``
+  with the last seen ETag and serves the cached body on ``304 Not Modified``.
+  Small, rarely changing objects such as rulepacks are then re-validated
+  without being re-downloaded.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+try:  # pragma: no cover - optional dependency
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from botocore.exceptions import ClientError
+except ImportError:  # pragma: no cover - handled at runtime
+    boto3 = None
+    TransferConfig = Config = None
+
+    class ClientError(Exception):  # type: ignore[no-redef]
+        response: Dict[str, Any] = {}
+
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+NOT_FOUND_CODES = ("404", "NoSuchKey", "NotFound")
+NOT_MODIFIED_CODES = ("304", "NotModified")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def error_code(exc: Exception) -> str:
+    return str(getattr(exc, "response", {}).get("Error", {}).get("Code", ""))
+
+
+@dataclass
+class CachedObject:
+    body: bytes
+    etag: str
+    not_modified: bool = False
+
+
+class S3Client:
+    """Pooled client for one bucket on an S3-compatible endpoint."""
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        region_name: Optional[str] = None,
+    ):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region_name = region_name or os.getenv("S3_REGION", "us-east-1")
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._etags: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._etags_lock = threading.Lock()
+        self._etag_capacity = _env_int("S3_ETAG_CACHE_ENTRIES", 128)
+        self.stats = {"conditional_hits": 0, "conditional_misses": 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    if boto3 is None:
+                        raise RuntimeError("boto3 is required for S3 storage")
+                    self._client = boto3.client(
+                        "s3",
+                        endpoint_url=self.endpoint_url,
+                        aws_access_key_id=self.access_key,
+                        aws_secret_access_key=self.secret_key,
+                        region_name=self.region_name,
+                        config=Config(
+                            max_pool_connections=_env_int("S3_MAX_POOL_CONNECTIONS", 32),
+                            retries={"max_attempts": 3, "mode": "standard"},
+                        ),
+                    )
+        return self._client
+
+    @staticmethod
+    def transfer_config() -> "TransferConfig":
+        return TransferConfig(
+            multipart_threshold=_env_int("S3_MULTIPART_THRESHOLD_MB", 8) * MB,
+            multipart_chunksize=_env_int("S3_MULTIPART_CHUNK_MB", 8) * MB,
+            max_concurrency=_env_int("S3_TRANSFER_CONCURRENCY", 8),
+        )
+
+    # -- uploads -----------------------------------------------------------
+
+    def upload_file(self, path: Path, key: str, extra_args: Optional[Dict[str, Any]] = None) -> None:
+        self.client.upload_file(
+            str(path), self.bucket, key, ExtraArgs=extra_args or None, Config=self.transfer_config()
+        )
+
+    def upload_fileobj(self, fileobj: BinaryIO, key: str, extra_args: Optional[Dict[str, Any]] = None) -> None:
+        self.client.upload_fileobj(
+            fileobj, self.bucket, key, ExtraArgs=extra_args or None, Config=self.transfer_config()
+        )
+
+    # -- downloads ---------------------------------------------------------
+
+    def download_file(self, key: str, dest: Path) -> None:
+        """Download to ``dest`` atomically (temp file, then rename)."""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.client.download_file(self.bucket, key, str(tmp), Config=self.transfer_config())
+            os.replace(tmp, dest)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def stream(self, key: str, chunk_size: int = MB, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the object (or the inclusive byte range ``start``..``end``) in chunks."""
+        kwargs: Dict[str, Any] = {"Bucket": self.bucket, "Key": key}
+        if start or end is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+        body = self.client.get_object(**kwargs)["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        return b"".join(self.stream(key, start=start, end=end))
+
+    def get_bytes(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def get_cached(self, key: str) -> CachedObject:
+        """Conditional GET; the body comes from the ETag cache on 304."""
+        with self._etags_lock:
+            cached = self._etags.get(key)
+        kwargs: Dict[str, Any] = {"Bucket": self.bucket, "Key": key}
+        if cached is not None:
+            kwargs["IfNoneMatch"] = cached[0]
+        try:
+            response = self.client.get_object(**kwargs)
+        except ClientError as exc:
+            if cached is not None and error_code(exc) in NOT_MODIFIED_CODES:
+                with self._etags_lock:
+                    self._etags.move_to_end(key)
+                    self.stats["conditional_hits"] += 1
+                return CachedObject(body=cached[1], etag=cached[0], not_modified=True)
+            raise
+        body = response["Body"].read()
+        etag = str(response.get("ETag", ""))
+        with self._etags_lock:
+            self.stats["conditional_misses"] += 1
+            if etag:
+                self._etags[key] = (etag, body)
+                self._etags.move_to_end(key)
+                while len(self._etags) > self._etag_capacity:
+                    self._etags.popitem(last=False)
+        return CachedObject(body=body, etag=etag)
+
+    # -- metadata ----------------------------------------------------------
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as exc:
+            if error_code(exc) in NOT_FOUND_CODES:
+                return False
+            raise
+
+    def etag(self, key: str) -> Optional[str]:
+        """ETag of ``key`` from a HEAD request, or None if it does not exist."""
+        try:
+            return str(self.client.head_object(Bucket=self.bucket, Key=key).get("ETag", ""))
+        except ClientError as exc:
+            if error_code(exc) in NOT_FOUND_CODES:
+                return None
+            raise
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        with self._etags_lock:
+            self._etags.pop(key, None)
+
+    def list_keys(self, prefix: str = "") -> List[str]:
+        keys: List[str] = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        return keys
+
+
+_clients: Dict[Tuple[Optional[str], ...], S3Client] = {}
+_clients_lock = threading.Lock()
+
+
+def get_s3_client(
+    bucket: Optional[str] = None,
+    endpoint_url: Optional[str] = None,
+    access_key: Optional[str] = None,
+    secret_key: Optional[str] = None,
+) -> S3Client:
+    """Return the shared client for this endpoint/credentials/bucket.
+
+    Unset arguments fall back to ``S3_BUCKET``, ``S3_ENDPOINT_URL``,
+    ``S3_ACCESS_KEY`` and ``S3_SECRET_KEY``.
+    """
+    bucket = bucket or os.getenv("S3_BUCKET")
+    if not bucket:
+        raise ValueError("S3 access requires a bucket (S3_BUCKET)")
+    endpoint_url = endpoint_url or os.getenv("S3_ENDPOINT_URL")
+    access_key = access_key or os.getenv("S3_ACCESS_KEY")
+    secret_key = secret_key or os.getenv("S3_SECRET_KEY")
+    key = (bucket, endpoint_url, access_key, secret_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = S3Client(bucket, endpoint_url, access_key, secret_key)
+        return client
+
+
+def reset_s3_clients() -> None:
+    """Drop cached clients (tests, credential rotation)."""
+    with _clients_lock:
+        _clients.clear()
@@ -1,4 +1,6 @@
 from datetime import datetime
+from typing import Optional
+
 from fastapi import Cookie, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -33,3 +35,30 @@ def require_session(
         user_id=str(session.user_id),
         organization_id=str(session.org_id),
     )
+
+
+def org_id_for_token(session_token: Optional[str]) -> Optional[str]:
+    """Org of the session behind ``session_token``, or None if unknown."""
+    if not session_token:
+        return None
+    try:
+        with database.SessionLocal() as db:
+            session = (
+                db.query(SessionModel)
+                .filter(SessionModel.session_token == session_token)
+                .first()
+            )
+    except Exception:
+        return None
+    if not session or session.expires_at < datetime.utcnow():
+        return None
+    return str(session.org_id)
+
+
+def request_org_id(bl_sess: Optional[str] = Cookie(None)) -> Optional[str]:
+    """Dependency resolving the caller's org without requiring a session.
+
+    Declared sync so FastAPI runs the lookup off the event loop; it is
+    resolved once per request however many dependencies use it.
+    """
+    return org_id_for_token(bl_sess)
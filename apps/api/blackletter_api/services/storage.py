@@ -1,15 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import functools
+import hashlib
+import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import BinaryIO, List
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, TypeVar
 
 from fastapi import UploadFile
 import json
 
 from ..models.schemas import AnalysisSummary, VerdictCounts
 
+try:  # pragma: no cover - optional dependency
+    import zstandard
+except ImportError:  # pragma: no cover - handled at runtime
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
 
 DATA_ROOT = Path(os.getenv("DATA_ROOT", ".data")).resolve()
 
@@ -20,6 +34,11 @@ def analysis_dir(analysis_id: str) -> Path:
     return d
 
 
+def analysis_path(analysis_id: str) -> Path:
+    """Return the analysis directory without creating it (for read paths)."""
+    return DATA_ROOT / "analyses" / analysis_id
+
+
 def sanitize_filename(name: str) -> str:
     # Drop any directory components and strip dangerous characters
     base = os.path.basename(name).strip().replace("\x00", "")
@@ -27,7 +46,17 @@ def sanitize_filename(name: str) -> str:
     return base or "upload"
 
 
-def save_upload(file: UploadFile, dest: Path, max_bytes: int = 10 * 1024 * 1024) -> int:
+def save_upload(
+    file: UploadFile,
+    dest: Path,
+    max_bytes: int = 10 * 1024 * 1024,
+    hasher: Optional["hashlib._Hash"] = None,
+) -> int:
+    """Stream an upload to ``dest`` in 1 MiB chunks and return its size.
+
+    When ``hasher`` is given it is fed every chunk, so callers get a content
+    digest without re-reading the file.
+    """
     total = 0
     dest.parent.mkdir(parents=True, exist_ok=True)
     with dest.open("wb") as f:
@@ -51,25 +80,60 @@ def save_upload(file: UploadFile, dest: Path, max_bytes: int = 10 * 1024 * 1024)
                     except FileNotFoundError:
                         pass
                 raise ValueError("file_too_large")
+            if hasher is not None:
+                hasher.update(chunk)
             f.write(chunk)
     return total
 
 
-def write_analysis_json(analysis_id: str, filename: str, size: int) -> Path:
+def write_analysis_json(
+    analysis_id: str,
+    filename: str,
+    size: int,
+    status: str = "running",
+    org_id: Optional[str] = None,
+) -> Path:
     d = analysis_dir(analysis_id)
     payload = {
         "id": analysis_id,
         "filename": filename,
         "size": size,
         "created_at": datetime.now(timezone.utc).isoformat(),
-        "status": "done",
+        "status": status,
+        "org_id": org_id,
     }
     p = d / "analysis.json"
     with p.open("w", encoding="utf-8") as f:
         json.dump(payload, f)
+    try:
+        from .catalogue import upsert_entry
+
+        upsert_entry(analysis_id, filename, size, payload["created_at"], payload["status"], org_id=org_id)
+    except Exception as exc:
+        logger.warning(f"Could not index analysis {analysis_id} in catalogue: {exc}")
     return p
 
 
+def set_analysis_status(analysis_id: str, status: str) -> None:
+    """Record a job state change in analysis.json and the catalogue.
+
+    A no-op until ``write_analysis_json`` has created the analysis.
+    """
+    p = analysis_path(analysis_id) / "analysis.json"
+    try:
+        data = json.loads(p.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return
+    data["status"] = status
+    p.write_text(json.dumps(data), encoding="utf-8")
+    try:
+        from .catalogue import update_status
+
+        update_status(analysis_id, status)
+    except Exception as exc:
+        logger.warning(f"Could not update catalogue status for {analysis_id}: {exc}")
+
+
 def _parse_iso(dt: str) -> float:
     try:
         # Python 3.11+ supports fromisoformat with Z? Use replace as needed
@@ -83,7 +147,7 @@ def load_analysis_summary(analysis_id: str) -> AnalysisSummary | None:
 
     Returns None if the analysis cannot be loaded.
     """
-    p = analysis_dir(analysis_id) / "analysis.json"
+    p = analysis_path(analysis_id) / "analysis.json"
     if not p.exists():
         return None
     try:
@@ -100,7 +164,37 @@ def load_analysis_summary(analysis_id: str) -> AnalysisSummary | None:
     )
 
 
+def list_analyses_page(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    filename_prefix: Optional[str] = None,
+) -> Tuple[List[AnalysisSummary], Optional[str]]:
+    """Return a page of summaries from the catalogue index and the next cursor.
+
+    Raises ``ValueError("invalid_cursor")`` for a malformed cursor.
+    """
+    from .catalogue import ensure_backfilled, list_entries
+
+    ensure_backfilled()
+    return list_entries(limit=limit, cursor=cursor, status=status, filename_prefix=filename_prefix)
+
+
 def list_analyses_summaries(limit: int = 50) -> List[AnalysisSummary]:
+    """Return up to `limit` summaries, newest first.
+
+    Served from the catalogue index; falls back to scanning
+    DATA_ROOT/analyses/*/analysis.json if the index is unavailable.
+    """
+    try:
+        items, _ = list_analyses_page(limit=limit)
+        return items
+    except Exception as exc:
+        logger.warning(f"Catalogue unavailable, scanning analyses directory: {exc}")
+    return _scan_analyses_summaries(limit)
+
+
+def _scan_analyses_summaries(limit: int = 50) -> List[AnalysisSummary]:
     """Scan DATA_ROOT/analyses/*/analysis.json and return up to `limit` summaries."""
     root = DATA_ROOT / "analyses"
     if not root.exists():
@@ -138,9 +232,9 @@ def list_analyses_summaries(limit: int = 50) -> List[AnalysisSummary]:
 
 def get_analysis_text(analysis_id: str) -> str:
     """Return stored analysis text or an empty string if missing."""
-    p = analysis_dir(analysis_id) / "text.txt"
+    p = analysis_path(analysis_id) / "text.txt"
     try:
-        return p.read_text(encoding="utf-8")
+        return read_artifact_text(p)
     except FileNotFoundError:
         return ""
     except Exception:
@@ -149,11 +243,280 @@ def get_analysis_text(analysis_id: str) -> str:
 
 def get_analysis_findings(analysis_id: str) -> list:
     """Return deserialized findings or an empty list if missing/invalid."""
-    p = analysis_dir(analysis_id) / "findings.json"
-    if not p.exists():
+    p = analysis_path(analysis_id) / "findings.json"
+    if not artifact_exists(p):
         return []
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
+        data = read_artifact_json(p)
         return data if isinstance(data, list) else []
     except Exception:
         return []
+
+
+# ---------------------------------------------------------------------------
+# Async access
+#
+# Async route handlers must not touch the disk on the event loop: one slow
+# read stalls every request on that worker. The ``*_async`` variants run the
+# blocking call on a small dedicated thread pool (STORAGE_IO_THREADS, default
+# 8) so disk stalls queue behind each other instead of behind the loop, and
+# the pool cannot grow without bound under load.
+# ---------------------------------------------------------------------------
+
+T = TypeVar("T")
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    if _io_executor is None:
+        with _io_executor_lock:
+            if _io_executor is None:
+                workers = max(1, int(os.getenv("STORAGE_IO_THREADS", "8")))
+                _io_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="storage-io")
+    return _io_executor
+
+
+def shutdown_io_executor() -> None:
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is not None:
+            _io_executor.shutdown(wait=False)
+            _io_executor = None
+
+
+def _run_in_context(context: contextvars.Context, fn: Callable[..., T]) -> T:
+    return context.run(fn)
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking storage call on the I/O pool and await its result.
+
+    The caller's context variables are carried over, as ``asyncio.to_thread``
+    does, so request-scoped state (e.g. an active profile) follows the call.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    return await loop.run_in_executor(get_io_executor(), _run_in_context, contextvars.copy_context(), call)
+
+
+async def get_analysis_text_async(analysis_id: str) -> str:
+    return await run_io(get_analysis_text, analysis_id)
+
+
+async def get_analysis_findings_async(analysis_id: str) -> list:
+    return await run_io(get_analysis_findings, analysis_id)
+
+
+async def load_analysis_summary_async(analysis_id: str) -> AnalysisSummary | None:
+    return await run_io(load_analysis_summary, analysis_id)
+
+
+async def read_artifact_json_async(path: Path) -> Any:
+    return await run_io(read_artifact_json, path)
+
+
+async def save_upload_async(
+    file: UploadFile,
+    dest: Path,
+    max_bytes: int = 10 * 1024 * 1024,
+    hasher: Optional["hashlib._Hash"] = None,
+) -> int:
+    """Async variant of :func:`save_upload`; same errors, same return value."""
+    return await run_io(save_upload, file, dest, max_bytes=max_bytes, hasher=hasher)
+
+
+# ---------------------------------------------------------------------------
+# Artifact storage
+#
+# Analysis artifacts (extraction.json, extracted.txt, findings.json,
+# tokens.json) are written through ``write_artifact`` and read through
+# ``read_artifact``. With ARTIFACT_COMPRESSION=1 they are stored as
+# ``<name>.zst``, compressed with zstd using a dictionary trained on earlier
+# artifacts. Small JSON files share most of their structure, so a dictionary
+# helps far more than per-file compression alone. Callers always use the
+# logical (uncompressed) path; reads accept either form on disk.
+# ---------------------------------------------------------------------------
+
+ZSTD_SUFFIX = ".zst"
+ARTIFACT_SAMPLE_NAMES = ("extraction.json", "findings.json", "tokens.json", "extracted.txt")
+
+_zstd_lock = threading.Lock()
+_zstd_dicts: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+_active_dict_id: Optional[int] = None
+# (marker path, (mtime_ns, size)) the cached id was read from; another
+# process training a dictionary rewrites the marker and changes it
+_active_marker_state: Optional[Tuple[Path, Optional[Tuple[int, int]]]] = None
+
+
+def artifact_compression_enabled() -> bool:
+    """Check environment flag for zstd artifact compression."""
+    return os.getenv("ARTIFACT_COMPRESSION", "0") == "1" and zstandard is not None
+
+
+def _compression_level() -> int:
+    return int(os.getenv("ARTIFACT_COMPRESSION_LEVEL", "9"))
+
+
+def _dict_dir() -> Path:
+    return DATA_ROOT / "artifact_dicts"
+
+
+def _compressed_path(path: Path) -> Path:
+    return path.with_name(path.name + ZSTD_SUFFIX)
+
+
+def _load_dict(dict_id: int) -> "zstandard.ZstdCompressionDict":
+    with _zstd_lock:
+        cached = _zstd_dicts.get(dict_id)
+        if cached is None:
+            raw = (_dict_dir() / f"{dict_id}.zdict").read_bytes()
+            cached = zstandard.ZstdCompressionDict(raw)
+            _zstd_dicts[dict_id] = cached
+        return cached
+
+
+def _active_dict() -> Optional["zstandard.ZstdCompressionDict"]:
+    global _active_dict_id, _active_marker_state
+    marker = _dict_dir() / "active"
+    try:
+        st = marker.stat()
+        state = (marker, (st.st_mtime_ns, st.st_size))
+    except FileNotFoundError:
+        state = (marker, None)
+    if state != _active_marker_state:
+        try:
+            _active_dict_id = int(marker.read_text(encoding="utf-8").strip())
+        except (FileNotFoundError, ValueError):
+            _active_dict_id = None
+        _active_marker_state = state
+    if _active_dict_id is None:
+        return None
+    try:
+        return _load_dict(_active_dict_id)
+    except FileNotFoundError:
+        return None
+
+
+def reset_artifact_dictionary_cache() -> None:
+    """Forget cached dictionaries (after training or when DATA_ROOT changes)."""
+    global _active_dict_id, _active_marker_state
+    with _zstd_lock:
+        _zstd_dicts.clear()
+        _active_dict_id = None
+        _active_marker_state = None
+
+
+def artifact_exists(path: Path) -> bool:
+    return path.exists() or _compressed_path(path).exists()
+
+
+def artifact_version(path: Path) -> Optional[Tuple[int, int]]:
+    """``(mtime_ns, size)`` of the stored artifact, or None if missing.
+
+    A cheap change marker for caches derived from the artifact.
+    """
+    for candidate in (_compressed_path(path), path):
+        try:
+            st = candidate.stat()
+        except FileNotFoundError:
+            continue
+        return st.st_mtime_ns, st.st_size
+    return None
+
+
+def write_artifact(path: Path, data: bytes | str) -> Path:
+    """Write an artifact, compressed when enabled; returns the logical path.
+
+    The file is written to a temp name and renamed into place, and any copy
+    in the other format is removed so reads never see a stale version.
+    """
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if artifact_compression_enabled():
+        dict_data = _active_dict()
+        compressor = zstandard.ZstdCompressor(level=_compression_level(), dict_data=dict_data)
+        target, stale, body = _compressed_path(path), path, compressor.compress(raw)
+    else:
+        target, stale, body = path, _compressed_path(path), raw
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(body)
+    os.replace(tmp, target)
+    stale.unlink(missing_ok=True)
+    return path
+
+
+def delete_artifact(path: Path) -> None:
+    path.unlink(missing_ok=True)
+    _compressed_path(path).unlink(missing_ok=True)
+
+
+def write_json_artifact(path: Path, obj: Any) -> Path:
+    return write_artifact(path, json.dumps(obj, separators=(",", ":")))
+
+
+def read_artifact(path: Path) -> bytes:
+    """Read an artifact by its logical path, decompressing if needed."""
+    compressed = _compressed_path(path)
+    if compressed.exists():
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read compressed artifacts")
+        body = compressed.read_bytes()
+        dict_id = zstandard.get_frame_parameters(body).dict_id
+        dict_data = _load_dict(dict_id) if dict_id else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(body)
+    return path.read_bytes()
+
+
+def read_artifact_text(path: Path) -> str:
+    return read_artifact(path).decode("utf-8")
+
+
+def read_artifact_json(path: Path) -> Any:
+    return json.loads(read_artifact(path))
+
+
+def train_artifact_dictionary(dict_size: int = 112_640, max_samples: int = 2000) -> Optional[int]:
+    """Train a zstd dictionary from existing artifacts and make it active.
+
+    Runs periodically as ``tasks.train_artifact_dictionary_task``; other
+    processes pick up the new ``active`` marker on their next write.
+    Returns the new dictionary id, or None if there are too few samples.
+    Artifacts compressed with an older dictionary stay readable because the
+    dictionary id is recorded in each frame and old dictionaries are kept.
+    """
+    if zstandard is None:
+        raise RuntimeError("zstandard is required to train an artifact dictionary")
+    samples: List[bytes] = []
+    root = DATA_ROOT / "analyses"
+    if root.exists():
+        for d in root.iterdir():
+            for name in ARTIFACT_SAMPLE_NAMES:
+                p = d / name
+                if artifact_exists(p):
+                    try:
+                        samples.append(read_artifact(p))
+                    except Exception:
+                        continue
+            if len(samples) >= max_samples:
+                break
+    if len(samples) < 8:
+        return None
+    try:
+        trained = zstandard.train_dictionary(dict_size, samples)
+    except zstandard.ZstdError as exc:
+        logger.warning(f"Artifact dictionary training failed: {exc}")
+        return None
+    dict_id = trained.dict_id()
+    out = _dict_dir()
+    out.mkdir(parents=True, exist_ok=True)
+    (out / f"{dict_id}.zdict").write_bytes(trained.as_bytes())
+    # Renamed into place so other processes never read a partial marker
+    tmp = out / "active.tmp"
+    tmp.write_text(str(dict_id), encoding="utf-8")
+    os.replace(tmp, out / "active")
+    reset_artifact_dictionary_cache()
+    logger.info(f"Trained artifact dictionary {dict_id} from {len(samples)} samples")
+    return dict_id
@@ -1,18 +1,40 @@
 from __future__ import annotations
 
 import os
+import json
 import time
 import logging
-import tempfile
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Optional
 from uuid import uuid4
 
 from redis import Redis
 
-from ..models.schemas import JobState
+from ..models.schemas import Coverage, Finding, JobState
 from .celery_app import celery_app
+from .blob_store import resolve_upload
+from .catalogue import update_verdicts
+from .checkpoints import clear_checkpoints, load_checkpoint, save_checkpoint
+from .job_events import analysis_channel, build_job_event, job_channel
+from .admission import record_completion
+from .artifacts import record_evidence_artifact, record_extraction_artifact
+from .evidence import build_window
+from .exporter import generate_html_export
+from .extraction import get_extractor_registry, run_extraction
+from .histograms import observe, timer
+from .result_store import count_verdicts, save_results
+from .retention import run_retention_gc
+from .storage import (
+    analysis_dir,
+    artifact_compression_enabled,
+    set_analysis_status,
+    train_artifact_dictionary,
+    write_analysis_json,
+)
+from .tracing import begin_span, end_span, flush, set_analysis, start_span
+from .warmup import record_job_latency
 
 logger = logging.getLogger(__name__)
 
@@ -35,18 +57,23 @@ def _job_key(job_id: str) -> str:
 
 
 async def create_contract_analysis_job(
-    filename: str, 
-    content_type: str, 
-    file_content: bytes
+    analysis_id: str,
+    filename: str,
+    content_type: str,
+    job_id: str | None = None,
 ) -> str:
     """
     Create a new contract analysis job with enhanced async processing.
     Integrated from v4mpire77/blackletter for improved job management.
+
+    The upload must already be stored as ``analysis_dir(analysis_id)/filename``
+    (see :func:`storage.save_upload`) or ingested into the blob store; the
+    task only receives that reference. ``job_id`` lets callers that claimed a
+    dedup fingerprint reuse the id they claimed it with.
     """
     try:
-        # Generate unique job and analysis IDs
-        job_id = str(uuid4())
-        analysis_id = str(uuid4())
+        # Generate unique job ID
+        job_id = job_id or str(uuid4())
         
         # Create job record
         record = {
@@ -58,15 +85,12 @@ async def create_contract_analysis_job(
         }
         redis_client.hset(_job_key(job_id), mapping=record)
         
-        # Store file temporarily for processing
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{filename}") as tmp_file:
-            tmp_file.write(file_content)
-            tmp_file_path = tmp_file.name
+        # Queue the processing task; the trace follows it to the worker
+        set_analysis(analysis_id)
+        with start_span("enqueue", kind="producer", job_id=job_id):
+            process_contract_analysis.delay(job_id, analysis_id, filename)
         
-        # Queue the processing task
-        process_contract_analysis.delay(job_id, analysis_id, tmp_file_path, filename)
-        
-        logger.info(f"Created analysis job {job_id} for file: {filename}")
+        logger.info(f"Created analysis job {job_id} for file: {filename} ({content_type})")
         return job_id
         
     except Exception as e:
@@ -75,71 +99,97 @@ async def create_contract_analysis_job(
 
 
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
-def process_contract_analysis(self, job_id: str, analysis_id: str, file_path: str, filename: str):
+def process_contract_analysis(self, job_id: str, analysis_id: str, filename: str):
     """
     Enhanced Celery task for contract analysis processing.
     Integrated from v4mpire77/blackletter for robust async processing with GDPR analysis.
+
+    ``filename`` refers to the upload stored in (or referenced from) the
+    analysis directory.
     """
+    t_job_start = time.time()
+    set_analysis(analysis_id)
     try:
         # Update job status to running
-        update_job_status(job_id, JobState.running)
+        update_job_status(job_id, JobState.running, analysis_id=analysis_id)
         logger.info(f"Starting analysis for job {job_id}")
         
-        # Step 1: Text extraction
-        update_job_status(job_id, JobState.running, "Extracting text from document")
-        extracted_text = extract_text_from_file(file_path, filename)
-        
+        # Step 1: Text extraction (resumable from checkpoint on retry)
+        extracted = load_checkpoint(analysis_id, job_id, "extraction")
+        if extracted is not None:
+            logger.info(f"Resuming job {job_id}: reusing extraction checkpoint")
+            extracted_text = extracted["text"]
+        else:
+            update_job_status(job_id, JobState.running, "Extracting text from document", analysis_id=analysis_id)
+            file_path = str(resolve_upload(analysis_id, filename))
+            with timer("pipeline_stage_duration_ms", stage="extraction"), start_span("extraction"):
+                extracted_text = extract_text_from_file(file_path, filename)
+            save_checkpoint(analysis_id, job_id, "extraction", {"text": extracted_text})
+
         # Step 2: GDPR analysis with enhanced analyzer
-        update_job_status(job_id, JobState.running, "Running enhanced GDPR Article 28(3) analysis")
-        findings, coverage = run_gdpr_analysis(extracted_text, analysis_id, filename)
-        
+        analysed = load_checkpoint(analysis_id, job_id, "analysis")
+        if analysed is not None:
+            logger.info(f"Resuming job {job_id}: reusing analysis checkpoint")
+            findings = [Finding(**f) for f in analysed["findings"]]
+            coverage = Coverage(**analysed["coverage"])
+        else:
+            update_job_status(job_id, JobState.running, "Running enhanced GDPR Article 28(3) analysis", analysis_id=analysis_id)
+            with timer("pipeline_stage_duration_ms", stage="analysis"), start_span("detection"):
+                findings, coverage = run_gdpr_analysis(extracted_text, analysis_id, filename)
+            save_checkpoint(
+                analysis_id,
+                job_id,
+                "analysis",
+                {"findings": [f.model_dump() for f in findings], "coverage": coverage.model_dump()},
+            )
+
         # Step 3: Store results
-        update_job_status(job_id, JobState.running, "Storing analysis results")
-        store_analysis_results(analysis_id, findings, coverage, filename)
-        
+        if load_checkpoint(analysis_id, job_id, "store") is None:
+            update_job_status(job_id, JobState.running, "Storing analysis results", analysis_id=analysis_id)
+            with timer("pipeline_stage_duration_ms", stage="store"), start_span("db.write", target="results"):
+                store_analysis_results(analysis_id, findings, coverage, filename)
+            save_checkpoint(analysis_id, job_id, "store", {})
+
         # Mark as complete
-        update_job_status(job_id, JobState.done)
+        update_job_status(job_id, JobState.done, analysis_id=analysis_id)
+        clear_checkpoints(analysis_id)
         logger.info(f"Enhanced GDPR analysis completed for job {job_id}: "
                    f"{len(findings)} findings, {coverage.present}/{coverage.total} obligations detected")
-        
-        # Clean up temp file
-        try:
-            os.unlink(file_path)
-        except OSError:
-            logger.warning(f"Could not clean up temp file: {file_path}")
-            
+
     except Exception as e:
         error_msg = f"Analysis failed: {str(e)}"
-        update_job_status(job_id, JobState.error, error_msg)
+        if self.request.retries < self.max_retries:
+            # Not terminal: event streams stay open until the retry settles
+            update_job_status(job_id, JobState.queued, f"Retrying after error: {e}", analysis_id=analysis_id)
+            logger.warning(f"Job {job_id} failed, retrying: {error_msg}", exc_info=True)
+            raise self.retry(countdown=60)
+        update_job_status(job_id, JobState.error, error_msg, analysis_id=analysis_id)
+        # No attempt is left to resume from them
+        clear_checkpoints(analysis_id)
         logger.error(f"Job {job_id} failed: {error_msg}", exc_info=True)
-        raise self.retry(countdown=60, max_retries=3)
+        raise
+    finally:
+        job_ms = (time.time() - t_job_start) * 1000
+        observe("job_duration_ms", job_ms, task="process_contract_analysis")
+        record_job_latency(job_ms)
 
 
 def extract_text_from_file(file_path: str, filename: str) -> str:
-    """Extract text from uploaded file."""
+    """Extract text from uploaded file using the shared extractor registry."""
+    path = Path(file_path)
+    registry = get_extractor_registry()
     try:
-        if filename.lower().endswith('.pdf'):
-            # Simple PDF text extraction (placeholder)
-            # In production, use PyMuPDF or similar
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                return f"Extracted text from PDF: {filename} (placeholder implementation)"
-        
-        elif filename.lower().endswith(('.docx', '.doc')):
-            # Simple DOCX text extraction (placeholder)
-            # In production, use python-docx or similar
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                return f"Extracted text from Word document: {filename} (placeholder implementation)"
-        
-        else:
-            # Try to read as plain text
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-                
+        extractor = registry.for_path(Path(filename))
+    except ValueError:
+        # Unknown format: best-effort plain text read
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    try:
+        result = extractor.extract(path)
     except Exception as e:
         logger.error(f"Error extracting text from {filename}: {str(e)}")
         raise
+    return "".join(p["text"] for p in result.get("pages", []))
 
 
 def run_gdpr_analysis(text: str, analysis_id: str, filename: str):
@@ -149,23 +199,56 @@ def run_gdpr_analysis(text: str, analysis_id: str, filename: str):
 
 
 def store_analysis_results(analysis_id: str, findings, coverage, filename: str):
-    """Store analysis results (placeholder implementation)."""
-    # In production, this would store to database or filesystem
+    """Persist findings, coverage and verdict counts in the result store."""
+    row = save_results(analysis_id, findings, coverage)
     logger.info(f"Stored analysis results for {analysis_id}: "
-               f"{len(findings)} findings, coverage: {coverage.percentage:.1f}%")
+               f"{len(findings)} findings, coverage: {coverage.percentage:.1f}%, "
+               f"{row.size_bytes} bytes ({row.encoding})")
+
+
+def _write_job_status(
+    job_id: str,
+    fields: dict,
+    message: str = "",
+    analysis_id: str | None = None,
+) -> None:
+    """Write job fields and publish the transition in one round trip."""
+    updated_at = datetime.now(timezone.utc).isoformat()
+    fields = {**fields, "updated_at": updated_at}
+    event = json.dumps(
+        build_job_event(
+            job_id,
+            fields["status"],
+            message=message,
+            analysis_id=analysis_id,
+            updated_at=updated_at,
+        )
+    )
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hset(_job_key(job_id), mapping=fields)
+    pipe.publish(job_channel(job_id), event)
+    if analysis_id:
+        pipe.publish(analysis_channel(analysis_id), event)
+    pipe.execute()
+    if fields["status"] in (JobState.done.value, JobState.error.value):
+        record_completion()
 
 
-def update_job_status(job_id: str, status: JobState, message: str = "") -> None:
-    """Update job status in Redis."""
-    key = _job_key(job_id)
-    redis_client.hset(key, "status", status.value)
+def update_job_status(
+    job_id: str,
+    status: JobState,
+    message: str = "",
+    analysis_id: str | None = None,
+) -> None:
+    """Update job status in Redis and notify subscribers."""
+    fields = {"status": status.value}
     if message:
-        redis_client.hset(key, "error_reason", message)
-    redis_client.hset(key, "updated_at", datetime.now(timezone.utc).isoformat())
+        fields["error_reason"] = message
+    _write_job_status(job_id, fields, message=message, analysis_id=analysis_id)
 
 
-def new_job(analysis_id: str | None = None) -> str:
-    job_id = str(uuid4())
+def new_job(analysis_id: str | None = None, job_id: str | None = None) -> str:
+    job_id = job_id or str(uuid4())
     record = {
         "id": job_id,
         "status": JobState.queued.value,
@@ -185,6 +268,7 @@ def enqueue_job(
     filename: str,
     size: int,
     backend: str | None = None,
+    org_id: str | None = None,
 ) -> None:
     """Enqueue the document processing job.
 
@@ -192,6 +276,9 @@ def enqueue_job(
     ----------
     job_id, analysis_id, filename, size:
         Identifiers and metadata for the job to enqueue.
+    org_id:
+        Submitting organisation, recorded in the catalogue so retention
+        applies that organisation's policy.
     backend:
         Execution backend. ``"sync"`` processes the job immediately within the
         current process, while ``"celery"`` dispatches the job to a Celery
@@ -205,12 +292,15 @@ def enqueue_job(
     """
 
     chosen = backend or "celery"
-    if chosen == "sync":
-        process_job(job_id, analysis_id, filename, size)
-    elif chosen == "celery":
-        process_job.delay(job_id, analysis_id, filename, size)
-    else:
+    if chosen not in ("sync", "celery"):
         raise ValueError(f"Unknown backend '{chosen}'")
+    # The publishing span travels to the worker as a ``traceparent`` header
+    set_analysis(analysis_id)
+    with start_span("enqueue", kind="producer", job_id=job_id, backend=chosen):
+        if chosen == "sync":
+            process_job(job_id, analysis_id, filename, size, org_id=org_id)
+        else:
+            process_job.delay(job_id, analysis_id, filename, size, org_id=org_id)
 
 
 def get_job(job_id: str) -> Optional[JobRecord]:
@@ -226,40 +316,55 @@ def get_job(job_id: str) -> Optional[JobRecord]:
     )
 
 
-def set_status(job_id: str, status: JobState, error_reason: str | None = None) -> None:
+def set_status(
+    job_id: str,
+    status: JobState,
+    error_reason: str | None = None,
+    analysis_id: str | None = None,
+) -> None:
     if not redis_client.exists(_job_key(job_id)):
         return
-    redis_client.hset(
-        _job_key(job_id),
-        mapping={"status": status.value, "error_reason": error_reason or ""},
+    _write_job_status(
+        job_id,
+        {"status": status.value, "error_reason": error_reason or ""},
+        message=error_reason or "",
+        analysis_id=analysis_id,
     )
+    if analysis_id:
+        set_analysis_status(analysis_id, status.value)
 
 
 @celery_app.task(name="process_job")
-def process_job(job_id: str, analysis_id: str, filename: str, size: int) -> None:
+def process_job(job_id: str, analysis_id: str, filename: str, size: int, org_id: str | None = None) -> None:
     """Orchestration work for the document processing job."""
     log_extras = {"job_id": job_id, "analysis_id": analysis_id}
     logger.info("Starting job processing", extra=log_extras)
+    t_job_start = time.time()
+    span, span_token = begin_span("process_job", job_id=job_id)
+    set_analysis(analysis_id)
 
     try:
-        set_status(job_id, JobState.running)
+        set_status(job_id, JobState.running, analysis_id=analysis_id)
         a_dir = analysis_dir(analysis_id)
-        source_path = a_dir / filename
+        source_path = resolve_upload(analysis_id, filename)
 
-        write_analysis_json(analysis_id, filename=filename, size=size)
+        write_analysis_json(analysis_id, filename=filename, size=size, org_id=org_id)
 
         # Stage 1: Extraction
         t_start_ext = time.time()
         try:
-            extraction_path = run_extraction(analysis_id, source_path, a_dir)
-            record_extraction_artifact(
-                analysis_id=analysis_id,
-                job_id=job_id,
-                artifact_path=str(extraction_path),
-            )
+            with start_span("extraction"):
+                extraction_path = run_extraction(analysis_id, source_path, a_dir)
+            with start_span("db.write", target="extraction_artifacts"):
+                record_extraction_artifact(
+                    analysis_id=analysis_id,
+                    job_id=job_id,
+                    artifact_path=str(extraction_path),
+                )
             t_end_ext = time.time()
             latency_ms = round((t_end_ext - t_start_ext) * 1000)
             log_extras["latency_ms"] = latency_ms
+            observe("pipeline_stage_duration_ms", latency_ms, stage="extraction")
             logger.info("Extraction completed successfully", extra=log_extras)
 
         except Exception as e:
@@ -267,7 +372,7 @@ def process_job(job_id: str, analysis_id: str, filename: str, size: int) -> None
             latency_ms = round((t_end_ext - t_start_ext) * 1000)
             log_extras["latency_ms"] = latency_ms
             logger.error("Extraction failed", extra=log_extras)
-            set_status(job_id, JobState.error, error_reason=f"extraction_failed: {e}")
+            set_status(job_id, JobState.error, error_reason=f"extraction_failed: {e}", analysis_id=analysis_id)
             return
 
         # Stage 2: Detection (optional if detectors unavailable)
@@ -279,32 +384,68 @@ def process_job(job_id: str, analysis_id: str, filename: str, size: int) -> None
         if run_detectors is not None:
             t_start_det = time.time()
             try:
-                findings = run_detectors(analysis_id, str(extraction_path))
-                for f in findings:
-                    window = build_window(analysis_id, f.start, f.end)
-                    record_evidence_artifact(
-                        analysis_id=analysis_id,
-                        job_id=job_id,
-                        window=window,
-                    )
-                generate_html_export(analysis_id, findings)
+                with start_span("detection") as det_span:
+                    findings = run_detectors(analysis_id, str(extraction_path))
+                    det_span.set_attribute("findings", len(findings))
+                with start_span("evidence", findings=len(findings)):
+                    for f in findings:
+                        window = build_window(analysis_id, f.start, f.end)
+                        with start_span("db.write", target="evidence_artifacts"):
+                            record_evidence_artifact(
+                                analysis_id=analysis_id,
+                                job_id=job_id,
+                                window=window,
+                            )
+                with start_span("export", format="html"):
+                    generate_html_export(analysis_id, findings)
+                with start_span("db.write", target="catalogue"):
+                    update_verdicts(analysis_id, count_verdicts(findings))
                 t_end_det = time.time()
                 latency_ms = round((t_end_det - t_start_det) * 1000)
                 log_extras["latency_ms"] = latency_ms
+                observe("pipeline_stage_duration_ms", latency_ms, stage="detection")
                 logger.info("Detection completed successfully", extra=log_extras)
             except Exception as e:
                 t_end_det = time.time()
                 latency_ms = round((t_end_det - t_start_det) * 1000)
                 log_extras["latency_ms"] = latency_ms
                 logger.error("Detection failed", extra=log_extras)
-                set_status(job_id, JobState.error, error_reason=f"detection_failed: {e}")
+                set_status(job_id, JobState.error, error_reason=f"detection_failed: {e}", analysis_id=analysis_id)
                 return
         else:
             logger.info("Detection skipped: detectors unavailable", extra=log_extras)
 
-        set_status(job_id, JobState.done)
+        set_status(job_id, JobState.done, analysis_id=analysis_id)
         logger.info("Job processing completed successfully", extra=log_extras)
 
     except Exception as e:
         logger.error("Unhandled error in job processing", extra=log_extras)
-        set_status(job_id, JobState.error, error_reason=str(e))
+        set_status(job_id, JobState.error, error_reason=str(e), analysis_id=analysis_id)
+        span.status = "error"
+    finally:
+        job_ms = (time.time() - t_job_start) * 1000
+        observe("job_duration_ms", job_ms, task="process_job")
+        record_job_latency(job_ms)
+        flush(end_span(span, span_token))
+
+
+@celery_app.task(bind=True)
+def cleanup_task(self) -> dict:
+    """Enforce org retention policies on the maintenance queue.
+
+    Returns the GC report (analyses and rows deleted, bytes reclaimed,
+    runtime); ``complete`` is False when the batch budget ran out first.
+    """
+    return run_retention_gc()
+
+
+@celery_app.task(bind=True)
+def train_artifact_dictionary_task(self) -> dict:
+    """Retrain the shared zstd artifact dictionary on the maintenance queue.
+
+    A no-op unless ARTIFACT_COMPRESSION is enabled. ``dict_id`` is None when
+    there were too few artifacts to train on.
+    """
+    if not artifact_compression_enabled():
+        return {"enabled": False, "dict_id": None}
+    return {"enabled": True, "dict_id": train_artifact_dictionary()}
@@ -4,11 +4,26 @@ import os
 import json
 import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Optional, Any, Tuple
+from typing import Dict, Iterator, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 
-from .storage import analysis_dir
+try:  # pragma: no cover - POSIX only
+    import fcntl
+except ImportError:  # pragma: no cover - handled at runtime
+    fcntl = None
+
+from . import storage
+from .storage import (
+    artifact_exists,
+    delete_artifact,
+    read_artifact_json,
+    write_json_artifact,
+)
+
+TOTALS_FILE = "ledger_totals.json"
 
 
 @dataclass
@@ -40,13 +55,23 @@ class TokenUsage:
 
 
 class TokenLedger:
-    """Thread-safe token usage tracker with persistence."""
+    """Thread-safe token usage tracker with persistence.
+
+    Aggregates are running totals in ``ledger_totals.json`` next to the
+    per-analysis ``tokens.json`` files, updated by the same call that changes
+    an analysis. ``get_total_metrics`` therefore reads one small file instead
+    of walking every analysis. Updates to the totals hold an ``flock`` on
+    ``.ledger.lock`` so that several worker processes sharing the data
+    directory do not lose increments. Per-analysis usage is cached in an LRU
+    of ``TOKEN_LEDGER_CACHE_SIZE`` entries.
+    """
 
     def __init__(self, data_dir: Optional[Path] = None):
         self.data_dir = data_dir or Path("data/analyses")
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self._lock = threading.RLock()
-        self._cache: Dict[str, TokenUsage] = {}
+        self._cache: "OrderedDict[str, TokenUsage]" = OrderedDict()
+        self._cache_size = max(1, int(os.getenv("TOKEN_LEDGER_CACHE_SIZE", "1024")))
         self._cap_limit = int(os.getenv("TOKEN_CAP_PER_DOC", "20000"))
         self._cost_per_token = float(os.getenv("TOKEN_COST_PER_UNIT", "0.0001"))
 
@@ -54,32 +79,92 @@ class TokenLedger:
         """Get the path for token usage data."""
         return self.data_dir / analysis_id / "tokens.json"
 
-    def _load_usage(self, analysis_id: str) -> TokenUsage:
-        """Load token usage from disk or create new."""
-        if analysis_id in self._cache:
-            return self._cache[analysis_id]
+    def _totals_path(self) -> Path:
+        return self.data_dir / TOTALS_FILE
 
+    def _read_usage(self, analysis_id: str) -> Tuple[TokenUsage, bool]:
+        """Load token usage from disk; the flag says whether it was persisted."""
         usage_path = self._get_usage_path(analysis_id)
-        if usage_path.exists():
+        if artifact_exists(usage_path):
             try:
-                with usage_path.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
-                usage = TokenUsage.from_dict(data)
-            except (json.JSONDecodeError, KeyError):
-                usage = TokenUsage(analysis_id=analysis_id)
-        else:
-            usage = TokenUsage(analysis_id=analysis_id)
+                return TokenUsage.from_dict(read_artifact_json(usage_path)), True
+            except (json.JSONDecodeError, KeyError, TypeError):
+                pass
+        return TokenUsage(analysis_id=analysis_id), False
+
+    def _cache_put(self, usage: TokenUsage) -> None:
+        self._cache[usage.analysis_id] = usage
+        self._cache.move_to_end(usage.analysis_id)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
 
-        self._cache[analysis_id] = usage
+    def _load_usage(self, analysis_id: str) -> TokenUsage:
+        """Load token usage through the LRU cache."""
+        usage = self._cache.get(analysis_id)
+        if usage is not None:
+            self._cache.move_to_end(analysis_id)
+            return usage
+        usage, _ = self._read_usage(analysis_id)
+        self._cache_put(usage)
         return usage
 
     def _save_usage(self, usage: TokenUsage) -> None:
         """Save token usage to disk."""
-        usage_path = self._get_usage_path(usage.analysis_id)
-        usage_path.parent.mkdir(parents=True, exist_ok=True)
+        write_json_artifact(self._get_usage_path(usage.analysis_id), usage.to_dict())
+
+    # -- running totals ------------------------------------------------------
 
-        with usage_path.open("w", encoding="utf-8") as f:
-            json.dump(usage.to_dict(), f, indent=2)
+    @contextmanager
+    def _totals_file_lock(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(self.data_dir / ".ledger.lock", "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _read_totals(self) -> Optional[Dict[str, Any]]:
+        try:
+            return read_artifact_json(self._totals_path())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _scan_totals(self) -> Dict[str, Any]:
+        totals = {"analyses": 0, "tokens": 0, "cost": 0.0, "cap_exceeded": 0}
+        for entry in self.data_dir.iterdir():
+            if not entry.is_dir():
+                continue
+            usage, persisted = self._read_usage(entry.name)
+            if persisted:
+                totals["analyses"] += 1
+                totals["tokens"] += usage.total_tokens
+                totals["cost"] += usage.estimated_cost
+                totals["cap_exceeded"] += int(usage.cap_exceeded)
+        return totals
+
+    def _apply_delta(self, analyses: int = 0, tokens: int = 0, cost: float = 0.0, cap_exceeded: int = 0) -> None:
+        """Fold a change into the totals; call with the file lock held."""
+        totals = self._read_totals()
+        if totals is None:
+            # First use with existing analyses: backfill once. The file
+            # system already reflects this change, so no delta on top.
+            totals = self._scan_totals()
+        else:
+            totals["analyses"] += analyses
+            totals["tokens"] += tokens
+            totals["cost"] += cost
+            totals["cap_exceeded"] += cap_exceeded
+        write_json_artifact(self._totals_path(), totals)
+
+    def rebuild_totals(self) -> Dict[str, Any]:
+        """Recompute the running totals from every ``tokens.json`` (repair tool)."""
+        with self._lock, self._totals_file_lock():
+            totals = self._scan_totals()
+            write_json_artifact(self._totals_path(), totals)
+            return totals
 
     def add_tokens(
         self,
@@ -91,8 +176,13 @@ class TokenLedger:
 
         Returns (cap_exceeded: bool, reason: Optional[str])
         """
-        with self._lock:
-            usage = self._load_usage(analysis_id)
+        with self._lock, self._totals_file_lock():
+            # Re-read under the file lock: another worker may have written
+            # this analysis since it was cached here.
+            usage, persisted = self._read_usage(analysis_id)
+            self._cache_put(usage)
+            is_new = not persisted
+            was_capped = usage.cap_exceeded
 
             # Check cap before adding tokens
             projected_total = usage.total_tokens + input_tokens + output_tokens
@@ -101,11 +191,18 @@ class TokenLedger:
                 usage.cap_exceeded = True
                 usage.cap_reason = reason
                 self._save_usage(usage)
+                self._apply_delta(analyses=int(is_new), cap_exceeded=int(not was_capped))
                 return True, reason
 
             # Add tokens and save
+            cost_before = usage.estimated_cost
             usage.add_tokens(input_tokens, output_tokens, self._cost_per_token)
             self._save_usage(usage)
+            self._apply_delta(
+                analyses=int(is_new),
+                tokens=input_tokens + output_tokens,
+                cost=usage.estimated_cost - cost_before,
+            )
 
             return False, None
 
@@ -115,17 +212,18 @@ class TokenLedger:
             return self._load_usage(analysis_id)
 
     def get_all_usage(self) -> Dict[str, TokenUsage]:
-        """Get all token usage records."""
-        with self._lock:
-            # Load all existing records
-            all_usage = {}
-            if self.data_dir.exists():
-                for analysis_dir in self.data_dir.iterdir():
-                    if analysis_dir.is_dir():
-                        analysis_id = analysis_dir.name
-                        all_usage[analysis_id] = self._load_usage(analysis_id)
+        """Get all token usage records.
 
-            return all_usage
+        Walks every analysis directory; bypasses the cache so a full listing
+        does not evict the hot entries. Aggregates should use
+        :meth:`get_total_metrics` instead.
+        """
+        all_usage = {}
+        if self.data_dir.exists():
+            for analysis_dir in self.data_dir.iterdir():
+                if analysis_dir.is_dir():
+                    all_usage[analysis_dir.name] = self._read_usage(analysis_dir.name)[0]
+        return all_usage
 
     def get_cap_limit(self) -> int:
         """Get the current token cap limit."""
@@ -137,34 +235,37 @@ class TokenLedger:
             self._cap_limit = limit
 
     def get_total_metrics(self) -> Dict[str, Any]:
-        """Get aggregate metrics across all analyses."""
-        with self._lock:
-            all_usage = self.get_all_usage()
-
-            total_tokens = sum(u.total_tokens for u in all_usage.values())
-            total_cost = sum(u.estimated_cost for u in all_usage.values())
-            cap_exceeded_count = sum(1 for u in all_usage.values() if u.cap_exceeded)
-            analysis_count = len(all_usage)
-
-            return {
-                "total_analyses": analysis_count,
-                "total_tokens": total_tokens,
-                "total_cost": round(total_cost, 4),
-                "cap_exceeded_count": cap_exceeded_count,
-                "cap_limit": self._cap_limit,
-                "average_tokens_per_analysis": round(total_tokens / max(analysis_count, 1), 2),
-                "cap_exceeded_percentage": round((cap_exceeded_count / max(analysis_count, 1)) * 100, 2)
-            }
+        """Get aggregate metrics across all analyses (reads the running totals)."""
+        totals = self._read_totals()
+        if totals is None:
+            totals = self.rebuild_totals()
+
+        analysis_count = totals["analyses"]
+        total_tokens = totals["tokens"]
+        cap_exceeded_count = totals["cap_exceeded"]
+        return {
+            "total_analyses": analysis_count,
+            "total_tokens": total_tokens,
+            "total_cost": round(totals["cost"], 4),
+            "cap_exceeded_count": cap_exceeded_count,
+            "cap_limit": self._cap_limit,
+            "average_tokens_per_analysis": round(total_tokens / max(analysis_count, 1), 2),
+            "cap_exceeded_percentage": round((cap_exceeded_count / max(analysis_count, 1)) * 100, 2)
+        }
 
     def reset_usage(self, analysis_id: str) -> None:
         """Reset token usage for an analysis."""
-        with self._lock:
-            if analysis_id in self._cache:
-                del self._cache[analysis_id]
-
-            usage_path = self._get_usage_path(analysis_id)
-            if usage_path.exists():
-                usage_path.unlink()
+        with self._lock, self._totals_file_lock():
+            self._cache.pop(analysis_id, None)
+            usage, persisted = self._read_usage(analysis_id)
+            delete_artifact(self._get_usage_path(analysis_id))
+            if persisted:
+                self._apply_delta(
+                    analyses=-1,
+                    tokens=-usage.total_tokens,
+                    cost=-usage.estimated_cost,
+                    cap_exceeded=-int(usage.cap_exceeded),
+                )
 
 
 # Global ledger instance
@@ -173,15 +274,14 @@ _ledger_lock = threading.Lock()
 
 
 def get_token_ledger() -> TokenLedger:
-    """Get the global token ledger instance."""
+    """Get the global token ledger instance (rebuilt if ``DATA_ROOT`` moves)."""
     global _ledger_instance
-    if _ledger_instance is None:
+    # Same directory as analysis storage, next to each analysis
+    data_dir = storage.DATA_ROOT / "analyses"
+    if _ledger_instance is None or _ledger_instance.data_dir != data_dir:
         with _ledger_lock:
-            if _ledger_instance is None:
-                # Try to use the same data directory as analysis storage
-                from .storage import get_data_dir
-                data_dir = get_data_dir()
-                _ledger_instance = TokenLedger(data_dir / "analyses")
+            if _ledger_instance is None or _ledger_instance.data_dir != data_dir:
+                _ledger_instance = TokenLedger(data_dir)
     return _ledger_instance
 
 
@@ -0,0 +1,314 @@
+"""Lightweight local tracing from API request through Celery to detectors.
+
+Every HTTP request opens a root span. It continues the caller's W3C
+``traceparent`` header when one is sent, and otherwise starts a new trace.
+``enqueue_job`` publishes the current span as a ``traceparent`` task
+header, and the worker opens its task span under it. An upload and the
+``process_job`` run that follows it therefore share one trace id. The
+pipeline adds child spans for extraction, detection, evidence, export and
+DB writes with :func:`start_span`.
+
+Spans are buffered per process until the local root span ends (the HTTP
+request or the Celery task). They are then appended to
+``analyses/<id>/trace.jsonl`` of the analysis the trace was tagged with
+through :func:`set_analysis`. Traces never tagged with an analysis
+(health checks, listings) are dropped. That keeps disk use bounded, and
+retention removes traces along with their analysis. ``TRACE_EXPORTER``
+selects the line format: ``jsonl`` (default, one flat span per line),
+``otlp`` (OTLP/JSON ``resourceSpans`` per line, as written by the
+OpenTelemetry collector file exporter) or ``none``. No collector is
+required.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import storage
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+TRACE_FILENAME = "trace.jsonl"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class _Trace:
+    """Spans of one trace finished in this process, awaiting export."""
+
+    __slots__ = ("analysis_id", "spans", "closed", "_lock")
+
+    def __init__(self) -> None:
+        self.analysis_id: Optional[str] = None
+        self.spans: List["Span"] = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span") -> bool:
+        """Buffer ``span``; False once the local root has already flushed."""
+        with self._lock:
+            if self.closed:
+                return False
+            self.spans.append(span)
+            return True
+
+    def drain(self) -> List["Span"]:
+        with self._lock:
+            self.closed = True
+            spans, self.spans = self.spans, []
+            return spans
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    kind: str = "internal"
+    start_ns: int = 0
+    end_ns: int = 0
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns else 0.0
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+_current: ContextVar[Optional[Tuple[Span, _Trace]]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """``(trace_id, parent_span_id)`` from a W3C traceparent, or None if invalid."""
+    match = _TRACEPARENT.match((value or "").strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+def current_span() -> Optional[Span]:
+    entry = _current.get()
+    return entry[0] if entry else None
+
+
+def current_traceparent() -> Optional[str]:
+    span = current_span()
+    return span.traceparent if span else None
+
+
+def set_analysis(analysis_id: str) -> None:
+    """Tag the current trace with ``analysis_id`` so it is exported there."""
+    entry = _current.get()
+    if entry is not None:
+        entry[1].analysis_id = str(analysis_id)
+        entry[0].set_attribute("analysis_id", str(analysis_id))
+
+
+def begin_span(
+    name: str, traceparent: Optional[str] = None, kind: str = "internal", **attributes: Any
+) -> Tuple[Span, Token]:
+    """Open a span as a child of the current one, or of ``traceparent``.
+
+    A span with no parent in this process is a local root: ending it flushes
+    the trace. Pair with :func:`end_span` in the same context.
+    """
+    parent = _current.get()
+    if parent is not None:
+        trace_id, parent_id, trace = parent[0].trace_id, parent[0].span_id, parent[1]
+    else:
+        remote = parse_traceparent(traceparent)
+        trace_id, parent_id = remote or (secrets.token_hex(16), None)
+        trace = _Trace()
+    span = Span(
+        name=name,
+        trace_id=trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=parent_id,
+        kind=kind,
+        start_ns=time.time_ns(),
+        attributes=dict(attributes),
+    )
+    if trace.analysis_id and "analysis_id" not in span.attributes:
+        span.attributes["analysis_id"] = trace.analysis_id
+    return span, _current.set((span, trace))
+
+
+def end_span(span: Span, token: Token, error: Optional[BaseException] = None) -> Optional[_Trace]:
+    """Close ``span``; returns its trace when the caller must :func:`flush` it."""
+    span.end_ns = time.time_ns()
+    if error is not None:
+        span.status = "error"
+        span.attributes.setdefault("error", f"{type(error).__name__}: {error}")
+    trace = _current.get()[1]
+    _current.reset(token)
+    is_root = _current.get() is None
+    if not trace.add(span):
+        # The local root already flushed (e.g. a background task outliving
+        # its request); export the straggler on its own
+        export_spans(trace.analysis_id, [span])
+        return None
+    return trace if is_root else None
+
+
+def flush(trace: Optional[_Trace]) -> None:
+    if trace is not None:
+        export_spans(trace.analysis_id, trace.drain())
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Record the enclosed block as a span; exceptions mark it as an error."""
+    span, token = begin_span(name, **attributes)
+    error: Optional[BaseException] = None
+    try:
+        yield span
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        flush(end_span(span, token, error))
+
+
+def exporter_format() -> str:
+    return os.getenv("TRACE_EXPORTER", "jsonl").lower()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_line(spans: List[Span]) -> Dict[str, Any]:
+    kinds = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "blackletter"}}]},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [
+                            {
+                                "traceId": s.trace_id,
+                                "spanId": s.span_id,
+                                "parentSpanId": s.parent_id or "",
+                                "name": s.name,
+                                "kind": kinds.get(s.kind, 1),
+                                "startTimeUnixNano": str(s.start_ns),
+                                "endTimeUnixNano": str(s.end_ns),
+                                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                                "status": {"code": 2 if s.status == "error" else 1},
+                            }
+                            for s in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def _from_otlp(line: Dict[str, Any]) -> List[Dict[str, Any]]:
+    kinds = {1: "internal", 2: "server", 3: "client", 4: "producer", 5: "consumer"}
+    spans = []
+    for resource in line.get("resourceSpans", []):
+        for scope in resource.get("scopeSpans", []):
+            for s in scope.get("spans", []):
+                start, end = int(s["startTimeUnixNano"]), int(s["endTimeUnixNano"])
+                spans.append(
+                    {
+                        "trace_id": s["traceId"],
+                        "span_id": s["spanId"],
+                        "parent_id": s.get("parentSpanId") or None,
+                        "name": s["name"],
+                        "kind": kinds.get(s.get("kind"), "internal"),
+                        "start_ns": start,
+                        "end_ns": end,
+                        "duration_ms": round((end - start) / 1e6, 3),
+                        "status": "error" if s.get("status", {}).get("code") == 2 else "ok",
+                        "attributes": {a["key"]: next(iter(a["value"].values())) for a in s.get("attributes", [])},
+                    }
+                )
+    return spans
+
+
+def trace_path(analysis_id: str) -> Path:
+    return storage.analysis_path(analysis_id) / TRACE_FILENAME
+
+
+def export_spans(analysis_id: Optional[str], spans: List[Span]) -> None:
+    """Append ``spans`` to the analysis trace file in the configured format."""
+    fmt = exporter_format()
+    if not spans or not analysis_id or fmt == "none":
+        return
+    if fmt == "otlp":
+        lines = [json.dumps(_otlp_line(spans))]
+    else:
+        lines = [json.dumps(s.to_dict()) for s in spans]
+    path = trace_path(analysis_id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One write per flush; O_APPEND keeps concurrent API and worker
+        # processes from interleaving partial lines
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write("".join(f"{line}\n" for line in lines))
+    except OSError as exc:
+        logger.warning(f"Could not export {len(spans)} spans for {analysis_id}: {exc}")
+
+
+def load_trace(analysis_id: str) -> Optional[List[Dict[str, Any]]]:
+    """All exported spans of an analysis ordered by start time, or None."""
+    if not analysis_id or analysis_id.startswith(".") or "/" in analysis_id or "\\" in analysis_id:
+        return None
+    path = trace_path(analysis_id)
+    if not path.exists():
+        return None
+    spans: List[Dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as fh:
+        for raw in fh:
+            if not raw.strip():
+                continue
+            try:
+                line = json.loads(raw)
+            except json.JSONDecodeError:
+                continue  # torn final line from a crashed writer
+            spans.extend(_from_otlp(line) if "resourceSpans" in line else [line])
+    spans.sort(key=lambda s: s["start_ns"])
+    return spans
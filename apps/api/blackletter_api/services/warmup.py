@@ -0,0 +1,194 @@
+"""Worker warm-start preloading.
+
+The first job on a cold worker used to pay for importing PyMuPDF, blingfire
+and docx2python, reading the rulepack YAML, loading lexicons and building
+:class:`EnhancedGDPRAnalyzer`. :func:`warm_start` does all of that up front.
+
+When run in the Celery parent before the prefork pool is created, the loaded
+modules and compiled patterns are inherited by every child copy-on-write;
+``gc.freeze()`` keeps the collector from touching (and so copying) them.
+
+First-job latency per worker process is recorded in Redis so the admin
+metrics can report it separately from steady-state latency. Samples are
+fields keyed by ``host:pid`` and stamped with the time they were written;
+fields older than ``WORKER_STATS_TTL_SECONDS`` are trimmed, so restarted
+workers do not accumulate forever.
+"""
+from __future__ import annotations
+
+import gc
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FIRST_JOB_KEY = "worker:first_job_ms"
+WARM_START_KEY = "worker:warm_start_ms"
+
+_warm_report: Optional[Dict[str, float]] = None
+_warm_lock = threading.Lock()
+_first_job_recorded = False
+
+
+def preload_before_fork() -> bool:
+    """Check environment flag for warming in the parent before forking."""
+    return os.getenv("WORKER_PRELOAD_BEFORE_FORK", "1") == "1"
+
+
+def stats_ttl_seconds() -> int:
+    return int(os.getenv("WORKER_STATS_TTL_SECONDS", str(24 * 3600)))
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _timed(report: Dict[str, float], name: str, fn) -> None:
+    t0 = time.perf_counter()
+    try:
+        fn()
+    except Exception as exc:
+        logger.warning(f"Warm-start step '{name}' failed: {exc}")
+    report[f"{name}_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+
+
+def _warm_extractors() -> None:
+    from .extraction import get_extractor_registry
+
+    get_extractor_registry().warm_all()
+
+
+def _warm_rulepack() -> None:
+    from .rulepack_loader import load_rulepack
+
+    load_rulepack()
+
+
+def _warm_lexicons() -> None:
+    from .lexicon_registry import get_lexicon_registry
+
+    # Loads every language's lexicon and compiles all matchers
+    get_lexicon_registry().compile_all()
+
+
+def _warm_analyzer() -> None:
+    from .gdpr_analyzer import gdpr_analyzer
+
+    # Populate the ``re`` module cache with the analyzer's patterns using the
+    # same flags it matches with, so workers never compile them on the hot path.
+    for pattern in gdpr_analyzer.weak_language_patterns:
+        re.compile(pattern, re.IGNORECASE)
+    for spec in gdpr_analyzer.enhanced_patterns.values():
+        for pattern in (*spec.get("strong_patterns", []), *spec.get("weak_patterns", [])):
+            re.compile(pattern, re.IGNORECASE)
+
+
+def warm_start(freeze: bool = False) -> Dict[str, float]:
+    """Preload extraction libraries, rules, lexicons and the analyzer.
+
+    Idempotent per process. Returns per-step timings in milliseconds.
+    ``freeze`` moves everything loaded so far into the permanent GC
+    generation, which should only be done in a prefork parent.
+    """
+    global _warm_report
+    with _warm_lock:
+        if _warm_report is not None:
+            return _warm_report
+        report: Dict[str, float] = {}
+        t0 = time.perf_counter()
+        _timed(report, "extractors", _warm_extractors)
+        _timed(report, "rulepack", _warm_rulepack)
+        _timed(report, "lexicons", _warm_lexicons)
+        _timed(report, "analyzer", _warm_analyzer)
+        report["total_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        if freeze:
+            gc.collect()
+            gc.freeze()
+        _warm_report = report
+        logger.info(f"Worker warm start completed in {report['total_ms']}ms: {report}")
+        _publish(WARM_START_KEY, report["total_ms"])
+        return report
+
+
+def warm_report() -> Optional[Dict[str, float]]:
+    return _warm_report
+
+
+def _publish(key: str, value_ms: float) -> None:
+    try:
+        from . import tasks
+
+        client = tasks.redis_client
+        client.hset(key, mapping={_worker_id(): json.dumps({"ms": value_ms, "at": time.time()})})
+        client.expire(key, stats_ttl_seconds())
+        _live_samples(client, key)
+    except Exception as exc:
+        logger.debug(f"Could not publish {key}: {exc}")
+
+
+def _live_samples(client, key: str) -> List[float]:
+    """Samples in ``key`` younger than the TTL; older fields are deleted."""
+    cutoff = time.time() - stats_ttl_seconds()
+    live: List[float] = []
+    stale = []
+    for field, raw in (client.hgetall(key) or {}).items():
+        try:
+            sample = json.loads(raw)
+            value, at = float(sample["ms"]), float(sample["at"])
+        except (TypeError, ValueError, KeyError):
+            # Unstamped fields predate trimming
+            stale.append(field)
+            continue
+        if at < cutoff:
+            stale.append(field)
+        else:
+            live.append(value)
+    if stale:
+        try:
+            client.hdel(key, *stale)
+        except Exception:
+            pass
+    return live
+
+
+def reset_first_job() -> None:
+    """Reset per-process first-job tracking (forked children start fresh)."""
+    global _first_job_recorded
+    _first_job_recorded = False
+
+
+def record_job_latency(latency_ms: float) -> bool:
+    """Record ``latency_ms`` if this is the first job in this process.
+
+    Returns True when the latency was recorded as a first-job sample.
+    """
+    global _first_job_recorded
+    with _warm_lock:
+        if _first_job_recorded:
+            return False
+        _first_job_recorded = True
+    logger.info(f"First job on worker {_worker_id()} took {latency_ms:.0f}ms (warm={_warm_report is not None})")
+    _publish(FIRST_JOB_KEY, round(latency_ms, 2))
+    return True
+
+
+def get_warm_start_stats() -> Dict[str, float]:
+    """Aggregate first-job and warm-start timings reported by workers."""
+    try:
+        from . import tasks
+
+        first_values = _live_samples(tasks.redis_client, FIRST_JOB_KEY)
+        warm_values = _live_samples(tasks.redis_client, WARM_START_KEY)
+    except Exception:
+        first_values, warm_values = [], []
+    return {
+        "first_job_latency_ms": round(max(first_values), 2) if first_values else 0.0,
+        "first_job_samples": len(first_values),
+        "warm_start_ms": round(max(warm_values), 2) if warm_values else 0.0,
+    }
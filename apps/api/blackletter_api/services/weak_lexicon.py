@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from functools import lru_cache
 from typing import List
 
 from .lexicon_analyzer import load_lexicon
@@ -9,14 +8,14 @@ DEFAULT_WEAK_TERMS = ["may", "might", "could", "should"]
 DEFAULT_STRENGTHENERS = ["must", "shall"]
 
 
-@lru_cache(maxsize=1)
+# load_lexicon keeps per-(language, version) entries in process, so these
+# stay correct across languages and reloads without a cache of their own
 def get_weak_terms(language: str = "en") -> List[str]:
     lex = load_lexicon(language)
     terms = lex.weak_terms()
     return terms or DEFAULT_WEAK_TERMS.copy()
 
 
-@lru_cache(maxsize=1)
 def get_counter_anchors(language: str = "en") -> List[str]:
     lex = load_lexicon(language)
     anchors = list(lex.strengtheners)
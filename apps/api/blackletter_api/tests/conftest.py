@@ -43,15 +43,41 @@ except Exception:  # pragma: no cover - do not fail tests if unavailable
     pass
 
 # Stub Redis client for tests to avoid external dependency
+class DummyPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+    def hset(self, key, mapping):
+        self.ops.append(lambda: self.redis.hset(key, mapping=mapping))
+        return self
+    def publish(self, channel, message):
+        self.ops.append(lambda: self.redis.publish(channel, message))
+        return self
+    def execute(self):
+        return [op() for op in self.ops]
+
+
 class DummyRedis:
     def __init__(self):
         self.store = {}
+        self.published = []
     def hset(self, key, mapping):
-        self.store[key] = mapping
+        self.store.setdefault(key, {}).update(mapping)
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        return 0
+    def pipeline(self, transaction=True):
+        return DummyPipeline(self)
     def hgetall(self, key):
         return self.store.get(key, {})
     def exists(self, key):
         return key in self.store
+    def expire(self, key, seconds):
+        return key in self.store
+    def hincrby(self, key, field, amount=1):
+        bucket = self.store.setdefault(key, {})
+        bucket[field] = int(bucket.get(field, 0)) + amount
+        return bucket[field]
 
 
 try:
@@ -1,8 +1,15 @@
 import fakeredis
+import pytest
 from io import BytesIO
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
+from blackletter_api.database import get_db
 from blackletter_api.main import app
+from blackletter_api.models.entities import Base
+from blackletter_api.services import blob_store
 import blackletter_api.services.tasks as tasks
 
 client = TestClient(app)
@@ -12,7 +19,7 @@ def test_upload_enqueues_job(monkeypatch):
     monkeypatch.setattr(tasks, "redis_client", fakeredis.FakeRedis(decode_responses=True))
     called = {}
 
-    def fake_delay(job_id, analysis_id, filename, size):
+    def fake_delay(job_id, analysis_id, filename, size, org_id=None):
         called["args"] = (job_id, analysis_id, filename, size)
 
     monkeypatch.setattr(tasks.process_job, "delay", fake_delay)
@@ -26,3 +33,64 @@ def test_upload_enqueues_job(monkeypatch):
     assert job_id == data["id"]
     assert analysis_id == data["analysis_id"]
     assert filename.endswith(".pdf")
+
+
+@pytest.fixture()
+def isolated_db(monkeypatch):
+    # Own database, so the route does not depend on which suite created tables
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    def override():
+        with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override
+    monkeypatch.setattr(blob_store, "ingest_upload", lambda *args, **kwargs: None)
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
+
+def test_failed_enqueue_releases_the_dedup_claim(monkeypatch, isolated_db):
+    monkeypatch.setattr(tasks, "redis_client", fakeredis.FakeRedis(decode_responses=True))
+
+    def broken_delay(*args, **kwargs):
+        raise RuntimeError("broker down")
+
+    monkeypatch.setattr(tasks.process_job, "delay", broken_delay)
+    files = {"file": ("same.pdf", BytesIO(b"same bytes"), "application/pdf")}
+    try:
+        client.post("/api/contracts", files=files)
+    except RuntimeError:
+        pass
+
+    monkeypatch.setattr(tasks.process_job, "delay", lambda *args, **kwargs: None)
+    files = {"file": ("same.pdf", BytesIO(b"same bytes"), "application/pdf")}
+    resp = client.post("/api/contracts", files=files)
+    # The retry is enqueued instead of being handed the failed submission
+    assert resp.status_code == 201, resp.text
+
+
+def test_upload_disk_work_runs_on_the_io_pool(monkeypatch, isolated_db):
+    import shutil
+
+    from blackletter_api.services import storage
+
+    monkeypatch.setattr(tasks, "redis_client", fakeredis.FakeRedis(decode_responses=True))
+    monkeypatch.setattr(tasks.process_job, "delay", lambda *args, **kwargs: None)
+    offloaded = []
+    run_io = storage.run_io
+
+    async def recording_run_io(fn, *args, **kwargs):
+        offloaded.append(fn)
+        return await run_io(fn, *args, **kwargs)
+
+    monkeypatch.setattr(storage, "run_io", recording_run_io)
+    for expected in (201, 200):
+        files = {"file": ("dup.pdf", BytesIO(b"dup bytes"), "application/pdf")}
+        assert client.post("/api/contracts", files=files).status_code == expected
+
+    # Directory creation, and cleanup of the duplicate's upload, stay off the event loop
+    assert offloaded.count(storage.analysis_dir) == 2
+    assert shutil.rmtree in offloaded
@@ -52,6 +52,27 @@ class DummyRedis:
     def exists(self, key):
         return key in self.store
 
+    def publish(self, channel, message):
+        return 0
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class _Pipeline:
+            def __init__(self):
+                self.ops = []
+
+            def hset(self, key, mapping):
+                self.ops.append(lambda: redis.hset(key, mapping=mapping))
+
+            def publish(self, channel, message):
+                self.ops.append(lambda: redis.publish(channel, message))
+
+            def execute(self):
+                return [op() for op in self.ops]
+
+        return _Pipeline()
+
 
 def fake_run_extraction(analysis_id, source_path, out_dir):
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,130 @@
+"""Bytes-on-disk and read-latency benchmark for analysis artifacts.
+
+Run with ``pytest -s`` to see the report. Compares the legacy layout (plain
+JSON, pretty-printed findings, duplicate sentences.json) against compact
+zstd artifacts with and without a trained dictionary.
+"""
+from __future__ import annotations
+
+import json
+import statistics
+import time
+
+import pytest
+
+from blackletter_api.services import storage
+
+pytest.importorskip("zstandard")
+
+N_ANALYSES = 60
+
+
+def _artifacts(i: int) -> dict:
+    sentences = [
+        {
+            "page": 1 + j // 40,
+            "start": (j % 40) * 120,
+            "end": (j % 40) * 120 + 119,
+            "text": f"Clause {i}.{j}: the processor shall process personal data only on documented instructions.",
+        }
+        for j in range(200)
+    ]
+    page_map = [{"page": p, "start": (p - 1) * 4800, "end": p * 4800} for p in range(1, 6)]
+    findings = [
+        {
+            "detector_id": f"A28_3_{chr(97 + k)}",
+            "rule_id": f"A28_3_{chr(97 + k)}",
+            "verdict": ["pass", "weak", "missing"][k % 3],
+            "snippet": sentences[k * 7]["text"],
+            "page": 1,
+            "start": k * 120,
+            "end": k * 120 + 90,
+            "rationale": "anchor matched",
+            "category": None,
+            "confidence": None,
+            "reviewed": False,
+            "weak_language_detected": k % 3 == 1,
+            "lexicon_version": "v1",
+        }
+        for k in range(8)
+    ]
+    extraction = {
+        "text_path": "extracted.txt",
+        "page_map": page_map,
+        "sentences": sentences,
+        "meta": {"engine": "pymupdf"},
+        "checksum_sha256": f"{i:064x}",
+    }
+    return {
+        "extraction": extraction,
+        "sentences": {"sentences": sentences, "page_map": page_map},
+        "text": " ".join(s["text"] for s in sentences),
+        "findings": findings,
+        "tokens": {"analysis_id": str(i), "total_tokens": 4000 + i, "input_tokens": 4000 + i, "output_tokens": 0},
+    }
+
+
+def _write_legacy(d, a) -> None:
+    d.mkdir(parents=True, exist_ok=True)
+    (d / "extraction.json").write_text(json.dumps(a["extraction"]), encoding="utf-8")
+    (d / "sentences.json").write_text(json.dumps(a["sentences"]), encoding="utf-8")
+    (d / "extracted.txt").write_text(a["text"], encoding="utf-8")
+    (d / "findings.json").write_text(json.dumps(a["findings"], indent=2), encoding="utf-8")
+    (d / "tokens.json").write_text(json.dumps(a["tokens"], indent=2), encoding="utf-8")
+
+
+def _write_compact(d, a) -> None:
+    storage.write_json_artifact(d / "extraction.json", a["extraction"])
+    storage.write_artifact(d / "extracted.txt", a["text"])
+    storage.write_json_artifact(d / "findings.json", a["findings"])
+    storage.write_json_artifact(d / "tokens.json", a["tokens"])
+
+
+def _bytes_on_disk(root) -> int:
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+
+
+def _read_latency_ms(dirs) -> tuple[float, float]:
+    samples = []
+    for d in dirs:
+        t0 = time.perf_counter()
+        storage.read_artifact_json(d / "extraction.json")
+        storage.read_artifact_json(d / "findings.json")
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def test_artifact_storage_benchmark(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    storage.reset_artifact_dictionary_cache()
+    data = [_artifacts(i) for i in range(N_ANALYSES)]
+    report = {}
+
+    legacy_root = tmp_path / "legacy"
+    for i, a in enumerate(data):
+        _write_legacy(legacy_root / str(i), a)
+    report["legacy"] = (_bytes_on_disk(legacy_root), *_read_latency_ms([legacy_root / str(i) for i in range(N_ANALYSES)]))
+
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "1")
+    plain_root = tmp_path / "zstd"
+    for i, a in enumerate(data):
+        _write_compact(plain_root / str(i), a)
+    report["zstd"] = (_bytes_on_disk(plain_root), *_read_latency_ms([plain_root / str(i) for i in range(N_ANALYSES)]))
+
+    # Train on the analyses directory, then write a fresh set with the dictionary
+    for i, a in enumerate(data[:30]):
+        _write_compact(storage.analysis_dir(f"train{i}"), a)
+    assert storage.train_artifact_dictionary(dict_size=32_768)
+    dict_root = tmp_path / "zstd_dict"
+    for i, a in enumerate(data):
+        _write_compact(dict_root / str(i), a)
+    report["zstd+dict"] = (_bytes_on_disk(dict_root), *_read_latency_ms([dict_root / str(i) for i in range(N_ANALYSES)]))
+    storage.reset_artifact_dictionary_cache()
+
+    print(f"\n{'layout':<10} {'bytes':>10} {'ratio':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, (size, p50, p95) in report.items():
+        print(f"{name:<10} {size:>10} {report['legacy'][0] / size:>6.1f}x {p50:>8.3f} {p95:>8.3f}")
+
+    assert report["zstd"][0] < report["legacy"][0] / 3
+    assert report["zstd+dict"][0] <= report["zstd"][0]
@@ -0,0 +1,93 @@
+"""Throughput benchmark for the shared S3 access layer.
+
+Run with ``pytest -s`` to see the report. Uses moto's server as a local MinIO
+stand-in, so absolute numbers reflect loopback HTTP rather than a real
+object store; the comparison between strategies is what matters:
+
+- upload: single in-memory PUT (upstream style) vs managed multipart upload
+- download: whole-object GET into memory vs managed download / streaming
+- rulepack reads: new boto3 client per call (old loader) vs pooled client
+  with conditional GET
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import time
+
+import pytest
+
+from blackletter_api.services import s3_client
+
+moto_server = pytest.importorskip("moto.server")
+boto3 = pytest.importorskip("boto3")
+
+BUCKET = "bench"
+CREDS = dict(aws_access_key_id="minio", aws_secret_access_key="minio123", region_name="us-east-1")
+SIZE_MB = 24
+RULEPACK_READS = 30
+
+
+def _mb_per_s(seconds: float) -> float:
+    return SIZE_MB / seconds if seconds else float("inf")
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def test_s3_throughput_benchmark(tmp_path, monkeypatch):
+    server = moto_server.ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    try:
+        host, port = server.get_host_and_port()
+        endpoint = f"http://{host}:{port}"
+        raw = boto3.client("s3", endpoint_url=endpoint, **CREDS)
+        raw.create_bucket(Bucket=BUCKET)
+        monkeypatch.setenv("S3_MULTIPART_THRESHOLD_MB", "8")
+        monkeypatch.setenv("S3_MULTIPART_CHUNK_MB", "8")
+        s3_client.reset_s3_clients()
+        shared = s3_client.get_s3_client(
+            bucket=BUCKET, endpoint_url=endpoint, access_key="minio", secret_key="minio123"
+        )
+
+        data = os.urandom(SIZE_MB * 1024 * 1024)
+        src = tmp_path / "contract.bin"
+        src.write_bytes(data)
+        report = {}
+
+        report["upload single PUT"] = _timed(lambda: raw.put_object(Bucket=BUCKET, Key="single", Body=src.read_bytes()))
+        report["upload multipart"] = _timed(lambda: shared.upload_file(src, "multi"))
+        report["download in memory"] = _timed(lambda: raw.get_object(Bucket=BUCKET, Key="multi")["Body"].read())
+        report["download managed"] = _timed(lambda: shared.download_file("multi", tmp_path / "out.bin"))
+        report["download streamed"] = _timed(lambda: sum(len(c) for c in shared.stream("multi")))
+        assert (tmp_path / "out.bin").read_bytes() == data
+
+        print(f"\n{'transfer':<22} {'seconds':>8} {'MB/s':>8}")
+        for name, seconds in report.items():
+            print(f"{name:<22} {seconds:>8.3f} {_mb_per_s(seconds):>8.1f}")
+
+        raw.put_object(Bucket=BUCKET, Key="art28_v1.yaml", Body=b"name: art28\nversion: v1\n" * 200)
+
+        def fresh_client_read():
+            boto3.client("s3", endpoint_url=endpoint, **CREDS).get_object(Bucket=BUCKET, Key="art28_v1.yaml")["Body"].read()
+
+        latencies = {}
+        for name, fn in (
+            ("client per call", fresh_client_read),
+            ("pooled + ETag", lambda: shared.get_cached("art28_v1.yaml")),
+        ):
+            samples = sorted(_timed(fn) * 1000 for _ in range(RULEPACK_READS))
+            latencies[name] = (statistics.median(samples), samples[int(len(samples) * 0.95) - 1])
+
+        print(f"\n{'rulepack read':<22} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, (p50, p95) in latencies.items():
+            print(f"{name:<22} {p50:>8.2f} {p95:>8.2f}")
+
+        assert latencies["pooled + ETag"][0] < latencies["client per call"][0]
+        assert shared.stats["conditional_hits"] == RULEPACK_READS - 1
+    finally:
+        s3_client.reset_s3_clients()
+        server.stop()
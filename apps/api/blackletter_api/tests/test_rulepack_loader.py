@@ -6,6 +6,14 @@ from apps.api.blackletter_api.services.rulepack_loader import (
     RulepackLoader,
     S3CompatibleStorage,
 )
+from apps.api.blackletter_api.services.s3_client import reset_s3_clients
+
+
+@pytest.fixture(autouse=True)
+def _fresh_s3_clients():
+    reset_s3_clients()
+    yield
+    reset_s3_clients()
 
 
 def test_rulepack_loader_instantiation() -> None:
@@ -48,7 +56,7 @@ def test_s3_compatible_storage_disabled_when_missing() -> None:
         assert storage.enabled is False
 
 
-@patch('apps.api.blackletter_api.services.rulepack_loader.boto3')
+@patch('apps.api.blackletter_api.services.s3_client.boto3')
 def test_s3_compatible_storage_get_rulepack_success(mock_boto3) -> None:
     mock_client = MagicMock()
     mock_boto3.client.return_value = mock_client
@@ -68,7 +76,7 @@ def test_s3_compatible_storage_get_rulepack_success(mock_boto3) -> None:
     assert result.get('name') == 'test'
 
 
-@patch('apps.api.blackletter_api.services.rulepack_loader.boto3')
+@patch('apps.api.blackletter_api.services.s3_client.boto3')
 def test_s3_compatible_storage_get_rulepack_error(mock_boto3) -> None:
     mock_client = MagicMock()
     mock_boto3.client.return_value = mock_client
@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 from apps.api.blackletter_api.services.rulepack_loader import RulepackLoader, S3CompatibleStorage
+from apps.api.blackletter_api.services.s3_client import reset_s3_clients
 
 
 @patch('apps.api.blackletter_api.services.rulepack_loader.Path')
@@ -30,19 +31,20 @@ def test_list_available_versions_filesystem(mock_path):
     assert versions == ["1.2.3", "1.1.0", "1.0.0"]
 
 
-@patch('apps.api.blackletter_api.services.rulepack_loader.boto3')
+@patch('apps.api.blackletter_api.services.s3_client.boto3')
 def test_list_available_versions_s3(mock_boto3):
     """Test listing available versions from S3."""
+    reset_s3_clients()
     # Mock boto3 client
     mock_client = MagicMock()
     mock_boto3.client.return_value = mock_client
-    mock_client.list_objects_v2.return_value = {
+    mock_client.get_paginator.return_value.paginate.return_value = [{
         'Contents': [
             {'Key': 'art28_v1.2.3.yaml'},
             {'Key': 'art28_v1.0.0.yaml'},
             {'Key': 'art28_v1.1.0.yaml'}
         ]
-    }
+    }]
     
     storage = S3CompatibleStorage(
         endpoint_url='https://s3.example.com',
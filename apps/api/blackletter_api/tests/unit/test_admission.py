@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from blackletter_api.main import app
+from blackletter_api.models.schemas import JobState
+from blackletter_api.services import admission, tasks
+
+
+class FakeRedis:
+    def __init__(self, depth=0):
+        self.lists = {"gdpr_analysis": depth}
+        self.store = {}
+
+    def llen(self, key):
+        return self.lists.get(key, 0)
+
+    def hgetall(self, key):
+        return dict(self.store.get(key, {}))
+
+    def hincrby(self, key, field, amount=1):
+        bucket = self.store.setdefault(key, {})
+        bucket[field] = int(bucket.get(field, 0)) + amount
+        return bucket[field]
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.store.get(key, {}).pop(field, None)
+
+    def expire(self, key, seconds):
+        return True
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def hset(self, key, mapping):
+        self.store.setdefault(key, {}).update(mapping)
+
+    def publish(self, channel, message):
+        return 0
+
+    def execute(self):
+        return []
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    def install(depth):
+        redis = FakeRedis(depth)
+        monkeypatch.setattr(tasks, "redis_client", redis)
+        monkeypatch.setattr(admission, "broker_client", redis)
+        monkeypatch.setattr(admission, "_depth_cache", (0.0, 0))
+        return redis
+
+    monkeypatch.setenv("ADMISSION_WAIT_SLO_SECONDS", "60")
+    monkeypatch.setenv("ADMISSION_DEFAULT_THROUGHPUT", "1")
+    return install
+
+
+def test_rejects_with_503_when_projected_wait_exceeds_slo(fake_redis):
+    fake_redis(depth=90)
+
+    with pytest.raises(HTTPException) as exc:
+        admission.check_admission()
+
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "30"
+
+
+def test_observed_throughput_drives_projected_wait(fake_redis, monkeypatch):
+    monkeypatch.setenv("ADMISSION_THROUGHPUT_WINDOW_SECONDS", "60")
+    redis = fake_redis(depth=90)
+    now = 1_000_000.0
+    redis.store[admission.COMPLETIONS_KEY] = {str(int(now // 60)): 120, "1": 999}
+
+    snap = admission.snapshot(now)
+    assert snap.queue_depth == 90
+    assert snap.throughput_per_second == 2.0
+    assert snap.estimated_wait_seconds == 45.0
+    assert "1" not in redis.store[admission.COMPLETIONS_KEY]
+    admission.check_admission(now=now)
+
+
+def test_queue_depth_is_read_from_the_broker(fake_redis, monkeypatch):
+    fake_redis(depth=0)
+    monkeypatch.setattr(admission, "broker_client", FakeRedis(depth=500))
+
+    with pytest.raises(HTTPException) as exc:
+        admission.check_admission()
+    assert exc.value.detail["queue_depth"] == 500
+
+
+def test_only_terminal_outcomes_count_towards_throughput(fake_redis, monkeypatch):
+    redis = fake_redis(depth=0)
+    for status in (JobState.running, JobState.queued, JobState.error):
+        tasks._write_job_status("j1", {"status": status.value})
+
+    assert sum(redis.store[admission.COMPLETIONS_KEY].values()) == 1
+
+
+def test_org_quota_returns_429(fake_redis, monkeypatch):
+    fake_redis(depth=0)
+    monkeypatch.setenv("ADMISSION_ORG_QUOTA_PER_MINUTE", "2")
+    now = 1_000_040.0
+
+    admission.check_admission("org-a", now=now)
+    admission.check_admission("org-a", now=now)
+    admission.check_admission("org-b", now=now)
+    with pytest.raises(HTTPException) as exc:
+        admission.check_admission("org-a", now=now)
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "40"
+
+
+def test_upload_endpoint_returns_retry_after(fake_redis, tmp_path, monkeypatch):
+    from blackletter_api.services import storage
+
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    fake_redis(depth=1000)
+
+    res = TestClient(app).post(
+        "/api/",
+        files={"file": ("c.pdf", BytesIO(b"%PDF-1.4 body"), "application/pdf")},
+    )
+
+    assert res.status_code == 503
+    assert "Retry-After" in res.headers
+    assert not (tmp_path / "analyses").exists()
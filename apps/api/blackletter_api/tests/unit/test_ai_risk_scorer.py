@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import json
+import os
+
 import pytest
+from fastapi.testclient import TestClient
 
+from blackletter_api import main
+from blackletter_api.services import ai_risk_scorer as scorer_module, storage
 from blackletter_api.services.ai_risk_scorer import (
     AIRiskScorer,
     RiskCategory,
@@ -68,3 +74,80 @@ def test_analyze_contract_risk_critical_issues_drive_high_risk():
 
     assert profile.overall_level == RiskLevel.CRITICAL
     assert profile.overall_score == pytest.approx(0.89, abs=1e-4)
+
+
+def test_scan_counts_every_category_in_one_case_insensitive_pass():
+    scorer = AIRiskScorer()
+    counts = scorer.scan("The SLA covers uptime. An ICO Fine or Regulatory Penalty. Fees of €250k or 2 million.")
+
+    assert counts["operational_risk"]["service_levels"] == 2
+    # Overlapping phrases count for every category they match
+    assert counts["reputational_risk"]["regulatory_fines"] == 2
+    assert counts["financial_risk"]["penalty_clauses"] == 2
+    assert counts["financial_risk"]["high_value_contracts"] == 2
+    assert counts["legal_risk"]["arbitration_clauses"] == 0
+
+
+def test_overlapping_phrases_still_raise_each_category():
+    scorer = AIRiskScorer()
+    financial = scorer.analyze_contract_risk("Any regulatory penalty applies.", [])
+    legal = scorer.analyze_contract_risk("Disputes go to alternative dispute resolution.", [])
+    baseline = scorer.analyze_contract_risk("Nothing of note here.", [])
+
+    def score(profile, category):
+        return next(f.score for f in profile.risk_factors if f.category == category)
+
+    assert score(financial, RiskCategory.FINANCIAL) > score(baseline, RiskCategory.FINANCIAL)
+    counts = scorer.scan("Disputes go to alternative dispute resolution.")["legal_risk"]
+    assert counts["jurisdiction_issues"] == 1
+    assert counts["arbitration_clauses"] == 1
+    assert score(legal, RiskCategory.LEGAL) > score(baseline, RiskCategory.LEGAL)
+
+
+@pytest.fixture()
+def risk_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    scorer = AIRiskScorer()
+    calls = []
+    original = scorer.analyze_contract_risk
+
+    def counting(text, findings):
+        calls.append(text)
+        return original(text, findings)
+
+    monkeypatch.setattr(scorer, "analyze_contract_risk", counting)
+    monkeypatch.setattr("blackletter_api.routers.risk_analysis.ai_risk_scorer", scorer)
+    base = storage.analysis_dir("r1")
+    storage.write_artifact(base / "text.txt", "Valued at $5,000,000 with an SLA.")
+    storage.write_artifact(base / "findings.json", json.dumps([{"verdict": "pass"}]))
+    return TestClient(main.app), calls, base
+
+
+def test_repeat_requests_are_served_from_the_result_cache(risk_client):
+    client, calls, base = risk_client
+    first = client.get("/api/risk-analysis/r1").json()
+    second = client.get("/api/risk-analysis/r1").json()
+
+    assert len(calls) == 1
+    assert first["metadata"]["cached"] is False
+    assert second["metadata"]["cached"] is True
+    assert second["metadata"]["scorer_version"] == scorer_module.SCORER_VERSION
+    assert second["risk_profile"] == first["risk_profile"]
+
+    # Different request options are cached separately
+    client.get("/api/risk-analysis/r1", params={"include_text": False})
+    assert len(calls) == 2
+
+
+def test_changed_findings_invalidate_the_cached_result(risk_client):
+    client, calls, base = risk_client
+    client.get("/api/risk-analysis/r1")
+
+    path = storage.write_artifact(base / "findings.json", json.dumps([{"verdict": "missing"}] * 2))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    body = client.get("/api/risk-analysis/r1").json()
+
+    assert len(calls) == 2
+    assert body["metadata"]["cached"] is False
+    assert body["risk_profile"]["risk_factors"][0]["level"] == "critical"
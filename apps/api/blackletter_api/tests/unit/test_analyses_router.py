@@ -8,7 +8,7 @@ client = TestClient(app)
 
 
 def test_list_analyses_empty():
-    orchestrator._store.clear()
+    orchestrator.reset()
     res = client.get("/api/analyses?limit=50")
     assert res.status_code == 200
     body = res.json()
@@ -17,7 +17,7 @@ def test_list_analyses_empty():
 
 
 def test_analysis_summary_not_found():
-    orchestrator._store.clear()
+    orchestrator.reset()
     res = client.get("/api/analyses/missing")
     assert res.status_code == 404
     body = res.json()
@@ -26,10 +26,27 @@ def test_analysis_summary_not_found():
 
 
 def test_analysis_findings_not_found():
-    orchestrator._store.clear()
+    orchestrator.reset()
     res = client.get("/api/analyses/missing/findings")
     assert res.status_code == 404
     body = res.json()
     assert body["code"] == "not_found"
     assert isinstance(body["message"], str)
 
+
+
+def test_list_analyses_pages_with_cursor_and_status():
+    orchestrator.reset()
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        orchestrator.intake(name)
+
+    first = client.get("/api/analyses?limit=2")
+    assert [a["filename"] for a in first.json()] == ["a.pdf", "b.pdf"]
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(f"/api/analyses?limit=2&cursor={cursor}")
+    assert [a["filename"] for a in second.json()] == ["c.pdf"]
+    assert "X-Next-Cursor" not in second.headers
+
+    assert client.get("/api/analyses?status=REPORTED").json() == []
+    assert client.get("/api/analyses?status=bogus").status_code == 400
+    assert client.get("/api/analyses?cursor=bogus").status_code == 400
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from blackletter_api.services import evidence, storage
+
+pytest.importorskip("zstandard")
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    storage.reset_artifact_dictionary_cache()
+    yield tmp_path
+    storage.reset_artifact_dictionary_cache()
+
+
+def _extraction(i: int) -> dict:
+    sentences = [
+        {"page": 1, "start": j * 60, "end": j * 60 + 59, "text": f"The processor shall act on instruction {i}-{j}."}
+        for j in range(20)
+    ]
+    return {
+        "text_path": "extracted.txt",
+        "page_map": [{"page": 1, "start": 0, "end": 1200}],
+        "sentences": sentences,
+        "meta": {"engine": "pdf"},
+        "checksum_sha256": f"{i:064x}",
+    }
+
+
+def test_compressed_round_trip_is_transparent(data_root, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "1")
+    path = storage.analysis_dir("a1") / "extraction.json"
+
+    assert storage.write_json_artifact(path, _extraction(1)) == path
+
+    assert not path.exists()
+    assert (path.parent / "extraction.json.zst").exists()
+    assert storage.read_artifact_json(path) == _extraction(1)
+
+    # Turning compression off rewrites in plain form and removes the .zst copy
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "0")
+    storage.write_json_artifact(path, {"v": 2})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"v": 2}
+    assert not (path.parent / "extraction.json.zst").exists()
+
+
+def test_trained_dictionary_shrinks_artifacts_and_old_frames_stay_readable(data_root, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "1")
+    for i in range(40):
+        storage.write_json_artifact(storage.analysis_dir(f"s{i}") / "extraction.json", _extraction(i))
+    before = (storage.analysis_dir("s0") / "extraction.json.zst").stat().st_size
+
+    dict_id = storage.train_artifact_dictionary(dict_size=16_384)
+    assert dict_id
+
+    path = storage.analysis_dir("new") / "extraction.json"
+    storage.write_json_artifact(path, _extraction(0))
+    after = (path.parent / "extraction.json.zst").stat().st_size
+
+    assert after < before
+    assert storage.read_artifact_json(path) == _extraction(0)
+    assert storage.read_artifact_json(storage.analysis_dir("s1") / "extraction.json") == _extraction(1)
+
+
+def test_other_processes_pick_up_a_newly_trained_dictionary(data_root, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "1")
+    for i in range(40):
+        storage.write_json_artifact(storage.analysis_dir(f"s{i}") / "extraction.json", _extraction(i))
+    assert storage._active_dict() is None
+
+    # Trained elsewhere: this process never calls reset_artifact_dictionary_cache
+    monkeypatch.setattr(storage, "reset_artifact_dictionary_cache", lambda: None)
+    dict_id = storage.train_artifact_dictionary(dict_size=16_384)
+
+    assert storage._active_dict().dict_id() == dict_id
+
+
+def test_dictionary_training_runs_as_a_maintenance_task(data_root, monkeypatch):
+    from blackletter_api.services import tasks
+    from blackletter_api.services.celery_app import celery_app
+
+    name = tasks.train_artifact_dictionary_task.name
+    assert celery_app.conf.task_routes[name] == {"queue": "maintenance"}
+    assert celery_app.conf.beat_schedule["artifact-dictionary"]["task"] == name
+    assert tasks.train_artifact_dictionary_task.run() == {"enabled": False, "dict_id": None}
+
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "1")
+    for i in range(40):
+        storage.write_json_artifact(storage.analysis_dir(f"s{i}") / "extraction.json", _extraction(i))
+    report = tasks.train_artifact_dictionary_task.run()
+    assert report["enabled"] and report["dict_id"] == storage._active_dict().dict_id()
+
+
+def test_evidence_window_reads_sentences_from_extraction_when_deduplicated(data_root, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "1")
+    storage.write_json_artifact(storage.analysis_dir("a2") / "extraction.json", _extraction(2))
+    assert not storage.artifact_exists(storage.analysis_dir("a2") / "sentences.json")
+
+    window = evidence.build_window("a2", 65, 70, n_sentences=0)
+
+    assert window["snippet"] == "The processor shall act on instruction 2-1."
+
+
+def test_evidence_window_decompresses_extraction_once_per_analysis(data_root, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "1")
+    path = storage.analysis_dir("a3") / "extraction.json"
+    storage.write_json_artifact(path, _extraction(3))
+    reads = []
+    read = evidence.read_artifact_json
+    monkeypatch.setattr(evidence, "read_artifact_json", lambda p: reads.append(p) or read(p))
+
+    for offset in (5, 65, 125):
+        evidence.build_window("a3", offset, offset + 5, n_sentences=0)
+    assert len(reads) == 1
+
+    # A rewritten artifact is read again
+    storage.write_json_artifact(path, {**_extraction(3), "sentences": _extraction(3)["sentences"][:1]})
+    assert evidence.build_window("a3", 65, 70, n_sentences=0)["snippet"] == "The processor shall act on instruction 3-0."
+    assert len(reads) == 2
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from blackletter_api.database import Base
+from blackletter_api.models.entities import Blob, BlobRef, OrgSetting, RetentionPolicy
+from blackletter_api.services import blob_store, storage
+
+CONTENT = b"%PDF-1.4 identical contract"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture()
+def db_session() -> Session:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture()
+def local_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    monkeypatch.setenv("BLOB_GC_GRACE_SECONDS", "0")
+    blob_store.set_blob_backend(blob_store.LocalBlobBackend())
+    yield tmp_path
+    blob_store.set_blob_backend(None)
+
+
+def _upload(analysis_id: str, db: Session, org_id=None, name="contract.pdf"):
+    path = storage.analysis_dir(analysis_id) / name
+    path.write_bytes(CONTENT)
+    return blob_store.ingest_upload(analysis_id, path, DIGEST, org_id=org_id, db=db)
+
+
+def test_identical_uploads_are_stored_once(local_store, db_session):
+    _upload("a1", db_session)
+    _upload("a2", db_session)
+
+    blobs = list((local_store / "blobs").rglob(DIGEST))
+    assert len(blobs) == 1
+    assert db_session.get(Blob, DIGEST).refcount == 2
+    assert not (storage.analysis_dir("a1") / "contract.pdf").exists()
+
+    resolved = blob_store.resolve_upload("a2", "contract.pdf")
+    assert resolved.suffix == ".pdf"
+    assert resolved.read_bytes() == CONTENT
+
+
+def test_failed_commit_keeps_the_upload(local_store, db_session, monkeypatch):
+    def fail():
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(db_session, "commit", fail)
+    result = _upload("a1", db_session)
+
+    upload = storage.analysis_dir("a1") / "contract.pdf"
+    assert result == upload
+    assert upload.read_bytes() == CONTENT
+    assert not (storage.analysis_dir("a1") / "contract.pdf.blob").exists()
+    assert not list((local_store / "blobs").rglob(DIGEST))
+    assert blob_store.resolve_upload("a1", "contract.pdf") == upload
+
+
+def test_blob_deleted_only_after_last_reference(local_store, db_session):
+    _upload("a1", db_session)
+    _upload("a2", db_session)
+
+    blob_store.release_analysis("a1", db=db_session)
+    assert blob_store.collect_garbage(db=db_session)["blobs_deleted"] == 0
+
+    blob_store.release_analysis("a2", db=db_session)
+    result = blob_store.collect_garbage(now=datetime.utcnow() + timedelta(seconds=1), db=db_session)
+
+    assert result == {"blobs_deleted": 1, "bytes_freed": len(CONTENT)}
+    assert db_session.get(Blob, DIGEST) is None
+    assert not list((local_store / "blobs").rglob(DIGEST))
+
+
+def test_retention_policy_releases_expired_references(local_store, db_session):
+    org = uuid.uuid4()
+    db_session.add(OrgSetting(org_id=org, retention_policy=RetentionPolicy.thirty_days))
+    db_session.commit()
+    _upload("old", db_session, org_id=str(org))
+    _upload("new", db_session, org_id=str(org))
+    old_ref = db_session.query(BlobRef).filter(BlobRef.analysis_id == "old").one()
+    old_ref.created_at = datetime.utcnow() - timedelta(days=45)
+    db_session.commit()
+
+    result = blob_store.apply_retention(now=datetime.utcnow() + timedelta(seconds=1), db=db_session)
+
+    assert result["refs_released"] == 1
+    assert result["blobs_deleted"] == 0
+    assert db_session.get(Blob, DIGEST).refcount == 1
+
+
+def test_s3_backend_against_local_stand_in(local_store, db_session):
+    moto_server = pytest.importorskip("moto.server")
+    boto3 = pytest.importorskip("boto3")
+
+    server = moto_server.ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    try:
+        host, port = server.get_host_and_port()
+        endpoint = f"http://{host}:{port}"
+        boto3.client(
+            "s3", endpoint_url=endpoint, aws_access_key_id="minio", aws_secret_access_key="minio123",
+            region_name="us-east-1",
+        ).create_bucket(Bucket="contracts")
+        backend = blob_store.S3BlobBackend(
+            bucket="contracts", endpoint_url=endpoint, access_key="minio", secret_key="minio123"
+        )
+        blob_store.set_blob_backend(backend)
+
+        _upload("s1", db_session)
+        _upload("s2", db_session)
+        assert backend.exists(DIGEST)
+        assert blob_store.resolve_upload("s1", "contract.pdf").read_bytes() == CONTENT
+
+        blob_store.release_analysis("s1", db=db_session)
+        blob_store.release_analysis("s2", db=db_session)
+        blob_store.collect_garbage(now=datetime.utcnow() + timedelta(seconds=1), db=db_session)
+        assert not backend.exists(DIGEST)
+    finally:
+        server.stop()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from blackletter_api.database import Base
+from blackletter_api.models.schemas import VerdictCounts
+from blackletter_api.services import catalogue, storage
+
+
+@pytest.fixture()
+def db_session() -> Session:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as session:
+        yield session
+
+
+def _seed(db: Session, n: int) -> None:
+    for i in range(n):
+        catalogue.upsert_entry(
+            f"a{i:03d}",
+            f"{'msa' if i % 2 else 'dpa'}_{i}.pdf",
+            100 + i,
+            f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}+00:00",
+            "done" if i % 3 else "error",
+            db=db,
+        )
+
+
+def test_cursor_pagination_walks_all_entries_newest_first(db_session: Session) -> None:
+    _seed(db_session, 25)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = catalogue.list_entries(limit=10, cursor=cursor, db=db_session)
+        seen.extend(item.id for item in page)
+        if cursor is None:
+            break
+
+    assert seen == [f"a{i:03d}" for i in reversed(range(25))]
+
+
+def test_filters_by_status_and_filename_prefix(db_session: Session) -> None:
+    _seed(db_session, 12)
+
+    page, _ = catalogue.list_entries(limit=50, status="error", filename_prefix="dpa", db=db_session)
+
+    assert {item.id for item in page} == {"a000", "a006"}
+    assert catalogue.list_entries(limit=50, filename_prefix="dpa%", db=db_session)[0] == []
+
+
+def test_verdict_counts_are_precomputed(db_session: Session) -> None:
+    _seed(db_session, 1)
+    catalogue.update_verdicts("a000", VerdictCounts(pass_count=3, weak_count=1), db=db_session)
+
+    page, _ = catalogue.list_entries(limit=1, db=db_session)
+    assert page[0].verdicts.pass_count == 3
+    assert page[0].verdicts.weak_count == 1
+
+
+def test_rebuild_indexes_existing_analysis_json(db_session: Session, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    d = tmp_path / "analyses" / "legacy"
+    d.mkdir(parents=True)
+    (d / "analysis.json").write_text(
+        json.dumps({"id": "legacy", "filename": "old.pdf", "size": 7, "created_at": "2025-05-01T00:00:00+00:00", "status": "done"})
+    )
+
+    assert catalogue.rebuild_catalogue(db=db_session) == 1
+    page, _ = catalogue.list_entries(limit=5, db=db_session)
+    assert [(item.id, item.filename, item.size) for item in page] == [("legacy", "old.pdf", 7)]
+
+
+def test_invalid_cursor_raises_value_error(db_session: Session) -> None:
+    with pytest.raises(ValueError):
+        catalogue.list_entries(cursor="not-a-cursor", db=db_session)
+
+
+@pytest.fixture()
+def catalogue_db(tmp_path, monkeypatch):
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(catalogue, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(catalogue, "_backfilled_roots", set())
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    return tmp_path
+
+
+def test_backfill_runs_once_even_after_new_uploads(catalogue_db) -> None:
+    legacy = catalogue_db / "analyses" / "legacy"
+    legacy.mkdir(parents=True)
+    (legacy / "analysis.json").write_text(
+        json.dumps({"id": "legacy", "filename": "old.pdf", "size": 7, "created_at": "2025-05-01T00:00:00+00:00", "status": "done"})
+    )
+    # A new upload is catalogued before anyone lists analyses
+    storage.write_analysis_json("fresh", "new.pdf", 3)
+
+    page, _ = storage.list_analyses_page(limit=10)
+    assert {item.id for item in page} == {"legacy", "fresh"}
+    assert (catalogue_db / "analyses" / catalogue.BACKFILL_MARKER).exists()
+
+    # After a restart the marker stops a second scan of the disk
+    catalogue._backfilled_roots.clear()
+    (catalogue_db / "analyses" / "stray").mkdir()
+    (catalogue_db / "analyses" / "stray" / "analysis.json").write_text(json.dumps({"id": "stray"}))
+    assert len(storage.list_analyses_page(limit=10)[0]) == 2
+
+
+def test_status_filter_follows_the_job_state(catalogue_db) -> None:
+    storage.write_analysis_json("a1", "dpa.pdf", 3)
+    storage.write_analysis_json("a2", "msa.pdf", 3)
+    storage.set_analysis_status("a2", "done")
+
+    assert [i.id for i in storage.list_analyses_page(status="running")[0]] == ["a1"]
+    assert [i.id for i in storage.list_analyses_page(status="done")[0]] == ["a2"]
+    assert storage.load_analysis_summary("a2").state == "done"
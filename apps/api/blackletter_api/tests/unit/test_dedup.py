@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from blackletter_api import database
+from blackletter_api.models.entities import Base, ComplianceMode, OrgSetting
+from blackletter_api.models.schemas import JobState
+from blackletter_api.services import dedup, tasks
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def hset(self, key, mapping):
+        self.store.setdefault(key, {}).update(mapping)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def delete(self, key):
+        return int(self.store.pop(key, None) is not None)
+
+    def hgetall(self, key):
+        return dict(self.store.get(key, {}))
+
+    def exists(self, key):
+        return key in self.store
+
+    def expire(self, key, seconds):
+        return True
+
+    def hincrby(self, key, field, amount=1):
+        bucket = self.store.setdefault(key, {})
+        bucket[field] = int(bucket.get(field, 0)) + amount
+        return bucket[field]
+
+
+def _seed_job(redis: FakeRedis, job_id: str, status: JobState) -> None:
+    redis.hset(
+        f"job:{job_id}",
+        mapping={
+            "id": job_id,
+            "status": status.value,
+            "analysis_id": "a1",
+            "error_reason": "",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+    )
+
+
+def test_fingerprint_depends_on_rulepack_and_settings():
+    base = dedup.submission_fingerprint("abc", "v1", {"compliance_mode": "strict"})
+    assert base == dedup.submission_fingerprint("abc", "v1", {"compliance_mode": "strict"})
+    assert base != dedup.submission_fingerprint("abc", "v2", {"compliance_mode": "strict"})
+    assert base != dedup.submission_fingerprint("abc", "v1", {"compliance_mode": "standard"})
+    assert base != dedup.submission_fingerprint("abd", "v1", {"compliance_mode": "strict"})
+
+
+def test_fingerprint_uses_the_submitting_orgs_settings(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=engine))
+    strict, standard = uuid.uuid4(), uuid.uuid4()
+    with database.SessionLocal() as db:
+        db.add_all([
+            OrgSetting(org_id=strict, compliance_mode=ComplianceMode.strict),
+            OrgSetting(org_id=standard, compliance_mode=ComplianceMode.standard),
+        ])
+        db.commit()
+
+    assert dedup.current_org_settings(str(standard))["compliance_mode"] == "standard"
+    assert dedup.current_org_settings(str(strict))["org_id"] == str(strict)
+    # Same bytes from two tenants never share a dedup entry
+    assert dedup.submission_fingerprint("abc", "v1", org_id=str(strict)) != dedup.submission_fingerprint(
+        "abc", "v1", org_id=str(standard)
+    )
+    unknown = str(uuid.uuid4())
+    assert dedup.current_org_settings(unknown) == {"org_id": unknown}
+
+
+def test_find_duplicate_returns_remembered_job(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(tasks, "redis_client", redis)
+    _seed_job(redis, "j1", JobState.done)
+
+    fp = dedup.submission_fingerprint("abc", "v1", {})
+    assert dedup.find_duplicate(fp) is None
+    dedup.remember_submission(fp, "j1", "a1")
+    assert dedup.find_duplicate(fp) == {"job_id": "j1", "analysis_id": "a1"}
+
+
+def test_find_duplicate_ignores_failed_jobs(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(tasks, "redis_client", redis)
+    _seed_job(redis, "j2", JobState.error)
+
+    fp = dedup.submission_fingerprint("abc", "v1", {})
+    dedup.remember_submission(fp, "j2", "a1")
+    assert dedup.find_duplicate(fp) is None
+
+
+def test_concurrent_identical_submissions_share_one_claim(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(tasks, "redis_client", redis)
+    fp = dedup.submission_fingerprint("abc", "v1", {})
+
+    # Both uploads arrive before either job is enqueued
+    assert dedup.claim_submission(fp, "j1", "a1") is None
+    assert dedup.claim_submission(fp, "j2", "a2") == {"job_id": "j1", "analysis_id": "a1"}
+
+    _seed_job(redis, "j1", JobState.queued)
+    dedup.remember_submission(fp, "j1", "a1")
+    assert dedup.claim_submission(fp, "j3", "a3") == {"job_id": "j1", "analysis_id": "a1"}
+
+
+def test_failed_enqueue_releases_the_claim(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(tasks, "redis_client", redis)
+    fp = dedup.submission_fingerprint("abc", "v1", {})
+
+    assert dedup.claim_submission(fp, "j1", "a1") is None
+    dedup.release_submission(fp, "other")
+    assert dedup.claim_submission(fp, "j2", "a2") is not None
+    dedup.release_submission(fp, "j1")
+    assert dedup.claim_submission(fp, "j2", "a2") is None
+
+
+def test_claim_held_by_a_failed_job_is_taken_over(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(tasks, "redis_client", redis)
+    _seed_job(redis, "j1", JobState.error)
+    fp = dedup.submission_fingerprint("abc", "v1", {})
+
+    dedup.remember_submission(fp, "j1", "a1")
+    assert dedup.claim_submission(fp, "j2", "a2") is None
+    assert dedup.claim_submission(fp, "j3", "a3") == {"job_id": "j2", "analysis_id": "a2"}
+
+
+def test_dedup_stats_hit_rate(monkeypatch):
+    monkeypatch.setattr(tasks, "redis_client", FakeRedis())
+    dedup.record_outcome(hit=True)
+    dedup.record_outcome(hit=False)
+    dedup.record_outcome(hit=False)
+    dedup.record_outcome(hit=True)
+
+    stats = dedup.get_dedup_stats()
+    assert stats["dedup_hits"] == 2
+    assert stats["dedup_misses"] == 2
+    assert stats["dedup_hit_rate"] == 50.0
@@ -6,7 +6,7 @@ import blackletter_api.services.tasks as tasks
 def test_enqueue_job_sync(monkeypatch):
     called: dict[str, tuple] = {}
 
-    def fake_process(job_id, analysis_id, filename, size):  # noqa: ANN001
+    def fake_process(job_id, analysis_id, filename, size, org_id=None):  # noqa: ANN001
         called["args"] = (job_id, analysis_id, filename, size)
 
     monkeypatch.setattr(tasks, "process_job", fake_process)
@@ -17,7 +17,7 @@ def test_enqueue_job_sync(monkeypatch):
 def test_enqueue_job_async(monkeypatch):
     called: dict[str, tuple] = {}
 
-    def fake_delay(job_id, analysis_id, filename, size):  # noqa: ANN001
+    def fake_delay(job_id, analysis_id, filename, size, org_id=None):  # noqa: ANN001
         called["args"] = (job_id, analysis_id, filename, size)
 
     monkeypatch.setattr(tasks.process_job, "delay", fake_delay)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("docx2python")
+pytest.importorskip("blingfire")
+
+from blackletter_api.services import extraction
+from blackletter_api.services.extraction import (
+    BaseExtractor,
+    ExtractorRegistry,
+    PdfExtractor,
+    get_extractor_registry,
+)
+from blackletter_api.services.tasks import extract_text_from_file
+
+
+def _make_pdf(path: Path, text: str | None) -> None:
+    doc = fitz.open()
+    page = doc.new_page()
+    if text:
+        page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+class StubOcr(BaseExtractor):
+    engine = "stub-ocr"
+    suffixes = (".pdf",)
+
+    def __init__(self):
+        super().__init__(max_concurrency=1)
+        self.calls = 0
+
+    def _extract(self, path: Path):
+        self.calls += 1
+        return {
+            "pages": [{"page": 1, "text": "Scanned text.", "char_start": 0, "char_end": 13}],
+            "sentences": [{"page": 1, "start": 0, "end": 13, "text": "Scanned text."}],
+            "engine": "stub-ocr",
+        }
+
+
+def test_registry_dispatches_by_suffix_and_rejects_unknown():
+    registry = get_extractor_registry()
+    assert registry.for_path(Path("a.PDF")).engine == "pdf"
+    assert registry.for_path(Path("a.docx")).engine == "docx"
+    with pytest.raises(ValueError):
+        registry.for_path(Path("a.png"))
+
+
+def test_registry_reuses_warm_instances():
+    registry = get_extractor_registry()
+    first = registry.for_path(Path("x.pdf"))
+    assert registry.for_path(Path("y.pdf")) is first
+    registry.warm_all()
+    assert first._warm is True
+
+
+def test_register_duplicate_suffix_requires_replace():
+    registry = ExtractorRegistry()
+    registry.register(PdfExtractor())
+    with pytest.raises(ValueError):
+        registry.register(PdfExtractor())
+    registry.register(PdfExtractor(max_concurrency=1), replace=True)
+    assert registry.for_path(Path("a.pdf")).max_concurrency == 1
+
+
+def test_ocr_fallback_only_when_enabled(tmp_path, monkeypatch):
+    pdf = tmp_path / "scan.pdf"
+    _make_pdf(pdf, None)
+    ocr = StubOcr()
+    extractor = PdfExtractor(ocr=ocr)
+
+    monkeypatch.setenv("OCR_ENABLED", "0")
+    assert extractor.extract(pdf)["engine"] == "pymupdf"
+    assert ocr.calls == 0
+
+    monkeypatch.setenv("OCR_ENABLED", "1")
+    result = extractor.extract(pdf)
+    assert result["engine"] == "stub-ocr"
+    assert ocr.calls == 1
+
+
+def test_extract_text_from_file_returns_real_pdf_text(tmp_path):
+    pdf = tmp_path / "contract.pdf"
+    _make_pdf(pdf, "The processor shall act on documented instructions.")
+
+    text = extract_text_from_file(str(pdf), "contract.pdf")
+    assert "documented instructions" in text
+    assert "placeholder" not in text
+
+
+def test_concurrency_limit_from_env(monkeypatch):
+    monkeypatch.setenv("EXTRACT_CONCURRENCY_PDF", "3")
+    assert PdfExtractor().max_concurrency == 3
+    assert extraction.DocxExtractor(max_concurrency=0).max_concurrency == 1
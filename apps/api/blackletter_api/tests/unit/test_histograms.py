@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import random
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from blackletter_api.services import histograms
+from blackletter_api.services.histograms import DDSketch, HistogramRegistry, render_prometheus
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(4, 1.2) for _ in range(20000)]
+    sketch = DDSketch(0.01)
+    for v in values:
+        sketch.add(v)
+
+    for q in (0.5, 0.9, 0.95, 0.99):
+        assert sketch.quantile(q) == pytest.approx(_exact(values, q), rel=0.02)
+    assert sketch.count == len(values)
+    assert len(sketch.bins) < 1000
+
+
+def test_merged_sketches_match_a_single_sketch():
+    rng = random.Random(3)
+    parts = [[rng.expovariate(0.01) for _ in range(3000)] for _ in range(3)]
+    whole, merged = DDSketch(0.01), DDSketch(0.01)
+    for part in parts:
+        shard = DDSketch(0.01)
+        for v in part:
+            whole.add(v)
+            shard.add(v)
+        merged.merge(DDSketch.from_dict(shard.to_dict()))
+
+    assert merged.bins == whole.bins
+    assert merged.quantile(0.95) == whole.quantile(0.95)
+    with pytest.raises(ValueError):
+        merged.merge(DDSketch(0.05))
+
+
+def test_collect_merges_peer_workers_and_drops_stale(monkeypatch):
+    monkeypatch.setenv("TELEMETRY_PUBLISH_SECONDS", "0")
+    client = fakeredis.FakeRedis(decode_responses=True)
+    peer, local = HistogramRegistry(), HistogramRegistry()
+    for v in (10, 20, 30):
+        peer.observe("queue_wait_ms", v, queue="default")
+    local.observe("queue_wait_ms", 40, queue="default")
+
+    monkeypatch.setattr(histograms, "worker_id", lambda: "worker-a")
+    peer.publish(client)
+    client.hset(histograms.TELEMETRY_KEY, "worker-gone", '{"ts": 0, "series": {}}')
+    monkeypatch.setattr(histograms, "worker_id", lambda: "worker-b")
+
+    merged = local.merged("queue_wait_ms", client)
+
+    assert merged.count == 4
+    assert merged.max == 40
+    assert client.hkeys(histograms.TELEMETRY_KEY) == ["worker-a"]
+
+
+def test_prometheus_exposition_format():
+    sketch = DDSketch(0.01)
+    for v in (5, 10, 15):
+        sketch.add(v)
+    text = render_prometheus({("http_request_duration_ms", (("route", '/api/"x"'), ("status", "200"))): sketch})
+
+    assert "# TYPE http_request_duration_ms summary" in text
+    assert 'http_request_duration_ms{route="/api/\\"x\\"",status="200",quantile="0.95"}' in text
+    assert 'http_request_duration_ms_count{route="/api/\\"x\\"",status="200"} 3' in text
+    assert 'http_request_duration_ms_sum{route="/api/\\"x\\"",status="200"} 30' in text
+
+
+def test_metrics_endpoint_reports_route_latency(monkeypatch):
+    from blackletter_api.main import app
+
+    monkeypatch.setenv("TELEMETRY_PUBLISH_SECONDS", "0")
+    registry = HistogramRegistry()
+    monkeypatch.setattr(histograms, "_registry", registry)
+    monkeypatch.setattr(registry, "collect", lambda client=None: registry.snapshot())
+    client = TestClient(app)
+
+    client.get("/healthz")
+    res = client.get("/metrics")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_ms_count{method="GET",route="/healthz",status="200"} 1' in res.text
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+from celery.exceptions import Retry
+from fastapi.testclient import TestClient
+
+from blackletter_api.main import app
+from blackletter_api.models.schemas import JobState
+from blackletter_api.services import tasks
+
+
+class RecordingRedis:
+    def __init__(self):
+        self.store = {}
+        self.published = []
+        self.round_trips = 0
+
+    def hset(self, key, mapping):
+        self.store.setdefault(key, {}).update(mapping)
+
+    def hgetall(self, key):
+        return dict(self.store.get(key, {}))
+
+    def exists(self, key):
+        return key in self.store
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+    def pipeline(self, transaction=True):
+        redis = self
+        ops = []
+
+        class _Pipeline:
+            def hset(self, key, mapping):
+                ops.append(lambda: redis.hset(key, mapping=mapping))
+
+            def publish(self, channel, message):
+                ops.append(lambda: redis.publish(channel, message))
+
+            def execute(self):
+                redis.round_trips += 1
+                return [op() for op in ops]
+
+        return _Pipeline()
+
+
+def _seed(redis: RecordingRedis, job_id: str, status: JobState) -> None:
+    redis.hset(
+        f"job:{job_id}",
+        mapping={
+            "id": job_id,
+            "status": status.value,
+            "analysis_id": "a1",
+            "error_reason": "",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+    )
+
+
+def test_update_job_status_writes_and_publishes_once(monkeypatch):
+    redis = RecordingRedis()
+    monkeypatch.setattr(tasks, "redis_client", redis)
+    _seed(redis, "j1", JobState.queued)
+
+    tasks.update_job_status("j1", JobState.running, "Extracting", analysis_id="a1")
+
+    assert redis.round_trips == 1
+    assert redis.store["job:j1"]["status"] == "running"
+    assert redis.store["job:j1"]["error_reason"] == "Extracting"
+    assert "updated_at" in redis.store["job:j1"]
+    channels = [c for c, _ in redis.published]
+    assert channels == ["job_events:j1", "analysis_events:a1"]
+    assert redis.published[0][1]["status"] == "running"
+
+
+def test_failed_attempt_is_terminal_only_once_retries_are_exhausted(monkeypatch):
+    redis = RecordingRedis()
+    monkeypatch.setattr(tasks, "redis_client", redis)
+    _seed(redis, "j1", JobState.queued)
+
+    def boom(*args):
+        raise ConnectionError("transient")
+
+    monkeypatch.setattr(tasks, "resolve_upload", boom)
+    task = tasks.process_contract_analysis
+
+    with pytest.raises(Retry):
+        task.run("j1", "a1", "contract.pdf")
+    statuses = [e["status"] for c, e in redis.published if c == "job_events:j1"]
+    assert statuses[-1] == "queued"
+    assert "error" not in statuses
+
+    task.push_request(retries=task.max_retries)
+    try:
+        with pytest.raises(ConnectionError):
+            task.run("j1", "a1", "contract.pdf")
+    finally:
+        task.pop_request()
+    assert redis.published[-2][1]["status"] == "error"
+    assert redis.store["job:j1"]["status"] == "error"
+
+
+def test_sse_stream_for_finished_job_sends_snapshot(monkeypatch):
+    redis = RecordingRedis()
+    monkeypatch.setattr(tasks, "redis_client", redis)
+    _seed(redis, "j2", JobState.done)
+
+    client = TestClient(app)
+    res = client.get("/api/jobs/j2/events")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    frames = [line for line in res.text.splitlines() if line.startswith("data: ")]
+    assert len(frames) == 1
+    event = json.loads(frames[0][len("data: "):])
+    assert event["status"] == "done"
+    assert event["analysis_id"] == "a1"
+
+
+def test_sse_stream_unknown_job_404(monkeypatch):
+    monkeypatch.setattr(tasks, "redis_client", RecordingRedis())
+    client = TestClient(app)
+    res = client.get("/api/jobs/missing/events")
+    assert res.status_code == 404
@@ -12,3 +12,46 @@ def test_job_not_found():
     body = res.json()
     assert body["code"] == "not_found"
     assert isinstance(body["message"], str)
+
+
+def test_create_job_streams_upload_and_enqueues_reference(tmp_path, monkeypatch):
+    from io import BytesIO
+
+    from blackletter_api.services import blob_store, storage, tasks
+
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    monkeypatch.setenv("DEDUP_ENABLED", "0")
+    calls = []
+    monkeypatch.setattr(
+        tasks.process_contract_analysis, "delay", lambda *args: calls.append(args)
+    )
+
+    res = client.post(
+        "/api/",
+        files={"file": ("c.pdf", BytesIO(b"%PDF-1.4 body"), "application/pdf")},
+    )
+    assert res.status_code == 202
+    body = res.json()
+    job_id, analysis_id, filename = calls[0]
+    assert job_id == body["job_id"]
+    assert analysis_id == body["analysis_id"]
+    stored = blob_store.resolve_upload(analysis_id, filename)
+    assert stored.read_bytes() == b"%PDF-1.4 body"
+
+
+def test_create_job_rejects_oversized_upload(tmp_path, monkeypatch):
+    from io import BytesIO
+
+    from blackletter_api.services import storage, tasks
+
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    monkeypatch.setattr(tasks.process_contract_analysis, "delay", lambda *args: None)
+
+    big = b"x" * (10 * 1024 * 1024 + 1)
+    res = client.post(
+        "/api/",
+        files={"file": ("big.pdf", BytesIO(big), "application/pdf")},
+    )
+    assert res.status_code == 413
+    analyses_root = tmp_path / "analyses"
+    assert not analyses_root.exists() or list(analyses_root.iterdir()) == []
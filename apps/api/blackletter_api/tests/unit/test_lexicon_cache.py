@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+import fakeredis
+import pytest
+
+from blackletter_api.services import lexicon_analyzer, weak_lexicon
+
+
+class CountingRedis(fakeredis.FakeRedis):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gets = 0
+
+    def get(self, name):
+        self.gets += 1
+        return super().get(name)
+
+    def keys(self, pattern="*", **kwargs):  # pragma: no cover - must never run
+        raise AssertionError("KEYS blocks Redis")
+
+
+@pytest.fixture()
+def lexicons(tmp_path, monkeypatch):
+    lex_dir = tmp_path / "lexicons"
+    lex_dir.mkdir()
+    (lex_dir / "weak_language.yaml").write_text("version: v1\nhedges:\n  - may\n", encoding="utf-8")
+    (lex_dir / "weak_language_de.yaml").write_text("version: v1\nhedges:\n  - kann\n", encoding="utf-8")
+    monkeypatch.setattr(lexicon_analyzer, "LEXICON_DIR", lex_dir)
+    monkeypatch.setattr(lexicon_analyzer, "_local", OrderedDict())
+    monkeypatch.setattr(lexicon_analyzer, "_version", None)
+    monkeypatch.setattr(lexicon_analyzer, "_subscriber", None)
+    return lex_dir
+
+
+@pytest.fixture()
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture()
+def client(lexicons, server, monkeypatch):
+    redis = CountingRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(lexicon_analyzer, "redis_client", redis)
+    return redis
+
+
+def test_local_tier_serves_repeat_loads_without_redis(client):
+    assert lexicon_analyzer.load_lexicon("en").hedging == ["may"]
+    gets = client.gets
+    for _ in range(50):
+        lexicon_analyzer.load_lexicon("en")
+    assert client.gets == gets
+    assert client.get("lexicon_cache:0:en") is not None
+
+
+def test_mixed_languages_do_not_evict_each_other(client):
+    for _ in range(3):
+        assert weak_lexicon.get_weak_terms("en") == ["may"]
+        assert weak_lexicon.get_weak_terms("de") == ["kann"]
+    assert set(lexicon_analyzer._local) == {("en", 0), ("de", 0)}
+
+
+def test_reload_bumps_version_and_purges_stale_namespace_with_scan(client, lexicons):
+    lexicon_analyzer.load_lexicon("en")
+    lexicon_analyzer.load_lexicon("de")
+    (lexicons / "weak_language.yaml").write_text("version: v2\nhedges:\n  - might\n", encoding="utf-8")
+
+    assert lexicon_analyzer.reload_lexicons() == 1
+    assert client.get(lexicon_analyzer.VERSION_KEY) == "1"
+    assert lexicon_analyzer._local == OrderedDict()
+    assert list(client.scan_iter(match="lexicon_cache:0:*")) == []
+    assert lexicon_analyzer.load_lexicon("en").hedging == ["might"]
+
+
+def test_other_processes_pick_up_invalidations(client, server, lexicons):
+    lexicon_analyzer.load_lexicon("en")
+    (lexicons / "weak_language.yaml").write_text("version: v2\nhedges:\n  - might\n", encoding="utf-8")
+
+    # Another API or worker process reloads
+    other = fakeredis.FakeRedis(server=server, decode_responses=True)
+    deadline = time.time() + 5
+    while time.time() < deadline and not other.pubsub_numsub(lexicon_analyzer.INVALIDATE_CHANNEL)[0][1]:
+        time.sleep(0.01)
+    other.publish(lexicon_analyzer.INVALIDATE_CHANNEL, other.incr(lexicon_analyzer.VERSION_KEY))
+
+    while time.time() < deadline and lexicon_analyzer._version != 1:
+        time.sleep(0.01)
+    assert lexicon_analyzer.load_lexicon("en").hedging == ["might"]
+
+
+def test_without_redis_reload_still_evicts(lexicons, monkeypatch):
+    monkeypatch.setattr(lexicon_analyzer, "redis_client", None)
+    assert lexicon_analyzer.load_lexicon("en").hedging == ["may"]
+    (lexicons / "weak_language.yaml").write_text("hedges:\n  - could\n", encoding="utf-8")
+    assert lexicon_analyzer.load_lexicon("en").hedging == ["may"]
+
+    lexicon_analyzer.reload_lexicons()
+    assert lexicon_analyzer.load_lexicon("en").hedging == ["could"]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import pytest
+
+from blackletter_api.core.weak_language_detector import evaluate_weak_language
+from blackletter_api.services import lexicon_analyzer, lexicon_registry
+from blackletter_api.services.lexicon_registry import LexiconRegistry, detect_language
+
+GERMAN = "Der Auftragsverarbeiter kann die Daten nach eigenem Ermessen löschen, sofern dies mit dem Vertrag vereinbar ist und nicht der Verantwortliche widerspricht."
+ENGLISH = "The processor shall delete the data at the end of the provision of services and is bound by the instructions of the controller."
+
+
+@pytest.fixture()
+def lexicons(tmp_path, monkeypatch):
+    lex_dir = tmp_path / "lexicons"
+    lex_dir.mkdir()
+    (lex_dir / "weak_language.yaml").write_text(
+        "version: v1\nlanguage: en\nhedges:\n  - may\n  - reasonable efforts\ncounter_anchors:\n  - must\n",
+        encoding="utf-8",
+    )
+    (lex_dir / "weak_language_de.yaml").write_text("version: v1\nhedges:\n  - kann\n", encoding="utf-8")
+    (lex_dir / "legal_weak_language.yaml").write_text(
+        "name: legal_weak_language\nterms:\n"
+        "  - {term: at its discretion, category: legal_discretionary, confidence: 0.65}\n"
+        "  - {term: at its sole discretion, category: legal_discretionary, confidence: 0.7}\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(lexicon_analyzer, "LEXICON_DIR", lex_dir)
+    monkeypatch.setattr(lexicon_analyzer, "redis_client", None)
+    monkeypatch.setattr(lexicon_analyzer, "_local", OrderedDict())
+    monkeypatch.setattr(lexicon_analyzer, "_version", None)
+    registry = LexiconRegistry()
+    monkeypatch.setattr(lexicon_registry, "_registry", registry)
+    return registry
+
+
+def test_compile_all_reports_every_lexicon(lexicons):
+    stats = {s["name"]: s for s in lexicons.compile_all()}
+    assert set(stats) == {"weak_language:en", "weak_language:de", "legal_weak_language"}
+    assert stats["weak_language:de"]["file"] == "weak_language_de.yaml"
+    assert stats["weak_language:en"]["terms"] == 3
+    assert all(s["memory_bytes"] > 0 and s["compile_ms"] >= 0 for s in stats.values())
+    assert lexicons.languages() == ["de", "en"]
+
+
+def test_detect_language_uses_stopwords_and_candidates():
+    assert detect_language([ENGLISH]) == "en"
+    assert detect_language([GERMAN]) == "de"
+    assert detect_language([GERMAN], candidates=["en"]) == "en"
+    assert detect_language(["Kann."]) == "en"
+
+
+def test_document_language_selects_the_compiled_lexicon(lexicons):
+    sentences = [{"text": GERMAN}, {"text": "Die Daten werden nicht übermittelt."}]
+    language = lexicons.language_for(sentences)
+    assert language == "de"
+
+    verdict, detected, version = evaluate_weak_language("pass", GERMAN, language=language)
+    assert (verdict, detected, version) == ("weak", True, "v1")
+    assert evaluate_weak_language("pass", GERMAN)[0] == "pass"
+
+
+def test_weak_matcher_respects_word_boundaries_and_anchors(lexicons):
+    compiled = lexicons.for_language("en")
+    assert compiled.is_weak("we may share data")
+    assert not compiled.is_weak("in mayfair")
+    assert not compiled.is_weak("we may and must share data")
+    assert not compiled.is_weak("we may share data", counter_anchors=["share"])
+    # Each counter-anchor list is compiled once and reused
+    matcher = compiled.counter_matcher(["share"])
+    assert compiled.is_weak("we may send data", counter_anchors=["share"])
+    assert compiled.counter_matcher(["share"]) is matcher
+
+
+def test_lexicon_detectors_reuse_the_registry_domain_matcher(lexicons):
+    from blackletter_api.services.detector_runner import _term_matcher
+
+    same = [
+        {"term": "at its discretion", "category": "legal_discretionary", "confidence": 0.65},
+        {"term": "At its sole discretion", "category": "legal_discretionary", "confidence": 0.7},
+    ]
+    assert _term_matcher("legal_weak_language", same) is lexicons.domain("legal_weak_language")
+
+    # A rulepack with a different term list gets its own matcher
+    own = _term_matcher("legal_weak_language", ["best endeavours"])
+    assert own is not lexicons.domain("legal_weak_language")
+    assert [h["term"] for h in own.find_terms("Use best endeavours.")] == ["best endeavours"]
+
+
+def test_reload_recompiles_weak_and_domain_matchers(lexicons):
+    lexicons.compile_all()
+    before = lexicons.for_language("en")
+    assert lexicons.for_language("en") is before
+
+    (lexicons.lexicon_dir / "weak_language.yaml").write_text("language: en\nhedges:\n  - might\n", encoding="utf-8")
+    lexicon_analyzer.reload_lexicons()
+    after = lexicons.for_language("en")
+    assert after is not before
+    assert after.is_weak("it might happen") and not after.is_weak("it may happen")
+
+    hits = lexicons.domain("legal_weak_language").find_terms("Provider acts at its sole discretion.")
+    assert [(h["term"], h["category"]) for h in hits] == [("at its sole discretion", "legal_discretionary")]
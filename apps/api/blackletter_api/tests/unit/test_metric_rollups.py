@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from blackletter_api.database import Base
+from blackletter_api.models.entities import Metric, MetricDailyRollup
+from blackletter_api.services.histograms import HistogramRegistry
+from blackletter_api.services.llm_gate import LLMGate
+from blackletter_api.services.metric_rollups import rebuild_daily_rollups
+from blackletter_api.services.metrics import MetricsService
+
+
+@pytest.fixture()
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with patch("blackletter_api.services.metrics.SessionLocal", factory), patch(
+        "blackletter_api.services.llm_gate.SessionLocal", factory
+    ):
+        yield factory
+
+
+def _rollups(factory):
+    with factory() as session:
+        return {
+            r.day: (r.analyses, r.tokens_total, r.llm_invoked_count, r.cap_exceeded_count, r.latency_count)
+            for r in session.query(MetricDailyRollup)
+        }
+
+
+def test_writes_keep_daily_rollup_in_step(session_factory):
+    gate, service = LLMGate(), MetricsService()
+    first, second = uuid.uuid4(), uuid.uuid4()
+
+    gate.record_token_usage(first, 100, llm_invoked=True)
+    gate.record_token_usage(first, 50)
+    service.record_analysis_completion(first, processing_time_ms=200.0, detection_count=3)
+    service.record_analysis_completion(first, processing_time_ms=300.0, detection_count=3)
+    gate.record_token_usage(second, 0, error_reason="token_cap")
+
+    incremental = _rollups(session_factory)
+    assert list(incremental.values()) == [(2, 150, 1, 1, 1)]
+    with session_factory() as session:
+        rebuild_daily_rollups(session)
+    assert _rollups(session_factory) == incremental
+
+    assert gate.get_analysis_metrics()["avg_tokens_per_doc"] == 75
+    series = service.get_metrics_time_series(days=7)
+    assert series["tokens"] == [75.0]
+    assert series["llm_usage"] == [50.0]
+    assert series["latency"] == [300.0]
+
+
+def test_time_series_backfills_rollups_for_existing_metrics(session_factory):
+    today = datetime.utcnow().replace(hour=12)
+    with session_factory() as session:
+        for days_ago, tokens in [(0, 10), (0, 30), (2, 5), (40, 99)]:
+            session.add(
+                Metric(
+                    analysis_id=uuid.uuid4(),
+                    tokens_per_doc=tokens,
+                    llm_invoked=tokens > 20,
+                    created_at=today - timedelta(days=days_ago),
+                )
+            )
+        session.commit()
+
+    series = MetricsService().get_metrics_time_series(days=30)
+
+    assert series["dates"] == [(today - timedelta(days=2)).date().isoformat(), today.date().isoformat()]
+    assert series["tokens"] == [5.0, 20.0]
+    assert series["llm_usage"] == [0.0, 50.0]
+
+
+def test_history_is_rolled_up_after_the_first_new_write(session_factory):
+    # Metrics that predate the table, then a write after deploy creates today's row
+    with session_factory() as session:
+        for days_ago in (0, 3):
+            session.add(
+                Metric(
+                    analysis_id=uuid.uuid4(),
+                    tokens_per_doc=40,
+                    created_at=datetime.utcnow() - timedelta(days=days_ago),
+                )
+            )
+        session.commit()
+    LLMGate().record_token_usage(uuid.uuid4(), 10)
+
+    assert LLMGate().get_analysis_metrics()["avg_tokens_per_doc"] == 30
+    assert sum(analyses for analyses, *_ in _rollups(session_factory).values()) == 3
+
+
+def test_admin_p95_uses_job_sketch_when_available(session_factory, monkeypatch):
+    registry = HistogramRegistry()
+    monkeypatch.setattr(registry, "collect", lambda client=None: registry.snapshot())
+    monkeypatch.setattr("blackletter_api.services.metrics.get_histograms", lambda: registry)
+    with session_factory() as session:
+        session.add(Metric(analysis_id=uuid.uuid4(), processing_time_ms=5.0))
+        session.commit()
+    for latency in range(1, 101):
+        registry.observe("job_duration_ms", float(latency), task="process_job")
+
+    assert MetricsService().get_admin_metrics()["p95_latency_ms"] == pytest.approx(95, rel=0.02)
+
+
+def test_admin_p95_matches_interpolated_percentile(session_factory, monkeypatch):
+    # No streaming samples yet: falls back to the SQL window percentile
+    monkeypatch.setattr("blackletter_api.services.metrics.get_histograms", HistogramRegistry)
+    latencies = [float(v) for v in range(10, 410, 10)]
+    start = datetime.utcnow() - timedelta(hours=1)
+    with session_factory() as session:
+        for i, latency in enumerate(latencies):
+            session.add(
+                Metric(
+                    analysis_id=uuid.uuid4(),
+                    processing_time_ms=latency,
+                    created_at=start + timedelta(seconds=i),
+                )
+            )
+        session.commit()
+
+    metrics = MetricsService().get_admin_metrics()
+
+    # Last 30 runs are 110..400; p95 index 27.55 -> 380 + 0.55 * 10
+    assert metrics["total_analyses"] == 30
+    assert metrics["p95_latency_ms"] == 385.5
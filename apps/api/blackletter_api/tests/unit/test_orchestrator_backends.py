@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from threading import Thread
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from blackletter_api.database import Base
+from blackletter_api.orchestrator.backends import (
+    DatabaseOrchestratorBackend,
+    MemoryOrchestratorBackend,
+    RedisOrchestratorBackend,
+)
+from blackletter_api.orchestrator.state import AnalysisState, Orchestrator, StateConflict
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    # File-backed so concurrent threads get real SQLite locking
+    engine = create_engine(f"sqlite:///{tmp_path / 'orch.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture(params=["memory", "redis", "db"])
+def shared_backends(request, session_factory):
+    """Two backend instances over the same store, as two workers would see it."""
+    if request.param == "memory":
+        backend = MemoryOrchestratorBackend()
+        return backend, backend
+    if request.param == "redis":
+        server = fakeredis.FakeServer()
+        return (
+            RedisOrchestratorBackend(fakeredis.FakeRedis(server=server, decode_responses=True)),
+            RedisOrchestratorBackend(fakeredis.FakeRedis(server=server)),
+        )
+    return DatabaseOrchestratorBackend(session_factory), DatabaseOrchestratorBackend(session_factory)
+
+
+def test_records_are_visible_across_instances(shared_backends):
+    worker_a, worker_b = (Orchestrator(b) for b in shared_backends)
+
+    analysis_id = worker_a.intake("contract.pdf")
+    worker_b.advance(analysis_id, AnalysisState.EXTRACTED, {"issue": "ok"})
+
+    record = worker_a.summary(analysis_id)
+    assert (record.filename, record.state) == ("contract.pdf", AnalysisState.EXTRACTED)
+    assert worker_a.findings(analysis_id) == ({"issue": "ok"},)
+    assert [r.id for r in worker_b.list_records(10)] == [analysis_id]
+    with pytest.raises(KeyError):
+        worker_b.summary("missing")
+
+
+def test_compare_and_set_rejects_stale_transitions(shared_backends):
+    orch = Orchestrator(shared_backends[0])
+    analysis_id = orch.intake("contract.docx")
+
+    assert orch.compare_and_set(analysis_id, AnalysisState.RECEIVED, AnalysisState.EXTRACTED)
+    assert not orch.compare_and_set(analysis_id, AnalysisState.RECEIVED, AnalysisState.SEGMENTED)
+    with pytest.raises(StateConflict) as exc:
+        orch.advance(analysis_id, AnalysisState.GDPR_DONE, {"x": 1}, expected_state=AnalysisState.SEGMENTED)
+    assert exc.value.actual == AnalysisState.EXTRACTED
+    assert orch.findings(analysis_id) == ()
+
+
+def test_concurrent_compare_and_set_has_one_winner(shared_backends):
+    workers = [Orchestrator(b) for b in shared_backends]
+    analysis_id = workers[0].intake("contract.pdf")
+    wins = []
+
+    def attempt(i: int) -> None:
+        orch = workers[i % 2]
+        if orch.compare_and_set(analysis_id, AnalysisState.RECEIVED, AnalysisState.EXTRACTED):
+            wins.append(i)
+
+    threads = [Thread(target=attempt, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(wins) == 1
+
+
+def test_memory_backend_evicts_expired_records(monkeypatch):
+    monkeypatch.setenv("ORCHESTRATOR_TTL_SECONDS", "60")
+    clock = Clock(1000.0)
+    orch = Orchestrator(MemoryOrchestratorBackend(clock=clock))
+    old = orch.intake("old.pdf")
+
+    clock.now += 61
+    orch.intake("new.pdf")
+
+    assert [r.filename for r in orch.list_records(10)] == ["new.pdf"]
+    with pytest.raises(KeyError):
+        orch.summary(old)
+    assert old not in orch.backend._store
+
+
+def test_db_backend_purges_expired_records(session_factory, monkeypatch):
+    monkeypatch.setenv("ORCHESTRATOR_TTL_SECONDS", "60")
+    clock = Clock(datetime(2026, 1, 1))
+    backend = DatabaseOrchestratorBackend(session_factory, clock=clock)
+    orch = Orchestrator(backend)
+    old = orch.intake("old.pdf")
+    orch.advance(old, AnalysisState.EXTRACTED, {"f": 1})
+
+    clock.now += timedelta(seconds=61)
+    with pytest.raises(KeyError):
+        orch.summary(old)
+    assert backend.purge_expired() == 1
+
+
+def test_redis_backend_sets_ttl(monkeypatch):
+    monkeypatch.setenv("ORCHESTRATOR_TTL_SECONDS", "120")
+    client = fakeredis.FakeRedis(decode_responses=True)
+    orch = Orchestrator(RedisOrchestratorBackend(client))
+    analysis_id = orch.intake("contract.pdf")
+    orch.advance(analysis_id, AnalysisState.EXTRACTED, {"f": 1})
+
+    assert 0 < client.ttl(f"orch:rec:{analysis_id}") <= 120
+    assert 0 < client.ttl(f"orch:findings:{analysis_id}") <= 120
+
+
+def _walk(orch, limit, state=None):
+    pages, cursor = [], None
+    while True:
+        records, cursor = orch.page_records(limit, cursor=cursor, state=state)
+        pages.append([r.filename for r in records])
+        if cursor is None:
+            return pages
+
+
+def test_pages_follow_intake_order_and_state(shared_backends):
+    orch = Orchestrator(shared_backends[0])
+    ids = [orch.intake(f"c{i}.pdf") for i in range(7)]
+    for analysis_id in ids[1::2]:
+        orch.advance(analysis_id, AnalysisState.EXTRACTED)
+
+    assert _walk(orch, 3) == [["c0.pdf", "c1.pdf", "c2.pdf"], ["c3.pdf", "c4.pdf", "c5.pdf"], ["c6.pdf"]]
+    assert _walk(orch, 2, AnalysisState.EXTRACTED) == [["c1.pdf", "c3.pdf"], ["c5.pdf"]]
+    assert _walk(orch, 10, AnalysisState.RECEIVED) == [["c0.pdf", "c2.pdf", "c4.pdf", "c6.pdf"]]
+    with pytest.raises(ValueError):
+        orch.page_records(3, cursor="not-a-cursor")
+
+
+def test_records_are_immutable_snapshots(shared_backends):
+    orch = Orchestrator(shared_backends[0])
+    analysis_id = orch.intake("contract.pdf")
+    before = orch.summary(analysis_id)
+
+    after = orch.advance(analysis_id, AnalysisState.EXTRACTED, {"issue": "ok"})
+
+    assert (before.state, before.findings) == (AnalysisState.RECEIVED, ())
+    assert (after.state, after.findings) == (AnalysisState.EXTRACTED, ({"issue": "ok"},))
+    with pytest.raises(AttributeError):
+        after.state = AnalysisState.REPORTED
+
+
+def test_memory_pages_skip_expired_records(monkeypatch):
+    monkeypatch.setenv("ORCHESTRATOR_TTL_SECONDS", "60")
+    clock = Clock(1000.0)
+    orch = Orchestrator(MemoryOrchestratorBackend(clock=clock))
+    orch.intake("old.pdf")
+    clock.now += 30
+    orch.intake("new.pdf")
+    clock.now += 31
+
+    records, cursor = orch.page_records(10)
+    assert ([r.filename for r in records], cursor) == (["new.pdf"], None)
+
+
+def test_readers_share_the_lock_while_writers_wait():
+    from blackletter_api.orchestrator.locks import ReadWriteLock
+
+    lock = ReadWriteLock()
+    order = []
+
+    def write() -> None:
+        with lock.write():
+            order.append("write")
+
+    with lock.read():
+        with lock.read():
+            order.append("nested read")
+        writer = Thread(target=write)
+        writer.start()
+        writer.join(timeout=0.1)
+        assert writer.is_alive()
+    writer.join(timeout=1)
+    assert order == ["nested read", "write"]
@@ -8,7 +8,7 @@ def test_advance_updates_state_and_findings():
     analysis_id = orch.intake("contract.pdf")
     result = orch.advance(analysis_id, AnalysisState.EXTRACTED, {"issue": "ok"})
     assert result.state == AnalysisState.EXTRACTED
-    assert orch.findings(analysis_id) == [{"issue": "ok"}]
+    assert orch.findings(analysis_id) == ({"issue": "ok"},)
 
 
 def test_advance_without_finding():
@@ -17,7 +17,7 @@ def test_advance_without_finding():
     orch.advance(analysis_id, AnalysisState.SEGMENTED)
     record = orch.summary(analysis_id)
     assert record.state == AnalysisState.SEGMENTED
-    assert record.findings == []
+    assert record.findings == ()
 
 
 def test_concurrent_advance_no_keyerror_or_lost_updates():
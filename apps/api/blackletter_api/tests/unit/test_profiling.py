@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.api.dependencies.auth import get_current_user
+from apps.api.models.user import Role, User
+from blackletter_api import main
+from blackletter_api.routers import admin
+from blackletter_api.services import profiling, storage
+
+
+def _spin(ms: float) -> None:
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def busy_sync_handler_work() -> None:
+    _spin(80)
+
+
+def busy_storage_io_work() -> None:
+    _spin(80)
+
+
+def unrelated_background_work(stop: threading.Event) -> None:
+    while not stop.is_set():
+        _spin(5)
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    monkeypatch.setenv("PROFILING_SECRET", "s3cret")
+    monkeypatch.setenv("PROFILE_SAMPLE_INTERVAL_MS", "2")
+
+    app = FastAPI()
+    app.middleware("http")(main.profile_request)
+    app.include_router(admin.router)
+    app.dependency_overrides[get_current_user] = lambda: User(id="1", email="t@example.com", role=Role.ADMIN)
+
+    @app.get("/sync")
+    def sync_route() -> dict:
+        busy_sync_handler_work()
+        return {"ok": True}
+
+    @app.get("/async")
+    async def async_route() -> dict:
+        await storage.run_io(busy_storage_io_work)
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_tokens_are_signed_and_expire(monkeypatch):
+    monkeypatch.setenv("PROFILING_SECRET", "s3cret")
+    token = profiling.sign_profile_token(ttl_seconds=60, now=1000)
+
+    assert profiling.verify_profile_token(token, now=1030)
+    assert not profiling.verify_profile_token(token, now=1061)
+    assert not profiling.verify_profile_token(token.replace(".", ".0", 1), now=1030)
+    monkeypatch.setenv("PROFILING_SECRET", "other")
+    assert not profiling.verify_profile_token(token, now=1030)
+
+
+def test_unprofiled_requests_are_untouched(client):
+    res = client.get("/sync")
+    assert res.status_code == 200
+    assert "X-Profile-Id" not in res.headers
+    assert client.get("/sync", headers={"X-Profile-Token": "1.bad"}).status_code == 403
+
+
+def test_profile_captures_only_the_requests_own_work(client):
+    token = client.post("/api/admin/profiles/token").json()["token"]
+    stop = threading.Event()
+    noise = threading.Thread(target=unrelated_background_work, args=(stop,))
+    noise.start()
+    try:
+        sync_res = client.get("/sync", headers={"X-Profile-Token": token})
+        async_res = client.get(f"/async?__profile={token}")
+    finally:
+        stop.set()
+        noise.join()
+
+    sync_profile = client.get(f"/api/admin/profiles/{sync_res.headers['X-Profile-Id']}").text
+    async_profile = client.get(f"/api/admin/profiles/{async_res.headers['X-Profile-Id']}").text
+
+    assert sync_profile.startswith("# request: GET /sync")
+    assert "busy_sync_handler_work" in sync_profile
+    assert "busy_storage_io_work" in async_profile
+    for text in (sync_profile, async_profile):
+        assert "unrelated_background_work" not in text
+        stacks = [line for line in text.splitlines() if not line.startswith("#")]
+        assert stacks and all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+    assert len(client.get("/api/admin/profiles").json()) == 2
+
+
+def test_profile_endpoints_report_missing_and_disabled(client, monkeypatch):
+    assert client.get("/api/admin/profiles/" + "0" * 32).status_code == 404
+    assert client.get("/api/admin/profiles/..%2Fsecrets").status_code == 404
+    monkeypatch.delenv("PROFILING_SECRET")
+    monkeypatch.delenv("SECRET_KEY", raising=False)
+    assert client.post("/api/admin/profiles/token").status_code == 503
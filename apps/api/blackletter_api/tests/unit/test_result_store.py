@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from blackletter_api.database import Base
+from blackletter_api.models.schemas import Coverage, Finding
+from blackletter_api.services import result_store
+
+
+@pytest.fixture()
+def db_session() -> Session:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as session:
+        yield session
+
+
+def _findings(n: int) -> list[Finding]:
+    verdicts = ["pass", "weak", "missing", "pass"]
+    return [
+        Finding(
+            detector_id=f"A28_3_{chr(97 + i % 8)}",
+            rule_id=f"A28_3_{chr(97 + i % 8)}",
+            verdict=verdicts[i % 4],
+            snippet=f"clause {i}",
+            page=1 + i // 10,
+            start=i * 100,
+            end=i * 100 + 50,
+            rationale="matched",
+            category="processor_obligations",
+            confidence=0.9,
+        )
+        for i in range(n)
+    ]
+
+
+def test_round_trip_preserves_findings_and_counts(db_session: Session) -> None:
+    findings = _findings(40)
+    coverage = Coverage(present=6, total=8, percentage=75.0, missing_detectors=["A28_3_g"])
+
+    row = result_store.save_results("a1", findings, coverage, org_id="org-1", db=db_session)
+    loaded = result_store.load_results("a1", db=db_session)
+
+    assert loaded["findings"] == findings
+    assert loaded["coverage"] == coverage
+    assert loaded["verdicts"].pass_count == 20
+    assert loaded["verdicts"].weak_count == 10
+    assert loaded["size_bytes"] == row.size_bytes
+    assert [r["analysis_id"] for r in result_store.list_results_for_org("org-1", db=db_session)] == ["a1"]
+
+
+def test_columnar_payload_is_smaller_than_json(db_session: Session) -> None:
+    import json
+
+    findings = _findings(200)
+    row = result_store.save_results("a2", findings, Coverage(), db=db_session)
+
+    as_json = json.dumps([f.model_dump() for f in findings]).encode("utf-8")
+    assert row.size_bytes < len(as_json) / 2
+
+
+def test_save_replaces_previous_results(db_session: Session) -> None:
+    result_store.save_results("a3", _findings(5), Coverage(), db=db_session)
+    result_store.save_results("a3", _findings(2), Coverage(), db=db_session)
+
+    assert len(result_store.load_results("a3", db=db_session)["findings"]) == 2
+    assert result_store.load_results("missing", db=db_session) is None
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from blackletter_api.database import Base
+from blackletter_api.models.entities import (
+    Analysis,
+    AnalysisCatalogEntry,
+    AnalysisResult,
+    Blob,
+    EvidenceArtifact,
+    ExtractionArtifact,
+    OrgSetting,
+    RetentionPolicy,
+)
+from blackletter_api.services import blob_store, catalogue, retention, storage
+
+# Just ahead of the wall clock so blobs released during the run are past their grace period
+NOW = datetime.utcnow() + timedelta(minutes=1)
+ORG = uuid.uuid4()
+
+
+@pytest.fixture()
+def db_session() -> Session:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    monkeypatch.setenv("BLOB_GC_GRACE_SECONDS", "0")
+    blob_store.set_blob_backend(blob_store.LocalBlobBackend())
+    yield tmp_path
+    blob_store.set_blob_backend(None)
+
+
+def _policy(db: Session, policy: RetentionPolicy, org: uuid.UUID = ORG) -> None:
+    db.add(OrgSetting(org_id=org, retention_policy=policy))
+    db.commit()
+
+
+def _catalogued(db: Session, analysis_id: str, age_days: int) -> None:
+    created = (NOW - timedelta(days=age_days)).isoformat()
+    catalogue.upsert_entry(analysis_id, f"{analysis_id}.pdf", 10, created, "done", org_id=str(ORG), db=db)
+    (storage.analysis_dir(analysis_id) / "findings.json").write_text("[]" * 50, encoding="utf-8")
+
+
+def test_expired_analyses_are_purged_everywhere(db_session: Session) -> None:
+    _policy(db_session, RetentionPolicy.thirty_days)
+    _catalogued(db_session, "old-job", 45)
+    _catalogued(db_session, "new-job", 5)
+
+    # Contracts-route analysis: DB row, artifact rows, result row and an upload blob
+    contract = Analysis(
+        filename="dpa.pdf", size_bytes=4, mime_type="application/pdf", org_id=str(ORG),
+        created_at=NOW - timedelta(days=60),
+    )
+    db_session.add(contract)
+    db_session.commit()
+    cid = str(contract.id)
+    db_session.add_all([
+        ExtractionArtifact(analysis_id=contract.id, job_id=uuid.uuid4(), artifact_path="x"),
+        EvidenceArtifact(analysis_id=contract.id, job_id=uuid.uuid4(), snippet="s", page=1, start=0, end=1),
+        AnalysisResult(analysis_id=cid, encoding="msgpack", payload=b"x"),
+    ])
+    db_session.commit()
+    upload = storage.analysis_dir(cid) / "dpa.pdf"
+    upload.write_bytes(b"%PDF")
+    blob_store.ingest_upload(cid, upload, hashlib.sha256(b"%PDF").hexdigest(), org_id=str(ORG), db=db_session)
+
+    report = retention.run_retention_gc(now=NOW, db=db_session, limit=1)
+
+    assert report["analyses_deleted"] == 2
+    assert report["blobs_deleted"] == 1
+    assert report["bytes_reclaimed"] >= 100 + 4
+    assert report["complete"] is True
+    assert report["runtime_ms"] >= 0
+    assert not storage.analysis_path("old-job").exists()
+    assert not storage.analysis_path(cid).exists()
+    assert storage.analysis_path("new-job").exists()
+    assert [e.analysis_id for e in db_session.query(AnalysisCatalogEntry)] == ["new-job"]
+    for model in (Analysis, AnalysisResult, ExtractionArtifact, EvidenceArtifact, Blob):
+        assert db_session.query(model).count() == 0
+
+
+def test_batch_budget_leaves_rest_for_next_run(db_session: Session) -> None:
+    _policy(db_session, RetentionPolicy.ninety_days)
+    for i in range(5):
+        _catalogued(db_session, f"a{i}", 100 + i)
+
+    first = retention.run_retention_gc(now=NOW, db=db_session, limit=2, batches=1)
+    assert (first["analyses_deleted"], first["complete"]) == (2, False)
+
+    second = retention.run_retention_gc(now=NOW, db=db_session, limit=2, batches=5)
+    assert (second["analyses_deleted"], second["complete"]) == (3, True)
+    assert db_session.query(AnalysisCatalogEntry).count() == 0
+
+
+def test_each_org_expires_under_its_own_policy(db_session: Session, monkeypatch) -> None:
+    monthly, quarterly = uuid.uuid4(), uuid.uuid4()
+    _policy(db_session, RetentionPolicy.thirty_days, monthly)
+    _policy(db_session, RetentionPolicy.ninety_days, quarterly)
+    monkeypatch.setattr(catalogue, "SessionLocal", sessionmaker(bind=db_session.get_bind()))
+
+    # Catalogued through the worker's write path, which records the submitter's org
+    storage.write_analysis_json("monthly-job", "a.pdf", 10, org_id=str(monthly))
+    storage.write_analysis_json("quarterly-job", "b.pdf", 10, org_id=str(quarterly))
+    for entry in db_session.query(AnalysisCatalogEntry):
+        entry.created_at = NOW - timedelta(days=45)
+    db_session.commit()
+
+    report = retention.run_retention_gc(now=NOW, db=db_session)
+
+    assert report["analyses_deleted"] == 1
+    assert not storage.analysis_path("monthly-job").exists()
+    assert storage.analysis_path("quarterly-job").exists()
+    assert [e.analysis_id for e in db_session.query(AnalysisCatalogEntry)] == ["quarterly-job"]
+
+
+def test_no_policy_keeps_everything(db_session: Session) -> None:
+    _policy(db_session, RetentionPolicy.none)
+    _catalogued(db_session, "ancient", 3650)
+
+    report = retention.run_retention_gc(now=NOW, db=db_session)
+
+    assert report["analyses_deleted"] == 0
+    assert storage.analysis_path("ancient").exists()
+
+
+def test_cleanup_task_runs_on_maintenance_queue() -> None:
+    from blackletter_api.services import tasks
+    from blackletter_api.services.celery_app import celery_app
+
+    assert celery_app.conf.task_routes[tasks.cleanup_task.name] == {"queue": "maintenance"}
+    assert celery_app.conf.beat_schedule["retention-gc"]["task"] == tasks.cleanup_task.name
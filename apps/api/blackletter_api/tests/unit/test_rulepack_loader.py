@@ -110,3 +110,88 @@ def test_api_rules_summary(monkeypatch: pytest.MonkeyPatch) -> None:
     assert data.name == "art28"
     assert data.detector_count == 1
     assert data.lexicons == ["weak_language"]
+
+
+def _write_pack(rules_dir: Path, version: str, pattern: str = r"foo\d+") -> None:
+    write_file(
+        rules_dir / "pack.yaml",
+        f"""
+name: art28
+version: {version}
+detectors:
+  - id: foo_regex
+    type: regex
+    pattern: '{pattern}'
+        """.strip(),
+    )
+
+
+def test_refresh_swaps_in_a_new_compiled_version(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from blackletter_api.services.rulepack_loader import RulepackLoader  # type: ignore
+
+    monkeypatch.setenv("RULEPACK_POLL_SECONDS", "0")
+    rules_dir = tmp_path / "rules"
+    _write_pack(rules_dir, "v1")
+    loader = RulepackLoader(rules_dir, rulepack_file="pack.yaml")
+
+    in_flight = loader.current()
+    assert in_flight.version == "v1"
+    assert in_flight.patterns["foo_regex"].search("FOO12")
+    assert in_flight.compile_ms >= 0 and in_flight.loaded_at
+    assert loader.refresh() is False  # unchanged sources are not recompiled
+
+    _write_pack(rules_dir, "v2", pattern=r"bar\d+")
+    os.utime(rules_dir / "pack.yaml", ns=(0, 1))
+    assert loader.refresh() is True
+    assert loader.current().version == "v2"
+    # An analysis holding the old object keeps its version and patterns
+    assert in_flight.version == "v1" and in_flight.patterns["foo_regex"].pattern == r"foo\d+"
+
+
+def test_broken_rulepack_keeps_the_previous_version(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from blackletter_api.services.rulepack_loader import RulepackLoader  # type: ignore
+
+    monkeypatch.setenv("RULEPACK_POLL_SECONDS", "0")
+    rules_dir = tmp_path / "rules"
+    _write_pack(rules_dir, "v1")
+    loader = RulepackLoader(rules_dir, rulepack_file="pack.yaml")
+    loader.current()
+
+    write_file(rules_dir / "pack.yaml", "name: art28\nversion: v2\n")
+    assert loader.refresh() is False
+    assert loader.current().version == "v1"
+    assert loader.last_error == "missing detectors"
+
+
+def test_watcher_picks_up_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import time
+
+    from blackletter_api.services.rulepack_loader import RulepackLoader  # type: ignore
+
+    monkeypatch.setenv("RULEPACK_POLL_SECONDS", "0.02")
+    rules_dir = tmp_path / "rules"
+    _write_pack(rules_dir, "v1")
+    loader = RulepackLoader(rules_dir, rulepack_file="pack.yaml")
+    assert loader.current().version == "v1"
+
+    _write_pack(rules_dir, "v2")
+    os.utime(rules_dir / "pack.yaml", ns=(0, 1))
+    deadline = time.time() + 5
+    while time.time() < deadline and loader.current().version != "v2":
+        time.sleep(0.02)
+    assert loader.current().version == "v2"
+
+
+def test_rules_summary_reports_compile_time(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from blackletter_api.routers import rules  # type: ignore
+    from blackletter_api.services.rulepack_loader import RulepackLoader  # type: ignore
+
+    monkeypatch.setenv("RULEPACK_POLL_SECONDS", "0")
+    rules_dir = tmp_path / "rules"
+    _write_pack(rules_dir, "v3")
+    loader = RulepackLoader(rules_dir, rulepack_file="pack.yaml")
+    monkeypatch.setattr(rules, "load_rulepack", loader.current)
+
+    data = RulesSummary(**rules.rules_summary())
+    assert data.version == "v3"
+    assert data.compile_ms is not None and data.loaded_at is not None
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from blackletter_api.services import s3_client
+from blackletter_api.services.rulepack_loader import S3CompatibleStorage
+
+moto_server = pytest.importorskip("moto.server")
+boto3 = pytest.importorskip("boto3")
+
+BUCKET = "rules"
+CREDS = {"access_key": "minio", "secret_key": "minio123"}
+
+
+@pytest.fixture(scope="module")
+def endpoint():
+    # moto's server stands in for a local MinIO
+    server = moto_server.ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    url = f"http://{host}:{port}"
+    boto3.client(
+        "s3", endpoint_url=url, aws_access_key_id="minio", aws_secret_access_key="minio123", region_name="us-east-1"
+    ).create_bucket(Bucket=BUCKET)
+    yield url
+    server.stop()
+
+
+@pytest.fixture()
+def client(endpoint):
+    s3_client.reset_s3_clients()
+    yield s3_client.get_s3_client(bucket=BUCKET, endpoint_url=endpoint, **CREDS)
+    s3_client.reset_s3_clients()
+
+
+def test_clients_are_shared_per_configuration(client, endpoint):
+    again = s3_client.get_s3_client(bucket=BUCKET, endpoint_url=endpoint, **CREDS)
+    other = s3_client.get_s3_client(bucket="other", endpoint_url=endpoint, **CREDS)
+
+    assert again is client
+    assert again.client is client.client
+    assert other is not client
+
+
+def test_large_upload_is_multipart_and_ranged_reads_work(client, tmp_path, monkeypatch):
+    monkeypatch.setenv("S3_MULTIPART_THRESHOLD_MB", "5")
+    monkeypatch.setenv("S3_MULTIPART_CHUNK_MB", "5")
+    data = os.urandom(11 * 1024 * 1024)
+    src = tmp_path / "contract.pdf"
+    src.write_bytes(data)
+
+    client.upload_file(src, "contracts/big.pdf")
+
+    etag = client.client.head_object(Bucket=BUCKET, Key="contracts/big.pdf")["ETag"]
+    assert etag.strip('"').endswith("-3")  # three 5 MiB parts
+    assert client.get_range("contracts/big.pdf", 100, 199) == data[100:200]
+    assert b"".join(client.stream("contracts/big.pdf", chunk_size=1024 * 1024)) == data
+    client.download_file("contracts/big.pdf", tmp_path / "out.pdf")
+    assert (tmp_path / "out.pdf").read_bytes() == data
+
+
+def test_conditional_get_serves_unchanged_objects_from_cache(client):
+    client.client.put_object(Bucket=BUCKET, Key="art28.yaml", Body=b"name: a\nversion: '1'\n")
+
+    first = client.get_cached("art28.yaml")
+    second = client.get_cached("art28.yaml")
+    assert (first.not_modified, second.not_modified) == (False, True)
+    assert second.body == first.body
+
+    client.client.put_object(Bucket=BUCKET, Key="art28.yaml", Body=b"name: a\nversion: '2'\n")
+    assert client.get_cached("art28.yaml").body.endswith(b"'2'\n")
+    assert client.stats == {"conditional_hits": 1, "conditional_misses": 2}
+
+
+def test_rulepack_storage_uses_shared_client(client, endpoint):
+    client.client.put_object(Bucket=BUCKET, Key="art28_v1.yaml", Body=b"name: art28\nversion: v1\n")
+    client.client.put_object(Bucket=BUCKET, Key="art28_v2.yaml", Body=b"name: art28\nversion: v2\n")
+    rules = S3CompatibleStorage(endpoint_url=endpoint, bucket=BUCKET, **CREDS)
+
+    assert rules.client is client
+    assert rules.get_rulepack("art28_v1.yaml") == {"name": "art28", "version": "v1"}
+    assert rules.get_rulepack("art28_v1.yaml") == {"name": "art28", "version": "v1"}
+    assert client.stats["conditional_hits"] == 1
+    assert sorted(rules.list_keys("art28_v")) == ["art28_v1.yaml", "art28_v2.yaml"]
+
+
+def test_parsed_rulepacks_are_bounded(client, endpoint, monkeypatch):
+    monkeypatch.setenv("RULEPACK_PARSED_CACHE_ENTRIES", "1")
+    client.client.put_object(Bucket=BUCKET, Key="art28_v1.yaml", Body=b"name: art28\nversion: v1\n")
+    client.client.put_object(Bucket=BUCKET, Key="art28_v2.yaml", Body=b"name: art28\nversion: v2\n")
+    rules = S3CompatibleStorage(endpoint_url=endpoint, bucket=BUCKET, **CREDS)
+
+    rules.get_rulepack("art28_v1.yaml")
+    assert rules.get_rulepack("art28_v2.yaml") == {"name": "art28", "version": "v2"}
+    assert list(rules._parsed) == ["art28_v2.yaml"]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from pathlib import Path
 
@@ -42,3 +43,24 @@ def test_get_analysis_findings_missing_file(tmp_path: Path, monkeypatch) -> None
 
     assert storage.get_analysis_findings("missing") == []
 
+
+
+def test_read_paths_do_not_create_directories(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+
+    assert storage.get_analysis_findings("ghost") == []
+    assert storage.load_analysis_summary("ghost") is None
+    assert not (tmp_path / "analyses" / "ghost").exists()
+
+
+def test_async_variants_read_through_io_pool(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    (storage.analysis_dir("c3") / "text.txt").write_text("async hello", encoding="utf-8")
+    (storage.analysis_dir("c3") / "findings.json").write_text(json.dumps([{"id": 2}]), encoding="utf-8")
+
+    async def read():
+        return await asyncio.gather(
+            storage.get_analysis_text_async("c3"), storage.get_analysis_findings_async("c3")
+        )
+
+    assert asyncio.run(read()) == ["async hello", [{"id": 2}]]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import pytest
+from celery.exceptions import Retry
+
+from blackletter_api.models.schemas import Coverage, Finding
+from blackletter_api.services import checkpoints, storage, tasks
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    return tmp_path
+
+
+def _finding() -> Finding:
+    return Finding(
+        detector_id="A28_3_a",
+        rule_id="A28_3_a",
+        verdict="pass",
+        snippet="processes only on documented instructions",
+        page=1,
+        start=0,
+        end=10,
+        rationale="strong",
+    )
+
+
+def test_checkpoint_ignored_for_other_job(data_root):
+    checkpoints.save_checkpoint("a1", "job-1", "extraction", {"text": "hello"})
+
+    assert checkpoints.load_checkpoint("a1", "job-1", "extraction") == {"text": "hello"}
+    assert checkpoints.load_checkpoint("a1", "job-2", "extraction") is None
+
+
+def test_retry_resumes_after_last_completed_stage(data_root, monkeypatch):
+    calls = {"extract": 0, "analyse": 0, "store": 0}
+
+    def extract(file_path, filename):
+        calls["extract"] += 1
+        return "contract text"
+
+    def analyse(text, analysis_id, filename):
+        calls["analyse"] += 1
+        return [_finding()], Coverage(present=1, total=8, percentage=12.5)
+
+    def store(analysis_id, findings, coverage, filename):
+        calls["store"] += 1
+        if calls["store"] == 1:
+            raise ConnectionError("transient db blip")
+        assert findings[0].rule_id == "A28_3_a"
+        assert coverage.present == 1
+
+    monkeypatch.setattr(tasks, "extract_text_from_file", extract)
+    monkeypatch.setattr(tasks, "run_gdpr_analysis", analyse)
+    monkeypatch.setattr(tasks, "store_analysis_results", store)
+
+    with pytest.raises(Retry):
+        tasks.process_contract_analysis.run("job-1", "a1", "contract.txt")
+    tasks.process_contract_analysis.run("job-1", "a1", "contract.txt")
+
+    assert calls == {"extract": 1, "analyse": 1, "store": 2}
+    assert not (storage.analysis_dir("a1") / checkpoints.CHECKPOINT_DIRNAME).exists()
+
+
+def test_final_failed_attempt_clears_checkpoints(data_root, monkeypatch):
+    def store(analysis_id, findings, coverage, filename):
+        raise ConnectionError("db down")
+
+    monkeypatch.setattr(tasks, "extract_text_from_file", lambda file_path, filename: "contract text")
+    monkeypatch.setattr(
+        tasks, "run_gdpr_analysis", lambda *args: ([_finding()], Coverage(present=1, total=8, percentage=12.5))
+    )
+    monkeypatch.setattr(tasks, "store_analysis_results", store)
+    task = tasks.process_contract_analysis
+    checkpoint_dir = storage.analysis_dir("a2") / checkpoints.CHECKPOINT_DIRNAME
+
+    with pytest.raises(Retry):
+        task.run("job-2", "a2", "contract.txt")
+    assert checkpoint_dir.exists()
+
+    task.push_request(retries=task.max_retries)
+    try:
+        with pytest.raises(ConnectionError):
+            task.run("job-2", "a2", "contract.txt")
+    finally:
+        task.pop_request()
+    assert not checkpoint_dir.exists()
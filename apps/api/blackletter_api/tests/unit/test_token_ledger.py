@@ -24,3 +24,38 @@ def test_add_tokens_respects_cap(monkeypatch, tmp_path):
     usage = ledger.get_usage(analysis_id)
     assert usage.cap_exceeded is True
     assert usage.cap_reason == reason
+
+
+def test_totals_are_maintained_without_scanning(monkeypatch, tmp_path):
+    monkeypatch.setenv("TOKEN_CAP_PER_DOC", "100")
+    ledger = TokenLedger(data_dir=tmp_path)
+    ledger.add_tokens("a1", 30, 10)
+    ledger.add_tokens("a1", 20, 0)
+    ledger.add_tokens("a2", 5, 5)
+    ledger.add_tokens("a2", 95, 0)  # over the cap
+
+    def no_scan(*args):
+        raise AssertionError("aggregates must not walk analysis directories")
+
+    monkeypatch.setattr(ledger, "_scan_totals", no_scan)
+    totals = ledger.get_total_metrics()
+    assert (totals["total_analyses"], totals["total_tokens"], totals["cap_exceeded_count"]) == (2, 70, 1)
+    assert totals["total_cost"] == 0.007
+
+    ledger.reset_usage("a2")
+    totals = ledger.get_total_metrics()
+    assert (totals["total_analyses"], totals["total_tokens"], totals["cap_exceeded_count"]) == (1, 60, 0)
+
+
+def test_totals_backfill_existing_ledgers_and_cache_is_bounded(monkeypatch, tmp_path):
+    monkeypatch.setenv("TOKEN_LEDGER_CACHE_SIZE", "2")
+    ledger = TokenLedger(data_dir=tmp_path)
+    for analysis_id in ("a1", "a2", "a3"):
+        ledger.add_tokens(analysis_id, 10, 0)
+    (tmp_path / "ledger_totals.json").unlink()
+
+    fresh = TokenLedger(data_dir=tmp_path)
+    assert fresh.get_total_metrics()["total_tokens"] == 30
+    assert list(ledger._cache) == ["a2", "a3"]
+    assert ledger.get_usage("a1").total_tokens == 10
+    assert list(ledger._cache) == ["a3", "a1"]
@@ -2,6 +2,10 @@
 import pytest
 import uuid
 from unittest.mock import patch, MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from blackletter_api.database import Base
 
 from blackletter_api.services.llm_gate import LLMGate, get_llm_gate, simulate_llm_call
 from blackletter_api.services.metrics import MetricsService, get_metrics_service
@@ -144,16 +148,19 @@ def test_metrics_service_get_admin_metrics():
     """Test metrics service returns admin metrics."""
     service = MetricsService()
     
-    # Mock database session with sample metrics
-    mock_session = MagicMock()
-    mock_metrics = [
-        MagicMock(tokens_per_doc=100, llm_invoked=True, processing_time_ms=1200.5, error_reason=None),
-        MagicMock(tokens_per_doc=150, llm_invoked=False, processing_time_ms=800.0, error_reason=None),
-        MagicMock(tokens_per_doc=0, llm_invoked=False, processing_time_ms=500.0, error_reason="token_cap"),
-    ]
-    mock_session.query().order_by().limit().all.return_value = mock_metrics
-    
-    with patch('blackletter_api.services.metrics.SessionLocal', return_value=mock_session):
+    # In-memory database with sample metrics
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        session.add_all([
+            Metric(analysis_id=uuid.uuid4(), tokens_per_doc=100, llm_invoked=True, processing_time_ms=1200.5),
+            Metric(analysis_id=uuid.uuid4(), tokens_per_doc=150, llm_invoked=False, processing_time_ms=800.0),
+            Metric(analysis_id=uuid.uuid4(), tokens_per_doc=0, llm_invoked=False, processing_time_ms=500.0, error_reason="token_cap"),
+        ])
+        session.commit()
+    
+    with patch('blackletter_api.services.metrics.SessionLocal', factory):
         metrics = service.get_admin_metrics()
         
         assert "avg_tokens_per_doc" in metrics
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.api.dependencies.auth import get_current_user
+from apps.api.models.user import Role, User
+from blackletter_api import main
+from blackletter_api.routers import admin
+from blackletter_api.services import celery_app, storage, tracing
+
+
+@pytest.fixture(autouse=True)
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DATA_ROOT", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture()
+def client():
+    app = FastAPI()
+    app.middleware("http")(main.add_process_time_header_and_logging)
+    app.include_router(admin.router)
+    app.dependency_overrides[get_current_user] = lambda: User(id="1", email="t@example.com", role=Role.ADMIN)
+
+    @app.post("/upload/{analysis_id}")
+    def upload(analysis_id: str) -> dict:
+        tracing.set_analysis(analysis_id)
+        with tracing.start_span("db.write", target="analyses"):
+            pass
+        return {"traceparent": tracing.current_traceparent()}
+
+    @app.get("/plain")
+    def plain() -> dict:
+        with tracing.start_span("work"):
+            return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_parse_traceparent_rejects_malformed_values():
+    trace_id, span_id = "a" * 32, "b" * 16
+    assert tracing.parse_traceparent(f"00-{trace_id}-{span_id}-01") == (trace_id, span_id)
+    assert tracing.parse_traceparent(f"00-{'0' * 32}-{span_id}-01") is None
+    assert tracing.parse_traceparent("00-xyz-01") is None
+    assert tracing.parse_traceparent(None) is None
+
+
+def test_child_spans_share_the_trace_and_export_with_their_root():
+    with tracing.start_span("root") as root:
+        tracing.set_analysis("a1")
+        with tracing.start_span("child") as child:
+            assert tracing.current_span() is child
+        # Children are buffered until the local root ends
+        assert tracing.load_trace("a1") is None
+
+    spans = tracing.load_trace("a1")
+    assert [s["name"] for s in spans] == ["root", "child"]
+    assert {s["trace_id"] for s in spans} == {root.trace_id}
+    assert spans[1]["parent_id"] == root.span_id
+    assert spans[1]["attributes"]["analysis_id"] == "a1"
+    assert tracing.current_span() is None
+
+
+def test_untagged_traces_are_dropped_and_errors_are_marked(data_root):
+    with tracing.start_span("listing"):
+        pass
+    assert not (data_root / "analyses").exists()
+
+    with pytest.raises(RuntimeError):
+        with tracing.start_span("root"):
+            tracing.set_analysis("a2")
+            raise RuntimeError("boom")
+    (span,) = tracing.load_trace("a2")
+    assert span["status"] == "error"
+    assert span["attributes"]["error"] == "RuntimeError: boom"
+
+
+def test_otlp_exporter_round_trips(monkeypatch):
+    monkeypatch.setenv("TRACE_EXPORTER", "otlp")
+    with tracing.start_span("root", pages=3):
+        tracing.set_analysis("a3")
+        with tracing.start_span("child"):
+            pass
+
+    raw = tracing.trace_path("a3").read_text().splitlines()
+    assert len(raw) == 1 and '"resourceSpans"' in raw[0]
+    spans = tracing.load_trace("a3")
+    assert [s["name"] for s in spans] == ["root", "child"]
+    assert spans[0]["attributes"]["pages"] == "3"
+    assert spans[1]["parent_id"] == spans[0]["span_id"]
+
+
+def test_request_continues_incoming_trace_and_admin_endpoint_returns_it(client):
+    trace_id, parent = "1" * 32, "2" * 16
+    res = client.post("/upload/a4", headers={"traceparent": f"00-{trace_id}-{parent}-01"})
+    assert res.status_code == 200
+    assert res.headers["X-Correlation-ID"] == trace_id
+    assert res.headers["traceparent"].startswith(f"00-{trace_id}-")
+
+    body = client.get("/api/admin/traces/a4").json()
+    assert body["trace_ids"] == [trace_id]
+    by_name = {s["name"]: s for s in body["spans"]}
+    assert by_name["http.request"]["parent_id"] == parent
+    assert by_name["http.request"]["attributes"]["route"] == "/upload/{analysis_id}"
+    assert by_name["db.write"]["parent_id"] == by_name["http.request"]["span_id"]
+    # The handler saw the request span as its parent
+    assert res.json()["traceparent"] == by_name["http.request"]["span_id"].join(
+        (f"00-{trace_id}-", "-01")
+    )
+
+
+def test_only_tagged_traces_are_flushed_on_the_io_pool(client, monkeypatch):
+    flushed = []
+    run_io = storage.run_io
+
+    async def counting_run_io(fn, *args, **kwargs):
+        if fn is tracing.flush:
+            flushed.append(args[0].analysis_id)
+        return await run_io(fn, *args, **kwargs)
+
+    monkeypatch.setattr(storage, "run_io", counting_run_io)
+    client.get("/plain")
+    client.post("/upload/a5")
+
+    assert flushed == ["a5"]
+    assert tracing.load_trace("a5")
+
+
+def test_admin_trace_endpoint_404s(client):
+    client.get("/plain")
+    assert client.get("/api/admin/traces/unknown").status_code == 404
+    assert client.get("/api/admin/traces/..").status_code == 404
+
+
+def test_celery_signals_carry_the_trace_to_the_worker():
+    headers: dict = {}
+    with tracing.start_span("enqueue") as publisher:
+        celery_app.stamp_enqueue_time(headers=headers)
+    assert headers["traceparent"] == publisher.traceparent
+
+    task = SimpleNamespace(name="process_job", request=SimpleNamespace(traceparent=headers["traceparent"], retries=0))
+    celery_app.start_task_span(task_id="t1", task=task)
+    with tracing.start_span("extraction"):
+        tracing.set_analysis("a5")
+    celery_app.end_task_span(task_id="t1", state="SUCCESS")
+
+    spans = tracing.load_trace("a5")
+    assert [s["name"] for s in spans] == ["celery.task process_job", "extraction"]
+    assert spans[0]["trace_id"] == publisher.trace_id
+    assert spans[0]["parent_id"] == publisher.span_id
+    assert tracing.current_span() is None
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+import time
+
+import fakeredis
+import pytest
+
+from blackletter_api.services import tasks, warmup
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(tasks, "redis_client", redis)
+    monkeypatch.setattr(warmup, "_warm_report", None)
+    warmup.reset_first_job()
+    yield redis
+    warmup.reset_first_job()
+
+
+def test_warm_start_times_each_step_once(fake_redis, monkeypatch):
+    calls = []
+    for step in ("extractors", "rulepack", "lexicons", "analyzer"):
+        monkeypatch.setattr(warmup, f"_warm_{step}", lambda step=step: calls.append(step))
+
+    report = warmup.warm_start()
+    again = warmup.warm_start()
+
+    assert calls == ["extractors", "rulepack", "lexicons", "analyzer"]
+    assert again is report
+    assert {"extractors_ms", "rulepack_ms", "lexicons_ms", "analyzer_ms", "total_ms"} <= set(report)
+    assert fake_redis.exists(warmup.WARM_START_KEY)
+    assert fake_redis.ttl(warmup.WARM_START_KEY) > 0
+
+
+def test_failed_step_does_not_abort_warm_start(fake_redis, monkeypatch):
+    def boom():
+        raise RuntimeError("missing optional dependency")
+
+    monkeypatch.setattr(warmup, "_warm_extractors", boom)
+    for step in ("rulepack", "lexicons", "analyzer"):
+        monkeypatch.setattr(warmup, f"_warm_{step}", lambda: None)
+
+    report = warmup.warm_start()
+    assert "extractors_ms" in report and "analyzer_ms" in report
+
+
+def test_only_first_job_latency_is_recorded(fake_redis):
+    assert warmup.record_job_latency(1500.0) is True
+    assert warmup.record_job_latency(20.0) is False
+
+    stats = warmup.get_warm_start_stats()
+    assert stats["first_job_latency_ms"] == 1500.0
+    assert stats["first_job_samples"] == 1
+
+
+def test_samples_from_old_workers_are_trimmed(fake_redis):
+    stale = json.dumps({"ms": 9000.0, "at": time.time() - warmup.stats_ttl_seconds() - 1})
+    fake_redis.hset(warmup.FIRST_JOB_KEY, mapping={"gone:1": stale, "legacy:2": "8000.0"})
+    warmup.record_job_latency(1200.0)
+
+    stats = warmup.get_warm_start_stats()
+    assert stats["first_job_latency_ms"] == 1200.0
+    assert stats["first_job_samples"] == 1
+    assert list(fake_redis.hgetall(warmup.FIRST_JOB_KEY)) == [warmup._worker_id()]
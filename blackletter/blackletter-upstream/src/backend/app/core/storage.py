@@ -18,16 +18,27 @@ Usage:
     
     # Generate a signed URL
     url = generate_presigned_url(s3_key, expires_in=3600)
+
+    # Stream a large file (or a byte range of it) without buffering it
+    for chunk in stream_file(s3_key):
+        ...
+
+The client is shared and pooled (S3_MAX_POOL_CONNECTIONS). Uploads above
+S3_MULTIPART_THRESHOLD_MB are sent as multipart uploads of
+S3_MULTIPART_CHUNK_MB parts, streamed from the source file object.
 """
 
 import os
 import io
+import threading
 import uuid
-from typing import Dict, List, Optional, Tuple, Union, Any, BinaryIO
+from typing import Dict, Iterator, List, Optional, Tuple, Union, Any, BinaryIO
 import logging
 from datetime import datetime, timedelta
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from fastapi import UploadFile
 
@@ -40,28 +51,51 @@ S3_ENDPOINT = os.getenv("S3_ENDPOINT", "http://localhost:9000")
 S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY", "admin")
 S3_SECRET_KEY = os.getenv("S3_SECRET_KEY", "adminadmin")
 S3_BUCKET = os.getenv("S3_BUCKET", "blackletter")
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+MB = 1024 * 1024
 
-# Client instance
+# Client instance (boto3 clients are thread-safe; share one connection pool)
 _s3_client = None
+_s3_client_lock = threading.Lock()
+_known_buckets = set()
 
 def get_storage_client():
     """
-    Get or initialize the S3 client.
+    Get or initialize the shared, pooled S3 client.
     
     Returns:
         boto3.client: The S3 client
     """
     global _s3_client
     if _s3_client is None:
-        _s3_client = boto3.client(
-            's3',
-            endpoint_url=S3_ENDPOINT,
-            aws_access_key_id=S3_ACCESS_KEY,
-            aws_secret_access_key=S3_SECRET_KEY,
-            region_name='us-east-1',  # Doesn't matter for MinIO
-        )
+        with _s3_client_lock:
+            if _s3_client is None:
+                _s3_client = boto3.client(
+                    's3',
+                    endpoint_url=S3_ENDPOINT,
+                    aws_access_key_id=S3_ACCESS_KEY,
+                    aws_secret_access_key=S3_SECRET_KEY,
+                    region_name='us-east-1',  # Doesn't matter for MinIO
+                    config=Config(
+                        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                        retries={"max_attempts": 3, "mode": "standard"},
+                    ),
+                )
     return _s3_client
 
+def get_transfer_config() -> TransferConfig:
+    """
+    Multipart settings for managed uploads and downloads.
+    
+    Returns:
+        TransferConfig: Threshold, part size and concurrency from the environment
+    """
+    return TransferConfig(
+        multipart_threshold=int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8")) * MB,
+        multipart_chunksize=int(os.getenv("S3_MULTIPART_CHUNK_MB", "8")) * MB,
+        max_concurrency=int(os.getenv("S3_TRANSFER_CONCURRENCY", "8")),
+    )
+
 def ensure_bucket_exists(bucket_name: str = S3_BUCKET):
     """
     Ensure that the specified bucket exists, creating it if necessary.
@@ -72,12 +106,15 @@ def ensure_bucket_exists(bucket_name: str = S3_BUCKET):
     Returns:
         bool: True if the bucket exists or was created
     """
+    if bucket_name in _known_buckets:
+        return True
     client = get_storage_client()
     
     try:
         # Check if bucket exists
         client.head_bucket(Bucket=bucket_name)
         logger.info(f"Bucket {bucket_name} already exists")
+        _known_buckets.add(bucket_name)
         return True
     except ClientError as e:
         # If a 404 error, the bucket does not exist
@@ -86,6 +123,7 @@ def ensure_bucket_exists(bucket_name: str = S3_BUCKET):
                 # Create the bucket
                 client.create_bucket(Bucket=bucket_name)
                 logger.info(f"Created bucket {bucket_name}")
+                _known_buckets.add(bucket_name)
                 return True
             except ClientError as create_error:
                 logger.error(f"Error creating bucket: {str(create_error)}")
@@ -131,32 +169,25 @@ async def upload_file(
         extra_args['Metadata'] = metadata
     
     try:
-        # Handle different input types
+        # Handle different input types; file objects are streamed so large
+        # contracts go up as multipart uploads without being held in memory
         if isinstance(file_data, UploadFile):
-            # For FastAPI UploadFile
-            contents = await file_data.read()
-            client.upload_fileobj(
-                io.BytesIO(contents),
-                S3_BUCKET,
-                s3_key,
-                ExtraArgs=extra_args
-            )
+            # For FastAPI UploadFile (spooled to disk for large uploads)
+            await file_data.seek(0)
+            fileobj = file_data.file
         elif isinstance(file_data, bytes):
             # For bytes data
-            client.upload_fileobj(
-                io.BytesIO(file_data),
-                S3_BUCKET,
-                s3_key,
-                ExtraArgs=extra_args
-            )
+            fileobj = io.BytesIO(file_data)
         else:
             # For file-like objects
-            client.upload_fileobj(
-                file_data,
-                S3_BUCKET,
-                s3_key,
-                ExtraArgs=extra_args
-            )
+            fileobj = file_data
+        client.upload_fileobj(
+            fileobj,
+            S3_BUCKET,
+            s3_key,
+            ExtraArgs=extra_args,
+            Config=get_transfer_config()
+        )
         
         logger.info(f"Uploaded file to {s3_key}")
         return s3_key
@@ -185,6 +216,71 @@ async def download_file(s3_key: str) -> bytes:
         logger.error(f"Error downloading file {s3_key}: {str(e)}")
         raise
 
+def stream_file(
+    s3_key: str,
+    chunk_size: int = MB,
+    start: int = 0,
+    end: Optional[int] = None,
+    bucket: str = S3_BUCKET
+) -> Iterator[bytes]:
+    """
+    Stream a file, or the inclusive byte range start..end, in chunks.
+    
+    Args:
+        s3_key: The S3 key of the file
+        chunk_size: Size of each yielded chunk in bytes
+        start: First byte to read
+        end: Last byte to read (inclusive), or None for end of file
+        bucket: The S3 bucket name
+        
+    Yields:
+        bytes: Consecutive chunks of the file
+    """
+    client = get_storage_client()
+    kwargs = {"Bucket": bucket, "Key": s3_key}
+    if start or end is not None:
+        kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+    body = client.get_object(**kwargs)['Body']
+    try:
+        yield from body.iter_chunks(chunk_size)
+    finally:
+        body.close()
+
+def download_range(s3_key: str, start: int, end: int, bucket: str = S3_BUCKET) -> bytes:
+    """
+    Download the inclusive byte range start..end of a file.
+    
+    Args:
+        s3_key: The S3 key of the file
+        start: First byte
+        end: Last byte (inclusive)
+        bucket: The S3 bucket name
+        
+    Returns:
+        bytes: The requested bytes
+    """
+    return b"".join(stream_file(s3_key, start=start, end=end, bucket=bucket))
+
+def download_to_path(s3_key: str, path: str, bucket: str = S3_BUCKET) -> str:
+    """
+    Download a file to disk using concurrent ranged GETs for large objects.
+    
+    Args:
+        s3_key: The S3 key of the file
+        path: Destination path
+        bucket: The S3 bucket name
+        
+    Returns:
+        str: The destination path
+    """
+    client = get_storage_client()
+    try:
+        client.download_file(bucket, s3_key, path, Config=get_transfer_config())
+        return path
+    except ClientError as e:
+        logger.error(f"Error downloading file {s3_key} to {path}: {str(e)}")
+        raise
+
 def generate_presigned_url(
     s3_key: str,
     expires_in: int = 3600,